@@ -0,0 +1,4 @@
+"""
+Benchmarks for BOQ Tools
+Synthetic BOQ workbook generation and timing of the core processing stages
+"""
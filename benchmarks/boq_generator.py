@@ -0,0 +1,278 @@
+"""
+Synthetic BOQ Generator for BOQ Tools
+Builds realistic master and offer workbooks at configurable scale for benchmarking
+"""
+
+import json
+import logging
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import openpyxl
+
+logger = logging.getLogger(__name__)
+
+HEADER = ["Item No.", "Description", "Unit", "Quantity", "Unit Price", "Total Price"]
+
+# (description template, unit, category, unit price range)
+WORK_ITEMS = [
+    ("Excavation in {soil} soil to a depth of {depth} m", "m3", "Civil Works", (8, 25)),
+    ("Backfilling with {fill} compacted in layers of {layer} cm", "m3", "Civil Works", (6, 18)),
+    ("Reinforced concrete {grade} for {element}", "m3", "Civil Works", (110, 220)),
+    ("Steel reinforcement bars {steel} for {element}", "kg", "Civil Works", (1, 3)),
+    ("Formwork for {element}, {finish} finish", "m2", "Civil Works", (18, 45)),
+    ("Supply and laying of {pipe} pipe DN{dn}", "m", "Piping", (12, 140)),
+    ("Supply and installation of {cable} cable {section} mm2", "m", "Electrical", (3, 60)),
+    ("Cable tray {tray} width {width} mm", "m", "Electrical", (15, 70)),
+    ("Supply and installation of {module} PV modules {power} Wp", "pcs", "PV Modules", (80, 190)),
+    ("Mounting structure {structure} for {rows} module rows", "pcs", "Structures", (300, 1400)),
+    ("Inverter {inverter} {kva} kVA including commissioning", "pcs", "Electrical", (4000, 40000)),
+    ("Perimeter fence {fence} height {height} m", "m", "Site Works", (20, 65)),
+    ("Gravel road {road} thickness {thickness} cm", "m2", "Site Works", (9, 30)),
+    ("Labour for {trade} works", "hr", "Labour", (30, 75)),
+    ("Earthing conductor {earth} {section} mm2", "m", "Electrical", (4, 20)),
+]
+
+PARAMETERS = {
+    "soil": ["loose", "compact", "rocky", "clay", "sandy"],
+    "depth": ["0.5", "1.0", "1.5", "2.0", "3.0"],
+    "fill": ["selected material", "crushed stone", "excavated material", "sand"],
+    "layer": ["20", "30"],
+    "grade": ["C20/25", "C25/30", "C30/37", "C35/45"],
+    "element": ["foundations", "slabs", "columns", "beams", "walls", "cable pits"],
+    "steel": ["B450C", "B500B"],
+    "finish": ["rough", "smooth", "exposed"],
+    "pipe": ["HDPE", "PVC", "steel", "corrugated PE"],
+    "dn": ["63", "90", "110", "160", "200", "315"],
+    "cable": ["FG7R", "H1Z2Z2-K", "ARG7R", "N2XSY"],
+    "section": ["4", "6", "16", "35", "95", "240"],
+    "tray": ["galvanized", "stainless steel", "perforated"],
+    "width": ["100", "200", "300", "400"],
+    "module": ["monocrystalline", "bifacial"],
+    "power": ["450", "540", "605", "660"],
+    "structure": ["fixed tilt", "single-axis tracker"],
+    "rows": ["2", "3", "4"],
+    "inverter": ["string", "central"],
+    "kva": ["100", "250", "1000", "2500"],
+    "fence": ["welded mesh", "chain link"],
+    "height": ["1.8", "2.0", "2.4"],
+    "road": ["internal", "access"],
+    "thickness": ["20", "30", "40"],
+    "trade": ["civil", "electrical", "mechanical", "commissioning"],
+    "earth": ["bare copper", "galvanized steel"],
+}
+
+SECTION_NAMES = ["Site preparation", "Earthworks", "Foundations", "Structures", "Electrical installation",
+                 "Cabling", "Substation", "Roads and drainage", "Fencing", "Commissioning"]
+
+AREAS = ["North", "South", "East", "West", "Central"]
+
+
+@dataclass
+class BOQGeneratorConfig:
+    """Scale and shape of a synthetic BOQ"""
+    rows: int = 5000                 # Line items per workbook, across all sheets
+    sheets: int = 3
+    offers: int = 2
+    duplicate_rate: float = 0.05     # Share of items repeating an earlier description
+    hierarchical: bool = True        # Section/subsection header rows and subtotals
+    items_per_section: int = 25
+    title_rows: int = 3              # Project title rows above the column headers
+    price_spread: float = 0.15       # Offer unit prices vary by up to +/- this share
+    offer_missing_rate: float = 0.01 # Share of master items an offer leaves out
+    offer_extra_rate: float = 0.01   # Items an offer adds, as a share of master items
+    categorized_rate: float = 0.6    # Share of descriptions present in the category dictionary
+    seed: int = 42
+
+
+@dataclass
+class BenchmarkFiles:
+    """Files produced by generate_benchmark_files"""
+    master: Path
+    offers: List[Path]
+    offer_names: List[str]
+    dictionary: Path
+    config: BOQGeneratorConfig
+    item_count: int = 0
+    offer_item_counts: List[int] = field(default_factory=list)
+
+
+@dataclass
+class _Item:
+    code: str
+    description: str
+    unit: str
+    quantity: float
+    unit_price: float
+    category: str
+
+
+class _DescriptionFactory:
+    """Produces unique, realistic item descriptions (plus deliberate duplicates)"""
+
+    def __init__(self, rng: random.Random, duplicate_rate: float):
+        self.rng = rng
+        self.duplicate_rate = duplicate_rate
+        self.seen: List[Tuple[str, str, str, Tuple[int, int]]] = []
+        self.used = set()
+
+    def next(self) -> Tuple[str, str, str, Tuple[int, int]]:
+        if self.seen and self.rng.random() < self.duplicate_rate:
+            return self.rng.choice(self.seen)
+        template, unit, category, price_range = self.rng.choice(WORK_ITEMS)
+        params = {key: self.rng.choice(values) for key, values in PARAMETERS.items()}
+        base = template.format(**params)
+        description = base
+        variant = 1
+        while description.lower() in self.used:
+            variant += 1
+            description = f"{base} - {self.rng.choice(AREAS)} area, lot {variant}"
+        self.used.add(description.lower())
+        entry = (description, unit, category, price_range)
+        self.seen.append(entry)
+        return entry
+
+
+def _build_master_items(config: BOQGeneratorConfig, rng: random.Random) -> Dict[str, List[List[_Item]]]:
+    """Sheet name -> sections -> items"""
+    factory = _DescriptionFactory(rng, config.duplicate_rate)
+    sheets: Dict[str, List[List[_Item]]] = {}
+    per_sheet = [config.rows // config.sheets + (1 if i < config.rows % config.sheets else 0)
+                 for i in range(config.sheets)]
+    for sheet_index, item_count in enumerate(per_sheet):
+        sheet_name = f"BOQ {sheet_index + 1}"
+        sections: List[List[_Item]] = []
+        remaining = item_count
+        section_number = 0
+        while remaining > 0:
+            section_number += 1
+            size = min(config.items_per_section, remaining)
+            items = []
+            for item_number in range(1, size + 1):
+                description, unit, category, (low, high) = factory.next()
+                quantity = round(rng.uniform(1, 500), 2) if unit != 'pcs' else rng.randint(1, 200)
+                items.append(_Item(
+                    code=f"{sheet_index + 1}.{section_number}.{item_number}",
+                    description=description,
+                    unit=unit,
+                    quantity=quantity,
+                    unit_price=round(rng.uniform(low, high), 2),
+                    category=category,
+                ))
+            sections.append(items)
+            remaining -= size
+        sheets[sheet_name] = sections
+    return sheets
+
+
+def _write_workbook(path: Path, sheets: Dict[str, List[List[_Item]]], config: BOQGeneratorConfig,
+                    title: str) -> int:
+    """Write sheets of sectioned items; returns the number of item rows written"""
+    workbook = openpyxl.Workbook(write_only=True)
+    item_rows = 0
+    for sheet_name, sections in sheets.items():
+        sheet = workbook.create_sheet(sheet_name)
+        if config.title_rows > 0:
+            sheet.append([title])
+            for _ in range(config.title_rows - 1):
+                sheet.append([])
+        sheet.append(HEADER)
+        for section_index, items in enumerate(sections, start=1):
+            if config.hierarchical and items:
+                section_code = items[0].code.rsplit('.', 1)[0]
+                sheet.append([section_code, SECTION_NAMES[(section_index - 1) % len(SECTION_NAMES)].upper()])
+            section_total = 0.0
+            for item in items:
+                total = round(item.quantity * item.unit_price, 2)
+                section_total += total
+                sheet.append([item.code, item.description, item.unit, item.quantity, item.unit_price, total])
+                item_rows += 1
+            if config.hierarchical and items:
+                sheet.append(["", f"Subtotal {items[0].code.rsplit('.', 1)[0]}", "", "", "", round(section_total, 2)])
+    workbook.save(path)
+    return item_rows
+
+
+def _build_offer_items(master: Dict[str, List[List[_Item]]], config: BOQGeneratorConfig,
+                       rng: random.Random, offer_index: int) -> Dict[str, List[List[_Item]]]:
+    """Perturb master prices, drop some items and append offer-specific extras"""
+    offer: Dict[str, List[List[_Item]]] = {}
+    extra_counter = 0
+    for sheet_name, sections in master.items():
+        offer_sections = []
+        for items in sections:
+            offer_items = []
+            for item in items:
+                if rng.random() < config.offer_missing_rate:
+                    continue
+                factor = 1 + rng.uniform(-config.price_spread, config.price_spread)
+                offer_items.append(_Item(item.code, item.description, item.unit, item.quantity,
+                                         round(item.unit_price * factor, 2), item.category))
+            if items and rng.random() < config.offer_extra_rate * len(items):
+                extra_counter += 1
+                prefix = items[0].code.rsplit('.', 1)[0]
+                offer_items.append(_Item(
+                    f"{prefix}.{len(items) + 1}",
+                    f"Additional item {extra_counter} proposed by offer {offer_index + 1}",
+                    "pcs", rng.randint(1, 20), round(rng.uniform(50, 500), 2), "",
+                ))
+            offer_sections.append(offer_items)
+        offer[sheet_name] = offer_sections
+    return offer
+
+
+def generate_benchmark_files(output_dir: Path, config: Optional[BOQGeneratorConfig] = None) -> BenchmarkFiles:
+    """
+    Generate a master BOQ, its offers and a category dictionary
+
+    The same config (including seed) always produces identical workbooks.
+
+    Args:
+        output_dir: Directory to write the files to
+        config: Generator settings (defaults to BOQGeneratorConfig())
+
+    Returns:
+        BenchmarkFiles describing what was written
+    """
+    from core.category_dictionary import CategoryDictionary
+
+    config = config or BOQGeneratorConfig()
+    if config.rows < 1 or config.sheets < 1:
+        raise ValueError("rows and sheets must be at least 1")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(config.seed)
+
+    master_items = _build_master_items(config, rng)
+    master_path = output_dir / "master.xlsx"
+    item_count = _write_workbook(master_path, master_items, config, "Bill of Quantities - Master")
+
+    offer_paths, offer_names, offer_counts = [], [], []
+    for offer_index in range(config.offers):
+        name = f"Offer {chr(ord('A') + offer_index % 26)}{offer_index // 26 or ''}"
+        path = output_dir / f"offer_{offer_index + 1}.xlsx"
+        offer_items = _build_offer_items(master_items, config, rng, offer_index)
+        offer_counts.append(_write_workbook(path, offer_items, config, f"Bill of Quantities - {name}"))
+        offer_paths.append(path)
+        offer_names.append(name)
+
+    dictionary_path = output_dir / "category_dictionary.json"
+    with open(dictionary_path, 'w', encoding='utf-8') as f:
+        json.dump({"mappings": [], "categories": []}, f)
+    dictionary = CategoryDictionary(dictionary_path)
+    descriptions = {item.description: item.category
+                    for sections in master_items.values() for items in sections for item in items}
+    dictionary.upsert_mappings(
+        {"description": description, "category": category}
+        for description, category in descriptions.items()
+        if rng.random() < config.categorized_rate
+    )
+    dictionary.save_dictionary()
+
+    logger.info(f"Generated benchmark BOQ: {item_count} items in {config.sheets} sheets, "
+                f"{config.offers} offers, {len(dictionary.mappings)} dictionary entries in {output_dir}")
+    return BenchmarkFiles(master_path, offer_paths, offer_names, dictionary_path, config,
+                          item_count, offer_counts)
+
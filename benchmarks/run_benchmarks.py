@@ -0,0 +1,281 @@
+"""
+Benchmark Runner for BOQ Tools
+Times every ComparisonPipeline stage on synthetic BOQs and checks results against a baseline
+
+Usage:
+    python -m benchmarks.run_benchmarks --rows 50000 --offers 2 --repeat 3 --output results.json
+    python -m benchmarks.run_benchmarks --rows 50000 --baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --rows 50000 --output benchmarks/baseline.json --save-baseline
+"""
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Allow running as a script from the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.boq_generator import BenchmarkFiles, BOQGeneratorConfig, generate_benchmark_files
+from utils.profiler import disable_profiling, enable_profiling, get_profiler
+
+logger = logging.getLogger(__name__)
+
+RESULTS_SCHEMA_VERSION = 1
+
+# Stages in pipeline order
+STAGES = ['load', 'sheet_extraction', 'sheet_classification', 'column_mapping', 'row_classification',
+          'validation', 'mapping_generation', 'dataframe_build', 'categorization', 'offer_parsing',
+          'merge', 'export']
+
+# A stage regresses when it is this much slower than the baseline (0.25 = 25%)
+DEFAULT_THRESHOLD = 0.25
+
+# Stages faster than this in the baseline are too noisy to compare
+DEFAULT_MIN_SECONDS = 0.05
+
+
+@dataclass
+class StageComparison:
+    """Current vs baseline timing of one stage"""
+    stage: str
+    baseline_seconds: float
+    current_seconds: float
+    threshold: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_seconds / self.baseline_seconds if self.baseline_seconds > 0 else 1.0
+
+    @property
+    def regressed(self) -> bool:
+        return self.ratio > 1.0 + self.threshold
+
+
+def _run_once(files: BenchmarkFiles, work_dir: Path, memory_mode: str, max_workers: Optional[int] = None,
+              use_processes: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    Run ComparisonPipeline once and return the per-stage profiler summary
+
+    The stages are the spans the pipeline itself records; offers ingested in
+    worker processes are only timed as a whole, under 'offer_parsing'.
+    """
+    from core.category_dictionary import CategoryDictionary
+    from core.comparison_pipeline import ComparisonPipeline
+
+    profiler = get_profiler()
+    profiler.reset()
+    enable_profiling(memory_mode)
+    try:
+        pipeline = ComparisonPipeline(category_dictionary=CategoryDictionary(files.dictionary),
+                                      max_workers=max_workers, use_processes=use_processes)
+        pipeline.run(files.master, files.offers, offer_names=files.offer_names,
+                     output_path=work_dir / 'comparison_export.xlsx')
+        return profiler.summary()
+    finally:
+        disable_profiling()
+        profiler.reset()
+
+
+def run_benchmarks(config: Optional[BOQGeneratorConfig] = None, repeat: int = 1, memory_mode: str = 'none',
+                   work_dir: Optional[Path] = None, max_workers: Optional[int] = None,
+                   use_processes: bool = True) -> Dict[str, Any]:
+    """
+    Generate synthetic BOQs and time each core stage
+
+    Args:
+        config: Generator settings (defaults to BOQGeneratorConfig())
+        repeat: Number of timed runs; the median per stage is reported
+        memory_mode: Profiler memory mode ('none', 'rss' or 'tracemalloc')
+        work_dir: Directory for generated files (a temporary directory by default)
+        max_workers: Offers ingested concurrently (default: CPU count)
+        use_processes: Ingest offers in worker processes instead of threads
+
+    Returns:
+        JSON-serialisable results dictionary
+    """
+    config = config or BOQGeneratorConfig()
+    if repeat < 1:
+        raise ValueError("repeat must be at least 1")
+
+    with tempfile.TemporaryDirectory(prefix='boq_bench_') as temp_dir:
+        root = Path(work_dir) if work_dir else Path(temp_dir)
+        start = time.perf_counter()
+        files = generate_benchmark_files(root, config)
+        generation_seconds = time.perf_counter() - start
+
+        runs = []
+        for run in range(repeat):
+            logger.info(f"Benchmark run {run + 1}/{repeat}")
+            runs.append(_run_once(files, root, memory_mode, max_workers, use_processes))
+
+    stages = {}
+    for stage in STAGES:
+        samples = [summary[stage] for summary in runs if stage in summary]
+        if not samples:
+            continue
+        wall = [sample['wall_seconds'] for sample in samples]
+        median_wall = statistics.median(wall)
+        rows = samples[0]['rows']
+        peaks = [sample['memory_peak_mb'] for sample in samples if sample['memory_peak_mb'] is not None]
+        stages[stage] = {
+            'wall_seconds': round(median_wall, 4),
+            'wall_seconds_min': round(min(wall), 4),
+            'cpu_seconds': round(statistics.median(sample['cpu_seconds'] for sample in samples), 4),
+            'rows': rows,
+            'rows_per_second': round(rows / median_wall, 1) if rows and median_wall > 0 else None,
+            'memory_peak_mb': round(max(peaks), 1) if peaks else None,
+        }
+
+    return {
+        'schema': RESULTS_SCHEMA_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': _environment(),
+        'config': asdict(config),
+        'items': {'master': files.item_count, 'offers': files.offer_item_counts},
+        'repeat': repeat,
+        'memory_mode': memory_mode,
+        'workers': {'max_workers': max_workers, 'use_processes': use_processes},
+        'generation_seconds': round(generation_seconds, 3),
+        'total_seconds': round(sum(stage['wall_seconds'] for stage in stages.values()), 4),
+        'stages': stages,
+    }
+
+
+def _environment() -> Dict[str, str]:
+    import openpyxl
+    import pandas as pd
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'pandas': pd.__version__,
+        'openpyxl': openpyxl.__version__,
+    }
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any],
+                        threshold: Optional[float] = None,
+                        min_seconds: float = DEFAULT_MIN_SECONDS) -> List[StageComparison]:
+    """
+    Compare stage timings with a stored baseline
+
+    Per-stage thresholds can be stored in the baseline under "thresholds"
+    (stage -> allowed slowdown); `threshold` overrides the baseline's default.
+
+    Args:
+        results: Output of run_benchmarks
+        baseline: Previously saved results (optionally with "thresholds")
+        threshold: Allowed slowdown for stages without their own threshold
+        min_seconds: Baseline stages faster than this are skipped as noise
+
+    Returns:
+        StageComparison for each stage present in both
+    """
+    if results.get('config') != baseline.get('config'):
+        logger.warning("Benchmark config differs from the baseline; timings may not be comparable")
+
+    stage_thresholds = baseline.get('thresholds', {})
+    default = threshold if threshold is not None else stage_thresholds.get('default', DEFAULT_THRESHOLD)
+    comparisons = []
+    for stage, current in results.get('stages', {}).items():
+        previous = baseline.get('stages', {}).get(stage)
+        if previous is None or previous['wall_seconds'] < min_seconds:
+            continue
+        comparisons.append(StageComparison(
+            stage=stage,
+            baseline_seconds=previous['wall_seconds'],
+            current_seconds=current['wall_seconds'],
+            threshold=stage_thresholds.get(stage, default),
+        ))
+    return comparisons
+
+
+def format_results(results: Dict[str, Any], comparisons: Optional[List[StageComparison]] = None) -> str:
+    """Format benchmark results (and baseline comparison) as a text table"""
+    by_stage = {c.stage: c for c in comparisons or []}
+    lines = [f"Benchmark: {results['items']['master']} items, {len(results['items']['offers'])} offers, "
+             f"median of {results['repeat']} run(s)", ""]
+    lines.append(f"{'stage':<22} {'wall s':>9} {'rows/s':>11} {'peak MB':>8} {'baseline':>9} {'change':>8}")
+    for stage, data in results['stages'].items():
+        rate = '' if data['rows_per_second'] is None else f"{data['rows_per_second']:.0f}"
+        peak = '' if data['memory_peak_mb'] is None else f"{data['memory_peak_mb']:.0f}"
+        line = f"{stage:<22} {data['wall_seconds']:>9.3f} {rate:>11} {peak:>8}"
+        comparison = by_stage.get(stage)
+        if comparison:
+            flag = '  REGRESSION' if comparison.regressed else ''
+            line += f" {comparison.baseline_seconds:>9.3f} {comparison.ratio - 1:>+8.0%}{flag}"
+        lines.append(line)
+    lines.append(f"{'total':<22} {results['total_seconds']:>9.3f}")
+    return '\n'.join(lines)
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """Create command-line argument parser"""
+    defaults = BOQGeneratorConfig()
+    parser = argparse.ArgumentParser(description="BOQ Tools benchmark suite")
+    parser.add_argument('--rows', type=int, default=defaults.rows, help='Line items per workbook')
+    parser.add_argument('--sheets', type=int, default=defaults.sheets, help='BOQ sheets per workbook')
+    parser.add_argument('--offers', type=int, default=defaults.offers, help='Number of offer workbooks')
+    parser.add_argument('--duplicate-rate', type=float, default=defaults.duplicate_rate,
+                        help='Share of items repeating an earlier description')
+    parser.add_argument('--flat', action='store_true', help='No section headers or subtotal rows')
+    parser.add_argument('--seed', type=int, default=defaults.seed, help='Random seed')
+    parser.add_argument('--repeat', type=int, default=1, help='Timed runs; the median is reported')
+    parser.add_argument('--memory', choices=['none', 'rss', 'tracemalloc'], default='none',
+                        help='Memory measurement (tracemalloc inflates timings)')
+    parser.add_argument('--workers', type=int, help='Offers ingested concurrently (default: CPU count)')
+    parser.add_argument('--threads', action='store_true', help='Ingest offers in threads instead of processes')
+    parser.add_argument('--output', type=str, help='Write results JSON to this path')
+    parser.add_argument('--baseline', type=str, help='Compare against this results JSON')
+    parser.add_argument('--threshold', type=float, help=f'Allowed slowdown per stage (default {DEFAULT_THRESHOLD:.0%})')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Add default regression thresholds to --output so it can be used as a baseline')
+    parser.add_argument('--keep-files', type=str, metavar='DIR', help='Write the generated workbooks to DIR')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Benchmark entry point; returns 1 when a stage regressed against the baseline"""
+    args = create_parser().parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    config = BOQGeneratorConfig(rows=args.rows, sheets=args.sheets, offers=args.offers,
+                                duplicate_rate=args.duplicate_rate, hierarchical=not args.flat, seed=args.seed)
+    results = run_benchmarks(config, repeat=args.repeat, memory_mode=args.memory,
+                             work_dir=Path(args.keep_files) if args.keep_files else None,
+                             max_workers=args.workers, use_processes=not args.threads)
+
+    comparisons = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            comparisons = compare_to_baseline(results, json.load(f), args.threshold)
+
+    print(format_results(results, comparisons))
+
+    if args.output:
+        if args.save_baseline:
+            results['thresholds'] = {'default': args.threshold if args.threshold is not None else DEFAULT_THRESHOLD}
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to: {output_path}")
+
+    regressions = [c for c in comparisons or [] if c.regressed]
+    if regressions:
+        print(f"{len(regressions)} stage(s) regressed: {', '.join(c.stage for c in regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,8 @@ Build script for creating BOQ-Tools executable
 This script automates the entire process of building a standalone executable.
 """
 
+import ast
+import importlib.util
 import os
 import sys
 import subprocess
@@ -25,6 +27,71 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Source trees scanned for modules loaded through utils.lazy_import
+LAZY_IMPORT_SOURCES = ['main.py', 'ui', 'core', 'utils']
+LAZY_IMPORT_FUNCTIONS = {'lazy_module', 'lazy_callable', 'lazy_available'}
+
+# Lazily imported packages listed in requirements.txt: the build fails when they are not installed
+REQUIRED_LAZY_PACKAGES = {'pyarrow'}
+
+SPEC_TEMPLATE = """# -*- mode: python ; coding: utf-8 -*-
+# Generated by build_exe.py; edit freely, but keep the lazily imported modules in hiddenimports
+
+a = Analysis(
+    ['main.py'],
+    pathex=[],
+    binaries=[],
+    datas=[('config', 'config'), ('resources', 'resources')],
+    hiddenimports={hidden_imports},
+    hookspath=[],
+    hooksconfig={{}},
+    runtime_hooks=['runtime_hook.py'],
+    excludes=[],
+    noarchive=False,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    a.binaries,
+    a.datas,
+    [],
+    name='BOQ-Tools',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=True,
+    upx_exclude=[],
+    runtime_tmpdir=None,
+    console=False,
+    icon='resources/icon.ico',
+)
+"""
+
+
+def collect_lazy_imports(project_root: Path) -> List[str]:
+    """
+    Find the modules loaded through lazy_module/lazy_callable/lazy_available
+
+    They are imported by name at runtime, so PyInstaller's import analysis
+    cannot see them and they have to be listed as hidden imports.
+    """
+    modules = set()
+    for source in LAZY_IMPORT_SOURCES:
+        path = project_root / source
+        files = [path] if path.is_file() else sorted(path.glob('*.py'))
+        for file in files:
+            tree = ast.parse(file.read_text(encoding='utf-8'), filename=str(file))
+            for node in ast.walk(tree):
+                if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                        and node.func.id in LAZY_IMPORT_FUNCTIONS):
+                    names = node.args if node.func.id == 'lazy_available' else node.args[:1]
+                    modules.update(arg.value for arg in names
+                                   if isinstance(arg, ast.Constant) and isinstance(arg.value, str))
+    return sorted(modules)
+
+
 class ExecutableBuilder:
     """Handles the creation of the executable"""
     
@@ -193,6 +260,53 @@ class ExecutableBuilder:
             if str(self.project_root) in sys.path:
                 sys.path.remove(str(self.project_root))
     
+    def hidden_imports(self) -> List[str]:
+        """
+        Lazily imported modules that are installed (optional ones may be missing)
+
+        Raises:
+            RuntimeError: If a module of REQUIRED_LAZY_PACKAGES is not installed
+        """
+        sys.path.insert(0, str(self.project_root))
+        try:
+            hidden, missing = [], []
+            for module in collect_lazy_imports(self.project_root):
+                try:
+                    found = importlib.util.find_spec(module) is not None
+                except (ImportError, ValueError):
+                    found = False
+                if found:
+                    hidden.append(module)
+                elif module.split('.')[0] in REQUIRED_LAZY_PACKAGES:
+                    missing.append(module)
+                else:
+                    logger.info(f"Optional module not installed, not bundled: {module}")
+            if missing:
+                raise RuntimeError(f"Required modules are not installed: {', '.join(missing)}")
+            return hidden
+        finally:
+            sys.path.remove(str(self.project_root))
+
+    def create_spec_file(self):
+        """Write the PyInstaller spec if missing, or warn when it lacks lazily imported modules"""
+        try:
+            hidden = self.hidden_imports()
+        except RuntimeError as e:
+            logger.error(f"{e}; install requirements.txt before building")
+            return False
+
+        if not self.spec_file.exists():
+            self.spec_file.write_text(SPEC_TEMPLATE.format(hidden_imports=hidden), encoding='utf-8')
+            logger.info(f"Created spec file: {self.spec_file}")
+            return True
+
+        spec_text = self.spec_file.read_text(encoding='utf-8')
+        missing = [module for module in hidden if f"'{module}'" not in spec_text and f'"{module}"' not in spec_text]
+        if missing:
+            logger.warning(f"{self.spec_file.name} does not list these lazily imported modules in "
+                           f"hiddenimports; they will be missing from the executable: {', '.join(missing)}")
+        return True
+
     def run_pyinstaller(self, debug: bool = False):
         """Run PyInstaller to create the executable"""
         logger.info("Running PyInstaller...")
@@ -327,6 +441,10 @@ Filename: "{{app}}\\BOQ-Tools.exe"; Description: "{{cm:LaunchProgram,BOQ Tools}}
         if not self.copy_user_dictionaries():
             logger.warning("Failed to copy user dictionaries, proceeding with existing config files")
         
+        # Write or check the spec (hidden imports for lazily loaded modules)
+        if not self.create_spec_file():
+            return False
+
         # Run PyInstaller
         if not self.run_pyinstaller(debug):
             return False
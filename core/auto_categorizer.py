@@ -4,11 +4,13 @@ Automatically categorizes dataset rows using the CategoryDictionary
 """
 
 import logging
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Optional, Any, Callable
 from pathlib import Path
 from dataclasses import dataclass, field
 
+from core.boq_schema import make_writable
 from core.category_dictionary import CategoryDictionary, CategoryMatch
 
 logger = logging.getLogger(__name__)
@@ -35,9 +37,10 @@ class ManualReviewDescription:
     frequency: int = 1
     sample_rows: List[int] = field(default_factory=list)
     auto_category: Optional[str] = None  # Category assigned by auto-categorization
-    match_type: str = 'none'  # 'none', 'fuzzy', 'partial'
+    match_type: str = 'none'  # 'none', 'fuzzy', 'partial', 'suggested'
     confidence: float = 0.0
     matched_dictionary_string: Optional[str] = None  # For fuzzy matches, the dictionary string that was matched
+    suggestions: List[Tuple[str, float]] = field(default_factory=list)  # Ranked (category, probability) pairs
 
 
 @dataclass
@@ -60,6 +63,63 @@ def safe_int(val):
         return 0
 
 
+def _is_blank(values: pd.Series) -> pd.Series:
+    """Cells that str(value).strip() turns into '', 'nan' or 'none' (any case)"""
+    text = values.astype(str).str.strip()
+    return text.isna() | text.str.lower().isin(['nan', 'none', ''])
+
+
+def _group_descriptions(dataframe: pd.DataFrame, mask: pd.Series, description_column: str,
+                        sheet_name_column: Optional[str] = None,
+                        category_column: Optional[str] = None) -> pd.DataFrame:
+    """
+    Rows selected by mask with a non-empty description, grouped by normalized description
+
+    Args:
+        dataframe: DataFrame to read
+        mask: Boolean Series aligned on dataframe's index selecting the rows
+        description_column: Name of the description column
+        sheet_name_column: Name of the sheet name column (optional)
+        category_column: Name of the category column (optional)
+
+    Returns:
+        One row per normalized description, in order of first occurrence, holding the
+        first occurrence's description, index label, sheet and category next to the
+        frequency and 1-based sample_rows of the whole group
+    """
+    subset = dataframe[mask.to_numpy()]
+    subset = subset[(~_is_blank(subset[description_column])).to_numpy()]
+    descriptions = subset[description_column].astype(str).str.strip()
+
+    if pd.api.types.is_integer_dtype(subset.index):
+        row_numbers = subset.index.to_numpy() + 1
+    else:
+        row_numbers = [safe_int(index) + 1 for index in subset.index]
+
+    rows = pd.DataFrame({
+        'key': descriptions.str.lower().to_numpy(),
+        'description': descriptions.to_numpy(),
+        'label': subset.index.to_numpy(),
+        'row_number': row_numbers,
+    })
+    # Missing cells read as NaN (str() gives 'nan'), whatever placeholder the column holds
+    if sheet_name_column:
+        if sheet_name_column in subset.columns:
+            sheets = subset[sheet_name_column].astype(object)
+            rows['sheet'] = sheets.where(sheets.notna(), np.nan).to_numpy()
+        else:
+            rows['sheet'] = 'Unknown'
+    if category_column:
+        categories = subset[category_column].astype(object)
+        rows['category'] = categories.where(categories.notna(), np.nan).to_numpy()
+
+    by_key = rows.groupby('key', sort=False)['row_number']
+    groups = rows.drop_duplicates('key').reset_index(drop=True)
+    groups['frequency'] = by_key.size().loc[groups['key']].to_numpy()
+    groups['sample_rows'] = by_key.agg(list).loc[groups['key']].to_numpy()
+    return groups
+
+
 def collect_unmatched_descriptions(dataframe: pd.DataFrame,
                                  category_column: str = 'Category',
                                  description_column: str = 'Description',
@@ -86,50 +146,24 @@ def collect_unmatched_descriptions(dataframe: pd.DataFrame,
         raise ValueError(f"Description column '{description_column}' not found in DataFrame")
     
     # Find rows with empty/null categories
-    unmatched_mask = dataframe[category_column].isna() | (dataframe[category_column] == '') | (dataframe[category_column].isnull())
-    unmatched_df = dataframe[unmatched_mask].copy()
-    
-    logger.info(f"Found {len(unmatched_df)} rows with unmatched descriptions")
-    
-    # Initialize collection for unique descriptions
-    unique_descriptions: Dict[str, UnmatchedDescription] = {}
-    
-    # Process each unmatched row
-    for index, row in unmatched_df.iterrows():
-        description = str(row[description_column]).strip()
-        
-        # Skip empty descriptions
-        if not description or description.lower() in ['nan', 'none', '']:
-            continue
-        
-        # Normalize description for deduplication
-        normalized_desc = description.lower()
-        
-        # Get source information
-        source_sheet = str(row.get(sheet_name_column, 'Unknown')) if sheet_name_column else 'Unknown'
-        row_number = safe_int(index) + 1  # Convert to 1-based row numbering
-        
-        if normalized_desc in unique_descriptions:
-            # Update existing entry
-            existing = unique_descriptions[normalized_desc]
-            existing.frequency += 1
-            existing.sample_rows.append(row_number)
-            logger.debug(f"Duplicate description found: '{description[:50]}...' (frequency: {existing.frequency})")
-        else:
-            # Create new entry
-            unmatched_desc = UnmatchedDescription(
-                description=description,
-                source_sheet_name=source_sheet,
-                row_number=row_number,
-                original_index=safe_int(index),
-                frequency=1,
-                sample_rows=[row_number]
-            )
-            unique_descriptions[normalized_desc] = unmatched_desc
-            logger.debug(f"New unmatched description: '{description[:50]}...'")
+    unmatched_mask = dataframe[category_column].isna() | (dataframe[category_column] == '')
+    logger.info(f"Found {int(unmatched_mask.sum())} rows with unmatched descriptions")
+    
+    # One entry per normalized description
+    groups = _group_descriptions(dataframe, unmatched_mask, description_column, sheet_name_column)
+    unmatched_list = [
+        UnmatchedDescription(
+            description=group.description,
+            source_sheet_name=str(group.sheet) if sheet_name_column else 'Unknown',
+            row_number=int(group.row_number),
+            original_index=safe_int(group.label),
+            frequency=int(group.frequency),
+            sample_rows=[int(number) for number in group.sample_rows]
+        )
+        for group in groups.itertuples(index=False)
+    ]
     
-    # Convert to list and sort by frequency (most frequent first)
-    unmatched_list = list(unique_descriptions.values())
+    # Sort by frequency (most frequent first)
     unmatched_list.sort(key=lambda x: x.frequency, reverse=True)
     
     logger.info(f"Collected {len(unmatched_list)} unique unmatched descriptions")
@@ -215,10 +249,12 @@ def auto_categorize_dataset(dataframe: pd.DataFrame,
             match_types[match.match_type] += 1
             
             if match.matched_category:
+                make_writable(df, category_column, [match.matched_category])
                 df.at[index, category_column] = match.matched_category
                 matched_rows += 1
                 # print(f"[CATEGORIZATION] '{description}' → '{match.matched_category}' (type: {match.match_type}, confidence: {match.confidence:.2f})")
             else:
+                make_writable(df, category_column, [''])
                 df.at[index, category_column] = ''
                 unmatched_rows += 1
                 # print(f"[CATEGORIZATION] '{description}' → UNMATCHED")
@@ -270,6 +306,91 @@ def auto_categorize_dataset(dataframe: pd.DataFrame,
     return result
 
 
+def recategorize_rows(dataframe: pd.DataFrame,
+                      mask: Any,
+                      category_dictionary: CategoryDictionary,
+                      description_column: str = 'Description',
+                      category_column: str = 'Category',
+                      confidence_threshold: float = 0.8,
+                      progress_callback: Optional[Callable] = None) -> CategorizationResult:
+    """
+    Categorize the rows selected by a boolean mask, in place
+
+    Rows end up with the category auto_categorize_dataset would give them: the
+    dictionary category, '' when the description has no match, and their current
+    value when the description is empty. Each distinct description is looked up
+    once and all categories are written with a single aligned .loc assignment.
+
+    Args:
+        dataframe: DataFrame to update
+        mask: Boolean Series aligned on dataframe's index (or array of its length) selecting the rows
+        category_dictionary: CategoryDictionary instance
+        description_column: Name of the column containing descriptions
+        category_column: Name of the category column (added if missing)
+        confidence_threshold: Minimum confidence threshold for matches
+        progress_callback: Optional callback function for progress tracking
+
+    Returns:
+        CategorizationResult for the selected rows; its dataframe is dataframe itself
+    """
+    actual_description_column = next(
+        (col for col in dataframe.columns if str(col).lower() == description_column.lower()), None
+    )
+    if not actual_description_column:
+        available_columns = list(dataframe.columns)
+        raise ValueError(f"Description column '{description_column}' not found in DataFrame. Available columns: {available_columns}")
+
+    if isinstance(mask, pd.Series):
+        mask = mask.reindex(dataframe.index, fill_value=False)
+    else:
+        mask = pd.Series(mask, index=dataframe.index)
+    mask = mask.fillna(False).astype(bool)
+
+    if category_column not in dataframe.columns:
+        dataframe[category_column] = ''
+
+    keys = dataframe.loc[mask, actual_description_column].astype(str).str.strip().str.lower()
+    keys = keys[keys.notna() & ~keys.isin(['nan', 'none', ''])]
+    counts = keys.value_counts(sort=False)
+    matches = category_dictionary.find_categories(counts.index, counts.to_numpy())
+    categories = keys.map(matches)
+    if len(categories):
+        categories_written = categories.fillna('')
+        make_writable(dataframe, category_column, categories_written)
+        dataframe.loc[categories.index, category_column] = categories_written
+
+    total_rows = int(mask.sum())
+    matched_rows = int(categories.notna().sum())
+    unmatched_rows = total_rows - matched_rows
+    match_rate = matched_rows / total_rows if total_rows > 0 else 0.0
+    selected = dataframe.loc[mask, category_column]
+    match_statistics = {
+        'total_rows': total_rows,
+        'matched_rows': matched_rows,
+        'unmatched_rows': unmatched_rows,
+        'match_rate': match_rate,
+        'match_types': {'exact': matched_rows, 'none': len(keys) - matched_rows},
+        'confidence_threshold': confidence_threshold,
+        'unique_categories_found': len(selected.dropna().unique()),
+        'category_distribution': selected.value_counts().to_dict()
+    }
+    if progress_callback:
+        progress_callback(100, f"Processed {total_rows} rows")
+
+    logger.info(f"Recategorized {total_rows} rows ({len(counts)} distinct descriptions): "
+                f"{matched_rows} matched, {unmatched_rows} unmatched")
+
+    return CategorizationResult(
+        dataframe=dataframe,
+        unmatched_descriptions=[],
+        match_statistics=match_statistics,
+        total_rows=total_rows,
+        matched_rows=matched_rows,
+        unmatched_rows=unmatched_rows,
+        match_rate=match_rate
+    )
+
+
 class AutoCategorizer:
     """
     Automatic dataset categorizer using CategoryDictionary
@@ -308,6 +429,30 @@ class AutoCategorizer:
             category_column, confidence_threshold, progress_callback
         )
     
+    def recategorize_rows(self, dataframe: pd.DataFrame, mask: Any,
+                          description_column: str = 'Description',
+                          category_column: str = 'Category',
+                          confidence_threshold: float = 0.8,
+                          progress_callback: Optional[Callable] = None) -> CategorizationResult:
+        """
+        Categorize the rows selected by a boolean mask in place (see recategorize_rows)
+
+        Args:
+            dataframe: DataFrame to update
+            mask: Boolean Series aligned on dataframe's index selecting the rows
+            description_column: Name of the column containing descriptions
+            category_column: Name of the category column
+            confidence_threshold: Minimum confidence threshold for matches
+            progress_callback: Optional callback function for progress tracking
+
+        Returns:
+            CategorizationResult for the selected rows
+        """
+        return recategorize_rows(
+            dataframe, mask, self.category_dictionary, description_column,
+            category_column, confidence_threshold, progress_callback
+        )
+
     def collect_unmatched_descriptions(self, dataframe: pd.DataFrame,
                                      category_column: str = 'Category',
                                      description_column: str = 'Description',
@@ -418,9 +563,9 @@ class AutoCategorizer:
                              (dataframe[category_column] == '') | 
                              (dataframe[category_column].isnull()))
         
-        rows_to_categorize = dataframe[empty_category_mask].copy()
+        empty_row_count = int(empty_category_mask.sum())
         
-        if len(rows_to_categorize) == 0:
+        if empty_row_count == 0:
             logger.info("No rows with empty categories found - RECATEGORIZATION not needed")
             return CategorizationResult(
                 dataframe=dataframe,
@@ -441,23 +586,18 @@ class AutoCategorizer:
                 match_rate=1.0
             )
         
-        logger.info(f"Found {len(rows_to_categorize)} rows with empty categories to recategorize")
+        logger.info(f"Found {empty_row_count} rows with empty categories to recategorize")
         
-        # Use the same auto-categorization process as Master BoQ
-        recategorization_result = self.auto_categorize_dataset(
-            rows_to_categorize, 
+        # Same dictionary lookup as the Master BoQ, written back to the empty rows in one pass
+        recategorization_result = self.recategorize_rows(
+            dataframe,
+            empty_category_mask,
             description_column, 
             category_column, 
             confidence_threshold, 
             progress_callback
         )
         
-        # Update the original DataFrame with the recategorized results
-        for index, row in recategorization_result.dataframe.iterrows():
-            original_index = rows_to_categorize.index[index]
-            new_category = row[category_column]
-            dataframe.at[original_index, category_column] = new_category
-        
         # Calculate final statistics
         final_matched_mask = dataframe[category_column].notna() & (dataframe[category_column] != '')
         final_matched_rows = final_matched_mask.sum()
@@ -476,7 +616,7 @@ class AutoCategorizer:
                 'unique_categories_found': len(dataframe[category_column].dropna().unique()),
                 'category_distribution': dataframe[category_column].value_counts().to_dict(),
                 'recategorization_stats': {
-                    'rows_recategorized': len(rows_to_categorize),
+                    'rows_recategorized': empty_row_count,
                     'new_matches_found': recategorization_result.matched_rows,
                     'still_unmatched': recategorization_result.unmatched_rows
                 }
@@ -489,7 +629,7 @@ class AutoCategorizer:
         
         logger.info(f"RECATEGORIZATION completed:")
         logger.info(f"  Total rows: {len(dataframe)}")
-        logger.info(f"  Rows recategorized: {len(rows_to_categorize)}")
+        logger.info(f"  Rows recategorized: {empty_row_count}")
         logger.info(f"  New matches found: {recategorization_result.matched_rows}")
         logger.info(f"  Final match rate: {final_match_rate:.1%}")
         
@@ -582,15 +722,17 @@ def collect_descriptions_for_manual_review(dataframe: pd.DataFrame,
                                          confidence_threshold: float = 0.8) -> List[ManualReviewDescription]:
     """
     Collect descriptions for manual review (unmatched, fuzzy, and partial matches)
-    Excludes only exact matches from manual review
+    Excludes only exact matches from manual review. With a category dictionary, every
+    description gets ranked category suggestions; one whose top suggestion reaches
+    confidence_threshold is marked 'suggested' with that probability as confidence.
     
     Args:
         dataframe: Categorized DataFrame
-        category_dictionary: CategoryDictionary instance used for categorization
+        category_dictionary: CategoryDictionary instance used for categorization (optional)
         category_column: Name of the category column
         description_column: Name of the description column
         sheet_name_column: Name of the sheet name column (optional)
-        confidence_threshold: Confidence threshold used for categorization
+        confidence_threshold: Minimum suggestion probability for a 'suggested' match
         
     Returns:
         List of ManualReviewDescription objects with metadata
@@ -604,66 +746,38 @@ def collect_descriptions_for_manual_review(dataframe: pd.DataFrame,
     if description_column not in dataframe.columns:
         raise ValueError(f"Description column '{description_column}' not found in DataFrame")
     
-    # Initialize collection for unique descriptions
-    unique_descriptions: Dict[str, ManualReviewDescription] = {}
+    # Unmatched rows need review; exact matches don't
+    review_mask = _is_blank(dataframe[category_column])
+    groups = _group_descriptions(dataframe, review_mask, description_column, sheet_name_column,
+                                 category_column)
+    review_list = [
+        ManualReviewDescription(
+            description=group.description,
+            source_sheet_name=str(group.sheet) if sheet_name_column else 'Unknown',
+            row_number=int(group.row_number),
+            original_index=safe_int(group.label),
+            frequency=int(group.frequency),
+            sample_rows=[int(number) for number in group.sample_rows],
+            auto_category=str(group.category).strip(),
+            match_type='none',
+            confidence=0.0,
+            matched_dictionary_string=None
+        )
+        for group in groups.itertuples(index=False)
+    ]
     
-    # Process each row
-    for index, row in dataframe.iterrows():
-        description = str(row[description_column]).strip()
-        
-        # Skip empty descriptions
-        if not description or description.lower() in ['nan', 'none', '']:
-            continue
-        
-        # Get the current category and determine if it needs manual review
-        current_category = str(row[category_column]).strip()
-        needs_review = False
-        match_type = 'none'
-        confidence = 0.0
-        matched_dict_str = None
-        
-        # Check if this row needs manual review
-        if not current_category or current_category.lower() in ['nan', 'none', '']:
-            # Unmatched - needs review
-            needs_review = True
-            match_type = 'none'
-        # Exact matches don't need review
-        
-        if needs_review:
-            # Normalize description for deduplication
-            normalized_desc = description.lower()
-            
-            # Get source information
-            source_sheet = str(row.get(sheet_name_column, 'Unknown')) if sheet_name_column else 'Unknown'
-            row_number = safe_int(index) + 1  # Convert to 1-based row numbering
-            
-            if normalized_desc in unique_descriptions:
-                # Update existing entry
-                existing = unique_descriptions[normalized_desc]
-                existing.frequency += 1
-                existing.sample_rows.append(row_number)
-                logger.debug(f"Duplicate description found: '{description[:50]}...' (frequency: {existing.frequency})")
-            else:
-                # Create new entry
-                review_desc = ManualReviewDescription(
-                    description=description,
-                    source_sheet_name=source_sheet,
-                    row_number=row_number,
-                    original_index=safe_int(index),
-                    frequency=1,
-                    sample_rows=[row_number],
-                    auto_category=current_category,
-                    match_type=match_type,
-                    confidence=confidence,
-                    matched_dictionary_string=matched_dict_str
-                )
-                unique_descriptions[normalized_desc] = review_desc
-                logger.debug(f"New description for manual review: '{description[:50]}...' (type: {match_type})")
-    
-    # Convert to list and sort by frequency (most frequent first)
-    review_list = list(unique_descriptions.values())
+    # Sort by frequency (most frequent first)
     review_list.sort(key=lambda x: x.frequency, reverse=True)
     
+    # Rank likely categories for all descriptions in one batch
+    if category_dictionary is not None and review_list:
+        ranked = category_dictionary.suggest_categories([desc.description for desc in review_list])
+        for desc, suggestions in zip(review_list, ranked):
+            desc.suggestions = suggestions
+            if suggestions and suggestions[0][1] >= confidence_threshold:
+                desc.match_type = 'suggested'
+                desc.confidence = suggestions[0][1]
+    
     # Log statistics
     logger.info(f"Collected {len(review_list)} unique descriptions for manual review")
     logger.info(f"Total frequency: {sum(desc.frequency for desc in review_list)}")
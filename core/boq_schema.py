@@ -0,0 +1,106 @@
+"""
+BOQ Schema for BOQ Tools
+Column dtypes of the unified BOQ DataFrame, applied once when the frame is built
+"""
+
+import logging
+from typing import Any, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.description_intern import DescriptionTable
+from core.row_facts import parse_numeric
+
+logger = logging.getLogger(__name__)
+
+# Repeated labels, stored once per distinct value
+CATEGORY_COLUMNS = ('Source_Sheet', 'code', 'Category', 'unit')
+
+# Value columns; '<column>[<offer>]' offer columns share the base column's dtype
+NUMERIC_COLUMNS = ('quantity', 'unit_price', 'total_price', 'manhours', 'wage')
+
+DESCRIPTION_COLUMN = 'Description'
+
+
+def is_numeric_column(column: str) -> bool:
+    """Whether a base or offer column holds values (quantity, prices, manhours, wage)"""
+    return str(column).split('[', 1)[0] in NUMERIC_COLUMNS
+
+
+def apply_schema(dataframe: pd.DataFrame, descriptions: Optional[DescriptionTable] = None) -> pd.DataFrame:
+    """
+    Give the unified BOQ DataFrame its column dtypes (in place)
+
+    - Source_Sheet, code, Category and unit become categoricals; '' is always a
+      category, so blanks and fillna('') keep working.
+    - Base and offer value columns become float64. Text cells are parsed like
+      the comparison merge does (row_facts.parse_numeric), so '1,200.50',
+      '€ 1 200' or '$12.5' keep their value; cells that are not numbers
+      become NaN.
+    - Equal descriptions share one string object (through descriptions, so
+      frames built from the same table share them too). The text is unchanged.
+
+    Applying the schema again is cheap: columns that already have their dtype
+    are left alone.
+
+    Args:
+        dataframe: Unified BOQ DataFrame
+        descriptions: Interning table for the Description column (a new one if not given)
+
+    Returns:
+        The same DataFrame
+    """
+    for column in dataframe.columns:
+        series = dataframe[column]
+        if column in CATEGORY_COLUMNS:
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                series = series.astype('category')
+            if '' not in series.cat.categories:
+                series = series.cat.add_categories([''])
+            dataframe[column] = series
+        elif is_numeric_column(column):
+            if series.dtype != np.float64:
+                dataframe[column] = _to_float(series)
+    if DESCRIPTION_COLUMN in dataframe.columns and not isinstance(dataframe[DESCRIPTION_COLUMN].dtype,
+                                                                   pd.CategoricalDtype):
+        table = descriptions if descriptions is not None else DescriptionTable()
+        dataframe[DESCRIPTION_COLUMN] = pd.Series(table.strings(dataframe[DESCRIPTION_COLUMN]),
+                                                  index=dataframe.index, dtype=object)
+    return dataframe
+
+
+def _to_float(series: pd.Series) -> pd.Series:
+    """float64 copy of a value column; cells pandas cannot parse go through parse_numeric"""
+    numbers = pd.to_numeric(series, errors='coerce').astype(np.float64)
+    retry = numbers.isna().to_numpy() & series.notna().to_numpy() & series.ne('').to_numpy()
+    if not retry.any():
+        return numbers
+    values = numbers.to_numpy(copy=True)
+    parsed = (parse_numeric(value) for value in series.to_numpy(dtype=object)[retry])
+    values[retry] = [np.nan if number is None else number for number in parsed]
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def make_writable(dataframe: pd.DataFrame, column: str, values: Iterable[Any]) -> None:
+    """
+    Prepare a column for writing values into it
+
+    Values that are not yet categories of a categorical column are added as
+    categories, and columns that cannot hold strings (e.g. an all-NaN float
+    column) become object columns.
+
+    Args:
+        dataframe: DataFrame about to be written to
+        column: Existing column
+        values: Values that will be written
+    """
+    series = dataframe[column]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        new = [value for value in dict.fromkeys(values)
+               if value is not None and value == value and value not in categories]
+        if new:
+            dataframe[column] = series.cat.add_categories(new)
+    elif not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+        dataframe[column] = series.astype(object)
@@ -72,6 +72,8 @@ class CategoryDictionary:
             self.dictionary_file = dictionary_file
         self.mappings: Dict[str, CategoryMapping] = {}
         self.categories: Set[str] = set()
+        self._suggester = None  # CategorySuggester, loaded on first use
+        self._suggester_stale = False  # mappings changed outside upsert_mappings since the last sync
         self._load_dictionary()
         
         logger.info(f"Category Dictionary initialized with {len(self.mappings)} mappings")
@@ -209,6 +211,12 @@ class CategoryDictionary:
             with open(self.dictionary_file, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
 
+            if self._suggester is not None:
+                try:
+                    self.suggester.save(self.suggester_file)
+                except Exception as e:
+                    logger.warning(f"Could not save category suggester: {e}")
+
             logger.info(f"Dictionary saved to {self.dictionary_file}")
             return True
 
@@ -253,6 +261,7 @@ class CategoryDictionary:
             # Add to dictionary
             self.mappings[normalized_desc] = mapping
             self.categories.add(pretty_category)  # Store pretty category
+            self._suggester_stale = True
             
             logger.info(f"Added mapping: '{description}' -> '{pretty_category}'")
             return True
@@ -298,7 +307,8 @@ class CategoryDictionary:
                 suggestions=[]
             )
         
-        # No match found
+        # No match found. Ranked suggestions come from one batched suggest_categories
+        # call over all unmatched descriptions (see collect_descriptions_for_manual_review)
         return CategoryMatch(
             description=normalized_desc,
             matched_category=None,
@@ -308,6 +318,64 @@ class CategoryDictionary:
             suggestions=list(self.categories)[:5]  # Top 5 categories as suggestions
         )
     
+    def find_categories(self, descriptions: Iterable[str],
+                        counts: Optional[Iterable[int]] = None) -> Dict[str, str]:
+        """
+        Exact-match many descriptions in one call
+
+        Args:
+            descriptions: Distinct descriptions to categorize
+            counts: Occurrences of each description, added to usage_count like
+                repeated find_category calls would (default: 1 each)
+
+        Returns:
+            Normalized description -> category, for the descriptions that matched
+        """
+        if counts is None:
+            descriptions = list(descriptions)
+            counts = [1] * len(descriptions)
+
+        matches = {}
+        for description, count in zip(descriptions, counts):
+            normalized_desc = str(description).lower().strip()
+            mapping = self.mappings.get(normalized_desc) if normalized_desc else None
+            if mapping is not None:
+                mapping.usage_count += int(count)
+                matches[normalized_desc] = mapping.category
+        return matches
+
+    @property
+    def suggester_file(self) -> Path:
+        """Where the category suggester is saved, next to the dictionary file"""
+        dictionary_file = Path(self.dictionary_file)
+        return dictionary_file.with_name(f"{dictionary_file.stem}_suggester.npz")
+
+    @property
+    def suggester(self):
+        """CategorySuggester learned from the mappings, kept in sync with them"""
+        from core.category_suggester import load_or_train
+
+        if self._suggester is None:
+            self._suggester = load_or_train(self.suggester_file, self.mappings)
+        elif self._suggester_stale:
+            self._suggester.sync(self.mappings)
+        self._suggester_stale = False
+        return self._suggester
+
+    def suggest_categories(self, descriptions: Iterable[str],
+                           top_k: int = 5) -> List[List[Tuple[str, float]]]:
+        """
+        Ranked category suggestions for many descriptions at once
+
+        Args:
+            descriptions: Descriptions to score
+            top_k: Suggestions per description
+
+        Returns:
+            For each description, (category, probability) pairs, most likely first
+        """
+        return self.suggester.suggest(descriptions, top_k)
+
     def get_all_categories(self) -> List[str]:
         """Get all available categories"""
         return sorted(list(self.categories))
@@ -324,6 +392,7 @@ class CategoryDictionary:
         
         if normalized_desc in self.mappings:
             del self.mappings[normalized_desc]
+            self._suggester_stale = True
             logger.info(f"Removed mapping: '{description}'")
             self._prune_unused_categories()
             return True
@@ -405,6 +474,8 @@ class CategoryDictionary:
 
             if mapping.category:
                 self.categories.add(mapping.category)
+            if self._suggester is not None:
+                self._suggester.learn(normalized_desc, mapping.category)
 
         return added, updated
 
@@ -427,6 +498,7 @@ class CategoryDictionary:
             if mapping:
                 removed += 1
                 affected_categories.add(mapping.category)
+                self._suggester_stale = True
                 logger.debug(f"Deleted mapping for '{description}'")
 
         if affected_categories:
@@ -461,6 +533,7 @@ class CategoryDictionary:
             affected_categories.add(mapping.category)
             mapping.category = normalized_category
             self.categories.add(normalized_category)
+            self._suggester_stale = True
             updated += 1
 
         if affected_categories:
@@ -523,6 +596,7 @@ class CategoryDictionary:
             mapping = self.mappings[normalized_desc]
             old_category = mapping.category
             mapping.category = new_category.strip()  # Store in pretty format
+            self._suggester_stale = True
             
             if new_confidence is not None:
                 mapping.confidence = new_confidence
@@ -592,6 +666,7 @@ class CategoryDictionary:
                         self.mappings[normalized_desc] = mapping
                         self.categories.add(mapping.category)
                         imported_count += 1
+            self._suggester_stale = True
             
             logger.info(f"Imported {imported_count} mappings from {import_path}")
             return True
@@ -0,0 +1,251 @@
+"""
+Category Suggester for BOQ Tools
+Ranks likely categories for descriptions the dictionary has no exact match for, learned from the dictionary itself
+"""
+
+import logging
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Hashed feature space; collisions are rare at this size for BOQ vocabularies
+DEFAULT_FEATURES = 2 ** 15
+
+# Softmax temperature turning cosine similarities into probabilities
+DEFAULT_TEMPERATURE = 0.05
+
+_TOKEN = re.compile(r'\w+')
+
+
+class CategorySuggester:
+    """
+    Nearest-centroid classifier over hashed, IDF-weighted n-gram features
+
+    Every dictionary description adds its L2-normalized feature vector (word
+    unigrams, word bigrams and character trigrams, hashed into a fixed-size
+    space) to the sum of its category. A query is weighted by inverse document
+    frequency, compared with every category centroid by cosine similarity, and
+    the similarities are turned into probabilities with a softmax.
+
+    Learning is incremental: learn() and forget() touch only the descriptions
+    given, and sync() brings the model in line with a mapping dictionary by
+    learning only what changed. Scoring is batched over all descriptions at once.
+
+    Usage:
+        suggester = CategorySuggester()
+        suggester.sync({'excavation': 'Earth Movement'})
+        suggester.suggest(['excavation of trenches'])  # [[('Earth Movement', 1.0)]]
+    """
+
+    def __init__(self, n_features: int = DEFAULT_FEATURES, temperature: float = DEFAULT_TEMPERATURE):
+        """
+        Initialize an empty model
+
+        Args:
+            n_features: Size of the hashed feature space (a power of two)
+            temperature: Softmax temperature; lower values give sharper probabilities
+        """
+        self.n_features = n_features
+        self.temperature = temperature
+        self.categories: List[str] = []
+        self._category_index: Dict[str, int] = {}
+        self._sums = np.zeros((0, n_features), dtype=np.float64)
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._doc_freq = np.zeros(n_features, dtype=np.int64)
+        # Description -> category the model currently holds
+        self.learned: Dict[str, str] = {}
+        # Descriptions learned or forgotten so far
+        self.updates = 0
+
+    # ------------------------------------------------------------------ features
+
+    def features(self, description: str) -> np.ndarray:
+        """Sorted hashed feature indices of a description"""
+        tokens = _TOKEN.findall(str(description).lower())
+        grams = [f"w:{token}" for token in tokens]
+        grams.extend(f"b:{first} {second}" for first, second in zip(tokens, tokens[1:]))
+        for token in tokens:
+            padded = f"<{token}>"
+            grams.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        mask = self.n_features - 1
+        return np.unique(np.fromiter((zlib.crc32(gram.encode('utf-8')) & mask for gram in grams),
+                                     dtype=np.int64, count=len(grams)))
+
+    # ------------------------------------------------------------------ learning
+
+    def learn(self, description: str, category: str) -> None:
+        """Add one description to a category (replacing what was learned for it)"""
+        if not description or not category:
+            self.forget(description)
+            return
+        previous = self.learned.get(description)
+        if previous == category:
+            return
+        if previous is not None:
+            self.forget(description)
+        self._apply(description, self._category_row(category), 1)
+        self.learned[description] = category
+
+    def forget(self, description: str) -> None:
+        """Remove a learned description"""
+        category = self.learned.pop(description, None)
+        if category is not None:
+            self._apply(description, self._category_index[category], -1)
+
+    def sync(self, mappings: Mapping[str, object]) -> int:
+        """
+        Learn and forget whatever differs between the model and a dictionary
+
+        Args:
+            mappings: Normalized description -> category (or an object with a .category)
+
+        Returns:
+            Number of descriptions learned or forgotten
+        """
+        before = self.updates
+        current = {description: getattr(value, 'category', value) for description, value in mappings.items()}
+        for description in [d for d in self.learned if d not in current]:
+            self.forget(description)
+        for description, category in current.items():
+            if self.learned.get(description) != category:
+                self.learn(description, category)
+        changed = self.updates - before
+        if changed:
+            logger.debug(f"Category suggester synced: {changed} descriptions updated")
+        return changed
+
+    def _category_row(self, category: str) -> int:
+        row = self._category_index.get(category)
+        if row is None:
+            row = len(self.categories)
+            self.categories.append(category)
+            self._category_index[category] = row
+            self._sums = np.vstack([self._sums, np.zeros((1, self.n_features), dtype=np.float64)])
+            self._counts = np.append(self._counts, 0)
+        return row
+
+    def _apply(self, description: str, row: int, sign: int) -> None:
+        indices = self.features(description)
+        if len(indices):
+            self._sums[row, indices] += sign / np.sqrt(len(indices))
+            self._doc_freq[indices] += sign
+        self._counts[row] += sign
+        self.updates += 1
+
+    # ------------------------------------------------------------------ scoring
+
+    def suggest(self, descriptions: Iterable[str], top_k: int = 5) -> List[List[Tuple[str, float]]]:
+        """
+        Rank categories for many descriptions in one pass
+
+        Args:
+            descriptions: Descriptions to score
+            top_k: Suggestions returned per description
+
+        Returns:
+            For each description, up to top_k (category, probability) pairs, most likely
+            first; empty when the description shares no feature with any category
+        """
+        descriptions = list(descriptions)
+        unique = list(dict.fromkeys(descriptions))  # repeated descriptions are scored once
+        ranked_unique = self._rank(unique, top_k)
+        positions = {description: i for i, description in enumerate(unique)}
+        return [list(ranked_unique[positions[description]]) for description in descriptions]
+
+    def _rank(self, descriptions: List[str], top_k: int) -> List[List[Tuple[str, float]]]:
+        results: List[List[Tuple[str, float]]] = [[] for _ in descriptions]
+        active = np.flatnonzero(self._counts > 0)
+        if not descriptions or not len(active):
+            return results
+
+        features = [self.features(description) for description in descriptions]
+        rows = [i for i, indices in enumerate(features) if len(indices)]
+        if not rows:
+            return results
+        lengths = np.array([len(features[i]) for i in rows])
+        indices = np.concatenate([features[i] for i in rows])
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+
+        # IDF-weighted, L2-normalized queries
+        n_docs = int(self._counts.sum())
+        weights = np.log((1.0 + n_docs) / (1.0 + self._doc_freq[indices])) + 1.0
+        norms = np.sqrt(np.add.reduceat(weights ** 2, offsets))
+        weights /= np.repeat(norms, lengths)
+
+        # Cosine similarity with each category centroid, one column per description
+        centroids = self._sums[active]
+        centroid_norms = np.linalg.norm(centroids, axis=1)
+        centroid_norms[centroid_norms == 0] = 1.0
+        similarity = np.add.reduceat(centroids[:, indices] * weights, offsets, axis=1) / centroid_norms[:, None]
+
+        logits = similarity / self.temperature
+        probabilities = np.exp(logits - logits.max(axis=0))
+        probabilities /= probabilities.sum(axis=0)
+        top_k = min(top_k, len(active))
+        ranked = np.argsort(-probabilities, axis=0, kind='stable')[:top_k]
+
+        for column, row in enumerate(rows):
+            if similarity[:, column].max() <= 0:
+                continue
+            results[row] = [(self.categories[active[c]], float(probabilities[c, column])) for c in ranked[:, column]]
+        return results
+
+    # ------------------------------------------------------------------ persistence
+
+    def save(self, path: Path) -> None:
+        """Write the model to an .npz file"""
+        descriptions = list(self.learned)
+        with open(path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                n_features=np.array(self.n_features),
+                temperature=np.array(self.temperature),
+                categories=np.array(self.categories, dtype=str),
+                sums=self._sums,
+                counts=self._counts,
+                doc_freq=self._doc_freq,
+                descriptions=np.array(descriptions, dtype=str),
+                learned_categories=np.array([self.learned[d] for d in descriptions], dtype=str),
+            )
+        logger.debug(f"Category suggester saved to {path} ({len(descriptions)} descriptions)")
+
+    @classmethod
+    def load(cls, path: Path) -> 'CategorySuggester':
+        """Read a model written by save()"""
+        with np.load(path, allow_pickle=False) as data:
+            suggester = cls(int(data['n_features']), float(data['temperature']))
+            suggester.categories = data['categories'].tolist()
+            suggester._category_index = {category: i for i, category in enumerate(suggester.categories)}
+            suggester._sums = data['sums'].astype(np.float64)
+            suggester._counts = data['counts'].astype(np.int64)
+            suggester._doc_freq = data['doc_freq'].astype(np.int64)
+            suggester.learned = dict(zip(data['descriptions'].tolist(), data['learned_categories'].tolist()))
+        return suggester
+
+
+def load_or_train(path: Optional[Path], mappings: Mapping[str, object]) -> CategorySuggester:
+    """
+    The suggester saved at path, brought up to date with mappings (or trained from scratch)
+
+    Args:
+        path: Saved model, if any
+        mappings: Normalized description -> CategoryMapping (or category)
+
+    Returns:
+        CategorySuggester in sync with mappings
+    """
+    suggester = None
+    if path is not None and path.exists():
+        try:
+            suggester = CategorySuggester.load(path)
+        except Exception as e:
+            logger.warning(f"Could not load category suggester from {path}, retraining: {e}")
+    if suggester is None:
+        suggester = CategorySuggester()
+    suggester.sync(mappings)
+    return suggester
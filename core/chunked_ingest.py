@@ -0,0 +1,232 @@
+"""
+Chunked Ingestion for BOQ Tools
+Streams very large CSV exports through column mapping, row classification and categorization
+"""
+
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from core.column_mapper import ColumnMapper
+from core.columnar_io import ARROW_AVAILABLE, dataframe_to_arrow, pq
+from core.comparison_pipeline import RENAMED_COLUMNS, _order_columns
+from core.row_classifier import RowClassifier
+from core.sheet_sources import DEFAULT_CHUNK_ROWS, CsvSheetSource
+from utils.config import ColumnType
+from utils.profiler import profile_span
+
+logger = logging.getLogger(__name__)
+
+# Output suffixes the ingestor can append chunks to
+CHUNKED_OUTPUT_SUFFIXES = ['.csv', '.parquet']
+
+
+@dataclass
+class ChunkedIngestResult:
+    """Summary of a chunked ingestion run; the rows themselves are in output_path"""
+    source_path: Path
+    output_path: Optional[Path]
+    sheet_name: str
+    header_row_index: int
+    column_mappings: Dict[int, str]
+    total_rows: int = 0
+    valid_rows: int = 0
+    categorized_rows: int = 0
+    chunks: int = 0
+    row_types: Dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+class _CsvChunkWriter:
+    """Appends chunk DataFrames to one CSV file, header written once"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._started = False
+
+    def write(self, dataframe: pd.DataFrame) -> None:
+        dataframe.to_csv(self.path, mode='a' if self._started else 'w', header=not self._started,
+                         index=False, encoding='utf-8')
+        self._started = True
+
+    def close(self) -> None:
+        if not self._started:
+            self.path.write_text('', encoding='utf-8')
+
+
+class _ParquetChunkWriter:
+    """Appends chunk DataFrames to one Parquet file as row groups"""
+
+    def __init__(self, path: Path):
+        if not ARROW_AVAILABLE:
+            raise ImportError("Parquet output requires pyarrow (listed in requirements.txt); "
+                              "install it or write the chunks to a .csv file")
+        self.path = path
+        self._writer = None
+
+    def write(self, dataframe: pd.DataFrame) -> None:
+        table = dataframe_to_arrow(dataframe)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(str(self.path), table.schema, compression='zstd')
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _open_chunk_writer(path: Path):
+    suffix = path.suffix.lower()
+    if suffix not in CHUNKED_OUTPUT_SUFFIXES:
+        raise ValueError(f"Unsupported output type for chunked ingestion: {suffix} "
+                         f"(use {', '.join(CHUNKED_OUTPUT_SUFFIXES)})")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return _CsvChunkWriter(path) if suffix == '.csv' else _ParquetChunkWriter(path)
+
+
+class ChunkedCsvIngestor:
+    """
+    Processes a CSV BoQ chunk by chunk with memory bounded by the chunk size
+
+    The header and column mapping are detected on the first chunk; every chunk
+    is then row-classified, filtered to valid line items, categorized and
+    appended to the output, so no more than one chunk of rows is held at once.
+
+    Usage:
+        ingestor = ChunkedCsvIngestor(chunk_rows=20000, category_dictionary=CategoryDictionary())
+        result = ingestor.ingest(Path('erp_dump.csv'), Path('erp_dump_processed.parquet'))
+    """
+
+    def __init__(self, chunk_rows: int = DEFAULT_CHUNK_ROWS, category_dictionary=None,
+                 column_mapper: Optional[ColumnMapper] = None,
+                 row_classifier: Optional[RowClassifier] = None):
+        """
+        Initialize the ingestor
+
+        Args:
+            chunk_rows: Rows read, classified and written per chunk
+            category_dictionary: Optional CategoryDictionary used to categorize rows
+            column_mapper: ColumnMapper for header detection (default: a new one)
+            row_classifier: RowClassifier for classification and validity (default: a new one)
+        """
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows must be at least 1")
+        self.chunk_rows = chunk_rows
+        self.category_dictionary = category_dictionary
+        self.column_mapper = column_mapper or ColumnMapper()
+        self.row_classifier = row_classifier or RowClassifier()
+
+    def ingest(self, csv_path: Union[str, Path], output_path: Union[str, Path]) -> ChunkedIngestResult:
+        """
+        Process a CSV file and append the valid, categorized rows to output_path
+
+        Args:
+            csv_path: CSV BoQ to process
+            output_path: .csv or .parquet file receiving the rows
+
+        Returns:
+            ChunkedIngestResult with counts; rows are only in the output file
+        """
+        output_path = Path(output_path)
+        writer = _open_chunk_writer(output_path)
+        try:
+            result = None
+            for result, frame in self._iter_frames(Path(csv_path)):
+                if frame is not None and not frame.empty:
+                    writer.write(frame)
+        finally:
+            writer.close()
+        result.output_path = output_path
+        logger.info(f"Chunked ingestion of {result.source_path.name}: {result.valid_rows}/{result.total_rows} "
+                    f"valid rows in {result.chunks} chunks, {result.seconds:.2f}s -> {output_path}")
+        return result
+
+    def iter_dataframes(self, csv_path: Union[str, Path]) -> Iterator[pd.DataFrame]:
+        """Yield the valid, categorized rows of each chunk as a DataFrame in the canonical column order"""
+        for _, frame in self._iter_frames(Path(csv_path)):
+            if frame is not None and not frame.empty:
+                yield frame
+
+    def _iter_frames(self, csv_path: Path) -> Iterator[Tuple[ChunkedIngestResult, Optional[pd.DataFrame]]]:
+        """Yield (running result, chunk DataFrame or None) for every chunk of the file"""
+        if not csv_path.exists():
+            raise FileNotFoundError(f"File not found: {csv_path}")
+        start = time.perf_counter()
+        source = CsvSheetSource(csv_path)
+        sheet_name = source.sheet_name
+        result = None
+        row_types = Counter()
+        row_offset = 0
+
+        for chunk in source.iter_chunks(sheet_name, self.chunk_rows):
+            if result is None:
+                result, column_types, output_columns = self._map_columns(csv_path, sheet_name, chunk)
+            with profile_span('chunk', rows=len(chunk), offset=row_offset):
+                classification = self.row_classifier.classify_rows(chunk, column_types, sheet_name, row_offset)
+                row_types.update(rc.row_type.value for rc in classification.classifications)
+                valid = [row for row in chunk if self.row_classifier.validate_master_row_validity(row, column_types)]
+                frame = self._build_frame(valid, sheet_name, output_columns) if valid else None
+                if frame is not None and self.category_dictionary is not None:
+                    frame = self._categorize(frame)
+                    result.categorized_rows += int((frame['Category'].astype(str).str.strip() != '').sum())
+
+            row_offset += len(chunk)
+            result.total_rows = row_offset
+            result.valid_rows += len(valid)
+            result.chunks += 1
+            result.row_types = dict(row_types)
+            result.seconds = time.perf_counter() - start
+            yield result, frame
+
+        if result is None:
+            raise ValueError(f"No data found in: {csv_path}")
+
+    def _map_columns(self, csv_path: Path, sheet_name: str,
+                     first_chunk: List[List[str]]) -> Tuple[ChunkedIngestResult, Dict[int, ColumnType], List[Tuple[int, str]]]:
+        """Detect the header and column mapping from the first chunk"""
+        mapping = self.column_mapper.process_sheet_mapping(first_chunk)
+        column_types = {}
+        output_columns = []
+        for cm in mapping.mappings:
+            mapped_type = cm.mapped_type.value if hasattr(cm.mapped_type, 'value') else str(cm.mapped_type)
+            try:
+                column_types[cm.column_index] = ColumnType(mapped_type)
+            except ValueError:
+                continue
+            if mapped_type and mapped_type != 'ignore':
+                output_columns.append((cm.column_index, RENAMED_COLUMNS.get(mapped_type, mapped_type)))
+        if not output_columns:
+            raise ValueError(f"No columns could be mapped in the first {len(first_chunk)} rows of {csv_path}")
+
+        header_row_index = mapping.header_row.row_index if mapping.header_row else 0
+        logger.info(f"Chunked ingestion of {csv_path.name}: header row {header_row_index}, "
+                    f"columns {dict((idx, name) for idx, name in output_columns)}")
+        result = ChunkedIngestResult(
+            source_path=csv_path,
+            output_path=None,
+            sheet_name=sheet_name,
+            header_row_index=header_row_index,
+            column_mappings={idx: name for idx, name in output_columns},
+        )
+        return result, column_types, output_columns
+
+    def _build_frame(self, rows: List[List[str]], sheet_name: str,
+                     output_columns: List[Tuple[int, str]]) -> pd.DataFrame:
+        """Mapped columns of the valid rows, as dataframe_from_file_mapping lays them out"""
+        data = {'Source_Sheet': [sheet_name] * len(rows)}
+        for idx, name in output_columns:
+            data[name] = [row[idx] if idx < len(row) else '' for row in rows]
+        return _order_columns(pd.DataFrame(data))
+
+    def _categorize(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Fill categories from the category dictionary"""
+        from core.auto_categorizer import auto_categorize_dataset
+
+        if 'Description' not in frame.columns:
+            return frame
+        return auto_categorize_dataset(frame, self.category_dictionary).dataframe
@@ -0,0 +1,227 @@
+"""
+Columnar Dataset I/O for BOQ Tools
+Typed Parquet/Arrow export of categorized and compared datasets, and reload for re-comparison
+"""
+
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import pandas as pd
+
+from core.comparison_pipeline import OFFER_VALUE_COLUMNS
+from utils.lazy_import import lazy_module, module_available
+
+logger = logging.getLogger(__name__)
+
+ARROW_AVAILABLE = module_available('pyarrow')
+pa = lazy_module('pyarrow')
+pq = lazy_module('pyarrow.parquet')
+feather = lazy_module('pyarrow.feather')
+
+# File suffix -> container format
+COLUMNAR_SUFFIXES = {'.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow'}
+
+# Schema metadata key holding offer names, sheet layouts and the format version
+METADATA_KEY = b'boq_tools'
+SCHEMA_VERSION = 1
+
+CATEGORY_COLUMN = 'Category'
+
+# Matches offer-specific columns such as total_price[Offer A]
+OFFER_COLUMN_PATTERN = re.compile(r'^(?P<base>[^\[]+)\[(?P<offer>.+)\]$')
+
+
+@dataclass
+class ColumnarDataset:
+    """A processed dataset read back from Parquet/Arrow"""
+    dataframe: pd.DataFrame
+    master_offer_name: Optional[str] = None
+    offer_names: List[str] = field(default_factory=list)          # Offers merged after the master
+    sheet_layouts: List[Dict[str, Any]] = field(default_factory=list)  # Master layouts for offer parsing
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def is_columnar_path(path: Union[str, Path]) -> bool:
+    """True if the path has a Parquet or Arrow suffix"""
+    return Path(path).suffix.lower() in COLUMNAR_SUFFIXES
+
+
+def offer_names_from_columns(columns: List[Any]) -> List[str]:
+    """Offer names in column order, taken from `<value column>[<offer>]` headers"""
+    names = []
+    for column in columns:
+        match = OFFER_COLUMN_PATTERN.match(str(column))
+        if match and match.group('base') in OFFER_VALUE_COLUMNS and match.group('offer') not in names:
+            names.append(match.group('offer'))
+    return names
+
+
+def column_kinds(dataframe: pd.DataFrame) -> Dict[str, str]:
+    """
+    Decide the stored type of every column
+
+    Returns:
+        Column name -> 'category' (dictionary-encoded string), 'numeric' (float64),
+        'native' (numeric/bool dtype kept as is) or 'text' (string)
+    """
+    kinds = {}
+    for column in dataframe.columns:
+        match = OFFER_COLUMN_PATTERN.match(str(column))
+        base = match.group('base') if match else str(column)
+        dtype = dataframe[column].dtype
+        if column == CATEGORY_COLUMN:
+            kinds[column] = 'category'
+        elif base in OFFER_VALUE_COLUMNS:
+            kinds[column] = 'numeric'
+        elif pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+            kinds[column] = 'native'
+        else:
+            kinds[column] = 'text'
+    return kinds
+
+
+def _text_values(series: pd.Series) -> List[Optional[str]]:
+    """Strings with missing values as None"""
+    return [None if value is None or (not isinstance(value, str) and pd.isna(value)) else str(value)
+            for value in series.tolist()]
+
+
+def dataframe_to_arrow(dataframe: pd.DataFrame, metadata: Optional[Dict[str, Any]] = None):
+    """
+    Convert a BOQ DataFrame to an Arrow table with a typed schema
+
+    Value columns (quantity, unit_price, total_price, manhours, wage and their
+    `[offer]` copies) become float64; cells that are not numbers are stored as
+    null. Category is dictionary encoded, other object columns are strings.
+
+    Args:
+        dataframe: Categorized or compared dataset
+        metadata: JSON-serializable data stored in the schema metadata
+
+    Returns:
+        pyarrow.Table
+    """
+    if not ARROW_AVAILABLE:
+        raise ImportError("Columnar export requires pyarrow")
+
+    arrays, fields = [], []
+    for column, kind in column_kinds(dataframe).items():
+        series = dataframe[column]
+        name = str(column)
+        if kind == 'numeric':
+            values = pd.to_numeric(series.replace('', None), errors='coerce')
+            dropped = int(values.isna().sum() - series.replace('', None).isna().sum())
+            if dropped:
+                logger.warning(f"Column '{name}': {dropped} non-numeric value(s) stored as null")
+            array = pa.array(values.to_numpy(dtype=float, na_value=float('nan')), type=pa.float64(),
+                             from_pandas=True)
+        elif kind == 'category':
+            array = pa.array(_text_values(series), type=pa.string()).dictionary_encode()
+        elif kind == 'native':
+            array = pa.array(series, from_pandas=True)
+        else:
+            array = pa.array(_text_values(series), type=pa.string())
+        arrays.append(array)
+        fields.append(pa.field(name, array.type))
+
+    schema_metadata = {METADATA_KEY: json.dumps(metadata or {}, default=str).encode('utf-8')}
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields, metadata=schema_metadata))
+
+
+def arrow_to_dataframe(table) -> pd.DataFrame:
+    """Convert an Arrow table back to the DataFrame layout the comparison workflow uses"""
+    dataframe = table.to_pandas()
+    if CATEGORY_COLUMN in dataframe.columns:
+        dataframe[CATEGORY_COLUMN] = dataframe[CATEGORY_COLUMN].astype(object).where(
+            dataframe[CATEGORY_COLUMN].notna(), '')
+    return dataframe
+
+
+def write_columnar(dataframe: pd.DataFrame, path: Union[str, Path],
+                   master_offer_name: Optional[str] = None, offer_names: Optional[List[str]] = None,
+                   sheet_layouts: Optional[List[Dict[str, Any]]] = None,
+                   compression: str = 'zstd') -> Path:
+    """
+    Write a dataset to Parquet (.parquet) or Arrow IPC (.arrow/.feather)
+
+    Args:
+        dataframe: Categorized or compared dataset
+        path: Destination; the suffix selects the format
+        master_offer_name: Offer whose values are the master columns
+        offer_names: Offers merged after the master (default: read from `[offer]` columns)
+        sheet_layouts: Master sheet layouts, needed to compare further offers later
+        compression: Codec for both formats ('zstd', 'lz4', 'snappy' (Parquet only) or 'none')
+
+    Returns:
+        The written path
+    """
+    path = Path(path)
+    format_type = COLUMNAR_SUFFIXES.get(path.suffix.lower())
+    if format_type is None:
+        raise ValueError(f"Unsupported columnar file type: {path.suffix}")
+
+    if offer_names is None:
+        offer_names = [name for name in offer_names_from_columns(list(dataframe.columns))
+                       if name != master_offer_name]
+    metadata = {
+        'version': SCHEMA_VERSION,
+        'created': datetime.now().isoformat(),
+        'master_offer_name': master_offer_name,
+        'offer_names': list(offer_names),
+        'sheet_layouts': sheet_layouts or [],
+    }
+    table = dataframe_to_arrow(dataframe, metadata)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if format_type == 'parquet':
+        pq.write_table(table, str(path), compression=compression)
+    else:
+        feather.write_feather(table, str(path), compression=compression)
+    logger.info(f"Wrote {table.num_rows} rows x {table.num_columns} columns to {format_type}: {path}")
+    return path
+
+
+def read_columnar(path: Union[str, Path]) -> ColumnarDataset:
+    """
+    Read a dataset written by write_columnar
+
+    Files written by other tools are accepted too; offer names are then taken
+    from the `[offer]` columns and there are no sheet layouts.
+
+    Args:
+        path: .parquet, .arrow or .feather file
+
+    Returns:
+        ColumnarDataset
+    """
+    if not ARROW_AVAILABLE:
+        raise ImportError("Columnar import requires pyarrow")
+    path = Path(path)
+    format_type = COLUMNAR_SUFFIXES.get(path.suffix.lower())
+    if format_type is None:
+        raise ValueError(f"Unsupported columnar file type: {path.suffix}")
+
+    table = pq.read_table(str(path)) if format_type == 'parquet' else feather.read_table(str(path))
+    raw = (table.schema.metadata or {}).get(METADATA_KEY)
+    metadata = json.loads(raw.decode('utf-8')) if raw else {}
+    dataframe = arrow_to_dataframe(table)
+
+    offer_names = metadata.get('offer_names')
+    if offer_names is None:
+        offer_names = offer_names_from_columns(list(dataframe.columns))
+    master_offer_name = metadata.get('master_offer_name')
+    if master_offer_name is None and offer_names:
+        master_offer_name, offer_names = offer_names[0], offer_names[1:]
+
+    # JSON object keys are strings; layouts use column indices
+    sheet_layouts = [
+        dict(layout, columns={int(index): mapped for index, mapped in layout.get('columns', {}).items()})
+        for layout in metadata.get('sheet_layouts', [])
+    ]
+    logger.info(f"Read {len(dataframe)} rows from {format_type}: {path}")
+    return ColumnarDataset(dataframe, master_offer_name, list(offer_names), sheet_layouts, metadata)
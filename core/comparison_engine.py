@@ -5,10 +5,13 @@ Handles merging and adding data from Comparison BoQ to the main Dataset
 
 import logging
 import pandas as pd
+import numpy as np
 from typing import Dict, List, Any, Optional, Union, Tuple # Added Tuple
 from dataclasses import dataclass
 import re
 from core.validator import ValidationIssue, ValidationLevel, ValidationType
+from core.description_intern import DescriptionTable
+from utils.profiler import profile_span
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +32,8 @@ class ComparisonEngine:
     
     def __init__(self):
         """Initialize the comparison engine"""
+        # Data type warnings raised by MERGE/ADD
+        self.comparison_warnings = []
         # logger.info("Comparison Engine initialized")
     
     def MERGE(self, comparison_row_data: List[str], dataset_dataframe: pd.DataFrame,
@@ -82,7 +87,7 @@ class ComparisonEngine:
             # Remove conditional logic that was preventing data transfer for empty/zero values
             for col_name, offer_col_name in offer_columns.items():
                 if offer_col_name not in dataset_dataframe.columns:
-                    dataset_dataframe[offer_col_name] = 0  # Initialize with 0 instead of None
+                    dataset_dataframe[offer_col_name] = 0.0  # Initialize with 0.0 (float) so decimal values can be written
                     offer_columns_created.append(offer_col_name)
                     logger.info(f"Created new offer column: {offer_col_name}")
             
@@ -494,22 +499,32 @@ class ComparisonProcessor:
         self.manual_invalidations = set()
         # Row review/validation results (list of dicts or DataFrame)
         self.row_results = []
+        # Memoized validity and keys of comparison rows (RowFactsCache), reset with the data
+        self.row_facts = None
+        # Running category/sheet totals of the master dataset (SummaryCache), if one is kept
+        self.summary = None
+        # Description -> integer ID table shared by every comparison run on this processor
+        self.descriptions = DescriptionTable()
         # Optionally, store instance match results, merge/add logs, etc.
         self.instance_matches = []
         self.merge_results = []
         self.add_results = []
         self.comparison_warnings = [] # New: To collect warnings during comparison
 
-    def load_master_dataset(self, df, manual_invalidations=None):
+    def load_master_dataset(self, df, manual_invalidations=None, summary=None):
         """
         Load the master/reference BoQ DataFrame and manual invalidations.
         Args:
             df: pandas DataFrame for the master BoQ
             manual_invalidations: set of row keys or tracker (optional)
+            summary: SummaryCache kept up to date with the rows MERGE/ADD touch (optional)
         """
         # CRITICAL: Make a copy to avoid modifying the original dataframe
         # This ensures all existing offer columns are preserved
         self.master_dataset = df.copy()
+        self.summary = summary
+        if summary is not None:
+            summary.sync(self.master_dataset)
         
         # Log existing offer columns to verify they're preserved
         existing_offer_columns = [col for col in self.master_dataset.columns if '[' in col and ']' in col]
@@ -538,6 +553,7 @@ class ComparisonProcessor:
             df: pandas DataFrame for the comparison BoQ
         """
         self.comparison_data = df
+        self.row_facts = None
         
         # logger.info(f"Comparison dataset loaded with {len(df)} rows")
         # logger.info(f"Comparison dataset columns: {list(df.columns)}")
@@ -603,70 +619,45 @@ class ComparisonProcessor:
             raise ValueError("Comparison data not loaded.")
         if key_columns is None:
             key_columns = ['Description']
-        if row_classifier is None:
-            from core.row_classifier import RowClassifier
-            row_classifier = RowClassifier()
+        if self.row_facts is None or (row_classifier is not None and self.row_facts.row_classifier is not row_classifier):
+            from core.row_facts import RowFactsCache
+            self.row_facts = RowFactsCache(row_classifier)
+        
+        # Prepare column mapping for ROW_VALIDITY (the same for every row)
+        # CRITICAL FIX: Use provided column mapping if available, otherwise infer from column names
+        if column_mapping is not None:
+            # Use provided column mapping (should match DataFrame column order)
+            col_mapping = column_mapping.copy()
+        else:
+            # Fallback: infer column mapping from column names (legacy behavior)
+            col_mapping = self._infer_column_mapping()
+        
+        # Descriptions of manual invalidations, split once instead of per row
+        invalidated_descriptions = [invalidation.split('|')[0] for invalidation in self.manual_invalidations]
+        
+        columns = list(self.comparison_data.columns)
+        key_positions = [columns.index(col) if col in columns else None for col in key_columns]
         results = []
-        for idx, row in self.comparison_data.iterrows():
+        for idx, values in zip(self.comparison_data.index,
+                               self.comparison_data.itertuples(index=False, name=None)):
             # Build row key (tuple of key column values)
-            key = tuple(str(row.get(col, '')).strip() for col in key_columns)
+            key = tuple(str(values[pos]).strip() if pos is not None else '' for pos in key_positions)
             key_str = '|'.join(key)
             description = key[0] if key else ''
             
             # Check manual invalidation - check if description is in any invalidation
-            is_manually_invalid = any(description in invalidation.split('|')[0] for invalidation in self.manual_invalidations)
+            is_manually_invalid = any(description in invalidated for invalidated in invalidated_descriptions)
             
             if is_manually_invalid:
                 is_valid = False
                 reason = 'MANUAL_OVERRIDE'
             else:
-                # Prepare column mapping for ROW_VALIDITY
-                # CRITICAL FIX: Use provided column mapping if available, otherwise infer from column names
-                from utils.config import ColumnType
-                if column_mapping is not None:
-                    # Use provided column mapping (should match DataFrame column order)
-                    col_mapping = column_mapping.copy()
-                else:
-                    # Fallback: infer column mapping from column names (legacy behavior)
-                    col_mapping = {}
-                    for i, col_name in enumerate(self.comparison_data.columns):
-                        try:
-                            # CRITICAL FIX: Check for ignore columns first (before other heuristics)
-                            # This handles columns like 'ignore', 'ignore_1', 'ignore_10', etc.
-                            col_name_lower = col_name.lower()
-                            if col_name_lower.startswith('ignore') or col_name_lower == 'ignore':
-                                col_mapping[i] = ColumnType.IGNORE
-                            # Map common column names to ColumnType enum
-                            elif col_name_lower in ['description', 'desc', 'item']:
-                                col_mapping[i] = ColumnType.DESCRIPTION
-                            elif col_name_lower in ['quantity', 'qty', 'qty.']:
-                                col_mapping[i] = ColumnType.QUANTITY
-                            elif col_name_lower in ['unit_price', 'unit price', 'price', 'rate']:
-                                col_mapping[i] = ColumnType.UNIT_PRICE
-                            elif col_name_lower in ['total_price', 'total price', 'amount', 'total']:
-                                col_mapping[i] = ColumnType.TOTAL_PRICE
-                            elif col_name_lower in ['code', 'item code', 'ref']:
-                                col_mapping[i] = ColumnType.CODE
-                            elif col_name_lower in ['unit', 'uom']:
-                                col_mapping[i] = ColumnType.UNIT
-                            elif col_name_lower in ['manhours', 'ore/u.m.', 'ore', 'man hours']:
-                                col_mapping[i] = ColumnType.MANHOURS
-                            elif col_name_lower in ['wage', 'euro/hour', 'hourly rate']:
-                                col_mapping[i] = ColumnType.WAGE
-                            elif col_name_lower in ['scope']:
-                                col_mapping[i] = ColumnType.SCOPE
-                            else:
-                                # Default to DESCRIPTION for unknown columns
-                                col_mapping[i] = ColumnType.DESCRIPTION
-                        except Exception as e:
-                            logger.warning(f"Could not map column {col_name}: {e}")
-                            col_mapping[i] = ColumnType.DESCRIPTION
-                
-                row_values = [str(row[col]) if row[col] is not None else '' for col in self.comparison_data.columns]
+                row_values = [str(value) if value is not None else '' for value in values]
                 
                 # Use ROW_VALIDITY function to match master BOQ validation criteria
-                # This ensures comparison rows are validated using the same criteria as master BOQ rows
-                is_valid = row_classifier.ROW_VALIDITY(row_values, col_mapping)
+                # This ensures comparison rows are validated using the same criteria as master BOQ rows.
+                # Facts are memoized per row, so re-running after a review only recomputes changed rows.
+                is_valid = self.row_facts.is_valid('comparison', idx, row_values, col_mapping)
                 
                 # Set reason based on validity
                 if is_valid:
@@ -687,7 +678,57 @@ class ComparisonProcessor:
         self.row_results = results
         return results
 
-    def process_valid_rows(self, instance_matcher=None, comparison_engine=None, key_columns=None, offer_name=None):
+    def _infer_column_mapping(self):
+        """Column index -> ColumnType inferred from the comparison data's column names"""
+        from utils.config import ColumnType
+        col_mapping = {}
+        for i, col_name in enumerate(self.comparison_data.columns):
+            try:
+                # CRITICAL FIX: Check for ignore columns first (before other heuristics)
+                # This handles columns like 'ignore', 'ignore_1', 'ignore_10', etc.
+                col_name_lower = col_name.lower()
+                if col_name_lower.startswith('ignore') or col_name_lower == 'ignore':
+                    col_mapping[i] = ColumnType.IGNORE
+                # Map common column names to ColumnType enum
+                elif col_name_lower in ['description', 'desc', 'item']:
+                    col_mapping[i] = ColumnType.DESCRIPTION
+                elif col_name_lower in ['quantity', 'qty', 'qty.']:
+                    col_mapping[i] = ColumnType.QUANTITY
+                elif col_name_lower in ['unit_price', 'unit price', 'price', 'rate']:
+                    col_mapping[i] = ColumnType.UNIT_PRICE
+                elif col_name_lower in ['total_price', 'total price', 'amount', 'total']:
+                    col_mapping[i] = ColumnType.TOTAL_PRICE
+                elif col_name_lower in ['code', 'item code', 'ref']:
+                    col_mapping[i] = ColumnType.CODE
+                elif col_name_lower in ['unit', 'uom']:
+                    col_mapping[i] = ColumnType.UNIT
+                elif col_name_lower in ['manhours', 'ore/u.m.', 'ore', 'man hours']:
+                    col_mapping[i] = ColumnType.MANHOURS
+                elif col_name_lower in ['wage', 'euro/hour', 'hourly rate']:
+                    col_mapping[i] = ColumnType.WAGE
+                elif col_name_lower in ['scope']:
+                    col_mapping[i] = ColumnType.SCOPE
+                else:
+                    # Default to DESCRIPTION for unknown columns
+                    col_mapping[i] = ColumnType.DESCRIPTION
+            except Exception as e:
+                logger.warning(f"Could not map column {col_name}: {e}")
+                col_mapping[i] = ColumnType.DESCRIPTION
+        return col_mapping
+
+    def process_valid_rows(self, instance_matcher=None, comparison_engine=None, key_columns=None, offer_name=None,
+                           progress_callback=None):
+        """
+        Merge/add the valid comparison rows into the master dataset (profiled as the 'merge' stage).
+        See _process_valid_rows for details.
+        """
+        valid_count = sum(1 for r in self.row_results if r['is_valid']) if self.row_results else 0
+        with profile_span('merge', rows=valid_count, offer=offer_name):
+            return self._process_valid_rows(instance_matcher, comparison_engine, key_columns, offer_name,
+                                            progress_callback)
+
+    def _process_valid_rows(self, instance_matcher=None, comparison_engine=None, key_columns=None, offer_name=None,
+                            progress_callback=None):
         """
         For each valid row in the comparison data:
         - Use LIST_INSTANCES to get all instances with the same description in both master and comparison datasets
@@ -697,6 +738,8 @@ class ComparisonProcessor:
             comparison_engine: Optional, ComparisonEngine instance
             key_columns: List of columns to use as row key (default: ['Description'])
             offer_name: Name of the offer for creating offer-specific columns
+            progress_callback: Optional f(percentage, message), called as the valid rows are processed;
+                an exception it raises (e.g. a cancelled job) stops processing
         Returns:
             List of merge/add operation results
         """
@@ -725,7 +768,7 @@ class ComparisonProcessor:
             # Create offer columns if they don't exist, initialize with 0
             for col_name, offer_col_name in offer_columns.items():
                 if offer_col_name not in self.master_dataset.columns:
-                    self.master_dataset[offer_col_name] = 0
+                    self.master_dataset[offer_col_name] = 0.0
                     logger.info(f"Created offer column: {offer_col_name}")
         
         # Filter valid rows from previous step
@@ -755,39 +798,44 @@ class ComparisonProcessor:
         rows_logged = 0
         max_rows_to_log = 5
         
+        # Intern the key column once: instances are rows sharing a description ID
+        # (same text up to case and whitespace), grouped by integer instead of re-normalizing per row
+        descriptions = self.descriptions
+        comp_codes = descriptions.codes(self.comparison_data[key_columns[0]])
+        master_codes = descriptions.codes(self.master_dataset[key_columns[0]])
+        comp_groups = descriptions.group_positions(comp_codes)
+        master_groups = descriptions.group_positions(master_codes)
+        comp_code_by_index = dict(zip(self.comparison_data.index, comp_codes.tolist()))
+        no_rows = np.empty(0, dtype=np.int64)
+        master_lowered = None
+        reported = -1
+        
         for row_info in valid_rows:
             idx = row_info['row_index']
+            if idx in processed_comp_indices:
+                continue  # Already handled with the other instances of its description
+            if progress_callback is not None:
+                percentage = 100 * len(processed_comp_indices) // max(len(valid_rows), 1)
+                if percentage != reported:
+                    reported = percentage
+                    progress_callback(percentage, f"Matching rows: {len(processed_comp_indices)} of {len(valid_rows)}")
             row = self.comparison_data.loc[idx]
             
             # Build key for instance matching
             key = tuple(str(row.get(col, '')).strip() for col in key_columns)
             description = key[0] if key else ''
+            description_id = comp_code_by_index[idx]
             
             # # Enhanced logging for row 195 specifically
             is_row_195 = (idx == 195)
-            if is_row_195:
-            #     logger.info(f"=== PROCESSING ROW 195 ===")
-            #     logger.info(f"Row 195 description: '{description}'")
-            #     logger.info(f"Row 195 key: {key}")
-            #     logger.info(f"Row 195 data: {dict(row)}")
-                pass
             
-            # CRITICAL FIX: Use consistent normalized whitespace matching for both datasets
-            # This handles cases where descriptions have different whitespace/newline characters
-            normalized_desc = ' '.join(description.split())  # Normalize whitespace
-            
-            # Apply same normalization to both comparison and master datasets
-            comp_instances = self.comparison_data[
-                self.comparison_data[key_columns[0]].str.lower().apply(lambda x: ' '.join(str(x).split())) == normalized_desc.lower()
-            ]
-            master_instances = self.master_dataset[
-                self.master_dataset[key_columns[0]].str.lower().apply(lambda x: ' '.join(str(x).split())) == normalized_desc.lower()
-            ]
+            comp_instances = self.comparison_data.iloc[comp_groups.get(description_id, no_rows)]
+            master_instances = self.master_dataset.iloc[master_groups.get(description_id, no_rows)]
             
             # Debug: Log matching information (limit to first few rows to avoid verbosity)
             if rows_logged < max_rows_to_log:
                 logger.info(f"Row {idx} - Description: '{description[:50]}...'")
-                logger.info(f"Row {idx} - Normalized description: '{normalized_desc[:50]}...'")
+                logger.info(f"Row {idx} - Description ID: {description_id}")
                 logger.info(f"Row {idx} - Comparison instances found: {len(comp_instances)}")
                 logger.info(f"Row {idx} - Master instances found: {len(master_instances)}")
                 
@@ -807,41 +855,22 @@ class ComparisonProcessor:
                 logger.info(f"Row 195 - Master instance indices: {list(master_instances.index)}")
                 logger.info(f"Row 195 - Current description instance count: {description_instance_counts.get(description, 0)}")
             
-            # If no matches found with normalized matching, try exact matching as fallback
+            # No master instance: exact and case-insensitive matches share the ID, so only
+            # look for very similar descriptions (might be encoding issues) among the distinct ones
             if len(master_instances) == 0:
-                master_instances = self.master_dataset[self.master_dataset[key_columns[0]] == description]
-                # logger.info(f"Exact match master instances found: {len(master_instances)}")
-                
-                # If still no matches, try case-insensitive matching
-                if len(master_instances) == 0:
-                    master_instances = self.master_dataset[
-                        self.master_dataset[key_columns[0]].str.lower() == description.lower()
-                    ]
-                    # logger.info(f"Case-insensitive master instances found: {len(master_instances)}")
-                    
-                    # If still no matches, try fuzzy matching for very similar descriptions
-                    if len(master_instances) == 0:
-                        # Check for descriptions that are very similar (might be encoding issues)
-                        master_desc_lower = self.master_dataset[key_columns[0]].str.lower()
-                        # Use regex=False to treat pattern as literal string (avoids regex errors with special characters)
-                        search_pattern = description.lower()[:50]
-                        similar_matches = master_desc_lower[master_desc_lower.str.contains(search_pattern, na=False, regex=False)]
-                        if len(similar_matches) > 0:
-                            logger.warning(f"Found {len(similar_matches)} similar descriptions for '{description[:50]}...'")
-                            logger.warning(f"Similar descriptions: {similar_matches.head(3).tolist()}")
-                        else:
-                            pass
-                    else:
-                        pass
-                
-                # If still no matches, this is normal - the description doesn't exist in master
-                # This means we should ADD this row, not throw an error
-                if len(master_instances) == 0:
-                    # logger.info(f"No match found for description: '{description}' - will be added as new row")
-                    # Continue processing - this row will be added in the ADD section below
-                    pass
+                if master_lowered is None:
+                    master_lowered = pd.Series([descriptions.lower(i) for i in master_groups if i >= 0], dtype=object)
+                # Use regex=False to treat pattern as literal string (avoids regex errors with special characters)
+                search_pattern = description.lower()[:50]
+                similar_matches = master_lowered[master_lowered.str.contains(search_pattern, na=False, regex=False)]
+                if len(similar_matches) > 0:
+                    logger.warning(f"Found {len(similar_matches)} similar descriptions for '{description[:50]}...'")
+                    logger.warning(f"Similar descriptions: {similar_matches.head(3).tolist()}")
+                # Otherwise the description doesn't exist in master: the row will be ADDed below
             # For each nth instance, match and merge/add
-            for comp_idx, comp_row in comp_instances.iterrows():
+            # The instance number (n) is the position of comp_idx among all comparison
+            # instances with this description
+            for instance_number, (comp_idx, comp_row) in enumerate(comp_instances.iterrows()):
                 # Skip if this comparison instance has already been processed (prevents duplicates)
                 if comp_idx in processed_comp_indices:
                     continue
@@ -849,15 +878,6 @@ class ComparisonProcessor:
                 # Mark this comparison instance as processed
                 processed_comp_indices.add(comp_idx)
                 
-                # Calculate the actual instance number (n) by finding the position of comp_idx
-                # within all comparison instances with this description
-                # This is critical: n must represent the actual instance number, not the enumeration position
-                instance_number = 0
-                for i, idx in enumerate(comp_instances.index):
-                    if idx == comp_idx:
-                        instance_number = i
-                        break
-                
                 # Enhanced logging for instance processing
                 if is_row_195:
                     # logger.info(f"Row 195 - Processing instance {instance_number} of {len(comp_instances)}")
@@ -1076,6 +1096,12 @@ class ComparisonProcessor:
         self.merge_results = merge_results
         self.add_results = add_results
         
+        # Re-aggregate only the rows MERGE/ADD touched
+        if self.summary is not None:
+            touched = [op['master_row_index'] for op in merge_results if op['result'].rows_updated]
+            touched.extend(op['result']['new_row_index'] for op in add_results if op['result'].get('row_added'))
+            self.summary.update_rows(self.master_dataset, touched)
+        
         # Final logging summary
         logger.info(f"=== PROCESS_VALID_ROWS COMPLETED ===")
         logger.info(f"Total MERGE operations: {len(merge_results)}")
@@ -1088,17 +1114,21 @@ class ComparisonProcessor:
         
         return merge_results + add_results 
 
-    def cleanup_comparison_data(self, recategorize_func=None, numeric_columns=None, category_column='Category'):
+    def cleanup_comparison_data(self, recategorize_func=None, numeric_columns=None, category_column='Category',
+                                recategorize_rows_func=None):
         """
         1. Replace empty cells in Unitary_Price or Total_Price with zero values
         2. Collect all rows with empty categories
         3. Call RECATEGORIZATION function for uncategorized rows
         Args:
-            recategorize_func: function to call for recategorization (optional)
+            recategorize_func: function to call per uncategorized row for recategorization (optional)
             numeric_columns: list of columns to treat as numeric (default: ['Unit_Price', 'Total_Price'])
             category_column: name of the category column (default: 'Category')
+            recategorize_rows_func: function called once as f(comparison_data, uncategorized_mask),
+                e.g. AutoCategorizer.recategorize_rows; takes precedence over recategorize_func (optional)
         Returns:
-            List of recategorization results (if any)
+            List of recategorization results (if any): one {'row_index', 'result'} per row for
+            recategorize_func, a single {'row_indices', 'result'} for recategorize_rows_func
         """
         import numpy as np
         if self.comparison_data is None:
@@ -1116,7 +1146,10 @@ class ComparisonProcessor:
         uncategorized_rows = self.comparison_data[uncategorized_mask]
         recat_results = []
         # 3. Call RECATEGORIZATION for uncategorized rows
-        if recategorize_func is not None and not uncategorized_rows.empty:
+        if recategorize_rows_func is not None and not uncategorized_rows.empty:
+            result = recategorize_rows_func(self.comparison_data, uncategorized_mask)
+            recat_results.append({'row_indices': list(uncategorized_rows.index), 'result': result})
+        elif recategorize_func is not None and not uncategorized_rows.empty:
             for idx, row in uncategorized_rows.iterrows():
                 result = recategorize_func(row)
                 recat_results.append({'row_index': idx, 'result': result})
@@ -0,0 +1,665 @@
+"""
+Comparison Pipeline for BOQ Tools
+Headless master/offer comparison built on ComparisonProcessor
+"""
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import pandas as pd
+
+from core.boq_schema import apply_schema, make_writable
+from core.comparison_engine import ComparisonEngine, ComparisonProcessor
+from core.file_pipeline import analyze_workbook, read_workbook
+from core.file_processor import ExcelProcessor
+from core.row_classifier import RowClassifier
+from core.row_facts import get_row_facts
+from core.summary_cache import SummaryCache
+from utils.config import ColumnType
+from utils.export import StreamingExcelWriter
+from utils.profiler import profile_span
+
+logger = logging.getLogger(__name__)
+
+# Columns that receive an offer-specific copy (e.g. quantity[Offer A])
+OFFER_VALUE_COLUMNS = ['quantity', 'unit_price', 'total_price', 'manhours', 'wage']
+
+# Canonical DataFrame column order shared with the GUI and the controller
+BASE_COLUMN_ORDER = ['Source_Sheet', 'code', 'Category', 'Description', 'unit',
+                     'quantity', 'unit_price', 'total_price', 'manhours', 'wage']
+
+# DataFrame column name -> ColumnType used for row validity checks
+DATAFRAME_COLUMN_TYPES = {
+    'description': ColumnType.DESCRIPTION,
+    'code': ColumnType.CODE,
+    'unit': ColumnType.UNIT,
+    'quantity': ColumnType.QUANTITY,
+    'unit_price': ColumnType.UNIT_PRICE,
+    'total_price': ColumnType.TOTAL_PRICE,
+    'manhours': ColumnType.MANHOURS,
+    'wage': ColumnType.WAGE,
+    'scope': ColumnType.SCOPE,
+}
+
+# Lower-case mapped types that are renamed in the unified DataFrame
+RENAMED_COLUMNS = {'description': 'Description', 'category': 'Category'}
+
+
+@dataclass
+class OfferParseResult:
+    """Parsed and validated comparison offer, ready to be merged"""
+    offer_name: str
+    file_path: str
+    dataframe: Optional[pd.DataFrame]
+    row_results: List[Dict[str, Any]] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def valid_rows(self) -> int:
+        return sum(1 for r in self.row_results if r['is_valid'])
+
+
+@dataclass
+class ComparisonRunResult:
+    """Result of a headless comparison run"""
+    dataframe: pd.DataFrame
+    master_offer_name: str
+    offer_names: List[str]
+    timings: Dict[str, float]
+    offer_timings: Dict[str, Dict[str, float]]
+    merge_counts: Dict[str, int]
+    add_counts: Dict[str, int]
+    warnings: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+    output_path: Optional[str] = None
+    sheet_layouts: List[Dict[str, Any]] = field(default_factory=list)
+    summary: Optional[SummaryCache] = None  # Category totals of dataframe, kept up to date during the run
+
+    def timing_report(self) -> Dict[str, Any]:
+        """Return a JSON-serializable timing report for the run"""
+        return {
+            'master_offer': self.master_offer_name,
+            'offers': self.offer_names,
+            'rows': len(self.dataframe),
+            'stages': {name: round(seconds, 4) for name, seconds in self.timings.items()},
+            'offer_stages': {
+                offer: {name: round(seconds, 4) for name, seconds in stages.items()}
+                for offer, stages in self.offer_timings.items()
+            },
+            'merge_counts': self.merge_counts,
+            'add_counts': self.add_counts,
+            'warnings': len(self.warnings),
+            'errors': self.errors,
+        }
+
+
+def sheet_row_data(sheet, row_classification) -> List[str]:
+    """
+    Row values of a classified row
+
+    Falls back to the sheet's own rows when the classification does not carry
+    them, e.g. after the controller spilled sheet data to its disk cache.
+    """
+    row_data = getattr(row_classification, 'row_data', None)
+    if row_data is None:
+        sheet_data = getattr(sheet, 'sheet_data', None)
+        if sheet_data is not None and 0 <= row_classification.row_index < len(sheet_data):
+            row_data = sheet_data[row_classification.row_index]
+    return row_data or []
+
+
+def build_row_validity(file_mapping) -> Dict[str, Dict[int, bool]]:
+    """
+    Compute master row validity for every BOQ sheet, as the row review does
+
+    Args:
+        file_mapping: FileMapping produced by the processing pipeline
+
+    Returns:
+        Dictionary mapping sheet name to {row_index: is_valid}
+    """
+    row_facts = get_row_facts(file_mapping)
+    row_validity = {}
+    for sheet in getattr(file_mapping, 'sheets', []):
+        column_mapping = {}
+        for cm in getattr(sheet, 'column_mappings', []):
+            try:
+                column_mapping[cm.column_index] = ColumnType(cm.mapped_type)
+            except ValueError:
+                continue
+        sheet_validity = {}
+        for rc in getattr(sheet, 'row_classifications', []):
+            row_data = sheet_row_data(sheet, rc)
+            sheet_validity[rc.row_index] = row_facts.is_valid(sheet.sheet_name, rc.row_index, row_data, column_mapping)
+        row_validity[sheet.sheet_name] = sheet_validity
+    return row_validity
+
+
+def dataframe_from_file_mapping(file_mapping) -> Optional[pd.DataFrame]:
+    """
+    Build the unified master DataFrame from the valid rows of every BOQ sheet
+
+    Args:
+        file_mapping: FileMapping with row_validity set (all rows valid otherwise)
+
+    Returns:
+        DataFrame in the canonical column order, or None when there are no rows
+    """
+    row_validity = getattr(file_mapping, 'row_validity', {}) or {}
+    rows = []
+    for sheet in getattr(file_mapping, 'sheets', []):
+        if getattr(sheet, 'sheet_type', 'BOQ') != 'BOQ':
+            continue
+        sheet_validity = row_validity.get(sheet.sheet_name, {})
+        mapped = [(cm.column_index, cm.mapped_type) for cm in sheet.column_mappings
+                  if cm.mapped_type and cm.mapped_type != 'ignore']
+        for rc in getattr(sheet, 'row_classifications', []):
+            if not sheet_validity.get(rc.row_index, True):
+                continue
+            row_data = sheet_row_data(sheet, rc)
+            row_dict = {'Source_Sheet': sheet.sheet_name}
+            for idx, mapped_type in mapped:
+                row_dict[RENAMED_COLUMNS.get(mapped_type, mapped_type)] = row_data[idx] if idx < len(row_data) else ''
+            rows.append(row_dict)
+
+    if not rows:
+        return None
+    return _order_columns(pd.DataFrame(rows))
+
+
+def _order_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Add missing base columns and apply the canonical column order"""
+    for col in BASE_COLUMN_ORDER:
+        if col not in df.columns:
+            df[col] = ''
+    remaining = [col for col in df.columns if col not in BASE_COLUMN_ORDER]
+    return df[BASE_COLUMN_ORDER + remaining]
+
+
+def build_validation_mapping(dataframe: pd.DataFrame) -> Dict[int, ColumnType]:
+    """
+    Build a {column_index: ColumnType} mapping that matches the DataFrame column order
+
+    Offer-specific and metadata columns are skipped so ROW_VALIDITY only sees base values.
+    """
+    column_mapping = {}
+    for i, col_name in enumerate(dataframe.columns):
+        if '[' in col_name and ']' in col_name:
+            continue
+        col_type = DATAFRAME_COLUMN_TYPES.get(col_name.lower())
+        if col_type is not None:
+            column_mapping[i] = col_type
+    return column_mapping
+
+
+def extract_sheet_layouts(file_mapping) -> List[Dict[str, Any]]:
+    """
+    Extract the per-sheet header row and column mapping from a master FileMapping
+
+    The result is plain data so it can be shipped to offer parsing workers.
+    """
+    layouts = []
+    for sheet in getattr(file_mapping, 'sheets', []):
+        if getattr(sheet, 'sheet_type', 'BOQ') != 'BOQ':
+            continue
+        columns = {}
+        for cm in getattr(sheet, 'column_mappings', []):
+            mapped_type = cm.mapped_type.value if hasattr(cm.mapped_type, 'value') else str(cm.mapped_type)
+            mapped_type = mapped_type.lower()
+            if mapped_type and mapped_type != 'ignore':
+                columns[cm.column_index] = mapped_type
+        if columns:
+            layouts.append({
+                'sheet_name': sheet.sheet_name,
+                'header_row_index': getattr(sheet, 'header_row_index', 0) or 0,
+                'columns': columns,
+            })
+    return layouts
+
+
+def parse_offer_file(file_path: Union[str, Path], offer_name: str,
+                     sheet_layouts: List[Dict[str, Any]], max_rows: Optional[int] = None) -> OfferParseResult:
+    """
+    Load an offer workbook with the master sheet layouts and validate its rows
+
+    Args:
+        file_path: Path to the offer BoQ
+        offer_name: Name used for the offer-specific columns
+        sheet_layouts: Output of extract_sheet_layouts for the master
+        max_rows: Maximum number of rows to read per sheet (default: all rows, as for the master)
+
+    Returns:
+        OfferParseResult; error is set instead of raising
+    """
+    timings = {}
+    try:
+        start = time.perf_counter()
+        processor = ExcelProcessor()
+        processor.load_file(Path(file_path))
+        with processor:
+            visible_sheets = set(processor.get_visible_sheets())
+            sheets_data = {
+                layout['sheet_name']: processor.get_sheet_data(layout['sheet_name'], max_rows=max_rows)
+                for layout in sheet_layouts if layout['sheet_name'] in visible_sheets
+            }
+        timings['load'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        frames = []
+        for layout in sheet_layouts:
+            sheet_data = sheets_data.get(layout['sheet_name'])
+            header_row_idx = layout['header_row_index']
+            if not sheet_data or len(sheet_data) <= header_row_idx:
+                continue
+            indices = sorted(layout['columns'])
+            names = [RENAMED_COLUMNS.get(layout['columns'][i], layout['columns'][i]) for i in indices]
+            data_rows = [
+                [row[i] if i < len(row) and row[i] is not None else '' for i in indices]
+                for row in sheet_data[header_row_idx + 1:]
+            ]
+            if not data_rows:
+                continue
+            df = pd.DataFrame(data_rows, columns=names)
+            df = df.loc[:, ~df.columns.duplicated()]
+            df['Source_Sheet'] = layout['sheet_name']
+            frames.append(df)
+        if not frames:
+            return OfferParseResult(offer_name, str(file_path), None, timings=timings,
+                                    error="No data could be extracted using the master mappings")
+        dataframe = _order_columns(pd.concat(frames, ignore_index=True, sort=False))
+        dataframe['Category'] = None
+        timings['map'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        processor = ComparisonProcessor()
+        processor.load_comparison_data(dataframe)
+        row_results = processor.process_comparison_rows(column_mapping=build_validation_mapping(dataframe))
+        timings['validate'] = time.perf_counter() - start
+
+        logger.info(f"Parsed offer '{offer_name}': {len(dataframe)} rows, "
+                    f"{sum(1 for r in row_results if r['is_valid'])} valid")
+        return OfferParseResult(offer_name, str(file_path), dataframe, row_results, timings)
+    except Exception as e:
+        logger.error(f"Error parsing offer '{offer_name}' from {file_path}: {e}")
+        return OfferParseResult(offer_name, str(file_path), None, timings=timings, error=str(e))
+
+
+# Category dictionaries loaded inside worker processes, keyed by file path
+_worker_dictionaries: Dict[str, Any] = {}
+
+
+def _get_worker_dictionary(dictionary_file: str):
+    """Load a CategoryDictionary once per worker process"""
+    if dictionary_file not in _worker_dictionaries:
+        from core.category_dictionary import CategoryDictionary
+        _worker_dictionaries[dictionary_file] = CategoryDictionary(Path(dictionary_file))
+    return _worker_dictionaries[dictionary_file]
+
+
+def ingest_offer(file_path: Union[str, Path], offer_name: str, sheet_layouts: List[Dict[str, Any]],
+                 dictionary_file: Optional[str] = None, max_rows: Optional[int] = None) -> OfferParseResult:
+    """
+    Run load -> map -> validate -> categorize for a single offer
+
+    Module-level so it can be executed in a worker process; the category
+    dictionary is passed by path and loaded inside the worker.
+    """
+    result = parse_offer_file(file_path, offer_name, sheet_layouts, max_rows)
+    if result.error or not dictionary_file:
+        return result
+    try:
+        from core.auto_categorizer import auto_categorize_dataset
+
+        start = time.perf_counter()
+        valid_labels = [r['row_index'] for r in result.row_results if r['is_valid']]
+        if valid_labels:
+            categorized = auto_categorize_dataset(result.dataframe.loc[valid_labels],
+                                                  _get_worker_dictionary(dictionary_file))
+            result.dataframe.loc[valid_labels, 'Category'] = categorized.dataframe['Category']
+        result.timings['categorize'] = time.perf_counter() - start
+    except Exception as e:
+        # Categorization is best effort; rows are recategorized after the merge anyway
+        logger.warning(f"Could not categorize offer '{offer_name}': {e}")
+    return result
+
+
+class OfferIngestionScheduler:
+    """
+    Ingests several offers concurrently in a process pool
+
+    Results are always returned in submission order. Falls back to a thread
+    pool when worker processes cannot be started.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, use_processes: bool = True):
+        """
+        Initialize the scheduler
+
+        Args:
+            max_workers: Maximum number of concurrent workers (defaults to the CPU count)
+            use_processes: Use worker processes instead of threads
+        """
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+
+    def ingest(self, sheet_layouts: List[Dict[str, Any]], offer_paths: List[Union[str, Path]],
+               offer_names: List[str], dictionary_file: Optional[str] = None) -> List[OfferParseResult]:
+        """
+        Ingest all offers and return their results in submission order
+
+        Args:
+            sheet_layouts: Output of extract_sheet_layouts for the master
+            offer_paths: Offer file paths
+            offer_names: Offer names, aligned with offer_paths
+            dictionary_file: Optional category dictionary path for per-offer categorization
+
+        Returns:
+            List of OfferParseResult, one per offer
+        """
+        jobs = [(str(path), name, sheet_layouts, dictionary_file) for path, name in zip(offer_paths, offer_names)]
+        if len(jobs) <= 1 or self.max_workers == 1:
+            return [ingest_offer(*job) for job in jobs]
+
+        max_workers = min(len(jobs), self.max_workers or os.cpu_count() or 1)
+        if self.use_processes:
+            try:
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    futures = [executor.submit(ingest_offer, *job) for job in jobs]
+                    return [future.result() for future in futures]
+            except (BrokenProcessPool, OSError, PermissionError) as e:
+                logger.warning(f"Process pool unavailable ({e}), ingesting offers in threads")
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(ingest_offer, *job) for job in jobs]
+            return [future.result() for future in futures]
+
+
+class ComparisonPipeline:
+    """
+    Runs the master/offer comparison workflow without any UI
+
+    Offers are parsed and validated concurrently; merging into the master dataset
+    is done serially in submission order so the output is deterministic.
+    """
+
+    def __init__(self, process_file: Optional[Callable] = None,
+                 category_dictionary=None, max_workers: Optional[int] = None,
+                 use_processes: bool = True):
+        """
+        Initialize the pipeline
+
+        Args:
+            process_file: Callable(Path) -> FileMapping for the master file
+                          (defaults to BOQApplicationController-compatible core processing)
+            category_dictionary: Optional CategoryDictionary used to categorize rows
+            max_workers: Maximum number of offers ingested concurrently
+            use_processes: Ingest offers in worker processes instead of threads
+        """
+        self.process_file = process_file or process_master_file
+        self.category_dictionary = category_dictionary
+        self.scheduler = OfferIngestionScheduler(max_workers, use_processes)
+
+    def run(self, master_path: Union[str, Path], offer_paths: List[Union[str, Path]],
+            offer_names: Optional[List[str]] = None, master_offer_name: Optional[str] = None,
+            output_path: Optional[Union[str, Path]] = None) -> ComparisonRunResult:
+        """
+        Compare one or more offers against a master BoQ
+
+        Args:
+            master_path: Path to the master BoQ
+            offer_paths: Paths to the offer BoQs, merged in this order
+            offer_names: Names for the offers (defaults to the file stems)
+            master_offer_name: Name for the master offer (defaults to the file stem)
+            output_path: Optional path of the comparison workbook to write
+
+        Returns:
+            ComparisonRunResult with the merged DataFrame and timings
+        """
+        offer_names = list(offer_names) if offer_names else [Path(p).stem for p in offer_paths]
+        master_offer_name = master_offer_name or Path(master_path).stem
+        self._check_offer_names(offer_names, offer_paths, [master_offer_name])
+
+        timings = {}
+        total_start = time.perf_counter()
+
+        start = time.perf_counter()
+        master_mapping = self.process_file(Path(master_path))
+        master_mapping.row_validity = build_row_validity(master_mapping)
+        timings['master_processing'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with profile_span('dataframe_build') as span:
+            master_df = dataframe_from_file_mapping(master_mapping)
+            if master_df is None or master_df.empty:
+                raise ValueError(f"No valid rows found in master file: {master_path}")
+            span.rows = len(master_df)
+        with profile_span('categorization', rows=len(master_df)):
+            master_df = self._categorize(master_df)
+        master_df = master_df.rename(columns={col: f'{col}[{master_offer_name}]' for col in OFFER_VALUE_COLUMNS})
+        timings['master_dataframe'] = time.perf_counter() - start
+
+        return self._compare(master_df, master_offer_name, [], extract_sheet_layouts(master_mapping),
+                             offer_paths, offer_names, output_path, timings, total_start)
+
+    def run_dataset(self, dataset_path: Union[str, Path], offer_paths: List[Union[str, Path]],
+                    offer_names: Optional[List[str]] = None,
+                    output_path: Optional[Union[str, Path]] = None) -> ComparisonRunResult:
+        """
+        Compare further offers against a dataset saved with save_dataset
+
+        The saved comparison is the master: no Excel parsing of the master is
+        needed, and offers already in the dataset keep their columns.
+
+        Args:
+            dataset_path: .parquet/.arrow file written by save_dataset
+            offer_paths: Paths to the new offer BoQs, merged in this order
+            offer_names: Names for the new offers (defaults to the file stems)
+            output_path: Optional path of the comparison workbook to write
+
+        Returns:
+            ComparisonRunResult covering the saved and the new offers
+        """
+        from core.columnar_io import read_columnar
+
+        timings = {}
+        total_start = time.perf_counter()
+
+        start = time.perf_counter()
+        dataset = read_columnar(dataset_path)
+        if dataset.dataframe.empty:
+            raise ValueError(f"Dataset has no rows: {dataset_path}")
+        if not dataset.sheet_layouts:
+            raise ValueError(f"Dataset has no master sheet layouts to parse offers with: {dataset_path}")
+        master_offer_name = dataset.master_offer_name or Path(dataset_path).stem
+        timings['master_dataframe'] = time.perf_counter() - start
+
+        offer_names = list(offer_names) if offer_names else [Path(p).stem for p in offer_paths]
+        self._check_offer_names(offer_names, offer_paths, [master_offer_name] + dataset.offer_names)
+
+        return self._compare(dataset.dataframe, master_offer_name, dataset.offer_names, dataset.sheet_layouts,
+                             offer_paths, offer_names, output_path, timings, total_start)
+
+    def save_dataset(self, result: ComparisonRunResult, path: Union[str, Path]) -> Path:
+        """
+        Save a comparison result as typed Parquet (.parquet) or Arrow (.arrow)
+
+        The file can be reloaded with run_dataset to compare further offers.
+        """
+        from core.columnar_io import write_columnar
+
+        return write_columnar(result.dataframe, path, result.master_offer_name,
+                              result.offer_names, result.sheet_layouts)
+
+    def _check_offer_names(self, offer_names: List[str], offer_paths: List[Union[str, Path]],
+                           existing_names: List[str]) -> None:
+        """Raise ValueError unless there is one unique, unused name per offer file"""
+        if len(offer_names) != len(offer_paths):
+            raise ValueError(f"Got {len(offer_names)} offer names for {len(offer_paths)} offer files")
+        all_names = list(existing_names) + offer_names
+        if len(set(all_names)) != len(all_names):
+            raise ValueError(f"Offer names must be unique: {all_names}")
+
+    def _compare(self, master_df: pd.DataFrame, master_offer_name: str, previous_offers: List[str],
+                 sheet_layouts: List[Dict[str, Any]], offer_paths: List[Union[str, Path]],
+                 offer_names: List[str], output_path: Optional[Union[str, Path]],
+                 timings: Dict[str, float], total_start: float) -> ComparisonRunResult:
+        """Parse the offers, merge them into master_df and export"""
+        start = time.perf_counter()
+        with profile_span('offer_parsing', offers=len(offer_paths)) as span:
+            parsed = self.parse_offers(sheet_layouts, offer_paths, offer_names)
+            span.rows = sum(len(offer.dataframe) for offer in parsed if offer.dataframe is not None)
+        timings['offer_parsing'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        processor = ComparisonProcessor()
+        processor.load_master_dataset(apply_schema(master_df, processor.descriptions), summary=SummaryCache())
+        merge_counts, add_counts, errors, warnings = {}, {}, {}, []
+        for offer in parsed:
+            if offer.error:
+                errors[offer.offer_name] = offer.error
+                continue
+            results = self._merge_offer(processor, offer)
+            merge_counts[offer.offer_name] = sum(1 for r in results if r['type'] == 'MERGE')
+            add_counts[offer.offer_name] = sum(1 for r in results if r['type'] == 'ADD')
+            warnings.extend(f"[{offer.offer_name}] {w.message}" for w in processor.comparison_warnings)
+            processor.comparison_warnings.clear()
+        timings['merge'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with profile_span('categorization', rows=len(processor.master_dataset)):
+            final_df = self._categorize(processor.master_dataset, processor.summary)
+        # Rows ADD appended hold raw cell values: restore the column dtypes
+        final_df = apply_schema(final_df, processor.descriptions)
+        timings['recategorize'] = time.perf_counter() - start
+
+        result = ComparisonRunResult(
+            dataframe=final_df,
+            master_offer_name=master_offer_name,
+            offer_names=list(previous_offers) + offer_names,
+            timings=timings,
+            offer_timings={offer.offer_name: offer.timings for offer in parsed},
+            merge_counts=merge_counts,
+            add_counts=add_counts,
+            warnings=warnings,
+            errors=errors,
+            sheet_layouts=sheet_layouts,
+            summary=processor.summary,
+        )
+
+        if output_path:
+            start = time.perf_counter()
+            with profile_span('export', rows=len(final_df)):
+                self.write_workbook(result, Path(output_path))
+            result.output_path = str(output_path)
+            timings['export'] = time.perf_counter() - start
+
+        timings['total'] = time.perf_counter() - total_start
+        logger.info(f"Comparison completed in {timings['total']:.2f}s: {result.timing_report()['stages']}")
+        return result
+
+    def parse_offers(self, sheet_layouts: List[Dict[str, Any]], offer_paths: List[Union[str, Path]],
+                     offer_names: List[str]) -> List[OfferParseResult]:
+        """Ingest all offers concurrently, returned in submission order"""
+        dictionary_file = None
+        if self.category_dictionary is not None:
+            dictionary_file = str(self.category_dictionary.dictionary_file)
+        return self.scheduler.ingest(sheet_layouts, offer_paths, offer_names, dictionary_file)
+
+    def _merge_offer(self, processor: ComparisonProcessor, offer: OfferParseResult) -> List[Dict[str, Any]]:
+        """Merge one parsed offer into the processor's master dataset"""
+        valid_labels = [r['row_index'] for r in offer.row_results if r['is_valid']]
+        comparison_df = offer.dataframe.loc[valid_labels].copy()
+        for col in processor.master_dataset.columns:
+            if col not in comparison_df.columns:
+                comparison_df[col] = ''
+        processor.load_comparison_data(comparison_df)
+        processor.row_results = offer.row_results
+        engine = ComparisonEngine()
+        results = processor.process_valid_rows(comparison_engine=engine, offer_name=offer.offer_name)
+        processor.comparison_warnings.extend(engine.comparison_warnings)
+
+        # Carry categories assigned during ingestion over to the rows ADD appended
+        carried = []
+        for op in results:
+            if op['type'] != 'ADD' or not op['result'].get('row_added'):
+                continue
+            category = comparison_df.at[op['comp_row_index'], 'Category']
+            if category:
+                make_writable(processor.master_dataset, 'Category', [category])
+                processor.master_dataset.at[op['result']['new_row_index'], 'Category'] = category
+                carried.append(op['result']['new_row_index'])
+        if processor.summary is not None and carried:
+            processor.summary.update_rows(processor.master_dataset, carried)
+        processor.cleanup_comparison_data()
+        return results
+
+    def _categorize(self, dataframe: pd.DataFrame, summary: Optional[SummaryCache] = None) -> pd.DataFrame:
+        """Fill empty categories from the category dictionary, if one is configured (and update summary)"""
+        if self.category_dictionary is None:
+            return dataframe
+        from core.auto_categorizer import recategorize_rows
+
+        category = dataframe['Category']
+        empty_mask = category.isna() | (category.astype(str).str.strip() == '')
+        if not empty_mask.any():
+            return dataframe
+        dataframe = dataframe.copy()
+        recategorize_rows(dataframe, empty_mask, self.category_dictionary)
+        if summary is not None:
+            summary.update_rows(dataframe, dataframe.index[empty_mask.to_numpy()])
+        return dataframe
+
+    def write_workbook(self, result: ComparisonRunResult, output_path: Path) -> None:
+        """
+        Write the comparison workbook and a JSON timing report next to it
+
+        Args:
+            result: ComparisonRunResult to export
+            output_path: Destination .xlsx path
+        """
+        df = result.dataframe
+        total_columns = [f'total_price[{name}]' for name in [result.master_offer_name] + result.offer_names
+                         if f'total_price[{name}]' in df.columns]
+        if result.summary is not None:
+            summary = result.summary.sync(df).category_table(total_columns)
+        else:
+            summary = df[['Category'] + total_columns].copy()
+            summary['Category'] = summary['Category'].fillna('').astype(str)
+            for col in total_columns:
+                summary[col] = pd.to_numeric(summary[col], errors='coerce').fillna(0.0)
+            summary = summary.groupby('Category', sort=True).sum().reset_index()
+
+        with StreamingExcelWriter(output_path) as writer:
+            writer.write_dataframe('Comparison', df)
+            writer.write_dataframe('Summary', summary, category_column=None)
+
+        report_path = output_path.with_name(f"{output_path.stem}_timing.json")
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(result.timing_report(), f, indent=2, ensure_ascii=False)
+        logger.info(f"Comparison workbook written to {output_path}, timing report to {report_path}")
+
+
+def process_master_file(file_path: Path, max_rows: Optional[int] = None):
+    """
+    Run the core processing stages on a master file and return its FileMapping
+
+    Uses the same read_workbook/analyze_workbook stages as
+    BOQApplicationController.process_file, with components of its own.
+    """
+    from core.sheet_classifier import SheetClassifier
+    from core.column_mapper import ColumnMapper
+    from core.validator import DataValidator
+    from core.mapping_generator import MappingGenerator
+
+    file_info, sheet_data = read_workbook(file_path, max_rows=max_rows)
+    file_mapping, _ = analyze_workbook(file_info, sheet_data, SheetClassifier(), ColumnMapper(),
+                                       RowClassifier(), DataValidator(), MappingGenerator())
+    return file_mapping
@@ -0,0 +1,161 @@
+"""
+Description Interning for BOQ Tools
+Maps each distinct normalized description to an integer ID so matching and grouping compare integers, not strings
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+from core.mapping_generator import file_mapping_cache
+
+logger = logging.getLogger(__name__)
+
+# ID of missing (None/NaN) descriptions
+MISSING = -1
+
+
+def description_key(value: Any) -> str:
+    """Whitespace-normalized, lowercase form two descriptions must share to be the same item"""
+    return ' '.join(str(value).split()).lower()
+
+
+class DescriptionTable:
+    """
+    Interning table of descriptions
+
+    Descriptions that differ only in case or whitespace (runs of spaces, tabs,
+    newlines, leading/trailing blanks) share one integer ID. For every ID the
+    table caches the first original string seen, its lowercase form and its
+    whitespace-normalized form, so later stages reuse them instead of lowering
+    and splitting the same strings again.
+
+    Every raw string is normalized once: codes() factorizes a column first and
+    only interns its distinct values, and raw strings already seen are resolved
+    through a dictionary. Missing values get the MISSING ID.
+
+    Usage:
+        table = DescriptionTable()
+        codes = table.codes(dataframe['Description'])
+        rows_by_id = table.group_positions(codes)
+        table.normalized(codes[0])
+    """
+
+    def __init__(self):
+        """Initialize an empty table"""
+        self._ids: Dict[str, int] = {}
+        self._raw: Dict[str, int] = {}
+        self._shared: Dict[str, str] = {}
+        self._originals: List[str] = []
+        self._lowered: List[str] = []
+        self._normalized: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._originals)
+
+    def intern(self, value: Any) -> int:
+        """ID of one description, adding it to the table if it is new"""
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            return MISSING
+        raw = value if isinstance(value, str) else str(value)
+        description_id = self._raw.get(raw)
+        if description_id is not None:
+            return description_id
+        normalized = ' '.join(raw.split())
+        key = normalized.lower()
+        description_id = self._ids.get(key)
+        if description_id is None:
+            description_id = len(self._originals)
+            self._ids[key] = description_id
+            self._originals.append(raw)
+            self._lowered.append(raw.lower())
+            self._normalized.append(normalized)
+        self._raw[raw] = description_id
+        return description_id
+
+    def lookup(self, value: Any) -> int:
+        """ID of a description without adding it (MISSING when it is not in the table)"""
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            return MISSING
+        description_id = self._raw.get(value if isinstance(value, str) else str(value))
+        if description_id is None:
+            description_id = self._ids.get(description_key(value), MISSING)
+        return description_id
+
+    def codes(self, values: Iterable[Any]) -> np.ndarray:
+        """
+        IDs of a column of descriptions
+
+        Args:
+            values: Series, array or list of descriptions
+
+        Returns:
+            int64 array of IDs, one per value
+        """
+        if not isinstance(values, (pd.Series, pd.Index, np.ndarray)):
+            values = np.asarray(list(values), dtype=object)
+        positions, uniques = pd.factorize(values)
+        ids = np.fromiter((self.intern(value) for value in uniques), dtype=np.int64, count=len(uniques))
+        # factorize marks missing values with -1, which indexes the appended MISSING
+        return np.append(ids, MISSING)[positions]
+
+    def strings(self, values: Iterable[Any]) -> np.ndarray:
+        """
+        A column of descriptions with equal strings sharing one object
+
+        Every string seen by this table (in any column) is kept once, so frames
+        built from the same table hold references instead of copies. Values are
+        otherwise unchanged; missing values stay missing.
+
+        Args:
+            values: Series, array or list of descriptions
+
+        Returns:
+            object array, one value per input value
+        """
+        if not isinstance(values, (pd.Series, pd.Index, np.ndarray)):
+            values = np.asarray(list(values), dtype=object)
+        positions, uniques = pd.factorize(values)
+        shared = np.empty(len(uniques) + 1, dtype=object)
+        for i, value in enumerate(uniques):
+            if isinstance(value, str):
+                self.intern(value)
+                value = self._shared.setdefault(value, value)
+            shared[i] = value
+        shared[-1] = np.nan
+        return shared[positions]
+
+    @staticmethod
+    def group_positions(codes: np.ndarray) -> Dict[int, np.ndarray]:
+        """Ascending positions of each ID in codes"""
+        codes = np.asarray(codes)
+        if not len(codes):
+            return {}
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        return {int(sorted_codes[start]): positions
+                for start, positions in zip(starts, np.split(order, starts[1:]))}
+
+    def original(self, description_id: int) -> str:
+        """First original string interned under an ID"""
+        return self._originals[description_id]
+
+    def lower(self, description_id: int) -> str:
+        """Lowercase form of the original string"""
+        return self._lowered[description_id]
+
+    def normalized(self, description_id: int) -> str:
+        """Whitespace-normalized form of the original string"""
+        return self._normalized[description_id]
+
+    def key(self, description_id: int) -> str:
+        """Whitespace-normalized lowercase form shared by every description with this ID"""
+        return self._normalized[description_id].lower()
+
+
+def get_description_table(file_mapping) -> DescriptionTable:
+    """The DescriptionTable of a file mapping, created on first use and kept on the mapping"""
+    return file_mapping_cache(file_mapping, 'description_table', DescriptionTable)
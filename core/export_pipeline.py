@@ -0,0 +1,297 @@
+"""
+Export Pipeline for BOQ Tools
+Writes every export format for a processed file concurrently from one shared table
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import pandas as pd
+
+from core.columnar_io import ARROW_AVAILABLE, write_columnar
+from core.comparison_pipeline import OFFER_VALUE_COLUMNS, build_row_validity, dataframe_from_file_mapping
+from utils.export import StreamingExcelWriter
+from utils.lazy_import import module_available
+from utils.profiler import profile_span
+
+logger = logging.getLogger(__name__)
+
+PARQUET_AVAILABLE = ARROW_AVAILABLE or module_available('fastparquet')
+
+# Format name -> file name suffix appended to the input file stem
+EXPORT_FORMATS = {
+    'normalized_excel': '_processed.xlsx',
+    'summary_excel': '_summary.xlsx',
+    'json': '_mapping.json',
+    'csv': '.csv',
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+}
+
+# Formats that need an optional dependency -> (available, package hint)
+OPTIONAL_FORMATS = {
+    'parquet': (PARQUET_AVAILABLE, 'pyarrow or fastparquet'),
+    'arrow': (ARROW_AVAILABLE, 'pyarrow'),
+}
+
+DEFAULT_FORMATS = ['normalized_excel']
+
+
+@dataclass
+class ExportTable:
+    """
+    One processed file, converted once and shared read-only by every writer
+
+    Writers run concurrently and must not modify `dataframe`.
+    """
+    stem: str
+    dataframe: pd.DataFrame
+    file_mapping: Any = None  # FileMapping, serialized by the JSON writer
+
+    @classmethod
+    def from_file_mapping(cls, file_mapping, stem: str) -> 'ExportTable':
+        """
+        Build the shared table from a FileMapping
+
+        Row validity is computed when the mapping does not carry it yet, and value
+        columns whose non-blank cells are all numbers are converted to floats.
+
+        Args:
+            file_mapping: FileMapping produced by the processing pipeline
+            stem: Base name for the exported files
+
+        Returns:
+            ExportTable (with an empty DataFrame when there are no valid rows)
+        """
+        if not getattr(file_mapping, 'row_validity', None):
+            file_mapping.row_validity = build_row_validity(file_mapping)
+        dataframe = dataframe_from_file_mapping(file_mapping)
+        if dataframe is None:
+            dataframe = pd.DataFrame()
+        return cls(stem, _coerce_numeric_columns(dataframe), file_mapping)
+
+
+@dataclass
+class ExportResult:
+    """Outcome of writing all formats for one table"""
+    stem: str
+    paths: Dict[str, Path] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    seconds: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def success(self) -> bool:
+        return bool(self.paths) and not self.errors
+
+
+def _coerce_numeric_columns(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Convert value columns to float when every non-blank cell parses as a number"""
+    for column in OFFER_VALUE_COLUMNS:
+        if column not in dataframe.columns or pd.api.types.is_numeric_dtype(dataframe[column]):
+            continue
+        values = dataframe[column].replace('', None)
+        converted = pd.to_numeric(values, errors='coerce')
+        if converted.notna().sum() == values.notna().sum():
+            dataframe[column] = converted.astype(float)
+    return dataframe
+
+
+def write_normalized_excel(table: ExportTable, path: Path) -> None:
+    """Normalized rows plus the per-category SUMIFS summary"""
+    with StreamingExcelWriter(path) as writer:
+        writer.write_dataframe('Normalized BOQ', table.dataframe)
+        writer.write_category_summary('Summary', 'Normalized BOQ', table.dataframe, {table.stem: 'total_price'})
+
+
+def write_summary_excel(table: ExportTable, path: Path) -> None:
+    """Item count and total value per source sheet"""
+    df = table.dataframe
+    if 'Source_Sheet' in df.columns:
+        totals = pd.to_numeric(df.get('total_price'), errors='coerce') if 'total_price' in df.columns else 0.0
+        summary = (df.assign(_total=totals).groupby('Source_Sheet', sort=False)
+                   .agg(**{'Item Count': ('_total', 'size'), 'Total Value': ('_total', 'sum')})
+                   .reset_index().rename(columns={'Source_Sheet': 'Sheet Name'}))
+    else:
+        summary = pd.DataFrame(columns=['Sheet Name', 'Item Count', 'Total Value'])
+    with StreamingExcelWriter(path) as writer:
+        writer.write_dataframe('Summary Report', summary, numeric_columns=['Total Value'], category_column=None)
+
+
+def write_mapping_json(table: ExportTable, path: Path) -> None:
+    """Full FileMapping structure as JSON"""
+    from core.mapping_generator import MappingGenerator
+    if table.file_mapping is None:
+        raise ValueError("No file mapping to export")
+    MappingGenerator().write_mapping_json(table.file_mapping, path)
+
+
+def write_csv(table: ExportTable, path: Path) -> None:
+    """Normalized rows as UTF-8 CSV"""
+    table.dataframe.to_csv(path, index=False, encoding='utf-8')
+
+
+def write_parquet(table: ExportTable, path: Path) -> None:
+    """Normalized rows as typed Parquet (pyarrow), or via pandas with fastparquet"""
+    if ARROW_AVAILABLE:
+        write_columnar(table.dataframe, path)
+        return
+    if not PARQUET_AVAILABLE:
+        raise ImportError("Parquet export requires pyarrow or fastparquet")
+    # Object columns can mix numbers and text, which Parquet cannot store in one column
+    df = table.dataframe.copy()
+    for column in df.columns:
+        if df[column].dtype == object:
+            df[column] = df[column].map(lambda v: v if v is None or isinstance(v, str) else str(v))
+    df.to_parquet(path, index=False)
+
+
+def write_arrow(table: ExportTable, path: Path) -> None:
+    """Normalized rows as a typed Arrow IPC file"""
+    write_columnar(table.dataframe, path)
+
+
+WRITERS: Dict[str, Callable[[ExportTable, Path], None]] = {
+    'normalized_excel': write_normalized_excel,
+    'summary_excel': write_summary_excel,
+    'json': write_mapping_json,
+    'csv': write_csv,
+    'parquet': write_parquet,
+    'arrow': write_arrow,
+}
+
+
+def write_export(table: ExportTable, format_type: str, path: Union[str, Path]) -> Path:
+    """
+    Write one export format for a table
+
+    Args:
+        table: Table to export
+        format_type: Key of EXPORT_FORMATS
+        path: Destination file
+
+    Returns:
+        Path written
+    """
+    if format_type not in WRITERS:
+        raise ValueError(f"Unknown export format: {format_type}")
+    available, package = OPTIONAL_FORMATS.get(format_type, (True, None))
+    if not available:
+        raise ImportError(f"{format_type} export requires {package}")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    WRITERS[format_type](table, path)
+    return path
+
+
+class MultiFormatExporter:
+    """
+    Writes several export formats per table on a shared thread pool
+
+    Each format runs as its own task against the same in-memory table. At most
+    `max_pending` tables are in flight; submit() blocks beyond that, so a batch
+    can keep processing the next file while the previous one is written without
+    holding an unbounded number of tables in memory.
+
+    Usage:
+        with MultiFormatExporter(['normalized_excel', 'csv']) as exporter:
+            future = exporter.submit(ExportTable.from_file_mapping(mapping, 'boq'), output_dir)
+        result = future.result()
+    """
+
+    def __init__(self, formats: Optional[List[str]] = None, max_workers: Optional[int] = None,
+                 max_pending: int = 2):
+        """
+        Initialize the exporter
+
+        Args:
+            formats: Formats to write (keys of EXPORT_FORMATS, default: normalized_excel)
+            max_workers: Writer threads (default: one per format)
+            max_pending: Tables queued or being written before submit() blocks
+        """
+        formats = list(dict.fromkeys(formats or DEFAULT_FORMATS))
+        unknown = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+        if unknown:
+            raise ValueError(f"Unknown export format(s): {', '.join(unknown)}")
+        for format_type, (available, package) in OPTIONAL_FORMATS.items():
+            if format_type in formats and not available:
+                logger.warning(f"{format_type} export skipped: install {package} to enable it")
+                formats.remove(format_type)
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+
+        self.formats = formats
+        self.max_workers = max_workers or max(len(formats), 1)
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='export')
+
+    def __enter__(self) -> 'MultiFormatExporter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Wait for all submitted tables to be written and stop the writer threads"""
+        self._executor.shutdown(wait=True)
+
+    def submit(self, table: ExportTable, output_dir: Union[str, Path]) -> 'Future[ExportResult]':
+        """
+        Queue all formats for a table, blocking while max_pending tables are in flight
+
+        Args:
+            table: Shared table to export
+            output_dir: Directory for the exported files
+
+        Returns:
+            Future resolving to the ExportResult once every format has finished
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self._pending.acquire()
+
+        result = ExportResult(table.stem)
+        done: 'Future[ExportResult]' = Future()
+        remaining = [len(self.formats)]
+        lock = threading.Lock()
+
+        def _finished(_future) -> None:
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self._pending.release()
+                done.set_result(result)
+
+        if not self.formats:
+            self._pending.release()
+            done.set_result(result)
+            return done
+
+        for format_type in self.formats:
+            path = output_dir / f"{table.stem}{EXPORT_FORMATS[format_type]}"
+            future = self._executor.submit(self._write, table, format_type, path, result)
+            future.add_done_callback(_finished)
+        return done
+
+    def export(self, table: ExportTable, output_dir: Union[str, Path]) -> ExportResult:
+        """Write all formats for one table and wait for them"""
+        return self.submit(table, output_dir).result()
+
+    def _write(self, table: ExportTable, format_type: str, path: Path, result: ExportResult) -> None:
+        """Run one writer, recording its path or error on the shared result"""
+        start = time.perf_counter()
+        try:
+            with profile_span('export', rows=len(table.dataframe), format=format_type):
+                write_export(table, format_type, path)
+            result.paths[format_type] = path
+            logger.info(f"Exported {format_type} for {table.stem}: {path}")
+        except Exception as e:
+            result.errors[format_type] = str(e)
+            logger.error(f"Failed to export {format_type} for {table.stem}: {e}", exc_info=True)
+        finally:
+            result.seconds[format_type] = time.perf_counter() - start
@@ -0,0 +1,177 @@
+"""
+File Pipeline for BOQ Tools
+Load, classify, map, validate and generate the mapping of one workbook
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.mapping_generator import FileMapping
+from utils.profiler import profile_span
+
+logger = logging.getLogger(__name__)
+
+
+def read_workbook(file_path: Path, progress_callback: Optional[Callable] = None,
+                  max_rows: Optional[int] = None) -> Tuple[Dict[str, Any], Dict[str, List[List[Any]]]]:
+    """
+    Load a workbook and read all of its visible sheets
+
+    Each call uses its own ExcelProcessor, so files can be read concurrently.
+
+    Args:
+        file_path: Path to the workbook
+        progress_callback: Optional progress callback function
+        max_rows: Maximum number of rows to read per sheet (default: all rows)
+
+    Returns:
+        Tuple of (file info, sheet name -> rows)
+    """
+    if not file_path.exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    # Imported here: openpyxl and xlrd stay out of the application's startup imports
+    from core.file_processor import ExcelProcessor
+
+    processor = ExcelProcessor()
+    with profile_span('load', file=file_path.name):
+        processor.load_file(file_path)
+
+    with processor:
+        if progress_callback:
+            progress_callback(10, "File loaded, analyzing...")
+
+        with profile_span('sheet_extraction') as span:
+            file_info = processor.get_file_info()
+            sheet_data = processor.get_all_sheets_data(max_rows=max_rows)
+            span.rows = sum(len(data) for data in sheet_data.values())
+
+    if not sheet_data:
+        raise ValueError("No data found in any sheets.")
+    return file_info, sheet_data
+
+
+def analyze_workbook(file_info: Dict[str, Any], sheet_data: Dict[str, List[List[Any]]],
+                     sheet_classifier, column_mapper, row_classifier, validator, mapping_generator,
+                     sheet_types: Optional[Dict[str, str]] = None,
+                     progress_callback: Optional[Callable] = None) -> Tuple[FileMapping, Dict[str, Any]]:
+    """
+    Run sheet classification, column mapping, row classification, validation
+    and mapping generation on sheets read by read_workbook
+
+    The components are used as-is and are not safe to share between
+    concurrent calls; give each call its own instances (see process_workbook).
+
+    Args:
+        file_info: File info from read_workbook
+        sheet_data: Sheet rows from read_workbook
+        sheet_classifier: SheetClassifier
+        column_mapper: ColumnMapper (attached to the returned mapping)
+        row_classifier: RowClassifier
+        validator: DataValidator
+        mapping_generator: MappingGenerator
+        sheet_types: Optional dict mapping sheet names to their user-selected type (default: all 'BOQ')
+        progress_callback: Optional progress callback function
+
+    Returns:
+        Tuple of (FileMapping, processor results)
+    """
+    if progress_callback:
+        progress_callback(20, "Classifying sheets...")
+
+    total_rows = sum(len(data) for data in sheet_data.values())
+
+    with profile_span('sheet_classification', rows=total_rows):
+        sheet_classifications = {
+            name: sheet_classifier.classify_sheet(data, name)
+            for name, data in sheet_data.items()
+        }
+    if progress_callback: progress_callback(30, "Sheets classified")
+
+    with profile_span('column_mapping', rows=total_rows):
+        column_mapping_results = {
+            name: column_mapper.process_sheet_mapping(data)
+            for name, data in sheet_data.items()
+        }
+    if progress_callback: progress_callback(50, "Columns mapped")
+
+    column_mappings_dict = {
+        name: {m.column_index: m.mapped_type for m in result.mappings}
+        for name, result in column_mapping_results.items()
+    }
+
+    with profile_span('row_classification', rows=total_rows):
+        row_classifications = {
+            name: row_classifier.classify_rows(data, column_mappings_dict.get(name, {}), name)
+            for name, data in sheet_data.items()
+        }
+    if progress_callback: progress_callback(70, "Rows classified")
+
+    row_classifications_dict = {
+        name: {rc.row_index: rc.row_type.value for rc in result.classifications}
+        for name, result in row_classifications.items()
+    }
+
+    with profile_span('validation', rows=total_rows):
+        validation_results = {
+            name: validator.validate_sheet(
+                data, column_mappings_dict.get(name, {}), row_classifications_dict.get(name, {})
+            )
+            for name, data in sheet_data.items()
+        }
+    if progress_callback: progress_callback(90, "Data validated")
+
+    processor_results = {
+        'file_info': file_info,
+        'sheet_data': sheet_data,
+        'sheet_classifications': sheet_classifications,
+        'column_mappings': column_mapping_results,
+        'row_classifications': row_classifications,
+        'validation_results': validation_results,
+        'sheet_types': sheet_types or {name: 'BOQ' for name in sheet_data.keys()}
+    }
+
+    with profile_span('mapping_generation', rows=total_rows):
+        file_mapping = mapping_generator.generate_file_mapping(processor_results)
+    if progress_callback: progress_callback(100, "Processing complete")
+
+    # Add column mapper reference to file mapping for UI learning functionality
+    file_mapping.column_mapper = column_mapper
+    return file_mapping, processor_results
+
+
+def process_workbook(file_path: Path, sheet_classifier, column_mapper, row_classifier, validator,
+                     mapping_generator, sheet_filter: Optional[List[str]] = None,
+                     sheet_types: Optional[Dict[str, str]] = None,
+                     progress_callback: Optional[Callable] = None) -> Tuple[FileMapping, Dict[str, Any]]:
+    """
+    Read and analyze one workbook with the given components
+
+    A module-level function so it can run as a process job: the components
+    arrive as pickled copies, and the returned mapping carries the worker's
+    copy of the column mapper until the caller reattaches its own.
+
+    Args:
+        file_path: Path to the workbook
+        sheet_classifier: SheetClassifier
+        column_mapper: ColumnMapper
+        row_classifier: RowClassifier
+        validator: DataValidator
+        mapping_generator: MappingGenerator
+        sheet_filter: Optional list of sheet names to process (only these will be processed)
+        sheet_types: Optional dict mapping sheet names to their user-selected type
+        progress_callback: Optional progress callback function
+
+    Returns:
+        Tuple of (FileMapping, processor results)
+    """
+    file_info, sheet_data = read_workbook(file_path, progress_callback)
+
+    if sheet_filter is not None:
+        sheet_data = {name: data for name, data in sheet_data.items() if name in sheet_filter}
+
+    return analyze_workbook(
+        file_info, sheet_data, sheet_classifier, column_mapper, row_classifier, validator,
+        mapping_generator, sheet_types=sheet_types, progress_callback=progress_callback,
+    )
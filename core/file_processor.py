@@ -11,7 +11,7 @@ import warnings
 
 try:
     import openpyxl
-    from openpyxl import Workbook, load_workbook
+    from openpyxl import Workbook
     from openpyxl.worksheet.worksheet import Worksheet
     from openpyxl.utils.exceptions import InvalidFileException
     OPENPYXL_AVAILABLE = True
@@ -26,12 +26,7 @@ except ImportError:
     XLRD_AVAILABLE = False
     logging.warning("xlrd not available. Legacy .xls files will not be supported.")
 
-try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
-except ImportError:
-    PANDAS_AVAILABLE = False
-    logging.warning("pandas not available. CSV processing will not work.")
+from core.sheet_sources import SheetSource, open_sheet_source
 
 logger = logging.getLogger(__name__)
 
@@ -79,7 +74,8 @@ class ExcelProcessor:
         """
         self.max_memory_mb = max_memory_mb
         self.chunk_size = chunk_size
-        self.workbook: Optional[Workbook] = None
+        self.source: Optional[SheetSource] = None
+        self.workbook: Optional[Workbook] = None  # Read-only workbook, .xlsx only
         self.file_path: Optional[Path] = None
         self.file_format: Optional[str] = None
         self._sheet_metadata_cache: Dict[str, SheetMetadata] = {}
@@ -110,16 +106,19 @@ class ExcelProcessor:
             if not filepath.exists():
                 raise FileNotFoundError(f"File not found: {filepath}")
             
-            # Check file size
-            file_size_mb = filepath.stat().st_size / (1024 * 1024)
-            if file_size_mb > self.max_memory_mb:
-                raise MemoryError(f"File size ({file_size_mb:.1f}MB) exceeds memory limit ({self.max_memory_mb}MB)")
-            
             # Determine file format
             self.file_format = self._detect_file_format(filepath)
             logger.info(f"Detected file format: {self.file_format}")
             
-            # Load workbook based on format
+            # Check file size; CSV is streamed, so only workbooks are bound by the limit
+            file_size_mb = filepath.stat().st_size / (1024 * 1024)
+            if file_size_mb > self.max_memory_mb:
+                if self.file_format != "csv":
+                    raise MemoryError(f"File size ({file_size_mb:.1f}MB) exceeds memory limit ({self.max_memory_mb}MB)")
+                logger.warning(f"CSV file ({file_size_mb:.1f}MB) exceeds memory limit ({self.max_memory_mb}MB); "
+                               f"read it in chunks (core.chunked_ingest) rather than all at once")
+            
+            # Open the reader backend for the format
             if self.file_format == "xlsx":
                 self._load_xlsx_file(filepath)
             elif self.file_format == "csv":
@@ -131,8 +130,8 @@ class ExcelProcessor:
             
             self.file_path = filepath
             logger.info(f"Successfully loaded Excel file: {filepath.name}")
-            if self.workbook:
-                logger.info(f"Total sheets: {len(self.workbook.sheetnames)}")
+            if self.source:
+                logger.info(f"Total sheets: {len(self.source.sheetnames)}")
             
             return True
             
@@ -148,8 +147,6 @@ class ExcelProcessor:
         if extension == ".xlsx":
             return "xlsx"
         elif extension == ".csv":
-            if not PANDAS_AVAILABLE:
-                raise ImportError("pandas is required for .csv files")
             return "csv"
         elif extension == ".xls":
             if not XLRD_AVAILABLE:
@@ -172,66 +169,24 @@ class ExcelProcessor:
     def _load_xlsx_file(self, filepath: Path) -> None:
         """Load .xlsx file using openpyxl"""
         try:
-            # Suppress warnings for better user experience
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                self.workbook = load_workbook(
-                    filename=filepath,
-                    read_only=True,  # Memory efficient
-                    data_only=True,  # Get values instead of formulas
-                    keep_vba=False   # Don't load VBA code
-                )
+            self.source = open_sheet_source(filepath, "xlsx")
+            self.workbook = self.source.workbook
         except Exception as e:
             raise InvalidFileException(f"Failed to load .xlsx file: {str(e)}")
     
     def _load_csv_file(self, filepath: Path) -> None:
-        """Load .csv file using pandas into a virtual workbook structure."""
-        if not PANDAS_AVAILABLE:
-            raise ImportError("pandas is required for .csv files")
+        """Open .csv file as a single streamed sheet named after the file"""
         try:
-            df = pd.read_csv(filepath, keep_default_na=False, dtype=str)
-            self.workbook = Workbook()
-            if self.workbook.active:
-                self.workbook.remove(self.workbook.active) # Remove default sheet
-            
-            sheet_name = filepath.stem
-            ws = self.workbook.create_sheet(title=sheet_name)
-            ws.append(list(df.columns))
-            for _, row in df.iterrows():
-                ws.append(list(row))
-            setattr(ws, '_dataframe', df)
+            self.source = open_sheet_source(filepath, "csv")
         except Exception as e:
             raise InvalidFileException(f"Failed to load .csv file: {str(e)}")
     
     def _load_xls_file(self, filepath: Path) -> None:
-        """Load .xls file using xlrd (legacy format)"""
+        """Open .xls file with xlrd (legacy format); sheets are read on demand"""
         if not XLRD_AVAILABLE:
             raise ImportError("xlrd is required for .xls files")
-        
         try:
-            self.workbook = Workbook()
-            if self.workbook.active:
-                self.workbook.remove(self.workbook.active)
-            
-            xlrd_book = xlrd.open_workbook(str(filepath))
-            
-            for sheet_name in xlrd_book.sheet_names():
-                sheet = xlrd_book.sheet_by_name(sheet_name)
-                ws = self.workbook.create_sheet(title=sheet_name)
-                
-                # Copy data (limited to prevent memory issues)
-                max_rows = min(sheet.nrows, 1000)  # Limit for memory
-                max_cols = min(sheet.ncols, 100)
-                
-                for row_idx in range(max_rows):
-                    for col_idx in range(max_cols):
-                        try:
-                            cell_value = sheet.cell_value(row_idx, col_idx)
-                            if cell_value:
-                                ws.cell(row=row_idx + 1, column=col_idx + 1, value=str(cell_value))
-                        except Exception:
-                            continue
-                            
+            self.source = open_sheet_source(filepath, "xls")
         except Exception as e:
             raise InvalidFileException(f"Failed to load .xls file: {str(e)}")
     
@@ -242,22 +197,21 @@ class ExcelProcessor:
         Returns:
             List of visible sheet names
         """
-        if not self.workbook:
+        if not self.source:
             raise RuntimeError("No workbook loaded. Call load_file() first.")
         
         visible_sheets = []
         
-        for sheet_name in self.workbook.sheetnames:
+        for sheet_name in self.source.sheetnames:
             try:
-                worksheet = self.workbook[sheet_name]
-                if not worksheet.sheet_state == 'hidden':
+                if self.source.is_visible(sheet_name):
                     visible_sheets.append(sheet_name)
             except Exception as e:
                 logger.warning(f"Error checking visibility of sheet '{sheet_name}': {e}")
                 # Assume visible if we can't determine
                 visible_sheets.append(sheet_name)
         
-        logger.info(f"Found {len(visible_sheets)} visible sheets out of {len(self.workbook.sheetnames)} total")
+        logger.info(f"Found {len(visible_sheets)} visible sheets out of {len(self.source.sheetnames)} total")
         return visible_sheets
     
     def get_sheet_metadata(self, sheet_name: str) -> SheetMetadata:
@@ -270,13 +224,18 @@ class ExcelProcessor:
         Returns:
             SheetMetadata object with comprehensive information
         """
-        if not self.workbook:
+        if not self.source:
             raise RuntimeError("No workbook loaded. Call load_file() first.")
         
         # Check cache first
         if sheet_name in self._sheet_metadata_cache:
             return self._sheet_metadata_cache[sheet_name]
         
+        if self.workbook is None:
+            metadata = self._metadata_from_rows(sheet_name)
+            self._sheet_metadata_cache[sheet_name] = metadata
+            return metadata
+        
         try:
             worksheet = self.workbook[sheet_name]
             
@@ -339,12 +298,10 @@ class ExcelProcessor:
         Returns:
             ContentSample object with sampled data
         """
-        if not self.workbook:
+        if not self.source:
             raise RuntimeError("No workbook loaded. Call load_file() first.")
         
         try:
-            worksheet = self.workbook[sheet_name]
-            
             # Get metadata to determine sampling range
             metadata = self.get_sheet_metadata(sheet_name)
             
@@ -361,21 +318,16 @@ class ExcelProcessor:
             # Determine sampling range
             start_row = metadata.first_data_row
             end_row = min(start_row + rows - 1, metadata.last_data_row)
+            first_col = metadata.first_data_column - 1
+            width = metadata.last_data_column - first_col
             
-            # Extract headers (first row)
-            headers = []
-            for col in range(metadata.first_data_column, metadata.last_data_column + 1):
-                cell_value = worksheet.cell(row=start_row, column=col).value
-                headers.append(str(cell_value) if cell_value is not None else "")
-            
-            # Extract sample rows
-            sample_rows = []
-            for row in range(start_row + 1, end_row + 1):
-                row_data = []
-                for col in range(metadata.first_data_column, metadata.last_data_column + 1):
-                    cell_value = worksheet.cell(row=row, column=col).value
-                    row_data.append(str(cell_value) if cell_value is not None else "")
-                sample_rows.append(row_data)
+            # Read the rows once; the first data row holds the headers
+            sampled = []
+            for row in self.source.read_rows(sheet_name, max_rows=end_row)[start_row - 1:]:
+                cells = row[first_col:first_col + width]
+                sampled.append(cells + [""] * (width - len(cells)))
+            headers = sampled[0] if sampled else []
+            sample_rows = sampled[1:]
             
             content_sample = ContentSample(
                 sheet_name=sheet_name,
@@ -555,41 +507,81 @@ class ExcelProcessor:
         estimated_bytes = total_cells * 50
         return estimated_bytes / (1024 * 1024)  # Convert to MB
     
-    def get_sheet_data(self, sheet_name: str, max_rows: int = 1000) -> List[List[str]]:
+    def _metadata_from_rows(self, sheet_name: str) -> SheetMetadata:
+        """Sheet metadata from one streamed pass over the rows (.xls and .csv sources)"""
+        row_count = column_count = 0
+        first_row = first_col = None
+        last_row = last_col = 0
+        filled_cells = 0
+        empty_rows = 0
+        filled_columns = set()
+        for row_number, row in enumerate(self.source.iter_rows(sheet_name), 1):
+            row_count = row_number
+            column_count = max(column_count, len(row))
+            filled = [col for col, value in enumerate(row, 1) if value != ""]
+            if not filled:
+                empty_rows += 1
+                continue
+            if first_row is None:
+                first_row = row_number
+                # Empty rows above the data are outside the data range
+                empty_rows = 0
+            last_row = row_number
+            first_col = min(first_col or filled[0], filled[0])
+            last_col = max(last_col, filled[-1])
+            filled_cells += len(filled)
+            filled_columns.update(filled)
+
+        if first_row is None:
+            return SheetMetadata(sheet_name, self.source.is_visible(sheet_name), row_count, column_count,
+                                 0.0, row_count + 1, 0, column_count + 1, 0, row_count, column_count,
+                                 self.file_format or "unknown", 0.0)
+        # Empty rows below the data are outside the data range too
+        empty_rows -= row_count - last_row
+        data_cells = (last_row - first_row + 1) * (last_col - first_col + 1)
+        return SheetMetadata(
+            name=sheet_name,
+            is_visible=self.source.is_visible(sheet_name),
+            row_count=row_count,
+            column_count=column_count,
+            data_density=filled_cells / data_cells,
+            first_data_row=first_row,
+            last_data_row=last_row,
+            first_data_column=first_col,
+            last_data_column=last_col,
+            empty_rows_count=empty_rows,
+            empty_columns_count=(last_col - first_col + 1) - len(filled_columns),
+            file_format=self.file_format or "unknown",
+            estimated_size_mb=last_row * last_col * 50 / (1024 * 1024)
+        )
+    
+    def get_sheet_data(self, sheet_name: str, max_rows: Optional[int] = None) -> List[List[str]]:
         """
         Get all data from a specific sheet as a list of rows.
 
-        Handles both standard Excel sheets and virtual CSV sheets.
+        Handles .xlsx, .xls and .csv sheets alike. A sheet longer than max_rows
+        is truncated with a warning.
         
         Args:
             sheet_name: Name of the sheet to get data from
-            max_rows: Maximum number of rows to retrieve
+            max_rows: Maximum number of rows to retrieve (None for all rows)
             
         Returns:
             List of rows, where each row is a list of cell values
         """
-        if not self.workbook:
+        if not self.source:
             raise RuntimeError("No workbook loaded. Call load_file() first.")
         
         try:
-            worksheet = self.workbook[sheet_name]
-
-            # If it's a CSV, the data is already loaded in rows
-            if self.file_format == 'csv':
-                # The data is already in the openpyxl worksheet structure
-                data = []
-                for row in worksheet.iter_rows(max_row=max_rows):
-                    data.append([cell.value for cell in row])
-                return data
-
-            # For regular excel files, iterate and extract
-            data = []
-            # Use iter_rows for memory efficiency
-            for row in worksheet.iter_rows(max_row=max_rows):
-                # Convert cells to string, handling None
-                data.append([str(cell.value) if cell.value is not None else "" for cell in row])
-                
-            return data
+            # Rows stream from the format's reader; cells are strings, '' when empty
+            if max_rows is None:
+                return self.source.read_rows(sheet_name)
+            # One extra row tells whether the cap cut the sheet short
+            rows = self.source.read_rows(sheet_name, max_rows + 1)
+            if len(rows) > max_rows:
+                logger.warning(f"Sheet '{sheet_name}' has more than {max_rows} rows; only the first {max_rows} are read")
+                del rows[max_rows:]
+            return rows
             
         except KeyError:
             raise ValueError(f"Sheet '{sheet_name}' not found in the workbook.")
@@ -597,12 +589,12 @@ class ExcelProcessor:
             logger.error(f"Failed to get data for sheet '{sheet_name}': {e}")
             return []
     
-    def get_all_sheets_data(self, max_rows: int = 1000) -> Dict[str, List[List[str]]]:
+    def get_all_sheets_data(self, max_rows: Optional[int] = None) -> Dict[str, List[List[str]]]:
         """
         Get data from all visible sheets
         
         Args:
-            max_rows: Maximum number of rows to extract per sheet
+            max_rows: Maximum number of rows to extract per sheet (None for all rows)
             
         Returns:
             Dictionary mapping sheet names to their data
@@ -626,13 +618,13 @@ class ExcelProcessor:
         Returns:
             Dictionary with file information
         """
-        if not self.workbook:
+        if not self.source:
             raise RuntimeError("No workbook loaded. Call load_file() first.")
         
         return {
             "file_path": str(self.file_path) if self.file_path else None,
             "file_format": self.file_format,
-            "total_sheets": len(self.workbook.sheetnames),
+            "total_sheets": len(self.source.sheetnames),
             "visible_sheets": self.get_visible_sheets(),
             "file_size_mb": self.file_path.stat().st_size / (1024 * 1024) if self.file_path else 0
         }
@@ -661,12 +653,13 @@ class ExcelProcessor:
     
     def _cleanup(self) -> None:
         """Clean up resources"""
-        if self.workbook:
+        if self.source:
             try:
-                self.workbook.close()
+                self.source.close()
             except Exception:
                 pass
             finally:
+                self.source = None
                 self.workbook = None
         
         self.file_path = None
@@ -713,7 +706,7 @@ def analyze_excel_file(filepath: Union[str, Path], sample_rows: int = 20) -> Dic
             "file_path": str(filepath),
             "file_format": processor.file_format,
             "visible_sheets": visible_sheets,
-            "total_sheets": len(processor.workbook.sheetnames) if processor.workbook else 0,
+            "total_sheets": len(processor.source.sheetnames) if processor.source else 0,
             "sheets_metadata": {
                 name: {
                     "row_count": meta.row_count,
@@ -5,18 +5,21 @@ Generates Excel files for manual categorization of unmatched descriptions
 
 import logging
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
+import numpy as np
 import openpyxl
 import pandas as pd
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.worksheet.datavalidation import DataValidation
+import xlsxwriter
+from openpyxl.styles import Font
 from openpyxl.utils import get_column_letter
 import shutil
 import tempfile
 
 from core.auto_categorizer import UnmatchedDescription
+from core.boq_schema import make_writable
 from core.category_dictionary import CategoryDictionary
+from utils.profiler import profile_span
 
 logger = logging.getLogger(__name__)
 
@@ -48,148 +51,111 @@ def generate_manual_categorization_excel(review_descriptions: List,
     filename = f"manual_categorization_{timestamp}.xlsx"
     filepath = output_dir / filename
     
-    # Create workbook
-    wb = openpyxl.Workbook()
-    
-    # Remove default sheet
-    default_sheet = wb.active
-    if default_sheet:
-        wb.remove(default_sheet)
-    
-    # Create main categorization sheet
-    ws_categorize = wb.create_sheet("Categorization", 0)
-    
-    # Create instructions sheet
-    ws_instructions = wb.create_sheet("Instructions", 1)
-    
-    # Set up the main categorization sheet
-    _setup_categorization_sheet(ws_categorize, review_descriptions, available_categories)
-    
-    # Set up the instructions sheet
-    _setup_instructions_sheet(ws_instructions, available_categories)
-    
-    # Save the workbook
-    wb.save(filepath)
+    # Stream the workbook: rows go to disk as they are written
+    workbook = xlsxwriter.Workbook(str(filepath), {
+        'constant_memory': True,
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+    })
+    try:
+        # Main categorization sheet first, instructions second
+        ws_categorize = workbook.add_worksheet("Categorization")
+        ws_instructions = workbook.add_worksheet("Instructions")
+        
+        # Set up the main categorization sheet
+        _setup_categorization_sheet(workbook, ws_categorize, review_descriptions, available_categories)
+        
+        # Set up the instructions sheet
+        _setup_instructions_sheet(workbook, ws_instructions, available_categories)
+    finally:
+        workbook.close()
     logger.info(f"Manual categorization Excel file created: {filepath}")
     # print(f"[DEBUG] Manual categorization Excel created at: {filepath}, exists: {filepath.exists()}")
     
     return filepath
 
 
-def _setup_categorization_sheet(worksheet, review_descriptions: List, 
+# Columns of the Categorization sheet, as written and as read back
+CATEGORIZATION_HEADERS = ["Description", "Source_Sheet", "Frequency", "Auto_Category", "Match_Type",
+                          "Confidence", "Category", "Notes", "Suggestions"]
+
+
+def _setup_categorization_sheet(workbook, worksheet, review_descriptions: List, 
                                available_categories: List[str]):
-    """Set up the main categorization worksheet"""
+    """Set up the main categorization worksheet (rows are streamed, so they are written in order)"""
     
     # If there are no descriptions to review, show a message and return early
     if not review_descriptions:
-        worksheet['A2'] = "No descriptions to categorize."
+        worksheet.write_string(1, 0, "No descriptions to categorize.")
         return
     
+    last_row = len(review_descriptions)  # zero-based index of the last data row
+    
     # Define styles
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_alignment = Alignment(horizontal="center", vertical="center")
+    header_format = workbook.add_format({
+        'bold': True, 'font_color': '#FFFFFF', 'bg_color': '#366092',
+        'align': 'center', 'valign': 'vcenter', 'border': 1
+    })
+    cell_format = workbook.add_format({'border': 1})
+    
+    # Set column widths
+    for col, width in enumerate([60, 20, 12, 25, 15, 12, 25, 30, 50]):
+        worksheet.set_column(col, col, width)
     
-    border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
+    # Freeze the header row
+    worksheet.freeze_panes(1, 0)
+    
+    # Set up data validation for Category column (column G), one range for all rows
+    worksheet.data_validation(1, 6, last_row, 6, {
+        'validate': 'list',
+        'source': get_manual_categorization_categories(),
+        'ignore_blank': True,
+        'error_title': 'Invalid Category',
+        'error_message': 'Please select a category from the dropdown list.',
+        'input_title': 'Category Selection',
+        'input_message': 'Select a category from the dropdown list.',
+    })
+    
+    # Add conditional formatting for frequency and confidence (red for low confidence, green for high)
+    worksheet.conditional_format(1, 2, last_row, 2, {
+        'type': '2_color_scale', 'min_color': '#FFFFFF', 'max_color': '#FF6B6B'
+    })
+    worksheet.conditional_format(1, 5, last_row, 5, {
+        'type': '2_color_scale', 'min_color': '#FF6B6B', 'max_color': '#4CAF50'
+    })
     
     # Set up headers - include auto-category and match type for ManualReviewDescription objects
-    headers = ["Description", "Source_Sheet", "Frequency", "Auto_Category", "Match_Type", "Confidence", "Category", "Notes"]
-    for col, header in enumerate(headers, 1):
-        cell = worksheet.cell(row=1, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-        cell.border = border
+    worksheet.write_row(0, 0, CATEGORIZATION_HEADERS, header_format)
     
     # Add data
-    for row, desc in enumerate(review_descriptions, 2):
-        worksheet.cell(row=row, column=1, value=desc.description)
-        worksheet.cell(row=row, column=2, value=desc.source_sheet_name)
-        worksheet.cell(row=row, column=3, value=desc.frequency)
-        
+    for row, desc in enumerate(review_descriptions, 1):
         # Handle both UnmatchedDescription and ManualReviewDescription objects
         if hasattr(desc, 'auto_category'):
-            # ManualReviewDescription object
-            worksheet.cell(row=row, column=4, value=desc.auto_category or "")
-            worksheet.cell(row=row, column=5, value=desc.match_type)
-            worksheet.cell(row=row, column=6, value=f"{desc.confidence:.2f}" if desc.confidence > 0 else "")
-            worksheet.cell(row=row, column=7, value=desc.auto_category or "")  # Pre-fill with auto-category
-            worksheet.cell(row=row, column=8, value="")  # Notes (to be filled manually)
+            # ManualReviewDescription object: Category is pre-filled with the auto-category,
+            # or with the top suggestion when it was confident enough
+            auto_category = desc.auto_category or ""
+            suggestions = getattr(desc, 'suggestions', [])
+            prefill = suggestions[0][0] if desc.match_type == 'suggested' and suggestions else auto_category
+            review_values = [auto_category, desc.match_type,
+                             f"{desc.confidence:.2f}" if desc.confidence > 0 else "", prefill, "",
+                             "; ".join(f"{category} ({probability:.0%})" for category, probability in suggestions)]
         else:
             # UnmatchedDescription object (backward compatibility)
-            worksheet.cell(row=row, column=4, value="")  # Auto_Category
-            worksheet.cell(row=row, column=5, value="none")  # Match_Type
-            worksheet.cell(row=row, column=6, value="")  # Confidence
-            worksheet.cell(row=row, column=7, value="")  # Category (to be filled manually)
-            worksheet.cell(row=row, column=8, value="")  # Notes (to be filled manually)
-        
-        # Apply borders to all cells
-        for col in range(1, 9):
-            worksheet.cell(row=row, column=col).border = border
-    
-    # Set up data validation for Category column
-    category_validation = DataValidation(
-        type="list",
-        formula1=f'"{",".join(get_manual_categorization_categories())}"',
-        allow_blank=True,
-        showErrorMessage=True,
-        errorTitle="Invalid Category",
-        error="Please select a category from the dropdown list.",
-        showInputMessage=True,
-        promptTitle="Category Selection",
-        prompt="Select a category from the dropdown list."
-    )
-    worksheet.add_data_validation(category_validation)
-    
-    # Apply validation to Category column (column G)
-    category_validation.add(f'G2:G{len(review_descriptions) + 1}')
-    
-    # Set column widths
-    worksheet.column_dimensions['A'].width = 60  # Description
-    worksheet.column_dimensions['B'].width = 20  # Source_Sheet
-    worksheet.column_dimensions['C'].width = 12  # Frequency
-    worksheet.column_dimensions['D'].width = 25  # Auto_Category
-    worksheet.column_dimensions['E'].width = 15  # Match_Type
-    worksheet.column_dimensions['F'].width = 12  # Confidence
-    worksheet.column_dimensions['G'].width = 25  # Category
-    worksheet.column_dimensions['H'].width = 30  # Notes
-    
-    # Add conditional formatting for frequency
-    from openpyxl.formatting.rule import ColorScaleRule
-    frequency_rule = ColorScaleRule(
-        start_type='min',
-        start_color='FFFFFF',
-        end_type='max',
-        end_color='FF6B6B'
-    )
-    worksheet.conditional_formatting.add(f'C2:C{len(review_descriptions) + 1}', frequency_rule)
-    
-    # Add conditional formatting for confidence
-    confidence_rule = ColorScaleRule(
-        start_type='min',
-        start_color='FF6B6B',  # Red for low confidence
-        end_type='max',
-        end_color='4CAF50'     # Green for high confidence
-    )
-    worksheet.conditional_formatting.add(f'F2:F{len(review_descriptions) + 1}', confidence_rule)
-    
-    # Freeze the header row
-    worksheet.freeze_panes = "A2"
+            review_values = ["", "none", "", "", "", ""]
+        values = [desc.description, desc.source_sheet_name, desc.frequency] + review_values
+        worksheet.write_row(row, 0, values, cell_format)
 
 
-def _setup_instructions_sheet(worksheet, available_categories: List[str]):
+def _setup_instructions_sheet(workbook, worksheet, available_categories: List[str]):
     """Set up the instructions worksheet"""
     
+    # Set column widths
+    worksheet.set_column(0, 0, 20)
+    worksheet.set_column(1, 1, 80)
+    
     # Title
-    title_cell = worksheet['A1']
-    title_cell.value = "Manual Categorization Instructions"
-    title_cell.font = Font(size=16, bold=True)
-    title_cell.alignment = Alignment(horizontal="center")
+    worksheet.write_string(0, 0, "Manual Categorization Instructions",
+                           workbook.add_format({'bold': True, 'font_size': 16, 'align': 'center'}))
     
     # Instructions
     instructions = [
@@ -203,6 +169,7 @@ def _setup_instructions_sheet(worksheet, available_categories: List[str]):
         ("Available Categories", f"The following categories are available: {', '.join(get_manual_categorization_categories())}"),
         ("", ""),
         ("Tips", "- Descriptions are sorted by frequency (most frequent first)"),
+        ("", "- The 'Suggestions' column ranks likely categories learned from the dictionary; confident ones are pre-filled"),
         ("", "- Use the 'Notes' column to record any special considerations"),
         ("", "- If a description doesn't fit any category, leave it blank"),
         ("", "- You can add new categories by editing the dropdown list"),
@@ -212,16 +179,33 @@ def _setup_instructions_sheet(worksheet, available_categories: List[str]):
     ]
     
     # Add instructions to worksheet
-    for row, (title, content) in enumerate(instructions, 3):
+    title_format = workbook.add_format({'bold': True})
+    for row, (title, content) in enumerate(instructions, 2):
         if title:
-            cell = worksheet.cell(row=row, column=1, value=title)
-            cell.font = Font(bold=True)
+            worksheet.write_string(row, 0, title, title_format)
         if content:
-            worksheet.cell(row=row, column=2, value=content)
-    
-    # Set column widths
-    worksheet.column_dimensions['A'].width = 20
-    worksheet.column_dimensions['B'].width = 80
+            worksheet.write_string(row, 1, content)
+
+
+def _read_categorization_sheet(filepath: Path) -> Tuple[List[str], List[tuple]]:
+    """
+    Read the Categorization sheet in one streaming pass
+
+    Args:
+        filepath: Path to the manual categorization workbook
+
+    Returns:
+        Tuple (header names, data rows as value tuples); fully empty rows are skipped
+    """
+    wb = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        rows = wb["Categorization"].iter_rows(values_only=True)
+        header = next(rows, ())
+        headers = [str(value).strip() if value is not None else "" for value in header]
+        data = [row for row in rows if any(value is not None and value != "" for value in row)]
+    finally:
+        wb.close()
+    return headers, data
 
 
 def load_manual_categorization_results(filepath: Path) -> List[dict]:
@@ -240,18 +224,20 @@ def load_manual_categorization_results(filepath: Path) -> List[dict]:
         raise FileNotFoundError(f"Manual categorization file not found: {filepath}")
     
     try:
-        wb = openpyxl.load_workbook(filepath, data_only=True)
-        ws = wb["Categorization"]
+        headers, rows = _read_categorization_sheet(filepath)
+        
+        # Columns are located by header; files without the generated headers use the old layout
+        def column(name: str, fallback: int) -> int:
+            return headers.index(name) if name in headers else fallback
+        positions = [column("Description", 0), column("Source_Sheet", 1), column("Frequency", 2),
+                     column("Category", 3), column("Notes", 4)]
         
         results = []
         
-        # Read data starting from row 2 (skip header)
-        for row in range(2, ws.max_row + 1):
-            description = ws.cell(row=row, column=1).value
-            source_sheet = ws.cell(row=row, column=2).value
-            frequency = ws.cell(row=row, column=3).value
-            category = ws.cell(row=row, column=4).value
-            notes = ws.cell(row=row, column=5).value
+        for values in rows:
+            description, source_sheet, frequency, category, notes = (
+                values[idx] if idx < len(values) else None for idx in positions
+            )
             
             if description and category:  # Only include rows with both description and category
                 # Safely convert frequency to int
@@ -306,6 +292,7 @@ def apply_manual_categorizations(dataframe, manual_results: List[dict],
         manual_mapping[description] = category
     
     # Apply manual categorizations
+    make_writable(df, category_column, manual_mapping.values())
     updated_count = 0
     for index, row in df.iterrows():
         description = str(row[description_column]).strip().lower()
@@ -381,8 +368,12 @@ def process_manual_categorizations(excel_filepath: Path,
         raise FileNotFoundError(f"Manual categorization file not found: {excel_filepath}")
     
     try:
-        # Read the Excel file using pandas
-        df: pd.DataFrame = pd.read_excel(excel_filepath, sheet_name="Categorization")
+        # Read the Excel file in one streaming pass; missing cells become NaN as with read_excel
+        headers, rows = _read_categorization_sheet(excel_filepath)
+        width = len(headers)
+        df = pd.DataFrame([tuple(row[:width]) + (None,) * (width - len(row)) for row in rows],
+                          columns=headers, dtype=object)
+        df = df.where(df.notna(), np.nan)
         # print(f"[DEBUG] Loaded manual categorization file columns: {list(df.columns)}")
         # print(f"[DEBUG] First few rows:\n{df.head()}")
         logger.info(f"Successfully loaded Excel file with {len(df)} rows")
@@ -416,7 +407,7 @@ def process_manual_categorizations(excel_filepath: Path,
     df[description_column] = df[description_column].astype(str).str.strip()
     
     # Clean category column and filter for rows with categories
-    df[category_column] = df[category_column].astype(str).str.strip()
+    df[category_column] = df[category_column].fillna('').astype(str).str.strip()
     df = df[df[category_column] != '']
     df = df[df[category_column] != 'nan']
     
@@ -426,12 +417,12 @@ def process_manual_categorizations(excel_filepath: Path,
     
     # Clean source sheet column
     if source_sheet_column in df.columns:
-        df[source_sheet_column] = df[source_sheet_column].astype(str).str.strip()
+        df[source_sheet_column] = df[source_sheet_column].fillna('Unknown').astype(str).str.strip()
         df[source_sheet_column] = df[source_sheet_column].replace('nan', 'Unknown')
     
     # Clean notes column
     if notes_column in df.columns:
-        df[notes_column] = df[notes_column].astype(str).str.strip()
+        df[notes_column] = df[notes_column].fillna('').astype(str).str.strip()
         df[notes_column] = df[notes_column].replace('nan', '')
     
     # Create mapping dictionary
@@ -553,8 +544,9 @@ def validate_excel_file_structure(filepath: Path) -> Dict[str, Any]:
             expected_headers = ["Description", "Source_Sheet", "Frequency", "Auto_Category", "Match_Type", "Confidence", "Category", "Notes"]
             actual_headers = []
             
-            for col in range(1, 9):  # First 8 columns
-                cell_value = ws.cell(row=1, column=col).value
+            rows = ws.iter_rows(values_only=True)
+            header = tuple(next(rows, ()))
+            for cell_value in (header + (None,) * 8)[:8]:  # First 8 columns
                 actual_headers.append(str(cell_value) if cell_value else "")
             
             missing_headers = [h for h in expected_headers if h not in actual_headers]
@@ -565,17 +557,15 @@ def validate_excel_file_structure(filepath: Path) -> Dict[str, Any]:
                 validation_result['sheet_info']['headers'] = actual_headers
             
             # Check data rows
-            data_row_count = 0
-            for row in range(2, ws.max_row + 1):
-                description = ws.cell(row=row, column=1).value
-                if description and str(description).strip():
-                    data_row_count += 1
+            data_row_count = sum(1 for row in rows if row and row[0] and str(row[0]).strip())
             
             validation_result['sheet_info']['data_rows'] = data_row_count
             
             if data_row_count == 0:
                 validation_result['warnings'].append("No data rows found in Categorization sheet")
         
+        wb.close()
+        
         # File information
         validation_result['file_info'] = {
             'file_size': filepath.stat().st_size,
@@ -683,68 +673,48 @@ def apply_manual_categories(dataframe: pd.DataFrame,
     # Create a copy to avoid modifying the original
     df = dataframe.copy()
     
-    # Initialize tracking variables
-    initial_unmatched_count = 0
-    updated_count = 0
-    exact_matches = 0
-    case_insensitive_matches = 0
-    remaining_unmatched = []
-    
     # Count initial unmatched rows
-    unmatched_mask = df[category_column].isna() | (df[category_column] == '') | (df[category_column].isnull())
+    unmatched_mask = df[category_column].isna() | (df[category_column] == '')
     initial_unmatched_count = unmatched_mask.sum()
     
     logger.info(f"Initial unmatched rows: {initial_unmatched_count}")
     
-    # Process each row
-    for index, row in df.iterrows():
-        description = str(row[description_column]).strip()
-        
-        # Skip empty descriptions
-        if not description or description.lower() in ['nan', 'none', '']:
-            continue
-        
-        # Check if this row is currently unmatched
-        current_category = str(row[category_column]).strip()
-        if current_category and current_category.lower() not in ['nan', 'none', '']:
-            continue  # Already categorized
-        
-        # Try to find a match in manual categorizations
-        matched_category = None
-        
-        if case_sensitive:
-            # Case-sensitive matching
-            if description in manual_categorizations:
-                matched_category = manual_categorizations[description]
-                exact_matches += 1
-                logger.debug(f"Exact case-sensitive match: '{description}' → '{matched_category}'")
-        else:
-            # Case-insensitive matching
-            description_lower = description.lower()
-            
-            # First try exact case-insensitive match
-            if description_lower in manual_categorizations:
-                matched_category = manual_categorizations[description_lower]
-                exact_matches += 1
-                logger.debug(f"Exact case-insensitive match: '{description}' → '{matched_category}'")
-            else:
-                # Try to find a match by comparing normalized descriptions
-                for manual_desc, category in manual_categorizations.items():
-                    if description_lower == manual_desc.lower():
-                        matched_category = category
-                        case_insensitive_matches += 1
-                        logger.debug(f"Case-insensitive match: '{description}' → '{matched_category}' (manual: '{manual_desc}')")
-                        break
-        
-        # Apply the category if found
-        if matched_category:
-            df.at[index, category_column] = matched_category
-            updated_count += 1
-            logger.debug(f"Updated row {index}: '{description[:50]}...' → '{matched_category}'")
-        else:
-            # Track remaining unmatched descriptions
-            if description not in remaining_unmatched:
-                remaining_unmatched.append(description)
+    # Rows with a description and no category yet
+    descriptions = df[description_column].astype(str).str.strip()
+    categories = df[category_column].astype(str).str.strip()
+    candidates = (descriptions.notna() & ~descriptions.str.lower().isin(['nan', 'none', ''])
+                  & (categories.isna() | categories.str.lower().isin(['nan', 'none', ''])))
+    keys = descriptions[candidates]
+    
+    if case_sensitive:
+        exact_hits = keys.isin(manual_categorizations.keys())
+        matched = keys.map(manual_categorizations)
+        fallback_hits = pd.Series(False, index=keys.index)
+    else:
+        keys = keys.str.lower()
+        # Lowercase key -> category: an exact key wins, otherwise the first manual
+        # description with the same lowercase form
+        normalized = {desc: category for desc, category in manual_categorizations.items() if desc == desc.lower()}
+        for manual_desc, category in manual_categorizations.items():
+            normalized.setdefault(manual_desc.lower(), category)
+        exact_hits = keys.isin(manual_categorizations.keys())
+        fallback_hits = ~exact_hits & keys.isin(normalized.keys())
+        matched = keys.map(normalized)
+    
+    exact_matches = int(exact_hits.sum())
+    case_insensitive_matches = int(fallback_hits.sum())
+    applied = (exact_hits | fallback_hits) & matched.notna() & (matched.astype(str) != '')
+    
+    # Apply the categories with one positional write
+    if applied.any():
+        make_writable(df, category_column, matched[applied])
+        row_mask = candidates.to_numpy().copy()
+        row_mask[row_mask] = applied.to_numpy()
+        df.loc[row_mask, category_column] = matched[applied].to_numpy()
+    updated_count = int(applied.sum())
+    
+    # Track remaining unmatched descriptions
+    remaining_unmatched = descriptions[candidates][(~applied).to_numpy()].drop_duplicates().tolist()
     
     # Calculate final statistics
     final_unmatched_mask = df[category_column].isna() | (df[category_column] == '') | (df[category_column].isnull())
@@ -1102,7 +1072,8 @@ def execute_row_categorization(
         
         update_progress(5, "Auto-categorizing rows...")
         from core.auto_categorizer import auto_categorize_dataset, collect_unmatched_descriptions
-        auto_result = auto_categorize_dataset(mapped_df, category_dict)
+        with profile_span('categorization', rows=len(mapped_df)):
+            auto_result = auto_categorize_dataset(mapped_df, category_dict)
         # print(f"[DEBUG] auto_categorize_dataset: total_rows={auto_result.total_rows}, matched_rows={auto_result.matched_rows}, unmatched_rows={auto_result.unmatched_rows}")
         auto_df = auto_result.dataframe
         all_stats['auto_stats'] = auto_result.match_statistics
@@ -5,8 +5,9 @@ Unified mapping structure generation with comprehensive confidence scoring
 
 import logging
 import json
-from typing import Dict, List, Tuple, Optional, Any, Set
-from dataclasses import dataclass, asdict
+from collections.abc import Sequence
+from typing import Callable, Dict, Iterator, List, Tuple, Optional, Any, Set
+from dataclasses import dataclass, asdict, field, fields, is_dataclass
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
@@ -15,6 +16,23 @@ from utils.config import get_config, ColumnType
 
 logger = logging.getLogger(__name__)
 
+# Per-file caches declared on FileMapping, created on first use by file_mapping_cache()
+CACHE_FIELDS = ('description_table', 'summary_cache', 'row_facts', 'recompute_cache')
+
+# Fields left out of JSON exports: the ColumnMapper reference is UI state, the caches are derived
+_JSON_EXCLUDED_FIELDS = {'column_mapper', *CACHE_FIELDS}
+
+
+def _json_key(key: Any) -> str:
+    """Object key as json.dumps writes it"""
+    if isinstance(key, str):
+        return key
+    if isinstance(key, Enum):
+        return _json_key(key.value)
+    if key is None or isinstance(key, (bool, int, float)):
+        return json.dumps(key)
+    return str(key)
+
 
 class ProcessingStatus(Enum):
     """Processing status enumeration"""
@@ -137,9 +155,14 @@ class ProcessingSummary:
     recommendations: List[str]
 
 
-@dataclass
+@dataclass(eq=False)
 class FileMapping:
-    """Complete file mapping structure"""
+    """
+    Complete file mapping structure
+
+    Compared by identity: the UI looks files up by their mapping, and a
+    field-by-field comparison would reload every spilled mapping it passes.
+    """
     metadata: FileMetadata
     sheets: List[SheetMapping]
     global_confidence: float
@@ -148,6 +171,42 @@ class FileMapping:
     export_ready: bool
     column_mapper: Optional[Any] = None  # Reference to ColumnMapper for UI learning
 
+    # Per-file caches (see file_mapping_cache); spilled and reloaded with the mapping
+    description_table: Optional[Any] = field(default=None, compare=False, repr=False)  # DescriptionTable
+    summary_cache: Optional[Any] = field(default=None, compare=False, repr=False)  # SummaryCache
+    row_facts: Optional[Any] = field(default=None, compare=False, repr=False)  # RowFactsCache
+    recompute_cache: Optional[Any] = field(default=None, compare=False, repr=False)  # SheetRecomputeCache
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for missing attributes: state evicted by the session store is reloaded on first use
+        spilled = self.__dict__.get('_spilled')
+        if spilled is not None and not name.startswith('__'):
+            spilled.reload()
+            if name in self.__dict__:
+                return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+
+def file_mapping_cache(file_mapping: FileMapping, name: str, factory: Callable[[], Any]) -> Any:
+    """
+    A per-file cache kept on the file mapping, created on first use
+
+    Args:
+        file_mapping: FileMapping owning the cache
+        name: One of CACHE_FIELDS
+        factory: Creates the cache when the mapping has none yet
+
+    Returns:
+        The cache
+    """
+    if name not in CACHE_FIELDS:
+        raise ValueError(f"Unknown file mapping cache '{name}', expected one of {CACHE_FIELDS}")
+    cache = getattr(file_mapping, name, None)
+    if cache is None:
+        cache = factory()
+        setattr(file_mapping, name, cache)
+    return cache
+
 
 class MappingGenerator:
     """
@@ -408,33 +467,96 @@ class MappingGenerator:
         """
         Export mapping structure to JSON format
         
+        With an output path the JSON is streamed to the file (see write_mapping_json)
+        and not built in memory.
+        
         Args:
             mapping: FileMapping structure to export
             output_path: Optional path to save the JSON file
             
         Returns:
-            JSON string representation
+            JSON string representation, or the written path when output_path is given
         """
         try:
-            # Convert to dictionary with proper serialization
-            mapping_dict = self._serialize_mapping(mapping)
-            
-            # Convert to JSON
-            json_string = json.dumps(mapping_dict, indent=2, default=str)
-            
-            # Save to file if path provided
             if output_path:
-                output_path = Path(output_path)
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                output_path.write_text(json_string, encoding='utf-8')
-                logger.info(f"Mapping exported to: {output_path}")
-            
-            return json_string
+                return str(self.write_mapping_json(mapping, output_path))
+            return ''.join(self.iter_mapping_json(mapping))
             
         except Exception as e:
             logger.error(f"Error exporting mapping to JSON: {e}")
             raise
     
+    def write_mapping_json(self, mapping: FileMapping, output_path: Path) -> Path:
+        """
+        Stream a mapping to a JSON file without building it in memory first
+        
+        Args:
+            mapping: FileMapping structure to export
+            output_path: Path of the JSON file
+            
+        Returns:
+            The written path
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.writelines(self.iter_mapping_json(mapping))
+        logger.info(f"Mapping exported to: {output_path}")
+        return output_path
+    
+    def iter_mapping_json(self, mapping: FileMapping, indent: int = 2) -> Iterator[str]:
+        """
+        Yield the JSON text of a mapping piece by piece
+        
+        The dataclasses are walked in place, so row data and sheet grids are
+        never copied. The output matches json.dumps(..., indent=indent) of the
+        mapping as a dictionary, with enums as their values and datetimes as
+        ISO strings; the ColumnMapper reference is UI state and is left out.
+        
+        Args:
+            mapping: FileMapping structure to serialize
+            indent: Spaces per nesting level
+            
+        Returns:
+            Iterator of JSON text fragments
+        """
+        return self._iter_json(mapping, 0, ' ' * indent)
+    
+    def _iter_json(self, value: Any, level: int, indent: str) -> Iterator[str]:
+        """Yield JSON fragments for one value at the given nesting level"""
+        if is_dataclass(value) and not isinstance(value, type):
+            items = ((f.name, getattr(value, f.name)) for f in fields(value) if f.name not in _JSON_EXCLUDED_FIELDS)
+            yield from self._iter_json_object(items, level, indent)
+        elif isinstance(value, dict):
+            yield from self._iter_json_object(value.items(), level, indent)
+        elif isinstance(value, (list, tuple)) or (isinstance(value, Sequence) and not isinstance(value, (str, bytes))):
+            if not value:
+                yield '[]'
+                return
+            inner = '\n' + indent * (level + 1)
+            yield '['
+            for index, item in enumerate(value):
+                yield (',' + inner) if index else inner
+                yield from self._iter_json(item, level + 1, indent)
+            yield '\n' + indent * level + ']'
+        elif isinstance(value, Enum):
+            yield from self._iter_json(value.value, level, indent)
+        elif isinstance(value, datetime):
+            yield json.dumps(value.isoformat())
+        else:
+            yield json.dumps(value, default=str)
+    
+    def _iter_json_object(self, items, level: int, indent: str) -> Iterator[str]:
+        """Yield a JSON object from (key, value) pairs"""
+        inner = '\n' + indent * (level + 1)
+        empty = True
+        for key, item in items:
+            yield ('{' + inner) if empty else (',' + inner)
+            empty = False
+            yield json.dumps(_json_key(key)) + ': '
+            yield from self._iter_json(item, level + 1, indent)
+        yield '{}' if empty else '\n' + indent * level + '}'
+    
     def _create_file_metadata(self, file_info: Dict[str, Any]) -> FileMetadata:
         """Create file metadata from file info"""
         return FileMetadata(
@@ -816,29 +938,6 @@ class MappingGenerator:
             recommendations.append(f"Review ambiguous column mappings in {len(ambiguous_sheets)} sheets")
         
         return recommendations
-    
-    def _serialize_mapping(self, mapping: FileMapping) -> Dict[str, Any]:
-        """Serialize mapping structure for JSON export"""
-        mapping_dict = asdict(mapping)
-        
-        # Convert enums to strings
-        mapping_dict['processing_summary'] = asdict(mapping.processing_summary)
-        mapping_dict['metadata'] = asdict(mapping.metadata)
-        
-        for sheet in mapping_dict['sheets']:
-            sheet['processing_status'] = sheet['processing_status'].value
-            sheet['review_flags'] = [flag.value for flag in sheet['review_flags']]
-            sheet['validation_summary'] = asdict(sheet['validation_summary'])
-            
-            for col_mapping in sheet['column_mappings']:
-                col_mapping = asdict(col_mapping)
-            
-            for row_class in sheet['row_classifications']:
-                row_class = asdict(row_class)
-        
-        mapping_dict['review_flags'] = [flag.value for flag in mapping.review_flags]
-        
-        return mapping_dict
 
 
 # Convenience function for quick mapping generation
@@ -206,6 +206,16 @@ class RowClassification:
     row_data: Optional[List[str]] = None
 
 
+@dataclass(frozen=True)
+class RowPatterns:
+    """Mapping-independent text patterns of a row"""
+    is_subtotal: bool
+    is_header: bool
+    is_notes: bool
+    hierarchical_level: Optional[int]
+    section_title: Optional[str]
+
+
 @dataclass
 class ClassificationResult:
     """Result of row classification process"""
@@ -306,7 +316,8 @@ class RowClassifier:
     
     def classify_rows(self, sheet_data: List[List[str]], 
                      column_mapping: Dict[int, ColumnType],
-                     sheet_name: str = "Sheet1") -> ClassificationResult:
+                     sheet_name: str = "Sheet1", row_offset: int = 0,
+                     row_patterns: Optional[List[RowPatterns]] = None) -> ClassificationResult:
         """
         Classify all rows in a sheet
         
@@ -314,6 +325,8 @@ class RowClassifier:
             sheet_data: Sheet data as list of rows
             column_mapping: Dictionary mapping column index to ColumnType
             sheet_name: Name of the sheet (for position generation)
+            row_offset: Sheet row index of sheet_data[0], when classifying a chunk of a sheet
+            row_patterns: Previously computed detect_row_patterns() results, one per row
             
         Returns:
             ClassificationResult with all row classifications
@@ -322,9 +335,11 @@ class RowClassifier:
         
         classifications = []
         
-        for row_index, row_data in enumerate(sheet_data):
+        for position_in_data, row_data in enumerate(sheet_data):
+            row_index = position_in_data + row_offset
             try:
-                classification = self._classify_single_row(row_index, row_data, column_mapping, sheet_name)
+                patterns = row_patterns[position_in_data] if row_patterns is not None else None
+                classification = self._classify_single_row(row_index, row_data, column_mapping, sheet_name, patterns)
                 classifications.append(classification)
             except Exception as e:
                 logger.warning(f"Error classifying row {row_index}: {e}")
@@ -361,18 +376,39 @@ class RowClassifier:
         logger.info(f"Classification completed: {summary}")
         return result
     
+    def detect_row_patterns(self, row_data: List[str]) -> RowPatterns:
+        """
+        Text patterns of a row, which do not depend on the column mapping
+        
+        Args:
+            row_data: Row data as list of cell values
+            
+        Returns:
+            RowPatterns for the row; can be passed back to classify_rows after a mapping change
+        """
+        return RowPatterns(
+            is_subtotal=self.detect_subtotal_patterns(row_data),
+            is_header=self._detect_header_patterns(row_data),
+            is_notes=self._detect_notes_patterns(row_data),
+            hierarchical_level=self._detect_hierarchical_level(row_data),
+            section_title=self._extract_section_title(row_data)
+        )
+    
     def _classify_single_row(self, row_index: int, row_data: List[str], 
-                           column_mapping: Dict[int, ColumnType], sheet_name: str) -> RowClassification:
+                           column_mapping: Dict[int, ColumnType], sheet_name: str,
+                           patterns: Optional[RowPatterns] = None) -> RowClassification:
         """Classify a single row using simple validation rules"""
         # Calculate completeness score
         completeness_score = self.calculate_completeness_score(row_data, column_mapping)
         
         # Detect patterns
-        is_subtotal = self.detect_subtotal_patterns(row_data)
-        is_header = self._detect_header_patterns(row_data)
-        is_notes = self._detect_notes_patterns(row_data)
-        hierarchical_level = self._detect_hierarchical_level(row_data)
-        section_title = self._extract_section_title(row_data)
+        if patterns is None:
+            patterns = self.detect_row_patterns(row_data)
+        is_subtotal = patterns.is_subtotal
+        is_header = patterns.is_header
+        is_notes = patterns.is_notes
+        hierarchical_level = patterns.hierarchical_level
+        section_title = patterns.section_title
         
         # Determine row type using simple validation rule
         row_type, confidence, reasoning = self._determine_row_type(
@@ -0,0 +1,146 @@
+"""
+Row Facts for BOQ Tools
+Per-dataset memo of row validity, shared by the review and comparison stages
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.mapping_generator import file_mapping_cache
+from core.row_classifier import RowClassifier
+from utils.config import ColumnType
+
+logger = logging.getLogger(__name__)
+
+# Column types ROW_VALIDITY reads
+FACT_COLUMN_TYPES = {ColumnType.DESCRIPTION, ColumnType.QUANTITY, ColumnType.UNIT_PRICE, ColumnType.TOTAL_PRICE}
+
+# Characters dropped before parsing numbers, as in RowClassifier and ComparisonEngine
+_NUMERIC_NOISE = re.compile(r'[\$€£¥₹,\s\u00A0]')
+
+
+def dependency_key(column_mapping: Dict[int, ColumnType], column_types: Iterable[ColumnType]) -> Tuple:
+    """
+    The part of a column mapping a computation depends on
+
+    Remapping a column between types outside column_types (e.g. scope -> ignore)
+    leaves the key unchanged. Column order is kept because the classifier uses
+    the first column of each type; emptiness is kept because an empty mapping
+    short-circuits every check.
+
+    Args:
+        column_mapping: Column index -> ColumnType
+        column_types: Types the computation reads
+
+    Returns:
+        Hashable key
+    """
+    relevant = set(column_types)
+    return (bool(column_mapping),
+            tuple((idx, col_type) for idx, col_type in column_mapping.items() if col_type in relevant))
+
+
+def parse_numeric(value: Any) -> Optional[float]:
+    """
+    Parse a cell the way the comparison merge does (ComparisonEngine._convert_to_numeric)
+
+    Returns:
+        The number, or None for empty and non-numeric cells
+    """
+    if value is None or str(value).strip() == "":
+        return None
+    clean_value = _NUMERIC_NOISE.sub('', str(value).strip())
+    # Multiple dots are thousands separators: keep only the last one as decimal
+    if clean_value.count('.') > 1:
+        parts = clean_value.split('.')
+        clean_value = ''.join(parts[:-1]) + '.' + parts[-1]
+    try:
+        return round(float(clean_value), 6)
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class RowFacts:
+    """Mapping-dependent facts about one row"""
+    is_valid: bool  # RowClassifier.ROW_VALIDITY
+
+
+class RowFactsCache:
+    """
+    Row facts keyed by (sheet, row index, mapping version)
+
+    The mapping version is derived from the columns mapped to FACT_COLUMN_TYPES,
+    so any mapping change that could alter a fact drops that sheet's facts
+    automatically; the row's cells in those columns are checked too, so a row
+    whose data changed is recomputed. Use one cache per dataset (a file
+    mapping, or one comparison DataFrame).
+
+    Usage:
+        facts = RowFactsCache()
+        if facts.get('BOQ', 12, row_data, column_mapping).is_valid: ...
+    """
+
+    def __init__(self, row_classifier: Optional[RowClassifier] = None):
+        """
+        Initialize the cache
+
+        Args:
+            row_classifier: RowClassifier whose validity rule is applied (default: a new one)
+        """
+        self.row_classifier = row_classifier or RowClassifier()
+        self._sheets: Dict[str, Tuple[Tuple, Dict[int, Tuple[Optional[Tuple], RowFacts]]]] = {}
+        self.computed = 0
+
+    def invalidate(self, sheet_name: Optional[str] = None) -> None:
+        """Drop the facts of one sheet, or of every sheet"""
+        if sheet_name is None:
+            self._sheets.clear()
+        else:
+            self._sheets.pop(sheet_name, None)
+
+    def get(self, sheet_name: str, row_index: Any, row_data: List[str],
+            column_mapping: Dict[int, ColumnType]) -> RowFacts:
+        """
+        Facts of one row, computed on first request
+
+        Args:
+            sheet_name: Sheet (or dataset) name
+            row_index: Row index or label, unique within the sheet
+            row_data: Row cells
+            column_mapping: Column index -> ColumnType
+
+        Returns:
+            RowFacts for the row
+        """
+        version = dependency_key(column_mapping, FACT_COLUMN_TYPES)
+        entry = self._sheets.get(sheet_name)
+        if entry is None or entry[0] != version:
+            entry = (version, {})
+            self._sheets[sheet_name] = entry
+        rows = entry[1]
+
+        cells = tuple(row_data[idx] if idx < len(row_data) else None for idx, _ in version[1]) if row_data else None
+        cached = rows.get(row_index)
+        if cached is not None and cached[0] == cells:
+            return cached[1]
+
+        facts = self._compute(row_data, column_mapping)
+        rows[row_index] = (cells, facts)
+        self.computed += 1
+        return facts
+
+    def is_valid(self, sheet_name: str, row_index: Any, row_data: List[str],
+                 column_mapping: Dict[int, ColumnType]) -> bool:
+        """Master row validity of one row"""
+        return self.get(sheet_name, row_index, row_data, column_mapping).is_valid
+
+    def _compute(self, row_data: List[str], column_mapping: Dict[int, ColumnType]) -> RowFacts:
+        return RowFacts(is_valid=self.row_classifier.ROW_VALIDITY(row_data or [], column_mapping))
+
+
+def get_row_facts(file_mapping) -> RowFactsCache:
+    """The RowFactsCache of a file mapping, created on first use and kept on the mapping"""
+    return file_mapping_cache(file_mapping, 'row_facts', RowFactsCache)
@@ -0,0 +1,436 @@
+"""
+Session Store for BOQ Tools
+Processed-file registry with a memory budget: inactive files are spilled to disk and reloaded on access
+"""
+
+import logging
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Union
+
+logger = logging.getLogger(__name__)
+
+# Default budget for resident processed files, in MB (0 disables eviction)
+DEFAULT_BUDGET_MB = 1024
+
+# Entry keys that always stay in memory: the UI scans them to find a tab's file
+RESIDENT_ENTRY_KEYS = {'file_mapping', 'processing_time'}
+
+# FileMapping attributes that stay in memory: small metadata and live UI/learning objects
+RESIDENT_MAPPING_ATTRIBUTES = {'metadata', 'global_confidence', 'processing_summary', 'review_flags',
+                               'export_ready', 'column_mapper', 'tab', '_spilled'}
+
+# Items inspected per container when estimating sizes
+_SIZE_SAMPLE = 64
+
+
+def estimate_size(obj: Any, _seen: Optional[Set[int]] = None) -> int:
+    """
+    Approximate memory held by an object graph, in bytes
+
+    DataFrames and arrays report their own usage; large containers are
+    extrapolated from a sample of their items, so this stays cheap for
+    sheets with hundreds of thousands of rows.
+    """
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    module = type(obj).__module__
+    if module.startswith('pandas') and hasattr(obj, 'memory_usage'):  # DataFrame, Series
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, 'sum') else usage)
+    if module.startswith('numpy') and hasattr(obj, 'nbytes'):
+        return int(obj.nbytes)
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + _estimate_items(list(obj.items()), seen)
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + _estimate_items(list(obj), seen)
+    if is_dataclass(obj) and not isinstance(obj, type):
+        values = [getattr(obj, f.name, None) for f in fields(obj)]
+        extra = [value for name, value in vars(obj).items() if name not in {f.name for f in fields(obj)}]
+        return sys.getsizeof(obj) + _estimate_items(values + extra, seen)
+    if hasattr(obj, '__dict__') and module.startswith(('core.', 'utils.')):
+        return sys.getsizeof(obj) + _estimate_items(list(vars(obj).values()), seen)
+    return sys.getsizeof(obj)
+
+
+def _estimate_items(items: list, seen: Set[int]) -> int:
+    """Sum item sizes, extrapolating from an evenly spread sample for long containers"""
+    if len(items) <= _SIZE_SAMPLE:
+        return sum(estimate_size(item, seen) for item in items)
+    step = len(items) / _SIZE_SAMPLE
+    sample = [items[int(i * step)] for i in range(_SIZE_SAMPLE)]
+    return int(sum(estimate_size(item, seen) for item in sample) * len(items) / _SIZE_SAMPLE)
+
+
+class _SpillPickler(pickle.Pickler):
+    """Pickles spilled state, keeping live objects (widgets, shared components) out of the file"""
+
+    def __init__(self, file, store: 'SessionStore', mapping: Any):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.store = store
+        self.mapping = mapping
+
+    def persistent_id(self, obj):
+        if type(obj) in (str, int, float, list, dict, tuple, bool) or obj is None:
+            return None
+        if obj is self.mapping and obj is not None:
+            return 'file_mapping'
+        if id(obj) in self.store._shared:
+            return id(obj)
+        if type(obj).__module__.startswith(('tkinter', '_tkinter')):
+            self.store._shared[id(obj)] = obj
+            return id(obj)
+        return None
+
+
+class _SpillUnpickler(pickle.Unpickler):
+    def __init__(self, file, store: 'SessionStore', mapping: Any):
+        super().__init__(file)
+        self.store = store
+        self.mapping = mapping
+
+    def persistent_load(self, pid):
+        return self.mapping if pid == 'file_mapping' else self.store._shared[pid]
+
+
+class SpilledState:
+    """Handle left on an evicted FileMapping; reloads the file's state on first access"""
+
+    def __init__(self, store: 'SessionStore', key: str):
+        self.store = store
+        self.key = key
+
+    def reload(self) -> None:
+        self.store.reload(self.key)
+
+
+class SessionEntry(MutableMapping):
+    """
+    One processed file's state, used like the dict it replaces
+
+    Keys other than RESIDENT_ENTRY_KEYS may have been spilled to disk; reading
+    or changing them reloads the file transparently.
+    """
+
+    def __init__(self, store: 'SessionStore', key: str, data: Optional[Dict[str, Any]] = None):
+        self._store = store
+        self._key = key
+        self._data: Dict[str, Any] = dict(data or {})
+        self._spilled_keys: Set[str] = set()
+
+    def _load(self) -> None:
+        if self._store.is_spilled(self._key):
+            self._store.reload(self._key)
+        else:
+            self._store.touch(self._key)
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in RESIDENT_ENTRY_KEYS:
+            self._load()
+        return self._data[name]
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        # Always reload: spilled mapping state belongs to the mapping being replaced
+        self._load()
+        self._data[name] = value
+
+    def __delitem__(self, name: str) -> None:
+        self._load()
+        del self._data[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._data or name in self._spilled_keys
+
+    def __iter__(self) -> Iterator[str]:
+        self._load()
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data) + len(self._spilled_keys)
+
+    def __repr__(self) -> str:
+        state = f", spilled={sorted(self._spilled_keys)}" if self._spilled_keys else ""
+        return f"SessionEntry({self._key!r}, keys={sorted(self._data)}{state})"
+
+
+class SessionStore(MutableMapping):
+    """
+    Processed files keyed by path, held within a memory budget
+
+    When the estimated size of resident files exceeds the budget, the least
+    recently used files are evicted: their DataFrames, processing results and
+    sheet rows are pickled to the spill directory, leaving the FileMapping
+    shell, its UI tab reference and a SpilledState handle in memory. Reading a
+    spilled value (entry['processor_results'], file_mapping.dataframe, ...)
+    reloads the whole file. The most recently used file is never evicted.
+
+    A reloaded file gets new DataFrame objects, so files whose data is held
+    elsewhere must not be evicted: the selected tab's file (set_active) and files
+    a running job or an open dialog works on (pin/pinned) stay resident.
+    Eviction only runs on the thread that created the store (the Tk thread);
+    budget checks triggered from worker threads, e.g. by a background file open,
+    are deferred to the next check on that thread.
+
+    Usage:
+        store = SessionStore(budget_mb=512)
+        store[path] = {'file_mapping': mapping, 'processor_results': results}
+        store[path]['processor_results']  # reloads if it was spilled
+        with store.pinned(mapping):
+            ...  # mapping.dataframe keeps its identity
+    """
+
+    def __init__(self, budget_mb: float = DEFAULT_BUDGET_MB, spill_dir: Optional[Union[str, Path]] = None):
+        """
+        Initialize the store
+
+        Args:
+            budget_mb: Memory budget for resident files in MB (0 disables eviction)
+            spill_dir: Directory for spilled files (default: a new temporary directory)
+        """
+        self.budget_mb = budget_mb
+        self._owns_dir = spill_dir is None
+        self._spill_dir = Path(spill_dir) if spill_dir else None
+        self._entries: 'OrderedDict[str, SessionEntry]' = OrderedDict()  # least recently used first
+        self._sizes: Dict[str, int] = {}
+        self._dirty: Set[str] = set()
+        self._spill_paths: Dict[str, Path] = {}
+        self._shared: Dict[int, Any] = {}
+        self._pins: Dict[int, List[Any]] = {}  # id(file mapping) -> [file mapping, pin count]
+        self._active = None
+        self._owner = threading.current_thread()
+        self._budget_pending = False
+        self._lock = threading.RLock()
+
+    @property
+    def spill_dir(self) -> Path:
+        if self._spill_dir is None:
+            self._spill_dir = Path(tempfile.mkdtemp(prefix='boq_session_'))
+        self._spill_dir.mkdir(parents=True, exist_ok=True)
+        return self._spill_dir
+
+    def share(self, obj: Any) -> None:
+        """Register an object that spilled state may reference but that must never be copied to disk"""
+        self._shared[id(obj)] = obj
+
+    # Mapping interface
+
+    def __getitem__(self, key: str) -> SessionEntry:
+        with self._lock:
+            return self._entries[key]
+
+    def __setitem__(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._release(key)
+            entry = value if isinstance(value, SessionEntry) and value._store is self else SessionEntry(self, key, value)
+            entry._key = key
+            self._entries[key] = entry
+            self._dirty.add(key)
+            self.enforce_budget()
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            self._release(key)
+            del self._entries[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def clear(self) -> None:
+        """Remove every file and its spill data, without reloading anything"""
+        with self._lock:
+            for key in list(self._entries):
+                self._discard(key)
+            self._entries.clear()
+
+    def close(self) -> None:
+        """Clear the store and remove the spill directory if the store created it"""
+        self.clear()
+        if self._owns_dir and self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+    # Residency
+
+    def pin(self, file_mapping: Any) -> None:
+        """Keep a file resident until the matching unpin() (pins are counted)"""
+        with self._lock:
+            pin = self._pins.setdefault(id(file_mapping), [file_mapping, 0])
+            pin[1] += 1
+
+    def unpin(self, file_mapping: Any) -> None:
+        """Release a pin taken with pin(); runs a deferred budget check when called on the owner thread"""
+        with self._lock:
+            pin = self._pins.get(id(file_mapping))
+            if pin is not None:
+                pin[1] -= 1
+                if pin[1] <= 0:
+                    del self._pins[id(file_mapping)]
+        if self._budget_pending:
+            self.enforce_budget()
+
+    @contextmanager
+    def pinned(self, file_mapping: Any):
+        """Keep a file resident for the duration of a with block"""
+        self.pin(file_mapping)
+        try:
+            yield file_mapping
+        finally:
+            self.unpin(file_mapping)
+
+    def set_active(self, file_mapping: Any) -> None:
+        """Pin the selected tab's file, releasing the previously selected one"""
+        if file_mapping is self._active:
+            return
+        if file_mapping is not None:
+            self.pin(file_mapping)
+        previous, self._active = self._active, file_mapping
+        if previous is not None:
+            self.unpin(previous)
+
+    def is_pinned(self, key: str) -> bool:
+        mapping = self._entries[key]._data.get('file_mapping')
+        return mapping is not None and id(mapping) in self._pins
+
+    def is_spilled(self, key: str) -> bool:
+        return key in self._spill_paths
+
+    def touch(self, key: str) -> None:
+        """Mark a file as most recently used; its size is re-estimated at the next budget check"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._dirty.add(key)
+
+    def resident_bytes(self) -> int:
+        """Estimated size of all resident files"""
+        with self._lock:
+            for key in list(self._dirty):
+                if key in self._entries and not self.is_spilled(key):
+                    self._sizes[key] = self._estimate_entry(self._entries[key])
+            self._dirty.clear()
+            return sum(self._sizes.get(key, 0) for key in self._entries if not self.is_spilled(key))
+
+    def enforce_budget(self) -> None:
+        """
+        Spill least recently used, unpinned files until the resident estimate fits the budget
+
+        Called from a thread other than the owner, the check is deferred.
+        """
+        if not self.budget_mb or self.budget_mb <= 0:
+            return
+        if threading.current_thread() is not self._owner:
+            self._budget_pending = True
+            return
+        self._budget_pending = False
+        budget = self.budget_mb * 1024 * 1024
+        with self._lock:
+            total = self.resident_bytes()
+            candidates = [key for key in list(self._entries)[:-1]
+                          if not self.is_spilled(key) and not self.is_pinned(key)]
+            for key in candidates:
+                if total <= budget:
+                    break
+                size = self._sizes.get(key, 0)
+                if self.evict(key):
+                    total -= size
+
+    def evict(self, key: str) -> bool:
+        """
+        Spill one file's heavy state to disk
+
+        Returns:
+            True if the file was spilled (False if already spilled, pinned or not picklable)
+        """
+        with self._lock:
+            entry = self._entries[key]
+            if self.is_spilled(key) or self.is_pinned(key):
+                return False
+            mapping = entry._data.get('file_mapping')
+            entry_state = {name: value for name, value in entry._data.items() if name not in RESIDENT_ENTRY_KEYS}
+            mapping_state = {}
+            if mapping is not None and hasattr(mapping, '__dict__'):
+                mapping_state = {name: value for name, value in vars(mapping).items()
+                                 if name not in RESIDENT_MAPPING_ATTRIBUTES}
+            if not entry_state and not mapping_state:
+                return False
+
+            path = self.spill_dir / f"{uuid.uuid4().hex}.pkl"
+            try:
+                with open(path, 'wb') as f:
+                    _SpillPickler(f, self, mapping).dump({'entry': entry_state, 'mapping': mapping_state})
+            except Exception as e:
+                path.unlink(missing_ok=True)
+                logger.warning(f"Could not spill {key}, keeping it in memory: {e}")
+                return False
+
+            for name in entry_state:
+                del entry._data[name]
+            entry._spilled_keys = set(entry_state)
+            if mapping_state:
+                for name in mapping_state:
+                    delattr(mapping, name)
+                mapping._spilled = SpilledState(self, key)
+            self._spill_paths[key] = path
+            logger.info(f"Spilled {key} ({self._sizes.get(key, 0) / 1024 / 1024:.1f}MB) to {path.name}")
+            return True
+
+    def reload(self, key: str) -> None:
+        """Bring a spilled file back into memory and mark it most recently used"""
+        with self._lock:
+            path = self._spill_paths.pop(key, None)
+            if path is not None:
+                entry = self._entries[key]
+                mapping = entry._data.get('file_mapping')
+                with open(path, 'rb') as f:
+                    state = _SpillUnpickler(f, self, mapping).load()
+                path.unlink(missing_ok=True)
+                entry._data.update(state['entry'])
+                entry._spilled_keys = set()
+                if mapping is not None:
+                    mapping.__dict__.update(state['mapping'])
+                    mapping.__dict__.pop('_spilled', None)
+                logger.info(f"Reloaded {key} from the session spill directory")
+            self.touch(key)
+            self.enforce_budget()
+
+    def _release(self, key: str) -> None:
+        """Reload a file that is being replaced or removed; its FileMapping may still be shown in a tab"""
+        if self.is_spilled(key):
+            self.reload(key)
+        self._discard(key)
+
+    def _discard(self, key: str) -> None:
+        """Forget a file's spill data and size"""
+        path = self._spill_paths.pop(key, None)
+        if path is not None:
+            path.unlink(missing_ok=True)
+            mapping = self._entries[key]._data.get('file_mapping')
+            if mapping is not None:
+                mapping.__dict__.pop('_spilled', None)
+        self._sizes.pop(key, None)
+        self._dirty.discard(key)
+
+    def _estimate_entry(self, entry: SessionEntry) -> int:
+        seen = set(self._shared)
+        return estimate_size(entry._data, seen)
@@ -45,14 +45,88 @@ class PatternInfo:
     description: str
 
 
+# Rows taken from a sheet for classification: the head, the middle and the tail
+# each get a third, so classification cost does not grow with the row count
+DEFAULT_SAMPLE_ROWS = 300
+
+_CURRENCY_SYMBOLS = re.compile(r'[$,€£¥₹]')
+
+
+def sample_rows(content: List[List[str]], sample_size: Optional[int] = DEFAULT_SAMPLE_ROWS) -> List[List[str]]:
+    """
+    Stratified row sample: head, middle and tail, in sheet order
+
+    Args:
+        content: Sheet rows
+        sample_size: Maximum rows to keep (None or 0 keeps every row)
+
+    Returns:
+        The rows themselves when the sheet fits, otherwise a bounded sample
+    """
+    if not sample_size or len(content) <= sample_size:
+        return content
+    head = (sample_size + 2) // 3
+    tail = sample_size // 3
+    middle = sample_size - head - tail
+    middle_start = (len(content) - middle) // 2
+    return content[:head] + content[middle_start:middle_start + middle] + content[len(content) - tail:]
+
+
+class KeywordMatcher:
+    """
+    A group of keyword patterns compiled into one case-insensitive alternation
+
+    matches() returns the same keywords as searching each pattern on its own,
+    but scans the text once per keyword occurrence instead of once per keyword.
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = list(patterns)
+        # Longest first, so at any position the alternation picks the longest literal
+        ordered = sorted(dict.fromkeys(self.patterns), key=len, reverse=True)
+        self.regex = re.compile('|'.join(f'(?:{pattern})' for pattern in ordered), re.IGNORECASE)
+        self._compiled = {pattern: re.compile(pattern, re.IGNORECASE) for pattern in ordered}
+        self._literal = {pattern: re.escape(pattern) == pattern for pattern in ordered}
+
+    def search(self, text: str) -> bool:
+        """True if any pattern occurs in text"""
+        return self.regex.search(text) is not None
+
+    def matches(self, text: str) -> List[str]:
+        """Patterns occurring in text, in declaration order (duplicates kept)"""
+        found = set()
+        match = self.regex.search(text)
+        while match:
+            found.add(match.group(0))
+            match = self.regex.search(text, match.start() + 1)
+        if not found:
+            return []
+
+        # A shorter literal starting where a longer one matched is inside that match;
+        # anything else is checked against the full text
+        hits = {}
+        for pattern, compiled in self._compiled.items():
+            if self._literal[pattern]:
+                hits[pattern] = any(compiled.search(span) for span in found)
+            else:
+                hits[pattern] = compiled.search(text) is not None
+        return [pattern for pattern in self.patterns if hits[pattern]]
+
+
 class SheetClassifier:
     """
     Intelligent sheet classifier using heuristic scoring and pattern analysis
     """
     
-    def __init__(self):
-        """Initialize the sheet classifier"""
+    def __init__(self, sample_size: Optional[int] = DEFAULT_SAMPLE_ROWS):
+        """
+        Initialize the sheet classifier
+        
+        Args:
+            sample_size: Rows sampled per sheet (head, middle, tail); None classifies every row
+        """
         self.config = get_config()
+        self.sample_size = sample_size
         self._setup_keyword_patterns()
         self._setup_numeric_patterns()
         self._setup_financial_patterns()
@@ -95,6 +169,9 @@ class SheetClassifier:
             "decimal": r"^\d+\.\d+$",
             "integer": r"^\d+$"
         }
+        self.numeric_regex = re.compile(
+            '|'.join(f'(?:{pattern})' for pattern in self.numeric_patterns.values()), re.IGNORECASE
+        )
     
     def _setup_financial_patterns(self):
         """Setup patterns for financial aggregation detection"""
@@ -116,6 +193,12 @@ class SheetClassifier:
                 r"goods and services tax", r"taxation"
             ]
         }
+        self.keyword_matchers = {
+            sheet_type: KeywordMatcher(patterns) for sheet_type, patterns in self.keyword_patterns.items()
+        }
+        self.financial_matchers = {
+            category: KeywordMatcher(keywords) for category, keywords in self.financial_patterns.items()
+        }
     
     def classify_sheet(self, sheet_content: List[List[str]], sheet_name: str) -> ClassificationResult:
         """
@@ -130,15 +213,16 @@ class SheetClassifier:
         """
         logger.debug(f"Classifying sheet: {sheet_name}")
         
-        # The content is the sheet_data itself.
         # Assume headers are the first row for classification purposes.
-        content = sheet_content
-        headers = content[0] if content else []
+        # Scoring runs on a bounded head/middle/tail sample with one cell-type pass.
+        headers = sheet_content[0] if sheet_content else []
+        content = sample_rows(sheet_content, self.sample_size)
+        cell_types = self.classify_cells(content)
         
         # Calculate individual scores
         keyword_score = self.score_keywords(sheet_name, content, headers)
-        numeric_score = self.calculate_numeric_ratio(content, headers)
-        pattern_score = self.detect_patterns(content, headers)
+        numeric_score = self.calculate_numeric_ratio(content, headers, cell_types)
+        pattern_score = self.detect_patterns(content, headers, cell_types)
         
         # Calculate weighted score
         total_score = (
@@ -193,29 +277,17 @@ class SheetClassifier:
         score = 0.0
         matches = []
         
-        # Check sheet name
-        name_lower = sheet_name.lower()
-        for sheet_type, patterns in self.keyword_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, name_lower, re.IGNORECASE):
-                    score += 0.4  # Higher weight for name matches
-                    matches.append(f"Sheet name matches {sheet_type.value}: '{pattern}'")
-        
-        # Check headers
-        header_text = " ".join(headers).lower()
-        for sheet_type, patterns in self.keyword_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, header_text, re.IGNORECASE):
-                    score += 0.2
-                    matches.append(f"Headers match {sheet_type.value}: '{pattern}'")
-        
-        # Check content (first few rows)
-        content_text = " ".join([str(cell) for row in content[:5] for cell in row]).lower()
-        for sheet_type, patterns in self.keyword_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, content_text, re.IGNORECASE):
-                    score += 0.1
-                    matches.append(f"Content matches {sheet_type.value}: '{pattern}'")
+        # Sheet name, headers and the first few rows, weighted in that order
+        sources = [
+            ("Sheet name matches", sheet_name.lower(), 0.4),
+            ("Headers match", " ".join(headers).lower(), 0.2),
+            ("Content matches", " ".join([str(cell) for row in content[:5] for cell in row]).lower(), 0.1),
+        ]
+        for label, text, weight in sources:
+            for sheet_type, matcher in self.keyword_matchers.items():
+                for pattern in matcher.matches(text):
+                    score += weight
+                    matches.append(f"{label} {sheet_type.value}: '{pattern}'")
         
         # Normalize score
         score = min(score, 1.0)
@@ -226,13 +298,15 @@ class SheetClassifier:
         }
     
     def calculate_numeric_ratio(self, content: List[List[str]], 
-                               headers: List[str]) -> Dict[str, Any]:
+                               headers: List[str],
+                               cell_types: Optional[List[List[Optional[bool]]]] = None) -> Dict[str, Any]:
         """
         Calculate the ratio of numeric content in the sheet
         
         Args:
             content: Sheet content as list of rows
             headers: Column headers
+            cell_types: Output of classify_cells for content (computed when omitted)
             
         Returns:
             Dictionary with numeric ratio and analysis
@@ -240,8 +314,6 @@ class SheetClassifier:
         if not content:
             return {'ratio': 0.0, 'analysis': 'No content'}
         
-        total_cells = 0
-        numeric_cells = 0
         numeric_columns = []
         
         # Analyze headers for numeric indicators
@@ -251,33 +323,11 @@ class SheetClassifier:
                    ['qty', 'quantity', 'amount', 'price', 'rate', 'total', 'no', 'number']):
                 numeric_columns.append(i)
         
-        # Analyze content
-        for row in content:
-            for i, cell in enumerate(row):
-                if not cell or str(cell).strip() == "":
-                    continue
-                
-                total_cells += 1
-                cell_str = str(cell).strip()
-                
-                # Check if cell is numeric
-                is_numeric = False
-                
-                # Check various numeric patterns
-                for pattern_name, pattern in self.numeric_patterns.items():
-                    if re.match(pattern, cell_str, re.IGNORECASE):
-                        is_numeric = True
-                        break
-                
-                # Additional checks for currency and numbers
-                if not is_numeric:
-                    # Remove common currency symbols and check
-                    clean_cell = re.sub(r'[$,€£¥₹]', '', cell_str)
-                    if clean_cell.replace('.', '').replace(',', '').isdigit():
-                        is_numeric = True
-                
-                if is_numeric:
-                    numeric_cells += 1
+        # Analyze content: None marks an empty cell
+        if cell_types is None:
+            cell_types = self.classify_cells(content)
+        total_cells = sum(len(row) - row.count(None) for row in cell_types)
+        numeric_cells = sum(row.count(True) for row in cell_types)
         
         ratio = numeric_cells / max(1, total_cells)
         
@@ -294,13 +344,15 @@ class SheetClassifier:
         }
     
     def detect_patterns(self, content: List[List[str]], 
-                       headers: List[str]) -> Dict[str, Any]:
+                       headers: List[str],
+                       cell_types: Optional[List[List[Optional[bool]]]] = None) -> Dict[str, Any]:
         """
         Detect patterns in sheet content
         
         Args:
             content: Sheet content as list of rows
             headers: Column headers
+            cell_types: Output of classify_cells for content (computed when omitted)
             
         Returns:
             Dictionary with pattern score and detected patterns
@@ -320,7 +372,9 @@ class SheetClassifier:
         patterns.extend(structure_patterns)
         
         # Detect repetition patterns
-        repetition_patterns = self._detect_repetition_patterns(content)
+        if cell_types is None:
+            cell_types = self.classify_cells(content)
+        repetition_patterns = self._detect_repetition_patterns(content, cell_types)
         patterns.extend(repetition_patterns)
         
         # Calculate pattern score
@@ -343,20 +397,16 @@ class SheetClassifier:
         
         # Check for financial keywords in headers
         header_text = " ".join(headers).lower()
-        for category, keywords in self.financial_patterns.items():
-            for keyword in keywords:
-                if re.search(keyword, header_text, re.IGNORECASE):
-                    patterns.append(f"Financial pattern: {category} in headers")
-                    break
+        for category, matcher in self.financial_matchers.items():
+            if matcher.search(header_text):
+                patterns.append(f"Financial pattern: {category} in headers")
         
         # Check for financial patterns in content
         for row in content:
             row_text = " ".join([str(cell) for cell in row]).lower()
-            for category, keywords in self.financial_patterns.items():
-                for keyword in keywords:
-                    if re.search(keyword, row_text, re.IGNORECASE):
-                        patterns.append(f"Financial pattern: {category} in content")
-                        break
+            for category, matcher in self.financial_matchers.items():
+                if matcher.search(row_text):
+                    patterns.append(f"Financial pattern: {category} in content")
         
         return patterns
     
@@ -389,15 +439,17 @@ class SheetClassifier:
         
         return patterns
     
-    def _detect_repetition_patterns(self, content: List[List[str]]) -> List[str]:
+    def _detect_repetition_patterns(self, content: List[List[str]],
+                                    cell_types: Optional[List[List[Optional[bool]]]] = None) -> List[str]:
         """Detect repetition patterns in content"""
         patterns = []
         
-        if not content:
+        row_lengths = [len(row) for row in content if row]
+        if not row_lengths:
             return patterns
         
         # Check for repeated values in columns
-        for col_idx in range(min(len(row) for row in content if row)):
+        for col_idx in range(min(row_lengths)):
             column_values = [row[col_idx] for row in content if len(row) > col_idx and row[col_idx].strip()]
             if column_values:
                 unique_values = set(column_values)
@@ -406,28 +458,38 @@ class SheetClassifier:
                 if repetition_ratio > 0.3:
                     patterns.append(f"Repetition pattern: Column {col_idx + 1} has {repetition_ratio:.1%} repetition")
         
-        # Check for similar row patterns
+        # Check for similar row patterns: adjacent non-empty rows whose numeric cell counts differ by at most one
         if len(content) > 2:
-            similar_rows = 0
-            for i in range(len(content) - 1):
-                if self._rows_are_similar(content[i], content[i + 1]):
-                    similar_rows += 1
+            if cell_types is None:
+                cell_types = self.classify_cells(content)
+            numeric_counts = [row.count(True) for row in cell_types]
+            similar_rows = sum(
+                1 for i in range(len(content) - 1)
+                if content[i] and content[i + 1] and abs(numeric_counts[i] - numeric_counts[i + 1]) <= 1
+            )
             
             if similar_rows > len(content) * 0.2:
                 patterns.append("Repetition pattern: Similar row structures detected")
         
         return patterns
     
-    def _rows_are_similar(self, row1: List[str], row2: List[str]) -> bool:
-        """Check if two rows have similar structure"""
-        if not row1 or not row2:
-            return False
-        
-        # Check if both rows have similar data types
-        numeric_count1 = sum(1 for cell in row1 if self._is_numeric(cell))
-        numeric_count2 = sum(1 for cell in row2 if self._is_numeric(cell))
+    def classify_cells(self, content: List[List[str]]) -> List[List[Optional[bool]]]:
+        """
+        One pass over the cells: None for empty, True for numeric, False for other text
         
-        return abs(numeric_count1 - numeric_count2) <= 1
+        Repeated values (units, codes, prices) are classified once per distinct string.
+        """
+        cache: Dict[str, Optional[bool]] = {}
+        cell_types = []
+        for row in content:
+            types = []
+            for cell in row:
+                key = cell if isinstance(cell, str) else str(cell) if cell else ''
+                if key not in cache:
+                    cache[key] = self._is_numeric(key) if key.strip() else None
+                types.append(cache[key])
+            cell_types.append(types)
+        return cell_types
     
     def _is_numeric(self, cell: str) -> bool:
         """Check if a cell contains numeric data"""
@@ -437,12 +499,11 @@ class SheetClassifier:
         cell_str = str(cell).strip()
         
         # Check numeric patterns
-        for pattern in self.numeric_patterns.values():
-            if re.match(pattern, cell_str, re.IGNORECASE):
-                return True
+        if self.numeric_regex.match(cell_str):
+            return True
         
         # Additional check for currency
-        clean_cell = re.sub(r'[$,€£¥₹]', '', cell_str)
+        clean_cell = _CURRENCY_SYMBOLS.sub('', cell_str)
         return clean_cell.replace('.', '').replace(',', '').isdigit()
     
     def _determine_sheet_type(self, keyword_score: Dict, numeric_score: Dict, 
@@ -0,0 +1,160 @@
+"""
+Sheet Recompute for BOQ Tools
+Dependency-tracked caching of per-sheet row classification, row validity and DataFrame rows,
+so editing a header row or a column mapping only recomputes what the edit affects
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from core.row_classifier import ClassificationResult, RowClassifier, RowPatterns
+from core.row_facts import RowFactsCache, dependency_key
+from utils.config import ColumnType
+
+logger = logging.getLogger(__name__)
+
+# Column types read by RowClassifier.classify_rows (completeness, row type and line item validation)
+CLASSIFICATION_COLUMN_TYPES = {
+    ColumnType.DESCRIPTION, ColumnType.UNIT_PRICE, ColumnType.TOTAL_PRICE,
+    ColumnType.QUANTITY, ColumnType.UNIT, ColumnType.CODE
+}
+
+
+@dataclass
+class _SheetState:
+    """Cached results for one sheet, each with the key it was computed for"""
+    sheet_data: Any = None
+    patterns: Optional[List[RowPatterns]] = None
+    classification_key: Optional[Tuple] = None
+    classification: Optional[ClassificationResult] = None
+    slice_key: Optional[Hashable] = None
+    slice_rows: Optional[List[Dict[str, Any]]] = None
+
+
+class SheetRecomputeCache:
+    """
+    Per-sheet results of the row mapping stages, recomputed only when their inputs change
+
+    - Row text patterns (the expensive, regex-heavy part of classification) depend
+      only on the sheet data, so they survive header row and column mapping edits.
+    - Row classification depends on the header row and on the columns mapped to
+      CLASSIFICATION_COLUMN_TYPES.
+    - Row validity comes from the file's RowFactsCache, shared with the other
+      stages that need it.
+    - DataFrame rows of a sheet depend on whatever key the caller passes, typically
+      its column mappings and row validity.
+
+    Sheets are independent, so editing one sheet of a 30-sheet file leaves the
+    other 29 cached.
+
+    Usage:
+        cache = SheetRecomputeCache()
+        result = cache.classify('Sheet1', sheet_data, header_row_index, column_mapping)
+    """
+
+    def __init__(self, row_classifier: Optional[RowClassifier] = None,
+                 row_facts: Optional[RowFactsCache] = None):
+        """
+        Initialize the cache
+
+        Args:
+            row_classifier: RowClassifier used for recomputation (default: a new one)
+            row_facts: RowFactsCache of the file, for row validity (default: a new one)
+        """
+        self.row_classifier = row_classifier or RowClassifier()
+        self.row_facts = row_facts or RowFactsCache(self.row_classifier)
+        self._sheets: Dict[str, _SheetState] = {}
+        self.recomputed: Dict[str, int] = {'patterns': 0, 'classification': 0, 'slice': 0}
+
+    def _state(self, sheet_name: str, sheet_data: Any = None) -> _SheetState:
+        state = self._sheets.get(sheet_name)
+        if state is None or (sheet_data is not None and state.sheet_data is not sheet_data):
+            # New data for the sheet (e.g. the file was re-read): nothing cached applies
+            state = _SheetState(sheet_data=sheet_data)
+            self._sheets[sheet_name] = state
+        return state
+
+    def invalidate(self, sheet_name: Optional[str] = None) -> None:
+        """Drop cached results for one sheet, or for every sheet"""
+        if sheet_name is None:
+            self._sheets.clear()
+        else:
+            self._sheets.pop(sheet_name, None)
+        self.row_facts.invalidate(sheet_name)
+
+    def classify(self, sheet_name: str, sheet_data: List[List[str]], header_row_index: int,
+                 column_mapping: Dict[int, ColumnType]) -> ClassificationResult:
+        """
+        Classify the data rows of a sheet (every row except the header row)
+
+        Row indices in the result refer to the data rows, as classify_rows reports
+        them for sheet_data without its header row.
+
+        Args:
+            sheet_name: Sheet name
+            sheet_data: Full sheet rows, including the header row
+            header_row_index: Index of the header row in sheet_data
+            column_mapping: Column index -> ColumnType
+
+        Returns:
+            ClassificationResult, cached while header row and relevant columns are unchanged
+        """
+        state = self._state(sheet_name, sheet_data)
+        key = (header_row_index, dependency_key(column_mapping, CLASSIFICATION_COLUMN_TYPES))
+        if state.classification is not None and state.classification_key == key:
+            return state.classification
+
+        if state.patterns is None:
+            state.patterns = [self.row_classifier.detect_row_patterns(row) for row in sheet_data]
+            self.recomputed['patterns'] += 1
+
+        if header_row_index < len(sheet_data):
+            data_rows = sheet_data[:header_row_index] + sheet_data[header_row_index + 1:]
+            patterns = state.patterns[:header_row_index] + state.patterns[header_row_index + 1:]
+        else:
+            data_rows, patterns = sheet_data, state.patterns
+
+        state.classification = self.row_classifier.classify_rows(
+            data_rows, column_mapping, sheet_name, row_patterns=patterns
+        )
+        state.classification_key = key
+        self.recomputed['classification'] += 1
+        logger.debug(f"Reclassified sheet '{sheet_name}' ({len(data_rows)} rows)")
+        return state.classification
+
+    def row_validity(self, sheet_name: str, row_index: int, row_data: List[str],
+                     column_mapping: Dict[int, ColumnType]) -> bool:
+        """
+        Master row validity of one row (see RowFactsCache)
+
+        Args:
+            sheet_name: Sheet name
+            row_index: Row index used by the caller (e.g. RowClassificationInfo.row_index)
+            row_data: Row cells
+            column_mapping: Column index -> ColumnType
+
+        Returns:
+            True if the row is valid
+        """
+        return self.row_facts.is_valid(sheet_name, row_index, row_data, column_mapping)
+
+    def sheet_rows(self, sheet_name: str, key: Hashable,
+                   build: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        One sheet's slice of a unified DataFrame, as row dictionaries
+
+        Args:
+            sheet_name: Sheet name
+            key: Everything the slice depends on; build() runs again only when it changes
+            build: Produces the rows
+
+        Returns:
+            Row dictionaries for the sheet
+        """
+        state = self._state(sheet_name)
+        if state.slice_rows is None or state.slice_key != key:
+            state.slice_rows = build()
+            state.slice_key = key
+            self.recomputed['slice'] += 1
+        return state.slice_rows
@@ -0,0 +1,233 @@
+"""
+Sheet Sources for BOQ Tools
+Format-specific readers that stream sheet rows straight into the pipeline's row format
+"""
+
+import csv
+import logging
+import warnings
+from pathlib import Path
+from typing import Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    from openpyxl import load_workbook
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+try:
+    import xlrd
+    XLRD_AVAILABLE = True
+except ImportError:
+    XLRD_AVAILABLE = False
+
+# Rows per chunk yielded by SheetSource.iter_chunks
+DEFAULT_CHUNK_ROWS = 5000
+
+# Bytes inspected to decide whether a CSV is UTF-8
+_ENCODING_PROBE_BYTES = 1024 * 1024
+
+
+def cell_to_str(value) -> str:
+    """Pipeline cell format: '' for empty, integral floats without '.0', everything else str()"""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class SheetSource:
+    """
+    Read-only, row-oriented access to the sheets of one file
+
+    Rows are lists of strings (see cell_to_str). Subclasses implement
+    sheetnames, is_visible() and iter_rows(); everything else builds on those.
+    """
+
+    file_format = "unknown"
+
+    def __init__(self, filepath: Union[str, Path]):
+        self.filepath = Path(filepath)
+
+    @property
+    def sheetnames(self) -> List[str]:
+        raise NotImplementedError
+
+    def is_visible(self, sheet_name: str) -> bool:
+        return True
+
+    def visible_sheetnames(self) -> List[str]:
+        return [name for name in self.sheetnames if self.is_visible(name)]
+
+    def iter_rows(self, sheet_name: str, max_rows: Optional[int] = None) -> Iterator[List[str]]:
+        """Yield rows in sheet order, at most max_rows (None reads every row)"""
+        raise NotImplementedError
+
+    def iter_chunks(self, sheet_name: str, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                    max_rows: Optional[int] = None) -> Iterator[List[List[str]]]:
+        """Yield lists of up to chunk_rows rows, so callers can bound memory by chunk size"""
+        chunk = []
+        for row in self.iter_rows(sheet_name, max_rows):
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def read_rows(self, sheet_name: str, max_rows: Optional[int] = None) -> List[List[str]]:
+        return list(self.iter_rows(sheet_name, max_rows))
+
+    def close(self) -> None:
+        pass
+
+    def _check_sheet(self, sheet_name: str) -> None:
+        if sheet_name not in self.sheetnames:
+            raise KeyError(sheet_name)
+
+
+class XlsxSheetSource(SheetSource):
+    """.xlsx through a read-only openpyxl workbook"""
+
+    file_format = "xlsx"
+
+    def __init__(self, filepath: Union[str, Path]):
+        super().__init__(filepath)
+        if not OPENPYXL_AVAILABLE:
+            raise ImportError("openpyxl is required for .xlsx files")
+        # Suppress warnings for better user experience
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            self.workbook = load_workbook(
+                filename=self.filepath,
+                read_only=True,  # Memory efficient
+                data_only=True,  # Get values instead of formulas
+                keep_vba=False   # Don't load VBA code
+            )
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return self.workbook.sheetnames
+
+    def is_visible(self, sheet_name: str) -> bool:
+        return self.workbook[sheet_name].sheet_state != 'hidden'
+
+    def iter_rows(self, sheet_name: str, max_rows: Optional[int] = None) -> Iterator[List[str]]:
+        worksheet = self.workbook[sheet_name]
+        for row in worksheet.iter_rows(max_row=max_rows, values_only=True):
+            yield [cell_to_str(value) for value in row]
+
+    def close(self) -> None:
+        self.workbook.close()
+
+
+class XlsSheetSource(SheetSource):
+    """Legacy .xls read directly with xlrd, one sheet loaded at a time"""
+
+    file_format = "xls"
+
+    def __init__(self, filepath: Union[str, Path]):
+        super().__init__(filepath)
+        if not XLRD_AVAILABLE:
+            raise ImportError("xlrd is required for .xls files")
+        self.book = xlrd.open_workbook(str(self.filepath), on_demand=True)
+        self._visibility = {}
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return self.book.sheet_names()
+
+    def is_visible(self, sheet_name: str) -> bool:
+        if sheet_name not in self._visibility:
+            self._check_sheet(sheet_name)
+            self._visibility[sheet_name] = self.book.sheet_by_name(sheet_name).visibility == 0
+        return self._visibility[sheet_name]
+
+    def iter_rows(self, sheet_name: str, max_rows: Optional[int] = None) -> Iterator[List[str]]:
+        self._check_sheet(sheet_name)
+        sheet = self.book.sheet_by_name(sheet_name)
+        row_count = sheet.nrows if max_rows is None else min(sheet.nrows, max_rows)
+        empty, error = xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_ERROR
+        for row_idx in range(row_count):
+            yield [
+                "" if cell.ctype in (empty, error) else cell_to_str(cell.value)
+                for cell in sheet.row(row_idx)
+            ]
+
+    def close(self) -> None:
+        self.book.release_resources()
+
+
+class CsvSheetSource(SheetSource):
+    """
+    CSV exposed as a single sheet named after the file, streamed row by row
+
+    Nothing is held in memory beyond the row being read, so multi-hundred-MB
+    files can be processed in chunks. Blank lines are skipped and ragged rows
+    are kept as they are.
+    """
+
+    file_format = "csv"
+
+    def __init__(self, filepath: Union[str, Path], encoding: Optional[str] = None,
+                 delimiter: Optional[str] = None):
+        super().__init__(filepath)
+        self.encoding = encoding or self._detect_encoding()
+        self.delimiter = delimiter or self._detect_delimiter()
+        self.sheet_name = self.filepath.stem
+
+    def _detect_encoding(self) -> str:
+        with open(self.filepath, 'rb') as f:
+            probe = f.read(_ENCODING_PROBE_BYTES)
+        try:
+            # A multi-byte character cut at the probe boundary is not an error
+            probe.decode('utf-8-sig')
+        except UnicodeDecodeError as e:
+            if e.start < len(probe) - 3:
+                logger.info(f"{self.filepath.name} is not UTF-8, reading it as cp1252")
+                return 'cp1252'
+        return 'utf-8-sig'
+
+    def _detect_delimiter(self) -> str:
+        with open(self.filepath, 'r', encoding=self.encoding, errors='replace', newline='') as f:
+            sample = f.read(64 * 1024)
+        try:
+            return csv.Sniffer().sniff(sample, delimiters=',;\t|').delimiter
+        except csv.Error:
+            return ','
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return [self.sheet_name]
+
+    def iter_rows(self, sheet_name: str, max_rows: Optional[int] = None) -> Iterator[List[str]]:
+        self._check_sheet(sheet_name)
+        with open(self.filepath, 'r', encoding=self.encoding, newline='') as f:
+            count = 0
+            for row in csv.reader(f, delimiter=self.delimiter):
+                if not row:
+                    continue
+                if max_rows is not None and count >= max_rows:
+                    break
+                count += 1
+                yield row
+
+
+def open_sheet_source(filepath: Union[str, Path], file_format: str) -> SheetSource:
+    """
+    Open the reader backend for a detected file format
+
+    Args:
+        filepath: File to read
+        file_format: 'xlsx', 'xls' or 'csv'
+
+    Returns:
+        SheetSource for the file
+    """
+    sources = {'xlsx': XlsxSheetSource, 'xls': XlsSheetSource, 'csv': CsvSheetSource}
+    if file_format not in sources:
+        raise ValueError(f"Unsupported file format: {file_format}")
+    return sources[file_format](filepath)
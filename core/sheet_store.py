@@ -0,0 +1,154 @@
+"""
+Sheet Store for BOQ Tools
+Spills raw sheet grids to a disk cache and hands out compact references that reload on demand
+"""
+
+import hashlib
+import logging
+import pickle
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Grids kept in memory after being reloaded, so walking one sheet row by row
+# does not unpickle it for every row
+DEFAULT_CACHED_SHEETS = 2
+
+
+class SheetDataRef(Sequence):
+    """
+    Compact, read-only stand-in for one sheet's rows
+
+    Supports len(), indexing, slicing and iteration like the list of rows it
+    replaces; the rows are loaded from the store's cache file on first access.
+    """
+
+    def __init__(self, store: 'SheetDataStore', path: Path, sheet_name: str,
+                 row_count: int, column_count: int):
+        self.store = store
+        self.path = path
+        self.sheet_name = sheet_name
+        self.row_count = row_count
+        self.column_count = column_count
+
+    def load(self) -> List[List[str]]:
+        """Return the full list of rows"""
+        return self.store.load(self.path)
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def __getitem__(self, index):
+        return self.load()[index]
+
+    def __iter__(self) -> Iterator[List[str]]:
+        return iter(self.load())
+
+    def __repr__(self) -> str:
+        return f"SheetDataRef({self.sheet_name!r}, rows={self.row_count}, columns={self.column_count})"
+
+
+class SpilledSheets(Mapping):
+    """Sheet name -> SheetDataRef, in place of a {sheet_name: rows} dictionary"""
+
+    def __init__(self, refs: Dict[str, SheetDataRef]):
+        self._refs = dict(refs)
+
+    def __getitem__(self, sheet_name: str) -> SheetDataRef:
+        return self._refs[sheet_name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._refs)
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def __repr__(self) -> str:
+        return f"SpilledSheets({list(self._refs)})"
+
+
+class SheetDataStore:
+    """
+    Disk cache for raw sheet grids of processed files
+
+    Processed files normally keep every sheet's rows in memory for as long as
+    they stay open. spill() writes them to the cache directory instead and
+    returns references; only the most recently used grids are kept loaded.
+    """
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None,
+                 max_cached_sheets: int = DEFAULT_CACHED_SHEETS):
+        """
+        Initialize the store
+
+        Args:
+            cache_dir: Directory for the cache files (default: a new temporary directory)
+            max_cached_sheets: Reloaded grids kept in memory
+        """
+        self._owns_dir = cache_dir is None
+        self.cache_dir = Path(cache_dir) if cache_dir else Path(tempfile.mkdtemp(prefix='boq_sheets_'))
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_cached_sheets = max_cached_sheets
+        self._loaded: 'OrderedDict[Path, List[List[str]]]' = OrderedDict()
+        self._files: List[Path] = []
+        self._lock = threading.Lock()
+
+    def spill(self, key: str, sheet_data: Dict[str, List[List[str]]]) -> SpilledSheets:
+        """
+        Write the sheets of one file to the cache
+
+        Args:
+            key: Identifies the file (e.g. its absolute path); spilling the same key again replaces it
+            sheet_data: Sheet name -> rows
+
+        Returns:
+            SpilledSheets with one reference per sheet
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        prefix = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        refs = {}
+        for index, (sheet_name, rows) in enumerate(sheet_data.items()):
+            if isinstance(rows, SheetDataRef):
+                refs[sheet_name] = rows
+                continue
+            path = self.cache_dir / f"{prefix}_{index}.pkl"
+            with open(path, 'wb') as f:
+                pickle.dump(rows, f, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._lock:
+                self._loaded.pop(path, None)
+                if path not in self._files:
+                    self._files.append(path)
+            column_count = max((len(row) for row in rows), default=0)
+            refs[sheet_name] = SheetDataRef(self, path, sheet_name, len(rows), column_count)
+        logger.info(f"Spilled {len(refs)} sheet(s) of {key} to {self.cache_dir}")
+        return SpilledSheets(refs)
+
+    def load(self, path: Path) -> List[List[str]]:
+        """Load a spilled grid, keeping the most recently used ones in memory"""
+        with self._lock:
+            if path in self._loaded:
+                self._loaded.move_to_end(path)
+                return self._loaded[path]
+        with open(path, 'rb') as f:
+            rows = pickle.load(f)
+        with self._lock:
+            self._loaded[path] = rows
+            while len(self._loaded) > self.max_cached_sheets:
+                self._loaded.popitem(last=False)
+        return rows
+
+    def clear(self) -> None:
+        """Delete every cache file written by this store"""
+        with self._lock:
+            self._loaded.clear()
+            files, self._files = self._files, []
+        for path in files:
+            path.unlink(missing_ok=True)
+        if self._owns_dir:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
@@ -0,0 +1,302 @@
+"""
+Summary Cache for BOQ Tools
+Running per-category and per-sheet totals of a dataset, updated row by row instead of rescanning the DataFrame
+"""
+
+import logging
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.mapping_generator import file_mapping_cache
+
+logger = logging.getLogger(__name__)
+
+# Bookkeeping columns of the snapshot, next to one column per tracked total
+_CATEGORY = '_category'
+_SHEET = '_sheet'
+_ROWS = '_rows'
+_CATEGORIZED = '_categorized'
+
+
+class SummaryCache:
+    """
+    Totals per (offer total column, category) and per (offer total column, sheet)
+
+    The cache keeps a small snapshot of each row (category, sheet, numeric totals)
+    so a changed row can be taken out of the aggregates and put back with its new
+    values:
+
+    - Writers that know which rows they touched (MERGE/ADD, recategorization,
+      manual category edits) call update_rows() and pay for those rows only.
+      sync() trusts the DataFrame it tracks, so every in-place edit of it must
+      be reported this way.
+    - Readers call sync() with the dataset the cache tracks, not with display or
+      export views built from it. Added or removed rows and offer columns are
+      reconciled by label; a DataFrame other than the one last synced (a new
+      dataset, or a copy) is diffed against the snapshot with vectorized
+      comparisons, and again only differing rows are re-aggregated.
+
+    Totals follow the summary views: values go through pd.to_numeric(errors='coerce')
+    and non-numeric cells count as 0. Tracked columns are the base total column and
+    every offer column '<total>[<offer>]'. Row labels must be unique; a DataFrame
+    with duplicate labels is summarized by a full rebuild.
+
+    Usage:
+        summary = get_summary_cache(file_mapping)
+        summary.sync(dataframe)
+        summary.category_totals('total_price[Offer A]')
+    """
+
+    def __init__(self, category_column: str = 'Category', sheet_column: str = 'Source_Sheet',
+                 total_column: str = 'total_price'):
+        """
+        Initialize an empty cache
+
+        Args:
+            category_column: Column holding categories
+            sheet_column: Column holding the source sheet
+            total_column: Base total column; '<total_column>[<offer>]' columns are tracked too
+        """
+        self.category_column = category_column
+        self.sheet_column = sheet_column
+        self.total_column = total_column
+        self._snapshot: Optional[pd.DataFrame] = None
+        self._by_category: Optional[pd.DataFrame] = None
+        self._by_sheet: Optional[pd.DataFrame] = None
+        self._source = None
+        # Rows re-aggregated so far (a full rebuild counts every row)
+        self.updated_rows = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_source'] = None  # weak references cannot be pickled; the next sync diffs instead
+        return state
+
+    # ------------------------------------------------------------------ writers
+
+    def rebuild(self, dataframe: pd.DataFrame) -> 'SummaryCache':
+        """Recompute every aggregate from dataframe"""
+        self._snapshot = self._extract(dataframe)
+        self._by_category = self._group(self._snapshot, _CATEGORY)
+        self._by_sheet = self._group(self._snapshot, _SHEET)
+        self._remember(dataframe)
+        self.updated_rows += len(self._snapshot)
+        logger.debug(f"Summary cache rebuilt from {len(self._snapshot)} rows")
+        return self
+
+    def sync(self, dataframe: pd.DataFrame) -> 'SummaryCache':
+        """
+        Bring the cache in line with dataframe
+
+        Args:
+            dataframe: Dataset the summary should describe
+
+        Returns:
+            self, for chaining
+        """
+        if self._snapshot is None or not dataframe.index.is_unique:
+            return self.rebuild(dataframe)
+
+        self._reconcile_columns(dataframe)
+        self._reconcile_rows(dataframe)
+        if self._source is None or self._source() is not dataframe:
+            current = self._extract(dataframe)
+            previous = self._snapshot.loc[current.index, current.columns]
+            changed = ~((current == previous) | (current.isna() & previous.isna())).all(axis=1)
+            if changed.any():
+                self._replace(current.loc[changed])
+            self._remember(dataframe)
+        return self
+
+    def update_rows(self, dataframe: pd.DataFrame, labels: Iterable[Any]) -> None:
+        """
+        Re-aggregate rows that were changed, added or removed in dataframe
+
+        dataframe becomes the tracked dataset: a later sync() with the same object
+        trusts the cache instead of diffing.
+
+        Args:
+            dataframe: Dataset the rows belong to
+            labels: Index labels of the touched rows (labels no longer in dataframe are removed)
+        """
+        if self._snapshot is None or not dataframe.index.is_unique:
+            self.rebuild(dataframe)
+            return
+        self._reconcile_columns(dataframe)
+
+        labels = pd.Index(list(labels)).unique()
+        present = labels[labels.isin(dataframe.index)]
+        removed = labels[~labels.isin(dataframe.index) & labels.isin(self._snapshot.index)]
+        if len(removed):
+            self._apply(self._snapshot.loc[removed], -1)
+            self._snapshot = self._snapshot.drop(index=removed)
+            self.updated_rows += len(removed)
+        if len(present):
+            self._replace(self._extract(dataframe.loc[present]))
+        self._remember(dataframe)
+
+    # ------------------------------------------------------------------ readers
+
+    @property
+    def total_columns(self) -> List[str]:
+        """Tracked total columns, in DataFrame order"""
+        if self._snapshot is None:
+            return []
+        return [col for col in self._snapshot.columns if not col.startswith('_')]
+
+    @property
+    def row_count(self) -> int:
+        return 0 if self._snapshot is None else len(self._snapshot)
+
+    @property
+    def categorized_count(self) -> int:
+        """Rows with a non-empty category"""
+        return 0 if self._snapshot is None else int(self._snapshot[_CATEGORIZED].sum())
+
+    def total(self, column: str) -> float:
+        """Sum of a total column over every row"""
+        if self._snapshot is None or column not in self._snapshot.columns:
+            return 0.0
+        return float(self._by_sheet[column].sum())
+
+    def category_totals(self, column: str) -> Dict[str, float]:
+        """Sum of a total column per category (rows without a category are left out)"""
+        return self._read(self._by_category, column)
+
+    def sheet_totals(self, column: str) -> Dict[str, float]:
+        """Sum of a total column per source sheet"""
+        return self._read(self._by_sheet, column)
+
+    def category_counts(self) -> Dict[str, int]:
+        """Rows per category, most common first, like Series.value_counts()"""
+        counts = self._read(self._by_category, _ROWS)
+        return {key: int(count) for key, count in sorted(counts.items(), key=lambda item: -item[1])}
+
+    def category_table(self, columns: List[str]) -> pd.DataFrame:
+        """
+        Totals per category as a DataFrame, blank and missing categories folded into ''
+
+        Args:
+            columns: Total columns to include
+
+        Returns:
+            DataFrame with a 'Category' column followed by columns, sorted by category
+        """
+        columns = [col for col in columns if col in self.total_columns]
+        if self._by_category is None:
+            return pd.DataFrame(columns=['Category'] + columns)
+        frame = self._by_category[self._by_category[_ROWS] > 0]
+        keys = frame.index.to_series().fillna('').astype(str).values
+        table = frame[columns].groupby(keys, sort=True).sum()
+        table.index.name = 'Category'
+        return table.reset_index()
+
+    def sheet_coverage(self) -> Dict[str, Tuple[int, int]]:
+        """(rows, categorized rows) per source sheet"""
+        if self._by_sheet is None:
+            return {}
+        sheets = self._by_sheet[(self._by_sheet[_ROWS] > 0) & self._by_sheet.index.notna()]
+        return {sheet: (int(round(rows)), int(round(categorized)))
+                for sheet, rows, categorized in zip(sheets.index, sheets[_ROWS], sheets[_CATEGORIZED])}
+
+    # ------------------------------------------------------------------ internals
+
+    def _is_total_column(self, column: Any) -> bool:
+        return isinstance(column, str) and (
+            column == self.total_column or ('[' in column and ']' in column and self.total_column in column)
+        )
+
+    def _remember(self, dataframe: pd.DataFrame) -> None:
+        try:
+            self._source = weakref.ref(dataframe)
+        except TypeError:
+            self._source = None
+
+    def _extract(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        """Per-row snapshot: category, sheet, counters and numeric totals"""
+        snapshot = pd.DataFrame(index=dataframe.index)
+        for target, source in ((_CATEGORY, self.category_column), (_SHEET, self.sheet_column)):
+            if source in dataframe.columns:
+                snapshot[target] = dataframe[source].astype(object)
+            else:
+                snapshot[target] = pd.Series(np.nan, index=dataframe.index, dtype=object)
+        category = snapshot[_CATEGORY]
+        snapshot[_ROWS] = 1.0
+        snapshot[_CATEGORIZED] = (category.notna() & (category != '')).astype(float)
+        for column in dataframe.columns:
+            if self._is_total_column(column):
+                snapshot[column] = pd.to_numeric(dataframe[column], errors='coerce').fillna(0.0).astype(float)
+        return snapshot
+
+    @staticmethod
+    def _value_columns(frame: pd.DataFrame) -> List[str]:
+        return [col for col in frame.columns if col not in (_CATEGORY, _SHEET)]
+
+    def _group(self, frame: pd.DataFrame, key: str) -> pd.DataFrame:
+        return frame.groupby(key, dropna=False, sort=False)[self._value_columns(frame)].sum()
+
+    def _apply(self, frame: pd.DataFrame, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) rows from the aggregates"""
+        if frame.empty:
+            return
+        for attr, key in (('_by_category', _CATEGORY), ('_by_sheet', _SHEET)):
+            delta = self._group(frame, key)
+            setattr(self, attr, getattr(self, attr).add(delta * sign, fill_value=0.0))
+
+    def _replace(self, rows: pd.DataFrame) -> None:
+        """Swap the snapshot of rows (existing or new labels) for their current values"""
+        existing = rows.index[rows.index.isin(self._snapshot.index)]
+        self._apply(self._snapshot.loc[existing], -1)
+        self._apply(rows, 1)
+        self._snapshot.loc[existing, rows.columns] = rows.loc[existing]
+        added = rows.index.difference(existing, sort=False)
+        if len(added):
+            self._snapshot = pd.concat([self._snapshot, rows.loc[added]])
+        self.updated_rows += len(rows)
+
+    def _reconcile_columns(self, dataframe: pd.DataFrame) -> None:
+        """Start tracking new offer total columns and drop the ones that disappeared"""
+        wanted = [col for col in dataframe.columns if self._is_total_column(col)]
+        tracked = self.total_columns
+        for column in [col for col in tracked if col not in wanted]:
+            self._snapshot = self._snapshot.drop(columns=column)
+            self._by_category = self._by_category.drop(columns=column)
+            self._by_sheet = self._by_sheet.drop(columns=column)
+        new_columns = [col for col in wanted if col not in tracked]
+        if not new_columns:
+            return
+        # A new offer column is summed once, over the rows already tracked
+        common = self._snapshot.index.intersection(dataframe.index, sort=False)
+        for column in new_columns:
+            values = pd.Series(0.0, index=self._snapshot.index)
+            values.loc[common] = pd.to_numeric(dataframe.loc[common, column], errors='coerce').fillna(0.0)
+            self._snapshot[column] = values
+        keys = self._snapshot[[_CATEGORY, _SHEET] + new_columns]
+        for attr, key in (('_by_category', _CATEGORY), ('_by_sheet', _SHEET)):
+            totals = keys.groupby(key, dropna=False, sort=False)[new_columns].sum()
+            setattr(self, attr, getattr(self, attr).join(totals, how='outer').fillna(0.0))
+        logger.debug(f"Summary cache now tracks {new_columns}")
+
+    def _reconcile_rows(self, dataframe: pd.DataFrame) -> None:
+        """Add rows new to dataframe and remove rows it no longer has"""
+        if dataframe.index.equals(self._snapshot.index):
+            return
+        added = dataframe.index.difference(self._snapshot.index, sort=False)
+        removed = self._snapshot.index.difference(dataframe.index, sort=False)
+        if len(added) or len(removed):
+            self.update_rows(dataframe, added.append(removed))
+
+    @staticmethod
+    def _read(aggregates: Optional[pd.DataFrame], column: str) -> Dict[str, float]:
+        if aggregates is None or column not in aggregates.columns:
+            return {}
+        values = aggregates.loc[aggregates.index.notna() & (aggregates[_ROWS] > 0), column]
+        return {key: float(value) for key, value in values.items()}
+
+
+def get_summary_cache(file_mapping) -> SummaryCache:
+    """The SummaryCache of a file mapping, created on first use and kept on the mapping"""
+    return file_mapping_cache(file_mapping, 'summary_cache', SummaryCache)
@@ -66,6 +66,288 @@ class MathematicalCheck:
     is_valid: bool
 
 
+class ValidationRow:
+    """
+    One row as seen by validation rules, with numbers parsed at most once
+
+    Every rule reading the same cell shares the parse, so adding a rule does
+    not add another round of parsing.
+    """
+    __slots__ = ('index', 'cells', '_parse', '_numbers')
+
+    def __init__(self, index: int, cells: List[str], parse):
+        self.index = index
+        self.cells = cells
+        self._parse = parse
+        self._numbers: Dict[int, Optional[float]] = {}
+
+    def has(self, col_idx: int) -> bool:
+        """Whether the row reaches the column"""
+        return col_idx < len(self.cells)
+
+    def number(self, col_idx: int) -> Optional[float]:
+        """DataValidator._parse_number of a cell, None when the row is too short"""
+        if col_idx in self._numbers:
+            return self._numbers[col_idx]
+        number = self._parse(self.cells[col_idx]) if col_idx < len(self.cells) else None
+        self._numbers[col_idx] = number
+        return number
+
+
+class ValidationRule:
+    """
+    Base class for rules evaluated by DataValidator's single pass over a sheet
+
+    A rule is created for each validated sheet, sees every row through
+    check_row() and returns its issues from finish(), in the order they should
+    be reported. Register new rules with DataValidator.add_rule().
+    """
+
+    def __init__(self, validator: 'DataValidator', column_mapping: Dict[int, ColumnType],
+                 row_classifications: Dict[int, str]):
+        self.validator = validator
+        self.column_mapping = column_mapping
+        self.row_classifications = row_classifications
+
+    @property
+    def active(self) -> bool:
+        """False when the rule cannot apply to this mapping, so the pass skips it"""
+        return True
+
+    def check_row(self, row: ValidationRow) -> None:
+        """Inspect one row"""
+
+    def finish(self) -> List[ValidationIssue]:
+        """Issues found, after the last row"""
+        return []
+
+
+class MathematicalConsistencyRule(ValidationRule):
+    """quantity * unit price must match the total price within the validator's tolerance"""
+
+    def __init__(self, validator, column_mapping, row_classifications):
+        super().__init__(validator, column_mapping, row_classifications)
+        self.checks: List[MathematicalCheck] = []
+        self.quantity_col: Optional[int] = None
+        self.unit_price_col: Optional[int] = None
+        self.total_price_col: Optional[int] = None
+        # The last column of each type is used
+        for col_idx, col_type in column_mapping.items():
+            if col_type == ColumnType.QUANTITY:
+                self.quantity_col = col_idx
+            elif col_type == ColumnType.UNIT_PRICE:
+                self.unit_price_col = col_idx
+            elif col_type == ColumnType.TOTAL_PRICE:
+                self.total_price_col = col_idx
+
+    @property
+    def active(self) -> bool:
+        return None not in (self.quantity_col, self.unit_price_col, self.total_price_col)
+
+    def check_row(self, row: ValidationRow) -> None:
+        try:
+            quantity = row.number(self.quantity_col)
+            unit_price = row.number(self.unit_price_col)
+            total_price = row.number(self.total_price_col)
+            if quantity is None or unit_price is None or total_price is None:
+                return
+
+            calculated_total = quantity * unit_price
+            difference = abs(calculated_total - total_price)
+            tolerance = total_price * self.validator.tolerance_percentage
+            self.checks.append(MathematicalCheck(
+                row_index=row.index,
+                quantity=quantity,
+                unit_price=unit_price,
+                total_price=total_price,
+                calculated_total=calculated_total,
+                difference=difference,
+                tolerance=tolerance,
+                is_valid=difference <= tolerance
+            ))
+        except (ValueError, IndexError) as e:
+            logger.warning(f"Error validating row {row.index}: {e}")
+
+    def finish(self) -> List[ValidationIssue]:
+        return [
+            ValidationIssue(
+                row_index=check.row_index,
+                column_index=None,
+                validation_type=ValidationType.MATHEMATICAL,
+                level=ValidationLevel.ERROR,
+                message=f"Mathematical inconsistency: calculated {check.calculated_total}, actual {check.total_price}",
+                expected_value=check.calculated_total,
+                actual_value=check.total_price,
+                suggestion="Check quantity and unit price calculations"
+            )
+            for check in self.checks if not check.is_valid
+        ]
+
+
+class DataTypeRule(ValidationRule):
+    """Quantity, unit price and unit cells must have the expected format"""
+
+    CHECKED_TYPES = (ColumnType.QUANTITY, ColumnType.UNIT_PRICE, ColumnType.UNIT)
+
+    def __init__(self, validator, column_mapping, row_classifications):
+        super().__init__(validator, column_mapping, row_classifications)
+        self.columns = [(col_idx, col_type) for col_idx, col_type in column_mapping.items()
+                        if col_type in self.CHECKED_TYPES]
+        # Issues are reported column by column, in mapping order
+        self.issues_by_column: Dict[int, List[ValidationIssue]] = {col_idx: [] for col_idx, _ in self.columns}
+
+    @property
+    def active(self) -> bool:
+        return bool(self.columns)
+
+    def check_row(self, row: ValidationRow) -> None:
+        for col_idx, col_type in self.columns:
+            if not row.has(col_idx):
+                continue
+            value = row.cells[col_idx]
+            if not value or value.strip() == "":
+                continue
+
+            if col_type == ColumnType.QUANTITY:
+                if row.number(col_idx) is None:
+                    self.issues_by_column[col_idx].append(ValidationIssue(
+                        row_index=row.index,
+                        column_index=col_idx,
+                        validation_type=ValidationType.DATA_TYPE,
+                        level=ValidationLevel.WARNING, # Changed from ERROR to WARNING
+                        message=f"Invalid quantity format: {value}",
+                        expected_value="Numeric value",
+                        actual_value=value,
+                        suggestion="Enter a valid numeric quantity"
+                    ))
+
+            elif col_type == ColumnType.UNIT_PRICE:
+                if row.number(col_idx) is None and not self.validator._is_currency_format(value):
+                    self.issues_by_column[col_idx].append(ValidationIssue(
+                        row_index=row.index,
+                        column_index=col_idx,
+                        validation_type=ValidationType.DATA_TYPE,
+                        level=ValidationLevel.ERROR,
+                        message=f"Invalid unit price format: {value}",
+                        expected_value="Currency value",
+                        actual_value=value,
+                        suggestion="Enter a valid currency amount"
+                    ))
+
+            elif not self.validator._is_valid_unit(value):
+                self.issues_by_column[col_idx].append(ValidationIssue(
+                    row_index=row.index,
+                    column_index=col_idx,
+                    validation_type=ValidationType.DATA_TYPE,
+                    level=ValidationLevel.WARNING,
+                    message=f"Unusual unit format: {value}",
+                    expected_value="Standard unit",
+                    actual_value=value,
+                    suggestion="Use standard unit formats (m², kg, pcs, etc.)"
+                ))
+
+    def finish(self) -> List[ValidationIssue]:
+        return [issue for col_idx, _ in self.columns for issue in self.issues_by_column[col_idx]]
+
+
+class BusinessRule(ValidationRule):
+    """Primary line items need every required column, and quantities must not be negative"""
+
+    REQUIRED_TYPES = [ColumnType.DESCRIPTION, ColumnType.QUANTITY, ColumnType.UNIT_PRICE,
+                      ColumnType.TOTAL_PRICE, ColumnType.UNIT, ColumnType.CODE]
+
+    def __init__(self, validator, column_mapping, row_classifications):
+        super().__init__(validator, column_mapping, row_classifications)
+        # Last column of each required type; the first quantity column for the sign check
+        self.required_columns: Dict[ColumnType, int] = {}
+        self.quantity_col: Optional[int] = None
+        for col_idx, col_type in column_mapping.items():
+            if col_type in self.REQUIRED_TYPES:
+                self.required_columns[col_type] = col_idx
+            if col_type == ColumnType.QUANTITY and self.quantity_col is None:
+                self.quantity_col = col_idx
+        self.missing_issues: List[ValidationIssue] = []
+        self.negative_issues: List[ValidationIssue] = []
+
+    def check_row(self, row: ValidationRow) -> None:
+        # Only check line items (not headers, subtotals, etc.)
+        if self.row_classifications.get(row.index, "") == "primary_line_item":
+            missing_columns = []
+            for required_type in self.REQUIRED_TYPES:
+                col_idx = self.required_columns.get(required_type)
+                if col_idx is None or not row.has(col_idx) or not row.cells[col_idx] or row.cells[col_idx].strip() == "":
+                    missing_columns.append(required_type.value)
+
+            if missing_columns:
+                self.missing_issues.append(ValidationIssue(
+                    row_index=row.index,
+                    column_index=None,
+                    validation_type=ValidationType.BUSINESS_RULE,
+                    level=ValidationLevel.ERROR,
+                    message=f"Missing required columns: {', '.join(missing_columns)}",
+                    expected_value="All required columns present",
+                    actual_value=f"Missing: {', '.join(missing_columns)}",
+                    suggestion="Ensure all required columns (Description, Quantity, Unit Price, Total Price, Unit, Code) have values"
+                ))
+
+        if self.quantity_col is not None:
+            quantity = row.number(self.quantity_col)
+            if quantity is not None and quantity < 0:
+                self.negative_issues.append(ValidationIssue(
+                    row_index=row.index,
+                    column_index=self.quantity_col,
+                    validation_type=ValidationType.BUSINESS_RULE,
+                    level=ValidationLevel.ERROR,
+                    message="Negative quantity detected",
+                    expected_value="Positive number",
+                    actual_value=quantity,
+                    suggestion="Quantities should be positive"
+                ))
+
+    def finish(self) -> List[ValidationIssue]:
+        return self.missing_issues + self.negative_issues
+
+
+class ConsistencyRule(ValidationRule):
+    """Descriptions (first description column) should not repeat"""
+
+    def __init__(self, validator, column_mapping, row_classifications):
+        super().__init__(validator, column_mapping, row_classifications)
+        self.description_col = next(
+            (col_idx for col_idx, col_type in column_mapping.items() if col_type == ColumnType.DESCRIPTION), None
+        )
+        self.descriptions: Set[str] = set()
+        self.issues: List[ValidationIssue] = []
+
+    @property
+    def active(self) -> bool:
+        return self.description_col is not None
+
+    def check_row(self, row: ValidationRow) -> None:
+        if not row.has(self.description_col):
+            return
+        desc = row.cells[self.description_col].strip()
+        if desc and desc in self.descriptions:
+            self.issues.append(ValidationIssue(
+                row_index=row.index,
+                column_index=self.description_col,
+                validation_type=ValidationType.CONSISTENCY,
+                level=ValidationLevel.WARNING,
+                message=f"Duplicate description: {desc}",
+                expected_value="Unique description",
+                actual_value=desc,
+                suggestion="Consider merging duplicate items or adding distinguishing details"
+            ))
+        self.descriptions.add(desc)
+
+    def finish(self) -> List[ValidationIssue]:
+        return self.issues
+
+
+# Rules run by validate_sheet, in the order their issues are reported
+DEFAULT_RULES = [MathematicalConsistencyRule, DataTypeRule, BusinessRule, ConsistencyRule]
+
+
 class DataValidator:
     """
     Comprehensive data validator with mathematical consistency and business rules
@@ -81,6 +363,8 @@ class DataValidator:
         self.config = get_config()
         self.tolerance_percentage = tolerance_percentage
         self._setup_patterns()
+        # ValidationRule subclasses run by validate_sheet, in reporting order
+        self.rule_types: List[type] = list(DEFAULT_RULES)
         
         logger.info("Data Validator initialized")
     
@@ -116,6 +400,39 @@ class DataValidator:
             r'^units$',           # units
         ]
     
+    def add_rule(self, rule_type: type) -> None:
+        """
+        Register a ValidationRule subclass, evaluated by validate_sheet in the same pass as the built-in rules
+
+        Args:
+            rule_type: ValidationRule subclass; its issues are reported after those of earlier rules
+        """
+        self.rule_types.append(rule_type)
+
+    def run_rules(self, sheet_data: List[List[str]], column_mapping: Dict[int, ColumnType],
+                  row_classifications: Dict[int, str], rule_types: List[type]) -> List[ValidationRule]:
+        """
+        Evaluate rules together in a single pass over the sheet
+
+        Args:
+            sheet_data: Sheet data as list of rows
+            column_mapping: Dictionary mapping column index to ColumnType
+            row_classifications: Dictionary mapping row index to classification
+            rule_types: ValidationRule subclasses to evaluate
+
+        Returns:
+            The rule instances, after every row was checked
+        """
+        rules = [rule_type(self, column_mapping, row_classifications) for rule_type in rule_types]
+        active = [rule for rule in rules if rule.active]
+        if active:
+            parse = self._parse_number
+            for row_idx, cells in enumerate(sheet_data):
+                row = ValidationRow(row_idx, cells, parse)
+                for rule in active:
+                    rule.check_row(row)
+        return rules
+
     def validate_mathematical_consistency(self, sheet_data: List[List[str]], 
                                         column_mapping: Dict[int, ColumnType]) -> List[MathematicalCheck]:
         """
@@ -128,62 +445,8 @@ class DataValidator:
         Returns:
             List of mathematical check results
         """
-        checks = []
-        
-        # Find relevant columns
-        quantity_col: Optional[int] = None
-        unit_price_col: Optional[int] = None
-        total_price_col: Optional[int] = None
-        
-        for col_idx, col_type in column_mapping.items():
-            if col_type == ColumnType.QUANTITY:
-                quantity_col = col_idx
-            elif col_type == ColumnType.UNIT_PRICE:
-                unit_price_col = col_idx
-            elif col_type == ColumnType.TOTAL_PRICE:
-                total_price_col = col_idx
-        
-        if not all([quantity_col is not None, unit_price_col is not None, total_price_col is not None]):
-            return checks
-        
-        for row_idx, row in enumerate(sheet_data):
-            try:
-                # Extract values with proper null checks
-                quantity = None
-                unit_price = None
-                total_price = None
-                
-                if quantity_col is not None and quantity_col < len(row):
-                    quantity = self._parse_number(row[quantity_col])
-                if unit_price_col is not None and unit_price_col < len(row):
-                    unit_price = self._parse_number(row[unit_price_col])
-                if total_price_col is not None and total_price_col < len(row):
-                    total_price = self._parse_number(row[total_price_col])
-                
-                if all(v is not None for v in [quantity, unit_price, total_price]):
-                    # Type assertion to help type checker
-                    assert quantity is not None and unit_price is not None and total_price is not None
-                    calculated_total = quantity * unit_price
-                    difference = abs(calculated_total - total_price)
-                    tolerance = total_price * self.tolerance_percentage
-                    is_valid = difference <= tolerance
-                    
-                    checks.append(MathematicalCheck(
-                        row_index=row_idx,
-                        quantity=quantity,
-                        unit_price=unit_price,
-                        total_price=total_price,
-                        calculated_total=calculated_total,
-                        difference=difference,
-                        tolerance=tolerance,
-                        is_valid=is_valid
-                    ))
-                    
-            except (ValueError, IndexError) as e:
-                logger.warning(f"Error validating row {row_idx}: {e}")
-                continue
-        
-        return checks
+        rule, = self.run_rules(sheet_data, column_mapping, {}, [MathematicalConsistencyRule])
+        return rule.checks
     
     def validate_sheet(self, sheet_data: List[List[str]], 
                       column_mapping: Dict[int, ColumnType],
@@ -191,6 +454,9 @@ class DataValidator:
         """
         Validate a complete sheet with all validation types
         
+        All registered rules are evaluated in one pass over the rows, sharing
+        parsed cell values.
+        
         Args:
             sheet_data: Sheet data as list of rows
             column_mapping: Dictionary mapping column index to ColumnType
@@ -200,33 +466,8 @@ class DataValidator:
             ValidationResult with all validation issues and summary
         """
         issues = []
-        
-        # Mathematical consistency validation
-        math_checks = self.validate_mathematical_consistency(sheet_data, column_mapping)
-        for check in math_checks:
-            if not check.is_valid:
-                issues.append(ValidationIssue(
-                    row_index=check.row_index,
-                    column_index=None,
-                    validation_type=ValidationType.MATHEMATICAL,
-                    level=ValidationLevel.ERROR,
-                    message=f"Mathematical inconsistency: calculated {check.calculated_total}, actual {check.total_price}",
-                    expected_value=check.calculated_total,
-                    actual_value=check.total_price,
-                    suggestion="Check quantity and unit price calculations"
-                ))
-        
-        # Data type validation
-        data_type_issues = self.validate_data_types(sheet_data, column_mapping)
-        issues.extend(data_type_issues)
-        
-        # Business rule validation
-        business_issues = self.validate_business_rules(sheet_data, column_mapping, row_classifications)
-        issues.extend(business_issues)
-        
-        # Consistency validation
-        consistency_issues = self.validate_consistency(sheet_data, column_mapping)
-        issues.extend(consistency_issues)
+        for rule in self.run_rules(sheet_data, column_mapping, row_classifications, self.rule_types):
+            issues.extend(rule.finish())
         
         # Calculate summary
         summary = self._calculate_summary(issues)
@@ -251,159 +492,21 @@ class DataValidator:
     def validate_data_types(self, sheet_data: List[List[str]], 
                            column_mapping: Dict[int, ColumnType]) -> List[ValidationIssue]:
         """Validate data types for each column"""
-        issues = []
-        
-        for col_idx, col_type in column_mapping.items():
-            for row_idx, row in enumerate(sheet_data):
-                if col_idx >= len(row):
-                    continue
-                    
-                value = row[col_idx]
-                if not value or value.strip() == "":
-                    continue
-                
-                if col_type == ColumnType.QUANTITY:
-                    if not self._is_valid_number(value):
-                        issues.append(ValidationIssue(
-                            row_index=row_idx,
-                            column_index=col_idx,
-                            validation_type=ValidationType.DATA_TYPE,
-                            level=ValidationLevel.WARNING, # Changed from ERROR to WARNING
-                            message=f"Invalid quantity format: {value}",
-                            expected_value="Numeric value",
-                            actual_value=value,
-                            suggestion="Enter a valid numeric quantity"
-                        ))
-                
-                elif col_type == ColumnType.UNIT_PRICE:
-                    if not self._is_valid_currency(value):
-                        issues.append(ValidationIssue(
-                            row_index=row_idx,
-                            column_index=col_idx,
-                            validation_type=ValidationType.DATA_TYPE,
-                            level=ValidationLevel.ERROR,
-                            message=f"Invalid unit price format: {value}",
-                            expected_value="Currency value",
-                            actual_value=value,
-                            suggestion="Enter a valid currency amount"
-                        ))
-                
-                elif col_type == ColumnType.UNIT:
-                    if not self._is_valid_unit(value):
-                        issues.append(ValidationIssue(
-                            row_index=row_idx,
-                            column_index=col_idx,
-                            validation_type=ValidationType.DATA_TYPE,
-                            level=ValidationLevel.WARNING,
-                            message=f"Unusual unit format: {value}",
-                            expected_value="Standard unit",
-                            actual_value=value,
-                            suggestion="Use standard unit formats (m², kg, pcs, etc.)"
-                        ))
-        
-        return issues
+        rule, = self.run_rules(sheet_data, column_mapping, {}, [DataTypeRule])
+        return rule.finish()
     
     def validate_business_rules(self, sheet_data: List[List[str]], 
                               column_mapping: Dict[int, ColumnType],
                               row_classifications: Dict[int, str]) -> List[ValidationIssue]:
         """Validate business rules and logic"""
-        issues = []
-        
-        # Define required column types
-        required_types = [ColumnType.DESCRIPTION, ColumnType.QUANTITY, ColumnType.UNIT_PRICE, 
-                         ColumnType.TOTAL_PRICE, ColumnType.UNIT, ColumnType.CODE]
-        
-        # Find required columns
-        required_columns = {}
-        for col_idx, col_type in column_mapping.items():
-            if col_type in required_types:
-                required_columns[col_type] = col_idx
-        
-        # Check for missing required columns in line items
-        for row_idx, row in enumerate(sheet_data):
-            # Only check line items (not headers, subtotals, etc.)
-            row_type = row_classifications.get(row_idx, "")
-            if row_type == "primary_line_item":
-                missing_columns = []
-                for required_type in required_types:
-                    if required_type not in required_columns:
-                        missing_columns.append(required_type.value)
-                    else:
-                        col_idx = required_columns[required_type]
-                        if col_idx >= len(row) or not row[col_idx] or row[col_idx].strip() == "":
-                            missing_columns.append(required_type.value)
-                
-                if missing_columns:
-                    issues.append(ValidationIssue(
-                        row_index=row_idx,
-                        column_index=None,
-                        validation_type=ValidationType.BUSINESS_RULE,
-                        level=ValidationLevel.ERROR,
-                        message=f"Missing required columns: {', '.join(missing_columns)}",
-                        expected_value="All required columns present",
-                        actual_value=f"Missing: {', '.join(missing_columns)}",
-                        suggestion="Ensure all required columns (Description, Quantity, Unit Price, Total Price, Unit, Code) have values"
-                    ))
-        
-        # Check for negative quantities
-        quantity_col = None
-        for col_idx, col_type in column_mapping.items():
-            if col_type == ColumnType.QUANTITY:
-                quantity_col = col_idx
-                break
-        
-        if quantity_col is not None:
-            for row_idx, row in enumerate(sheet_data):
-                if quantity_col < len(row):
-                    try:
-                        quantity = self._parse_number(row[quantity_col])
-                        if quantity is not None and quantity < 0:
-                            issues.append(ValidationIssue(
-                                row_index=row_idx,
-                                column_index=quantity_col,
-                                validation_type=ValidationType.BUSINESS_RULE,
-                                level=ValidationLevel.ERROR,
-                                message="Negative quantity detected",
-                                expected_value="Positive number",
-                                actual_value=quantity,
-                                suggestion="Quantities should be positive"
-                            ))
-                    except (ValueError, IndexError):
-                        continue
-        
-        return issues
+        rule, = self.run_rules(sheet_data, column_mapping, row_classifications, [BusinessRule])
+        return rule.finish()
     
     def validate_consistency(self, sheet_data: List[List[str]], 
                            column_mapping: Dict[int, ColumnType]) -> List[ValidationIssue]:
         """Validate data consistency across the sheet"""
-        issues = []
-        
-        # Check for duplicate descriptions
-        description_col = None
-        for col_idx, col_type in column_mapping.items():
-            if col_type == ColumnType.DESCRIPTION:
-                description_col = col_idx
-                break
-        
-        if description_col is not None:
-            descriptions = {}
-            for row_idx, row in enumerate(sheet_data):
-                if description_col < len(row):
-                    desc = row[description_col].strip()
-                    if desc and desc in descriptions:
-                        issues.append(ValidationIssue(
-                            row_index=row_idx,
-                            column_index=description_col,
-                            validation_type=ValidationType.CONSISTENCY,
-                            level=ValidationLevel.WARNING,
-                            message=f"Duplicate description: {desc}",
-                            expected_value="Unique description",
-                            actual_value=desc,
-                            suggestion="Consider merging duplicate items or adding distinguishing details"
-                        ))
-                    descriptions[desc] = row_idx
-        
-        return issues
+        rule, = self.run_rules(sheet_data, column_mapping, {}, [ConsistencyRule])
+        return rule.finish()
     
     def _parse_number(self, value: str) -> Optional[float]:
         """Parse a string value to a number"""
@@ -424,11 +527,12 @@ class DataValidator:
     
     def _is_valid_currency(self, value: str) -> bool:
         """Check if value is a valid currency format"""
+        return self._is_currency_format(value) or self._is_valid_number(value.strip())
+    
+    def _is_currency_format(self, value: str) -> bool:
+        """Check if value matches one of the currency patterns"""
         value = value.strip()
-        for pattern in self.currency_patterns:
-            if re.match(pattern, value):
-                return True
-        return self._is_valid_number(value)
+        return any(re.match(pattern, value) for pattern in self.currency_patterns)
     
     def _is_valid_unit(self, value: str) -> bool:
         """Check if value is a valid unit format"""
@@ -7,6 +7,7 @@ Complete application integration with GUI and CLI modes
 import sys
 import os
 import argparse
+import copy
 import logging
 import signal
 import threading
@@ -20,34 +21,30 @@ import json
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-# Core components
-from core.file_processor import ExcelProcessor
+# Core components (pandas/openpyxl-backed ones are imported on first use)
 from core.sheet_classifier import SheetClassifier
 from core.column_mapper import ColumnMapper
 from core.row_classifier import RowClassifier
 from core.validator import DataValidator
 from core.mapping_generator import MappingGenerator, FileMapping
-
-# UI components
-try:
-    from ui.main_window import MainWindow
-    from ui.preview_dialog import show_preview_dialog
-    from ui.progress_dialog import show_progress_dialog, ProgressDialog
-    from ui.settings_dialog import show_settings_dialog
-    GUI_AVAILABLE = True
-except ImportError:
-    GUI_AVAILABLE = False
+from core.file_pipeline import process_workbook
+from core.session_store import DEFAULT_BUDGET_MB, SessionStore
 
 # Utils
 from utils.config import get_config, BOQConfig, ensure_default_config, get_user_config_path
-from utils.export import ExcelExporter
+from utils.lazy_import import module_available
 from utils.logger import setup_logging
+from utils.profiler import profile_span, enable_profiling, disable_profiling, get_profiler, MEMORY_MODES, PROFILE_FORMATS
+
+# UI components are imported by run_gui(); only check that Tk is present here
+GUI_AVAILABLE = module_available('tkinter')
 
 # Application settings
 APP_NAME = "BOQ Tools"
 APP_VERSION = "1.0.0"
 DEFAULT_CONFIG_FILE = "config/boq_settings.json"
 DEFAULT_LOG_FILE = "logs/boq_tools.log"
+DEFAULT_PROFILE_FILE = "logs/boq_profile.json"
 
 
 class BOQApplicationController:
@@ -69,19 +66,21 @@ class BOQApplicationController:
         # Initialize components
         self.config: Optional[BOQConfig] = None
         self.logger: Optional[logging.Logger] = None
-        self.processor: Optional[ExcelProcessor] = None
+        self._processor = None
         self.sheet_classifier: Optional[SheetClassifier] = None
         self.column_mapper: Optional[ColumnMapper] = None
         self.row_classifier: Optional[RowClassifier] = None
         self.validator: Optional[DataValidator] = None
         self.mapping_generator: Optional[MappingGenerator] = None
-        self.exporter: Optional[ExcelExporter] = None
         
         # Application state
         self.is_running = False
-        self.current_files = {}
+        self.current_files = SessionStore()  # Processed files, spilled to disk beyond the memory budget
         self.settings = {}
         self.auto_save_timer = None
+        self.profile_output: Optional[Path] = None
+        self.profile_format = 'json'
+        self._sheet_store = None  # Disk cache for raw sheet data, see _spill_sheet_data
         
         # Comparison workflow state
         self.comparison_processor = None
@@ -89,7 +88,8 @@ class BOQApplicationController:
         self.is_comparison_mode = False
         
         # Threading
-        self.processing_lock = threading.Lock()
+        self._active_jobs = 0  # process_file calls in flight, see get_processing_status
+        self._active_jobs_lock = threading.Lock()
         self.shutdown_event = threading.Event()
         
         # Initialize application
@@ -109,6 +109,8 @@ class BOQApplicationController:
             
             # Load settings
             self._load_settings()
+            self._apply_profiling_settings()
+            self._apply_memory_settings()
             
             # Setup signal handlers
             self._setup_signal_handlers()
@@ -153,13 +155,14 @@ class BOQApplicationController:
             max_header_rows = self.settings.get("user_preferences", {}).get("processing_thresholds", {}).get("max_header_rows", 20)
             
             # Initialize processors
-            self.processor = ExcelProcessor()
             self.sheet_classifier = SheetClassifier()
             self.column_mapper = ColumnMapper(max_header_rows=max_header_rows)
             self.row_classifier = RowClassifier()
             self.validator = DataValidator()
             self.mapping_generator = MappingGenerator()
-            self.exporter = ExcelExporter()
+            
+            # Spilled file mappings keep referring to the live column mapper
+            self.current_files.share(self.column_mapper)
             
             self.logger.info("Core components initialized successfully")
             
@@ -167,6 +170,14 @@ class BOQApplicationController:
             self.logger.error(f"Failed to initialize core components: {e}")
             raise
     
+    @property
+    def processor(self):
+        """ExcelProcessor, created on first use (imports openpyxl and pandas)"""
+        if self._processor is None:
+            from core.file_processor import ExcelProcessor
+            self._processor = ExcelProcessor()
+        return self._processor
+    
     def _load_settings(self):
         """Load application settings"""
         assert self.logger is not None
@@ -193,6 +204,51 @@ class BOQApplicationController:
         except Exception as e:
             self.logger.error(f"Failed to save settings: {e}")
     
+    def _apply_profiling_settings(self):
+        """Enable or disable the pipeline profiler from the advanced settings"""
+        profiling = self.settings.get("advanced", {}).get("profiling", {})
+        if profiling.get("enabled", False):
+            enable_profiling(profiling.get("memory_mode", "rss"))
+            self.profile_output = Path(profiling.get("output_file") or DEFAULT_PROFILE_FILE)
+            self.profile_format = profiling.get("format", "json")
+        elif self.profile_output is not None:
+            disable_profiling()
+            self.profile_output = None
+    
+    def _apply_memory_settings(self):
+        """Apply the session memory budget from the advanced settings"""
+        memory = self.settings.get("advanced", {}).get("memory", {})
+        self.current_files.budget_mb = memory.get("session_budget_mb", DEFAULT_BUDGET_MB)
+        self.current_files.enforce_budget()
+    
+    def enable_profiling(self, output_path: Path, format_type: str = 'json', memory_mode: str = 'rss'):
+        """
+        Profile pipeline stages for the rest of the session
+        
+        Args:
+            output_path: Where write_profile() saves the profile
+            format_type: 'json' or 'chrome'
+            memory_mode: 'rss', 'tracemalloc' or 'none'
+        """
+        enable_profiling(memory_mode)
+        self.profile_output = output_path
+        self.profile_format = format_type
+    
+    def write_profile(self) -> Optional[Path]:
+        """Save the recorded pipeline profile, if profiling is enabled and spans were recorded"""
+        profiler = get_profiler()
+        if self.profile_output is None or not profiler.spans:
+            return None
+        try:
+            path = profiler.save(self.profile_output, self.profile_format)
+            assert self.logger is not None
+            self.logger.info(f"Pipeline profile:\n{profiler.format_report()}")
+            return path
+        except Exception as e:
+            assert self.logger is not None
+            self.logger.error(f"Failed to write pipeline profile: {e}")
+            return None
+    
     def _setup_signal_handlers(self):
         """Setup signal handlers for graceful shutdown"""
         def signal_handler(signum, frame):
@@ -207,6 +263,9 @@ class BOQApplicationController:
         """
         Process a single Excel file through the complete pipeline
         
+        Each call analyzes the file with its own copies of the pipeline
+        components, so several files can be processed concurrently.
+        
         Args:
             file_path: Path to Excel file
             progress_callback: Optional progress callback function
@@ -217,110 +276,104 @@ class BOQApplicationController:
             Complete processing results
         """
         assert self.logger is not None
-        assert self.processor is not None
-        assert self.sheet_classifier is not None
-        assert self.column_mapper is not None
-        assert self.row_classifier is not None
-        assert self.validator is not None
-        assert self.mapping_generator is not None
 
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
 
-        # Use an absolute path for the dictionary key to ensure consistency
-        abs_filepath_str = str(file_path.resolve())
-        
         self.logger.info(f"Processing file: {file_path}")
         
+        with self._active_jobs_lock:
+            self._active_jobs += 1
         try:
-            # Load the file first, outside the context manager
-            self.processor.load_file(file_path)
-
-            # Step 1: Use the processor as a context manager to ensure cleanup
-            with self.processor as processor_instance:
-                if progress_callback:
-                    progress_callback(10, "File loaded, analyzing...")
-
-                file_info = processor_instance.get_file_info()
-                sheet_data = processor_instance.get_all_sheets_data()
-                
-                if not sheet_data:
-                    raise ValueError("No data found in any sheets.")
-
-            # Filter sheets if a filter is provided
-            if sheet_filter is not None:
-                sheet_data = {name: data for name, data in sheet_data.items() if name in sheet_filter}
-
-            if progress_callback:
-                progress_callback(20, "Classifying sheets...")
-            
-            # The rest of the processing can happen outside the 'with' block
-            # as the data has been loaded into memory.
-            
-            sheet_classifications = {
-                name: self.sheet_classifier.classify_sheet(data, name) 
-                for name, data in sheet_data.items()
-            }
-            if progress_callback: progress_callback(30, "Sheets classified")
-
-            column_mapping_results = {
-                name: self.column_mapper.process_sheet_mapping(data)
-                for name, data in sheet_data.items()
-            }
-            if progress_callback: progress_callback(50, "Columns mapped")
-
-            column_mappings_dict = {
-                name: {m.column_index: m.mapped_type for m in result.mappings}
-                for name, result in column_mapping_results.items()
-            }
-            
-            row_classifications = {
-                name: self.row_classifier.classify_rows(data, column_mappings_dict.get(name, {}), name)
-                for name, data in sheet_data.items()
-            }
-            if progress_callback: progress_callback(70, "Rows classified")
-
-            row_classifications_dict = {
-                name: {rc.row_index: rc.row_type.value for rc in result.classifications}
-                for name, result in row_classifications.items()
-            }
-
-            validation_results = {
-                name: self.validator.validate_sheet(
-                    data, column_mappings_dict.get(name, {}), row_classifications_dict.get(name, {})
-                )
-                for name, data in sheet_data.items()
-            }
-            if progress_callback: progress_callback(90, "Data validated")
-
-            processor_results = {
-                'file_info': file_info,
-                'sheet_data': sheet_data,
-                'sheet_classifications': sheet_classifications,
-                'column_mappings': column_mapping_results,
-                'row_classifications': row_classifications,
-                'validation_results': validation_results,
-                'sheet_types': sheet_types or {name: 'BOQ' for name in sheet_data.keys()}
-            }
-            
-            file_mapping = self.mapping_generator.generate_file_mapping(processor_results)
-            if progress_callback: progress_callback(100, "Processing complete")
-
-            # Add column mapper reference to file mapping for UI learning functionality
-            file_mapping.column_mapper = self.column_mapper
-
-            self.current_files[abs_filepath_str] = {
-                'file_mapping': file_mapping,
-                'processor_results': processor_results,
-                'processing_time': time.time()
-            }
-            
-            self.logger.info(f"File processing completed: {file_path}")
-            return file_mapping
+            file_mapping, processor_results = process_workbook(
+                file_path, *self.pipeline_components(), sheet_filter=sheet_filter,
+                sheet_types=sheet_types, progress_callback=progress_callback,
+            )
+            return self.register_processed_file(file_path, file_mapping, processor_results)
                 
         except Exception as e:
             self.logger.error(f"Error processing file {file_path}: {e}", exc_info=True)
             raise
+        finally:
+            with self._active_jobs_lock:
+                self._active_jobs -= 1
+    
+    def pipeline_components(self) -> tuple:
+        """
+        Return private copies of the pipeline components for one processing job
+        
+        The copies carry the learned canonical mappings and the settings of the
+        shared instances, but no state another job could be mutating. Passing
+        them to JobScheduler.submit_process pickles them the same way.
+        
+        Returns:
+            Tuple of (sheet classifier, column mapper, row classifier, validator, mapping generator)
+        """
+        assert self.sheet_classifier is not None
+        assert self.column_mapper is not None
+        assert self.row_classifier is not None
+        assert self.validator is not None
+        assert self.mapping_generator is not None
+        
+        return copy.deepcopy((self.sheet_classifier, self.column_mapper, self.row_classifier,
+                              self.validator, self.mapping_generator))
+    
+    def register_processed_file(self, file_path: Path, file_mapping: FileMapping,
+                                processor_results: Dict[str, Any]) -> FileMapping:
+        """
+        Store the result of process_workbook as an open file
+        
+        The mapping gets the shared column mapper back, so corrections made in
+        the UI teach the application rather than a job's discarded copy.
+        
+        Args:
+            file_path: Path of the processed workbook
+            file_mapping: Mapping returned by process_workbook
+            processor_results: Processor results returned by process_workbook
+        
+        Returns:
+            The stored file mapping
+        """
+        # Use an absolute path for the dictionary key to ensure consistency
+        abs_filepath_str = str(Path(file_path).resolve())
+        file_mapping.column_mapper = self.column_mapper
+
+        if self.settings.get("advanced", {}).get("memory", {}).get("compact_sheet_data", False):
+            self._spill_sheet_data(abs_filepath_str, file_mapping, processor_results)
+
+        self.current_files[abs_filepath_str] = {
+            'file_mapping': file_mapping,
+            'processor_results': processor_results,
+            'processing_time': time.time()
+        }
+        
+        self.logger.info(f"File processing completed: {file_path}")
+        return file_mapping
+    
+    def _spill_sheet_data(self, file_key: str, file_mapping: FileMapping, processor_results: Dict[str, Any]):
+        """
+        Replace the raw sheet grids of a processed file with references into the sheet cache
+        
+        Row classifications drop their row values too; readers fall back to
+        sheet.sheet_data[row_index], which reloads the sheet on demand.
+        """
+        from core.sheet_store import SheetDataStore
+        
+        with self._active_jobs_lock:
+            if self._sheet_store is None:
+                cache_dir = self.settings.get("advanced", {}).get("memory", {}).get("cache_dir") or None
+                self._sheet_store = SheetDataStore(cache_dir)
+                self.current_files.share(self._sheet_store)
+        
+        sheet_refs = self._sheet_store.spill(file_key, processor_results['sheet_data'])
+        processor_results['sheet_data'] = sheet_refs
+        for sheet in file_mapping.sheets:
+            sheet.sheet_data = sheet_refs.get(sheet.sheet_name)
+            for rc in sheet.row_classifications:
+                rc.row_data = None
+        for result in processor_results.get('row_classifications', {}).values():
+            for rc in result.classifications:
+                rc.row_data = None
     
     def export_file(self, file_path: str, export_path: Path, format_type: str) -> bool:
         """
@@ -346,50 +399,69 @@ class BOQApplicationController:
             raise ValueError(f"File not found in processed files: {file_path}")
         
         try:
-            assert self.logger is not None
-            assert self.exporter is not None
+            from core.export_pipeline import ExportTable, write_export
+
             file_data = self.current_files[processed_file_key]
             file_mapping = file_data['file_mapping']
             
-            # This now correctly dispatches to the exporter
-            return self.exporter.export_data(file_mapping, export_path, format_type)
+            # Same table and writers as batch_process, so both produce identical files
+            table = ExportTable.from_file_mapping(file_mapping, Path(processed_file_key).stem)
+            with profile_span('export', rows=len(table.dataframe), format=format_type):
+                write_export(table, format_type, export_path)
+            return True
                 
         except Exception as e:
             assert self.logger is not None
             self.logger.error(f"Error exporting file {file_path}: {e}", exc_info=True)
             return False
     
-    def batch_process(self, file_paths: List[Path], output_dir: Path) -> Dict[str, bool]:
+    def batch_process(self, file_paths: List[Path], output_dir: Path,
+                      formats: Optional[List[str]] = None, max_workers: Optional[int] = None) -> Dict[str, bool]:
         """
         Process multiple files in batch
         
+        Each processed file is converted to one table that every requested format is
+        written from concurrently, while the next file is already being processed.
+        
         Args:
             file_paths: List of file paths to process
             output_dir: Output directory for exports
+            formats: Export formats per file (default: normalized_excel)
+            max_workers: Maximum number of export writer threads
             
         Returns:
             Dictionary mapping file paths to success status
         """
+        from core.export_pipeline import ExportTable, MultiFormatExporter
+        
         results = {}
+        pending = {}
         
-        for file_path in file_paths:
-            try:
-                assert self.logger is not None
-                self.logger.info(f"Processing file: {file_path}")
-                
-                # Process file
-                file_mapping = self.process_file(file_path)
-                
-                # Export file
-                export_path = output_dir / f"{file_path.stem}_processed.xlsx"
-                success = self.export_file(str(file_path), export_path, 'normalized_excel')
-                
-                results[str(file_path)] = success
-                
-            except Exception as e:
+        with MultiFormatExporter(formats, max_workers=max_workers) as exporter:
+            for file_path in file_paths:
+                try:
+                    assert self.logger is not None
+                    self.logger.info(f"Processing file: {file_path}")
+                    
+                    # Process file
+                    file_mapping = self.process_file(file_path)
+                    
+                    # Queue all formats; blocks while earlier files are still being written
+                    table = ExportTable.from_file_mapping(file_mapping, file_path.stem)
+                    pending[str(file_path)] = exporter.submit(table, output_dir)
+                    results[str(file_path)] = False
+                    
+                except Exception as e:
+                    assert self.logger is not None
+                    self.logger.error(f"Failed to process {file_path}: {e}")
+                    results[str(file_path)] = False
+        
+        for file_key, future in pending.items():
+            export_result = future.result()
+            results[file_key] = export_result.success
+            if export_result.errors:
                 assert self.logger is not None
-                self.logger.error(f"Failed to process {file_path}: {e}")
-                results[str(file_path)] = False
+                self.logger.error(f"Export failed for {file_key}: {export_result.errors}")
         
         return results
     
@@ -397,7 +469,7 @@ class BOQApplicationController:
         """Get current processing status"""
         return {
             'files_processed': len(self.current_files),
-            'is_processing': self.processing_lock.locked(),
+            'is_processing': self._active_jobs > 0,
             'settings_loaded': bool(self.settings),
             'components_initialized': all([
                 self.processor, self.sheet_classifier, self.column_mapper,
@@ -440,6 +512,8 @@ class BOQApplicationController:
         try:
             import pandas as pd
             import logging
+            from core.boq_schema import apply_schema
+            from core.description_intern import get_description_table
             logger = logging.getLogger(__name__)
             
             rows = []
@@ -547,7 +621,8 @@ class BOQApplicationController:
                 # DEBUG: Log final column order
                 logger.info(f"Final DataFrame columns in order: {list(df_renamed.columns)}")
                 
-                return df_renamed
+                # Categorical labels, float64 values and interned descriptions
+                return apply_schema(df_renamed, get_description_table(file_mapping))
             else:
                 return None
                 
@@ -566,6 +641,9 @@ class BOQApplicationController:
             max_header_rows = self.settings.get("user_preferences", {}).get("processing_thresholds", {}).get("max_header_rows", 20)
             self.column_mapper.max_header_rows = max_header_rows
         
+        self._apply_profiling_settings()
+        self._apply_memory_settings()
+        
         assert self.logger is not None
         self.logger.info("Settings updated and saved")
     
@@ -616,7 +694,9 @@ class BOQApplicationController:
         self._save_settings()
         
         # Clear current files
-        self.current_files.clear()
+        self.current_files.close()
+        if self._sheet_store is not None:
+            self._sheet_store.clear()
         
         assert self.logger is not None
         self.logger.info("Application shutdown completed")
@@ -698,8 +778,12 @@ class BOQApplication:
     
     def run_gui(self):
         """Run the application in GUI mode"""
-        if not GUI_AVAILABLE:
-            print("GUI components not available. Running in CLI mode.")
+        try:
+            if not GUI_AVAILABLE:
+                raise ImportError("tkinter is not available")
+            from ui.main_window import MainWindow
+        except ImportError as e:
+            print(f"GUI components not available ({e}). Running in CLI mode.")
             return self.run_cli()
         
         try:
@@ -775,13 +859,20 @@ class BOQApplication:
     
     def _run_argument_cli(self, args: argparse.Namespace):
         """Run CLI mode with command-line arguments"""
-        if args.file:
+        if args.compare:
+            self._run_compare_cli(args)
+        
+        elif args.file:
             # Process single file
             file_path = Path(args.file)
             if not file_path.exists():
                 print(f"Error: File not found: {file_path}")
                 return
             
+            if args.chunk_rows:
+                self._run_chunked_cli(file_path, args)
+                return
+            
             try:
                 print(f"Processing file: {file_path}")
                 file_mapping = self.controller.process_file(file_path)
@@ -820,7 +911,7 @@ class BOQApplication:
                 return
             
             print(f"Found {len(excel_files)} Excel files")
-            results = self.controller.batch_process(excel_files, output_dir)
+            results = self.controller.batch_process(excel_files, output_dir, args.formats, args.workers)
             
             # Show results
             successful = sum(1 for success in results.values() if success)
@@ -830,6 +921,98 @@ class BOQApplication:
                 status = "✓" if success else "✗"
                 print(f"  {status} {Path(file_path).name}")
     
+    def _run_chunked_cli(self, file_path: Path, args: argparse.Namespace):
+        """Stream a large CSV through mapping, classification and categorization in chunks"""
+        from core.chunked_ingest import ChunkedCsvIngestor
+        from core.category_dictionary import CategoryDictionary
+        
+        if file_path.suffix.lower() != '.csv':
+            print("Error: --chunk-rows only applies to .csv files")
+            return
+        
+        export_path = Path(args.export) if args.export else file_path.with_name(f"{file_path.stem}_processed.csv")
+        ingestor = ChunkedCsvIngestor(chunk_rows=args.chunk_rows, category_dictionary=CategoryDictionary())
+        
+        try:
+            print(f"Processing file in chunks of {args.chunk_rows} rows: {file_path}")
+            result = ingestor.ingest(file_path, export_path)
+        except Exception as e:
+            print(f"Error processing file: {e}")
+            return
+        
+        print(f"Processed {result.total_rows} rows in {result.chunks} chunks ({result.seconds:.2f}s): "
+              f"{result.valid_rows} valid, {result.categorized_rows} categorized")
+        print(f"Rows written to: {export_path}")
+    
+    def _run_compare_cli(self, args: argparse.Namespace):
+        """Compare one or more offers against a master BoQ without the GUI"""
+        from core.comparison_pipeline import ComparisonPipeline
+        from core.category_dictionary import CategoryDictionary
+        from core.columnar_io import is_columnar_path
+        
+        if len(args.compare) < 2:
+            print("Error: --compare needs a master file and at least one offer file")
+            return
+        
+        file_paths = [Path(p) for p in args.compare]
+        missing = [str(p) for p in file_paths if not p.exists()]
+        if missing:
+            print(f"Error: File not found: {', '.join(missing)}")
+            return
+        
+        master_path = file_paths[0]
+        from_dataset = is_columnar_path(master_path)
+        
+        # A saved dataset already names its master and earlier offers; only new offers are named
+        expected_names = file_paths[1:] if from_dataset else file_paths
+        names = args.offer_names or [p.stem for p in expected_names]
+        if len(names) != len(expected_names):
+            which = "offer" if from_dataset else "(master first)"
+            print(f"Error: --offer-names needs {len(expected_names)} {which} names, got {len(names)}")
+            return
+        
+        output_path = Path(args.output) if args.output else master_path.with_name(f"{master_path.stem}_comparison.xlsx")
+        
+        pipeline = ComparisonPipeline(
+            process_file=self.controller.process_file,
+            category_dictionary=CategoryDictionary(),
+            max_workers=args.workers
+        )
+        
+        try:
+            print(f"Comparing {len(file_paths) - 1} offer(s) against master: {master_path}")
+            if from_dataset:
+                result = pipeline.run_dataset(master_path, file_paths[1:], offer_names=names,
+                                              output_path=output_path)
+            else:
+                result = pipeline.run(
+                    master_path,
+                    file_paths[1:],
+                    offer_names=names[1:],
+                    master_offer_name=names[0],
+                    output_path=output_path
+                )
+            if args.save_dataset:
+                dataset_path = pipeline.save_dataset(result, Path(args.save_dataset))
+        except Exception as e:
+            print(f"Error running comparison: {e}")
+            return
+        
+        for offer_name in result.offer_names:
+            if offer_name in result.errors:
+                print(f"  ✗ {offer_name}: {result.errors[offer_name]}")
+            elif offer_name in result.merge_counts:
+                print(f"  ✓ {offer_name}: {result.merge_counts[offer_name]} merged, {result.add_counts[offer_name]} added")
+        if result.warnings:
+            print(f"Comparison completed with {len(result.warnings)} warnings (see log for details)")
+        
+        print("Timing report:")
+        for stage, seconds in result.timings.items():
+            print(f"  {stage:<18} {seconds:8.3f}s")
+        print(f"Comparison workbook written to: {output_path}")
+        if args.save_dataset:
+            print(f"Comparison dataset written to: {dataset_path}")
+    
     def _show_cli_help(self):
         """Show CLI help"""
         print("Available commands:")
@@ -911,7 +1094,13 @@ Examples:
   %(prog)s --gui                    # Run GUI mode
   %(prog)s --file data.xlsx         # Process single file
   %(prog)s --file data.xlsx --export output.xlsx  # Process and export
+  %(prog)s --file erp_dump.csv --chunk-rows 20000 --export dump.parquet  # Stream a very large CSV
   %(prog)s --batch ./input --output ./processed   # Batch process
+  %(prog)s --batch ./input --formats normalized_excel json csv  # Batch export several formats
+  %(prog)s --compare master.xlsx offer1.xlsx offer2.xlsx --offer-names Master A B  # Compare offers
+  %(prog)s --compare master.xlsx offer1.xlsx --save-dataset run.parquet  # Keep a typed dataset
+  %(prog)s --compare run.parquet offer3.xlsx --offer-names C  # Add an offer to a saved comparison
+  %(prog)s --file data.xlsx --profile trace.json --profile-format chrome  # Profile pipeline stages
   %(prog)s                          # Interactive CLI mode
         """
     )
@@ -921,17 +1110,39 @@ Examples:
     mode_group.add_argument('--gui', action='store_true', help='Run in GUI mode')
     mode_group.add_argument('--file', type=str, help='Process single Excel file')
     mode_group.add_argument('--batch', type=str, help='Batch process directory of Excel files')
+    mode_group.add_argument('--compare', type=str, nargs='+', metavar='FILE',
+                            help='Compare offers against a master BoQ or saved .parquet/.arrow dataset (master first)')
     
     # Output options
-    parser.add_argument('--output', type=str, help='Output directory for batch processing')
+    parser.add_argument('--output', type=str, help='Output directory for batch processing, or workbook path for --compare')
     parser.add_argument('--export', type=str, help='Export path for single file processing')
     parser.add_argument('--format', choices=['normalized_excel', 'summary_excel', 'json', 'csv'], 
                        default='normalized_excel', help='Export format')
+    parser.add_argument('--chunk-rows', type=int, metavar='N',
+                       help='Stream a --file CSV in chunks of N rows; valid rows are appended to --export (.csv or .parquet)')
+    parser.add_argument('--formats', nargs='+', metavar='FORMAT',
+                       choices=['normalized_excel', 'summary_excel', 'json', 'csv', 'parquet', 'arrow'],
+                       help='Formats written concurrently for every file in --batch (default: normalized_excel)')
+    
+    # Comparison options
+    parser.add_argument('--offer-names', type=str, nargs='+', metavar='NAME',
+                       help='Offer names for --compare, in file order (default: file names)')
+    parser.add_argument('--save-dataset', type=str, metavar='PATH',
+                       help='Also save the --compare result as typed .parquet/.arrow (reload it as the master to add offers)')
+    parser.add_argument('--workers', type=int, help='Maximum number of offers parsed, or batch export writers run, in parallel')
     
     # Configuration
     parser.add_argument('--config', type=str, help='Configuration file path')
     parser.add_argument('--log', type=str, help='Log file path')
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose logging')
+    parser.add_argument('--profile-startup', action='store_true',
+                       help='Report per-module import cost of application startup and exit')
+    parser.add_argument('--profile', type=str, nargs='?', const=DEFAULT_PROFILE_FILE, metavar='PATH',
+                       help=f'Record per-stage pipeline timings and memory (default: {DEFAULT_PROFILE_FILE})')
+    parser.add_argument('--profile-format', choices=PROFILE_FORMATS, default='json',
+                       help='Profile output format (chrome: load in chrome://tracing or Perfetto)')
+    parser.add_argument('--profile-memory', choices=MEMORY_MODES, default='rss',
+                       help='Memory measurement for profile spans')
     
     return parser
 
@@ -941,12 +1152,19 @@ def main():
     parser = create_parser()
     args = parser.parse_args()
     
+    if args.profile_startup:
+        from utils.startup_profile import profile_imports, format_import_report
+        print(format_import_report(profile_imports()))
+        return
+    
     # Setup paths
     config_file = Path(args.config) if args.config else None
     log_file = Path(args.log) if args.log else None
     
     # Create application
     app = BOQApplication(config_file, log_file)
+    if args.profile:
+        app.controller.enable_profiling(Path(args.profile), args.profile_format, args.profile_memory)
     
     try:
         # Determine mode and run
@@ -955,7 +1173,7 @@ def main():
         
         if args.gui:
             app.run_gui()
-        elif args.file or args.batch:
+        elif args.file or args.batch or args.compare:
             app.run_cli(args)
         elif is_executable:
             # When running as executable, default to GUI mode
@@ -973,10 +1191,17 @@ def main():
     finally:
         # Ensure cleanup
         if hasattr(app, 'controller'):
+            profile_path = app.controller.write_profile()
+            if profile_path and args.profile:
+                print(f"Pipeline profile written to: {profile_path}")
             app.controller.shutdown()
 
 
 if __name__ == "__main__":
+    # Required for the offer ingestion process pool in frozen (PyInstaller) builds
+    import multiprocessing
+    multiprocessing.freeze_support()
+    
     # At startup, ensure user-writable config files exist
     boq_settings_path = ensure_default_config(
         'boq_settings.json',
@@ -0,0 +1,113 @@
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.auto_categorizer import (AutoCategorizer, auto_categorize_dataset,
+                                   collect_descriptions_for_manual_review, collect_unmatched_descriptions)
+from core.category_dictionary import CategoryDictionary
+from core.manual_categorizer import apply_manual_categories
+
+
+class RecategorizeRowsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tempdir.cleanup)
+        dictionary_path = Path(self._tempdir.name) / "category_dictionary.json"
+        with open(dictionary_path, "w", encoding="utf-8") as handle:
+            json.dump({"mappings": [], "categories": []}, handle)
+
+        self.dictionary = CategoryDictionary(dictionary_path)
+        self.dictionary.mappings.clear()
+        self.dictionary.categories.clear()
+        self.dictionary.upsert_mappings([
+            {"description": "Excavation", "category": "Earthworks"},
+            {"description": "Concrete C25/30", "category": "Concrete"},
+        ])
+        self.categorizer = AutoCategorizer(self.dictionary)
+
+        # Non-positional labels: the old write-back treated labels as positions
+        self.dataframe = pd.DataFrame(
+            {
+                "Description": ["excavation ", "Concrete C25/30", "Unknown item", "", "Excavation", np.nan],
+                "Category": ["Manual", None, "", np.nan, "", ""],
+            },
+            index=[10, 20, 30, 40, 50, 60],
+        )
+
+    def test_masked_rows_match_a_row_by_row_run(self) -> None:
+        mask = self.dataframe["Category"].isna() | (self.dataframe["Category"] == "")
+        expected = auto_categorize_dataset(self.dataframe[mask], self.dictionary)
+
+        result = self.categorizer.recategorize_rows(self.dataframe, mask)
+
+        pd.testing.assert_series_equal(self.dataframe.loc[mask, "Category"], expected.dataframe["Category"],
+                                       check_dtype=False)
+        self.assertEqual(self.dataframe.at[10, "Category"], "Manual")
+        self.assertEqual((result.matched_rows, result.unmatched_rows), (expected.matched_rows, expected.unmatched_rows))
+        self.assertEqual(result.match_statistics["match_types"], expected.match_statistics["match_types"])
+
+    def test_usage_counts_grow_per_occurrence(self) -> None:
+        self.dataframe["Category"] = ""
+        self.categorizer.recategorize_rows(self.dataframe, pd.Series(True, index=self.dataframe.index))
+        self.assertEqual(self.dictionary.mappings["excavation"].usage_count, 2)
+        self.assertEqual(self.dictionary.mappings["concrete c25/30"].usage_count, 1)
+
+    def test_recategorization_writes_back_by_label(self) -> None:
+        result = self.categorizer.RECATEGORIZATION(self.dataframe)
+
+        self.assertIs(result.dataframe, self.dataframe)
+        self.assertEqual(list(self.dataframe["Category"].fillna("<na>")),
+                         ["Manual", "Concrete", "", "<na>", "Earthworks", ""])
+        self.assertEqual(result.match_statistics["recategorization_stats"],
+                         {"rows_recategorized": 5, "new_matches_found": 2, "still_unmatched": 3})
+
+
+class DescriptionGroupingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self.dataframe = pd.DataFrame(
+            {
+                "Description": ["Rebar", "Excavation", " rebar ", "", "REBAR", "Concrete", "Excavation"],
+                "Category": ["", np.nan, "", "", None, "Concrete", "Earthworks"],
+                "Source_Sheet": ["S1", "S2", "S3", "S1", "S2", "S3", "S1"],
+            },
+            index=[4, 9, 11, 12, 20, 21, 30],
+        )
+
+    def test_unmatched_descriptions_are_grouped_by_normalized_text(self) -> None:
+        unmatched = collect_unmatched_descriptions(self.dataframe, sheet_name_column="Source_Sheet")
+
+        self.assertEqual([(u.description, u.frequency, u.sample_rows, u.source_sheet_name, u.original_index)
+                          for u in unmatched],
+                         [("Rebar", 3, [5, 12, 21], "S1", 4), ("Excavation", 1, [10], "S2", 9)])
+
+        review = collect_descriptions_for_manual_review(self.dataframe, None)
+        self.assertEqual([(r.description, r.frequency, r.source_sheet_name, r.auto_category) for r in review],
+                         [("Rebar", 3, "Unknown", ""), ("Excavation", 1, "Unknown", "nan")])
+
+    def test_manual_categories_apply_through_lowercase_keys(self) -> None:
+        manual = {"REBAR": "Steel", "Rebar": "Reinforcement", "excavation": "Earthworks"}
+
+        result = apply_manual_categories(self.dataframe, manual)
+
+        self.assertEqual(list(result["updated_dataframe"]["Category"]),
+                         ["Steel", "Earthworks", "Steel", "", "Steel", "Concrete", "Earthworks"])
+        self.assertEqual((result["statistics"]["exact_matches"], result["statistics"]["case_insensitive_matches"]),
+                         (1, 3))
+        self.assertEqual(result["remaining_unmatched"], [])
+
+        sensitive = apply_manual_categories(self.dataframe, manual, case_sensitive=True)
+        self.assertEqual(sensitive["updated_count"], 2)
+        self.assertEqual(sensitive["remaining_unmatched"], ["Excavation", "rebar"])
+
+
+if __name__ == "__main__":
+    unittest.main()
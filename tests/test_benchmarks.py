@@ -0,0 +1,66 @@
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+import openpyxl
+
+from benchmarks.boq_generator import BOQGeneratorConfig, generate_benchmark_files
+from benchmarks.run_benchmarks import STAGES, compare_to_baseline, run_benchmarks
+
+
+def _sheet_values(path: Path):
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    return {sheet.title: [tuple(row) for row in sheet.iter_rows(values_only=True)] for sheet in workbook.worksheets}
+
+
+class BenchmarkSuiteTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tempdir.cleanup)
+        self.root = Path(self._tempdir.name)
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def test_generator_is_reproducible_and_hierarchical(self) -> None:
+        config = BOQGeneratorConfig(rows=120, sheets=2, offers=2, items_per_section=10, duplicate_rate=0.2)
+        first = generate_benchmark_files(self.root / "a", config)
+        second = generate_benchmark_files(self.root / "b", config)
+
+        self.assertEqual(first.item_count, 120)
+        self.assertEqual(len(first.offers), 2)
+        self.assertEqual(_sheet_values(first.master), _sheet_values(second.master))
+        self.assertEqual(_sheet_values(first.offers[1]), _sheet_values(second.offers[1]))
+
+        rows = _sheet_values(first.master)["BOQ 1"]
+        descriptions = [row[1] for row in rows if row and row[0] and row[0].count(".") == 2]
+        self.assertEqual(rows[3][:2], ("Item No.", "Description"))
+        self.assertIn(("1.1", "SITE PREPARATION"), [row[:2] for row in rows])
+        self.assertTrue(any(len(row) > 1 and str(row[1]).startswith("Subtotal") for row in rows))
+        self.assertLess(len(set(descriptions)), len(descriptions))
+
+    def test_run_times_every_stage(self) -> None:
+        results = run_benchmarks(BOQGeneratorConfig(rows=40, sheets=2, offers=1))
+
+        self.assertEqual(list(results["stages"]), STAGES)
+        self.assertEqual(results["items"]["master"], 40)
+        self.assertGreater(results["stages"]["merge"]["rows"], 0)
+        self.assertGreater(results["total_seconds"], 0)
+
+    def test_baseline_comparison_uses_stage_thresholds(self) -> None:
+        baseline = {
+            "stages": {"load": {"wall_seconds": 1.0}, "merge": {"wall_seconds": 2.0}, "export": {"wall_seconds": 0.01}},
+            "thresholds": {"default": 0.1, "merge": 0.5},
+        }
+        results = {"stages": {"load": {"wall_seconds": 1.2}, "merge": {"wall_seconds": 2.8}, "export": {"wall_seconds": 1.0}}}
+
+        comparisons = {c.stage: c for c in compare_to_baseline(results, baseline)}
+
+        self.assertTrue(comparisons["load"].regressed)
+        self.assertFalse(comparisons["merge"].regressed)
+        self.assertNotIn("export", comparisons)
+        self.assertFalse(compare_to_baseline(results, baseline, threshold=0.3)[0].regressed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from core.auto_categorizer import recategorize_rows
+from core.boq_schema import apply_schema, make_writable
+from core.comparison_engine import ComparisonEngine
+from core.description_intern import DescriptionTable
+from core.manual_categorizer import apply_manual_categories
+
+
+def _unified() -> pd.DataFrame:
+    return pd.DataFrame({
+        "Source_Sheet": ["Civil", "Civil", "Electrical"],
+        "code": ["1.1", "1.2", ""],
+        "Category": ["Earthworks", None, ""],
+        "Description": ["".join(["Excav", "ation"]), "Excavation", "Cabling"],
+        "unit": ["m3", "m3", np.nan],
+        "quantity": ["10", "", "n/a"],
+        "total_price": [200, "150.5", None],
+        "total_price[Offer A]": ["210", 140.0, ""],
+        "Notes": ["a", "b", "c"],
+    })
+
+
+class BoqSchemaTest(unittest.TestCase):
+    def test_columns_get_their_dtypes(self) -> None:
+        table = DescriptionTable()
+        df = apply_schema(_unified(), table)
+
+        for column in ("Source_Sheet", "code", "Category", "unit"):
+            self.assertIsInstance(df[column].dtype, pd.CategoricalDtype, column)
+            self.assertIn("", df[column].cat.categories)
+        for column in ("quantity", "total_price", "total_price[Offer A]"):
+            self.assertEqual(df[column].dtype, np.float64, column)
+        self.assertEqual(df["quantity"].fillna(-1).tolist(), [10.0, -1, -1])
+        self.assertEqual(df["total_price"].fillna(-1).tolist(), [200.0, 150.5, -1])
+        self.assertEqual(df["Notes"].tolist(), ["a", "b", "c"])
+
+        # Text is unchanged, equal descriptions share one object, across frames of the same table
+        self.assertEqual(df["Description"].tolist(), ["Excavation", "Excavation", "Cabling"])
+        self.assertIs(df["Description"].iloc[0], df["Description"].iloc[1])
+        other = apply_schema(pd.DataFrame({"Description": ["".join(["Cab", "ling"])]}), table)
+        self.assertIs(other["Description"].iloc[0], df["Description"].iloc[2])
+
+        self.assertEqual(df["Category"].fillna("").tolist(), ["Earthworks", "", ""])
+        self.assertEqual(df["Category"].isna().tolist(), [False, True, False])
+
+    def test_formatted_numbers_are_parsed_like_the_merge(self) -> None:
+        cells = ["1,200.50", "€ 1.200,50", "1 200", "$12.5", "1\u00a0500", 7, "n/a", ""]
+        df = apply_schema(pd.DataFrame({"unit_price[Offer A]": cells}))
+
+        engine = ComparisonEngine()
+        expected = [engine._convert_to_numeric(cell, 0, "unit_price", "BOQ")[0] for cell in cells[:6]]
+        self.assertEqual(df["unit_price[Offer A]"].tolist()[:6], expected)
+        self.assertEqual(expected[:5], [1200.5, 1.2005, 1200.0, 12.5, 1500.0])
+        self.assertTrue(df["unit_price[Offer A]"].iloc[6:].isna().all())
+
+    def test_schema_is_restored_after_rows_are_appended(self) -> None:
+        df = apply_schema(_unified())
+        df.loc[3] = ["Roads", "2.1", "Roads", "Asphalt", "m2", "5", "50", 55.0, "d"]
+
+        apply_schema(df)
+
+        self.assertIsInstance(df["Category"].dtype, pd.CategoricalDtype)
+        self.assertEqual(sorted(df["Category"].cat.categories), ["", "Earthworks", "Roads"])
+        self.assertEqual(df.at[3, "quantity"], 5.0)
+
+    def test_writers_add_new_categories(self) -> None:
+        df = apply_schema(_unified())
+        make_writable(df, "Category", ["Cabling", np.nan, "Cabling"])
+        df.at[2, "Category"] = "Cabling"
+        self.assertEqual(df["Category"].tolist()[2], "Cabling")
+
+        manual = apply_manual_categories(df, {"excavation": "Civil Works"})["updated_dataframe"]
+        self.assertEqual(manual["Category"].tolist(), ["Earthworks", "Civil Works", "Cabling"])
+        self.assertIsInstance(manual["Category"].dtype, pd.CategoricalDtype)
+
+        class Dictionary:
+            def find_categories(self, descriptions, counts=None):
+                return {description: "Earth Movement" for description in descriptions}
+
+        recategorize_rows(df, df["Category"].isna(), Dictionary())
+        self.assertEqual(df.at[1, "Category"], "Earth Movement")
+
+
+if __name__ == "__main__":
+    unittest.main()
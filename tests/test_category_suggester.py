@@ -0,0 +1,91 @@
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from core.auto_categorizer import collect_descriptions_for_manual_review
+from core.category_dictionary import CategoryDictionary
+
+
+MAPPINGS = [
+    {"description": "Excavation of trenches for cables", "category": "Trenching"},
+    {"description": "Trench backfill with selected material", "category": "Trenching"},
+    {"description": "MV cable 18/30 kV 3x240 mm2", "category": "MV Cables"},
+    {"description": "MV cable terminations", "category": "MV Cables"},
+    {"description": "Gravel access road construction", "category": "Roads"},
+    {"description": "Road drainage ditches", "category": "Roads"},
+]
+
+
+class CategorySuggesterTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tempdir.cleanup)
+        self.dictionary_path = Path(self._tempdir.name) / "category_dictionary.json"
+        with open(self.dictionary_path, "w", encoding="utf-8") as handle:
+            json.dump({"mappings": [], "categories": []}, handle)
+
+        self.dictionary = CategoryDictionary(self.dictionary_path)
+        self.dictionary.mappings.clear()
+        self.dictionary.categories.clear()
+        self.dictionary.upsert_mappings(MAPPINGS)
+
+    def test_suggestions_are_ranked_by_description(self) -> None:
+        ranked = self.dictionary.suggest_categories(["MV cable 3x150 mm2", "backfill of cable trenches", "xyz"])
+
+        self.assertEqual(ranked[0][0][0], "MV Cables")
+        self.assertEqual(ranked[1][0][0], "Trenching")
+        self.assertEqual(ranked[2], [])
+        self.assertAlmostEqual(sum(probability for _, probability in ranked[0]), 1.0)
+        self.assertEqual(self.dictionary.suggest_categories(["access road gravel layer"])[0][0][0], "Roads")
+
+    def test_find_category_misses_do_not_score_descriptions(self) -> None:
+        # Per-row scoring made categorizing large files dozens of times slower
+        with mock.patch.object(self.dictionary, "suggest_categories") as suggest:
+            match = self.dictionary.find_category("access road gravel layer")
+
+        suggest.assert_not_called()
+        self.assertEqual(match.match_type, "none")
+        self.assertEqual(len(match.suggestions), 3)
+
+    def test_upserts_and_edits_train_incrementally(self) -> None:
+        suggester = self.dictionary.suggester
+        trained = suggester.updates
+
+        self.dictionary.upsert_mappings([{"description": "PV module mounting", "category": "PV Mod. Installation"}])
+        self.assertEqual(suggester.updates, trained + 1)
+        self.assertEqual(self.dictionary.suggest_categories(["PV module installation"])[0][0][0],
+                         "PV Mod. Installation")
+
+        self.dictionary.rename_category_for_descriptions(["pv module mounting"], "Tracker Inst.")
+        self.assertEqual(self.dictionary.suggest_categories(["PV module installation"])[0][0][0], "Tracker Inst.")
+        self.assertEqual(suggester.updates, trained + 3)  # forget + learn of the renamed description
+
+    def test_model_is_saved_next_to_the_dictionary(self) -> None:
+        expected = self.dictionary.suggest_categories(["MV cable joints"])
+        self.assertTrue(self.dictionary.save_dictionary())
+        self.assertTrue(self.dictionary.suggester_file.exists())
+
+        reloaded = CategoryDictionary(self.dictionary_path)
+        self.assertEqual(reloaded.suggest_categories(["MV cable joints"]), expected)
+        self.assertEqual(reloaded.suggester.updates, 0)  # loaded, not retrained
+
+    def test_manual_review_is_prefilled_with_confident_suggestions(self) -> None:
+        dataframe = pd.DataFrame({"Description": ["MV cable 3x150 mm2", "xyz"], "Category": ["", ""]})
+
+        review = collect_descriptions_for_manual_review(dataframe, self.dictionary, confidence_threshold=0.5)
+
+        self.assertEqual([(r.description, r.match_type) for r in review],
+                         [("MV cable 3x150 mm2", "suggested"), ("xyz", "none")])
+        self.assertEqual(review[0].suggestions[0][0], "MV Cables")
+        self.assertEqual(review[0].confidence, review[0].suggestions[0][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+
+from core.chunked_ingest import ChunkedCsvIngestor
+from core.file_processor import ExcelProcessor
+
+
+def _write_csv(path: Path, items: int) -> None:
+    lines = ["ERP export;;;;;", "Code;Description;Unit;Quantity;Unit Price;Total Price"]
+    for i in range(items):
+        if i % 50 == 0:
+            lines.append(f"Section {i // 50};;;;;")
+        lines.append(f"1.{i};Concrete item {i};m3;{i % 5 + 1};10;{(i % 5 + 1) * 10}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+class ChunkedCsvIngestorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tempdir.cleanup)
+        self.root = Path(self._tempdir.name)
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self.csv_path = self.root / "dump.csv"
+        _write_csv(self.csv_path, 230)
+
+    def test_chunks_are_appended_to_the_output(self) -> None:
+        output = self.root / "out.csv"
+        result = ChunkedCsvIngestor(chunk_rows=40).ingest(self.csv_path, output)
+
+        self.assertEqual(result.header_row_index, 1)
+        self.assertEqual((result.total_rows, result.valid_rows, result.chunks), (237, 230, 6))
+        self.assertEqual(result.row_types["primary_line_item"], 230)
+        df = pd.read_csv(output, dtype=str, keep_default_na=False)
+        self.assertEqual(len(df), 230)
+        self.assertEqual(list(df.columns[:4]), ["Source_Sheet", "code", "Category", "Description"])
+        self.assertEqual(df.iloc[-1]["Description"], "Concrete item 229")
+
+    def test_chunk_size_does_not_change_the_rows(self) -> None:
+        small = pd.concat(ChunkedCsvIngestor(chunk_rows=7).iter_dataframes(self.csv_path), ignore_index=True)
+        large = pd.concat(ChunkedCsvIngestor(chunk_rows=10000).iter_dataframes(self.csv_path), ignore_index=True)
+        pd.testing.assert_frame_equal(small, large)
+
+    def test_parquet_output_has_one_row_group_per_chunk(self) -> None:
+        import pyarrow.parquet as pq
+
+        output = self.root / "out.parquet"
+        ChunkedCsvIngestor(chunk_rows=100).ingest(self.csv_path, output)
+        parquet = pq.ParquetFile(str(output))
+        self.assertEqual((parquet.metadata.num_rows, parquet.num_row_groups), (230, 3))
+        self.assertEqual(str(parquet.schema_arrow.field("total_price").type), "double")
+
+    def test_large_csv_is_not_rejected_by_the_memory_limit(self) -> None:
+        with ExcelProcessor(max_memory_mb=0) as processor:
+            self.assertTrue(processor.load_file(self.csv_path))
+        workbook_path = self.root / "boq.xlsx"
+        openpyxl.Workbook().save(workbook_path)
+        with self.assertRaises(MemoryError):
+            ExcelProcessor(max_memory_mb=0).load_file(workbook_path)
@@ -0,0 +1,67 @@
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from core.columnar_io import column_kinds, offer_names_from_columns, read_columnar, write_columnar
+from core.comparison_pipeline import ComparisonPipeline
+from tests.test_comparison_pipeline import _write_boq
+
+
+class ColumnarIOTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tempdir.cleanup)
+        self.root = Path(self._tempdir.name)
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def test_schema_plan_types_value_and_offer_columns(self) -> None:
+        df = pd.DataFrame({
+            "Description": ["Fence"], "Category": ["Site Costs"], "code": ["1.1"],
+            "quantity[Master]": ["10"], "total_price[Offer [2]]": [25.0], "notes[A]": ["x"], "row": [3],
+        })
+
+        self.assertEqual(column_kinds(df), {
+            "Description": "text", "Category": "category", "code": "text", "quantity[Master]": "numeric",
+            "total_price[Offer [2]]": "numeric", "notes[A]": "text", "row": "native",
+        })
+        self.assertEqual(offer_names_from_columns(list(df.columns)), ["Master", "Offer [2]"])
+
+    def test_round_trip_keeps_types_and_metadata(self) -> None:
+        df = pd.DataFrame({
+            "Description": ["Fence", "Gate"], "Category": ["Site Costs", ""],
+            "quantity[Master]": ["10", "n/a"], "total_price[Master]": [25.0, None], "total_price[A]": [30.0, 2.0],
+        })
+        for suffix in (".parquet", ".arrow"):
+            dataset = read_columnar(write_columnar(df, self.root / f"data{suffix}", master_offer_name="Master"))
+
+            self.assertEqual(dataset.master_offer_name, "Master")
+            self.assertEqual(dataset.offer_names, ["A"])
+            self.assertEqual(list(dataset.dataframe["Category"]), ["Site Costs", ""])
+            self.assertEqual(dataset.dataframe["quantity[Master]"].dtype, float)
+            self.assertTrue(pd.isna(dataset.dataframe.loc[1, "quantity[Master]"]))
+
+    def test_saved_comparison_is_reused_as_master(self) -> None:
+        paths = [self.root / name for name in ("master.xlsx", "offer_a.xlsx", "offer_b.xlsx")]
+        _write_boq(paths[0], [20, 100, 2])
+        _write_boq(paths[1], [22, 110, 2.5])
+        _write_boq(paths[2], [19, 95, 1.8, 30], extra_items=[("1.4", "Formwork", "m2", 20)])
+        pipeline = ComparisonPipeline(max_workers=1)
+        first = pipeline.run(paths[0], [paths[1]], offer_names=["A"], master_offer_name="Master")
+        dataset_path = pipeline.save_dataset(first, self.root / "run.parquet")
+
+        second = pipeline.run_dataset(dataset_path, [paths[2]], offer_names=["B"])
+
+        self.assertEqual(second.offer_names, ["A", "B"])
+        self.assertEqual(second.add_counts, {"B": 1})
+        self.assertAlmostEqual(second.dataframe.loc[2, "unit_price[A]"], 2.5)
+        self.assertAlmostEqual(second.dataframe.loc[3, "total_price[B]"], 600.0)
+        with self.assertRaises(ValueError):
+            pipeline.run_dataset(dataset_path, [paths[2]], offer_names=["A"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+
+from core.category_dictionary import CategoryDictionary
+from core.comparison_pipeline import ComparisonPipeline, OfferIngestionScheduler, extract_sheet_layouts, process_master_file
+
+
+ITEMS = [
+    ("1.1", "Excavation works", "m3", 10),
+    ("1.2", "Concrete C25/30", "m3", 5),
+    ("1.3", "Steel rebar", "kg", 100),
+]
+
+
+def _write_boq(path: Path, prices, extra_items=()) -> None:
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "BOQ"
+    sheet.append(["Code", "Description", "Unit", "Quantity", "Unit Price", "Total Price"])
+    for (code, description, unit, quantity), price in zip(list(ITEMS) + list(extra_items), prices):
+        sheet.append([code, description, unit, quantity, price, quantity * price])
+    workbook.save(path)
+
+
+class ComparisonPipelineTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tempdir.cleanup)
+        self.root = Path(self._tempdir.name)
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+        self.master = self.root / "master.xlsx"
+        self.offer_a = self.root / "offer_a.xlsx"
+        self.offer_b = self.root / "offer_b.xlsx"
+        _write_boq(self.master, [20, 100, 2])
+        _write_boq(self.offer_a, [22, 110, 2.5])
+        _write_boq(self.offer_b, [19, 95, 1.8, 30], extra_items=[("1.4", "Formwork", "m2", 20)])
+
+    def test_offers_are_merged_in_submission_order(self) -> None:
+        output = self.root / "comparison.xlsx"
+        result = ComparisonPipeline(max_workers=2).run(
+            self.master, [self.offer_a, self.offer_b],
+            offer_names=["A", "B"], master_offer_name="Master", output_path=output,
+        )
+
+        df = result.dataframe
+        self.assertEqual(result.errors, {})
+        self.assertEqual(result.merge_counts, {"A": 3, "B": 3})
+        self.assertEqual(result.add_counts, {"A": 0, "B": 1})
+        self.assertEqual(list(df["Description"])[-1], "Formwork")
+        self.assertAlmostEqual(df.loc[2, "unit_price[A]"], 2.5)
+        self.assertAlmostEqual(df.loc[3, "total_price[B]"], 600.0)
+        self.assertIn("total_price[Master]", df.columns)
+        self.assertIsInstance(df["Category"].dtype, pd.CategoricalDtype)
+        self.assertEqual(df["total_price[B]"].dtype, "float64")
+        self.assertLess(list(df.columns).index("quantity[A]"), list(df.columns).index("quantity[B]"))
+
+        self.assertTrue(output.exists())
+        summary_rows = list(openpyxl.load_workbook(output)["Summary"].iter_rows(values_only=True))
+        totals = dict(zip(summary_rows[0], zip(*summary_rows[1:])))
+        for column in ("total_price[Master]", "total_price[B]"):
+            self.assertAlmostEqual(sum(totals[column]), pd.to_numeric(df[column], errors="coerce").sum())
+        with open(self.root / "comparison_timing.json", encoding="utf-8") as handle:
+            report = json.load(handle)
+        self.assertEqual(report["offers"], ["A", "B"])
+        self.assertIn("merge", report["stages"])
+        self.assertIn("validate", report["offer_stages"]["A"])
+
+    def test_process_pool_ingestion_keeps_submission_order_and_categorizes(self) -> None:
+        dictionary_path = self.root / "category_dictionary.json"
+        with open(dictionary_path, "w", encoding="utf-8") as handle:
+            json.dump({"mappings": [], "categories": []}, handle)
+        dictionary = CategoryDictionary(dictionary_path)
+        dictionary.upsert_mappings([{"description": "Formwork", "category": "Civil Works"}])
+        dictionary.save_dictionary()
+
+        layouts = extract_sheet_layouts(process_master_file(self.master))
+        results = OfferIngestionScheduler(max_workers=2).ingest(
+            layouts, [self.offer_b, self.offer_a], ["B", "A"], str(dictionary_path)
+        )
+
+        self.assertEqual([r.offer_name for r in results], ["B", "A"])
+        self.assertIn("categorize", results[0].timings)
+        categories = dict(zip(results[0].dataframe["Description"], results[0].dataframe["Category"]))
+        self.assertEqual(categories["Formwork"], "Civil Works")
+
+        merged = ComparisonPipeline(category_dictionary=dictionary).run(self.master, [self.offer_b], offer_names=["B"])
+        self.assertEqual(merged.dataframe.iloc[-1]["Category"], "Civil Works")
+
+    def test_unreadable_offer_is_reported_without_aborting(self) -> None:
+        broken = self.root / "broken.xlsx"
+        broken.write_text("not a workbook", encoding="utf-8")
+
+        result = ComparisonPipeline().run(self.master, [broken, self.offer_a], offer_names=["X", "A"])
+
+        self.assertIn("X", result.errors)
+        self.assertEqual(result.merge_counts, {"A": 3})
+
+    def test_offer_names_must_be_unique(self) -> None:
+        with self.assertRaises(ValueError):
+            ComparisonPipeline().run(self.master, [self.offer_a], offer_names=["master"])
+
+
+if __name__ == "__main__":
+    unittest.main()
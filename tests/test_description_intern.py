@@ -0,0 +1,65 @@
+import logging
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from core.comparison_engine import ComparisonProcessor
+from core.description_intern import MISSING, DescriptionTable
+
+
+class DescriptionTableTest(unittest.TestCase):
+    def test_case_and_whitespace_variants_share_an_id(self) -> None:
+        table = DescriptionTable()
+        codes = table.codes(pd.Series(["Steel  rebar", "steel rebar", None, " STEEL\nrebar ", "Concrete", np.nan]))
+
+        self.assertEqual(codes.tolist(), [0, 0, MISSING, 0, 1, MISSING])
+        self.assertEqual(len(table), 2)
+        self.assertEqual((table.original(0), table.lower(0), table.normalized(0), table.key(0)),
+                         ("Steel  rebar", "steel  rebar", "Steel rebar", "steel rebar"))
+        self.assertEqual(table.lookup("steel REBAR"), 0)
+        self.assertEqual(table.lookup("Formwork"), MISSING)
+        self.assertEqual(len(table), 2)
+
+        groups = table.group_positions(codes)
+        self.assertEqual({key: positions.tolist() for key, positions in groups.items()},
+                         {MISSING: [2, 5], 0: [0, 1, 3], 1: [4]})
+
+
+class InstanceMatchingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def _frame(self, descriptions, prices) -> pd.DataFrame:
+        count = len(descriptions)
+        return pd.DataFrame({
+            "code": [str(i) for i in range(count)],
+            "Description": descriptions,
+            "unit": ["m3"] * count,
+            "quantity": [1.0] * count,
+            "unit_price": prices,
+            "total_price": prices,
+            "Source_Sheet": ["BOQ"] * count,
+            "Category": [""] * count,
+        })
+
+    def test_nth_instances_merge_across_case_and_whitespace(self) -> None:
+        master = self._frame(["Excavation", "Concrete C25/30", "excavation"], [10.0, 20.0, 30.0])
+        comparison = self._frame(["EXCAVATION ", "Concrete\nC25/30", "Excavation", "Excavation", "Formwork"],
+                                 [11.0, 21.0, 31.0, 41.0, 51.0])
+
+        processor = ComparisonProcessor()
+        processor.load_master_dataset(master)
+        processor.load_comparison_data(comparison)
+        processor.process_comparison_rows()
+        results = processor.process_valid_rows(offer_name="B")
+
+        self.assertEqual([(op["type"], op["comp_row_index"], op.get("master_row_index")) for op in results],
+                         [("MERGE", 0, 0), ("MERGE", 2, 2), ("MERGE", 1, 1), ("ADD", 3, None), ("ADD", 4, None)])
+        self.assertEqual(processor.master_dataset["unit_price[B]"].tolist()[:3], [11.0, 21.0, 31.0])
+        self.assertEqual(processor.master_dataset["Description"].tolist()[3:], ["Excavation", "Formwork"])
+
+
+if __name__ == "__main__":
+    unittest.main()
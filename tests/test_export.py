@@ -0,0 +1,79 @@
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from utils.export import ExcelExporter, StreamingExcelWriter, compute_column_widths, offer_total_columns
+
+
+class StreamingExcelWriterTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tempdir.cleanup)
+        self.root = Path(self._tempdir.name)
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def test_streams_values_with_column_formats_and_range_validation(self) -> None:
+        df = pd.DataFrame({
+            "Description": ["Excavation", "=SUM(A1:A2)", "http://example.com/spec", None],
+            "Category": ["Civil Works", "", "Other", "Roads"],
+            "total_price": [1234.5, np.nan, -2.0, 10.0],
+            "total_price[Offer A]": [1000.0, 5.0, 3.0, 2.0],
+            "code": ["1.1", "1.2", 7, True],
+        })
+        path = self.root / "export.xlsx"
+
+        with StreamingExcelWriter(path, chunk_rows=3) as writer:
+            writer.write_dataframe("BOQ Data", df)
+            writer.write_category_summary("Summary", "BOQ Data", df, offer_total_columns(df, ["Master", "Offer A"]))
+
+        workbook = openpyxl.load_workbook(path)
+        sheet = workbook["BOQ Data"]
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(rows[0], tuple(df.columns))
+        self.assertEqual(rows[1], ("Excavation", "Civil Works", 1234.5, 1000.0, "1.1"))
+        self.assertEqual(rows[2][0], "=SUM(A1:A2)")
+        self.assertEqual(sheet["A2"].data_type, "s")
+        self.assertEqual(sheet["A3"].data_type, "s")
+        self.assertIsNone(rows[2][2])
+        self.assertEqual(rows[4][4], True)
+        self.assertEqual(sheet["C2"].number_format, "#,##0.00")
+        self.assertEqual(sheet["A2"].number_format, "General")
+        self.assertTrue(sheet["A1"].font.bold)
+
+        validations = sheet.data_validations.dataValidation
+        self.assertEqual(len(validations), 1)
+        self.assertEqual(str(validations[0].sqref), "B2:B5")
+
+        self.assertAlmostEqual(sheet.column_dimensions["A"].width, len("http://example.com/spec") + 2, delta=1)
+        summary = workbook["Summary"]
+        self.assertEqual(summary["A2"].value, "Master")
+        self.assertEqual(summary["B3"].value, "=SUMIFS('BOQ Data'!D:D,'BOQ Data'!B:B,\"General Costs\")")
+        self.assertEqual(summary["B2"].value, "=SUMIFS('BOQ Data'!C:C,'BOQ Data'!B:B,\"General Costs\")")
+
+    def test_column_widths_use_formatted_numbers_and_cap(self) -> None:
+        df = pd.DataFrame({"quantity": [1234567.0, -1.0], "Description": ["x" * 80, None]})
+
+        self.assertEqual(compute_column_widths(df, ["quantity"]), [len("-1,234,567.00") + 2, 50])
+
+    def test_exporter_writes_normalized_boq(self) -> None:
+        file_mapping = {"sheets": {"BOQ": {"items": [
+            {"item_no": "1", "description": "Fence", "unit": "m", "quantity": 10, "unit_price": 2.5,
+             "total_price": 25.0, "category": "Site Costs"},
+        ]}}}
+        path = self.root / "normalized.xlsx"
+
+        self.assertTrue(ExcelExporter().export_data(file_mapping, path, "normalized_excel"))
+
+        workbook = openpyxl.load_workbook(path)
+        self.assertEqual(workbook.sheetnames, ["Normalized BOQ", "Summary"])
+        self.assertEqual(workbook["Normalized BOQ"]["B2"].value, "Fence")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import csv
+import json
+import logging
+import tempfile
+import threading
+import unittest
+import unittest.mock
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+
+from core import export_pipeline
+from core.comparison_pipeline import process_master_file
+from core.export_pipeline import ExportTable, MultiFormatExporter, write_export
+
+
+def _write_boq(path: Path) -> None:
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "BOQ"
+    sheet.append(["Code", "Description", "Unit", "Quantity", "Unit Price", "Total Price"])
+    sheet.append(["1.1", "Excavation works", "m3", 10, 20, 200])
+    sheet.append(["1.2", "Concrete C25/30", "m3", 5, 100.5, 502.5])
+    workbook.save(path)
+
+
+class MultiFormatExporterTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tempdir.cleanup)
+        self.root = Path(self._tempdir.name)
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def test_writes_every_format_from_one_table(self) -> None:
+        master = self.root / "master.xlsx"
+        _write_boq(master)
+        table = ExportTable.from_file_mapping(process_master_file(master), "master")
+
+        self.assertEqual(list(table.dataframe["Description"]), ["Excavation works", "Concrete C25/30"])
+        self.assertEqual(table.dataframe["total_price"].dtype, float)
+
+        with MultiFormatExporter(["normalized_excel", "summary_excel", "json", "csv"]) as exporter:
+            result = exporter.export(table, self.root / "out")
+
+        self.assertTrue(result.success, result.errors)
+        self.assertEqual(set(result.paths), {"normalized_excel", "summary_excel", "json", "csv"})
+        normalized = openpyxl.load_workbook(result.paths["normalized_excel"])
+        self.assertEqual(normalized.sheetnames, ["Normalized BOQ", "Summary"])
+        summary = openpyxl.load_workbook(result.paths["summary_excel"])["Summary Report"]
+        self.assertEqual([cell.value for cell in summary[2]], ["BOQ", 2, 702.5])
+        with open(result.paths["json"], encoding="utf-8") as handle:
+            self.assertEqual(json.load(handle)["sheets"][0]["processing_status"], "success")
+        with open(result.paths["csv"], encoding="utf-8", newline="") as handle:
+            self.assertEqual(len(list(csv.DictReader(handle))), 2)
+
+    def test_single_format_export_matches_the_batch_output(self) -> None:
+        master = self.root / "master.xlsx"
+        _write_boq(master)
+        table = ExportTable.from_file_mapping(process_master_file(master), "master")
+
+        single = write_export(table, "normalized_excel", self.root / "single" / "master.xlsx")
+        with MultiFormatExporter(["normalized_excel"]) as exporter:
+            batch = exporter.export(table, self.root / "batch").paths["normalized_excel"]
+
+        def rows(path):
+            workbook = openpyxl.load_workbook(path)
+            return {name: [[cell.value for cell in row] for row in workbook[name].iter_rows()]
+                    for name in workbook.sheetnames}
+
+        self.assertEqual(rows(single), rows(batch))
+        with self.assertRaises(ValueError):
+            write_export(table, "pdf", self.root / "master.pdf")
+
+    def test_submit_blocks_at_max_pending_and_reports_errors(self) -> None:
+        release = threading.Event()
+        started = []
+
+        def slow_writer(table, path):
+            started.append(table.stem)
+            release.wait(5)
+            path.write_text(table.stem)
+
+        def failing_writer(table, path):
+            raise RuntimeError("disk full")
+
+        writers = dict(export_pipeline.WRITERS, csv=slow_writer, json=failing_writer)
+        table = ExportTable("a", pd.DataFrame({"Description": ["x"]}))
+        with unittest.mock.patch.dict(export_pipeline.WRITERS, writers):
+            exporter = MultiFormatExporter(["csv"], max_pending=1)
+            first = exporter.submit(table, self.root)
+            blocked = threading.Thread(target=exporter.submit, args=(ExportTable("b", table.dataframe), self.root))
+            blocked.start()
+            blocked.join(0.2)
+            self.assertTrue(blocked.is_alive())
+            release.set()
+            blocked.join(5)
+            exporter.close()
+            self.assertTrue(first.result().success)
+            self.assertEqual(started, ["a", "b"])
+
+            with MultiFormatExporter(["json", "parquet"]) as exporter:
+                result = exporter.export(table, self.root)
+        self.assertEqual(result.errors, {"json": "disk full"})
+        self.assertFalse(result.success)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import logging
+import operator
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from core.column_mapper import ColumnMapper
+from core.comparison_engine import ComparisonProcessor
+from core.file_pipeline import process_workbook
+from core.mapping_generator import MappingGenerator
+from core.row_classifier import RowClassifier
+from core.sheet_classifier import SheetClassifier
+from core.validator import DataValidator
+from utils.job_scheduler import CANCELLED, DONE, FAILED, JobScheduler
+
+
+def wait_until(scheduler, condition, timeout=5.0):
+    """Poll the scheduler (as the Tk loop would) until condition() holds"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        scheduler.poll()
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class JobSchedulerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self.scheduler = JobScheduler(max_threads=1)
+        self.addCleanup(self.scheduler.shutdown, True)
+
+    def test_progress_updates_and_result_are_delivered_on_the_polling_thread(self) -> None:
+        events = []
+
+        def job(context, count):
+            for i in range(count):
+                context.progress(100 * (i + 1) / count, f"step {i + 1}")
+                context.publish(i)
+            return threading.current_thread().name
+
+        submitted = self.scheduler.submit(
+            job, 2, name="steps",
+            on_progress=lambda pct, msg: events.append(("progress", pct, msg, threading.current_thread())),
+            on_update=lambda value, msg: events.append(("update", value, msg, threading.current_thread())),
+            on_result=lambda value: events.append(("result", value, "", threading.current_thread())),
+        )
+
+        self.assertTrue(wait_until(self.scheduler, lambda: submitted.done))
+        self.assertEqual(submitted.state, DONE)
+        self.assertEqual([event[:3] for event in events[:-1]],
+                         [("progress", 50.0, "step 1"), ("update", 0, ""),
+                          ("progress", 100.0, "step 2"), ("update", 1, "")])
+        self.assertEqual(events[-1][0], "result")
+        self.assertTrue(events[-1][1].startswith("boq-job"))
+        self.assertTrue(all(event[3] is threading.current_thread() for event in events))
+        self.assertEqual(self.scheduler.jobs(), [])
+
+    def test_cancelled_jobs_stop_at_the_next_checkpoint_and_pending_jobs_never_run(self) -> None:
+        started, release = threading.Event(), threading.Event()
+        outcomes = []
+
+        def blocking(context):
+            started.set()
+            release.wait(5)
+            context.progress(50, "after release")
+            outcomes.append("not stopped")
+
+        running = self.scheduler.submit(blocking, on_cancelled=lambda: outcomes.append("running cancelled"))
+        pending = self.scheduler.submit(lambda context: outcomes.append("pending ran"),
+                                        on_cancelled=lambda: outcomes.append("pending cancelled"))
+        self.assertTrue(started.wait(5))  # one worker: the second job is queued
+
+        self.scheduler.cancel_all()
+        release.set()
+
+        self.assertTrue(wait_until(self.scheduler, lambda: running.done and pending.done))
+        self.assertEqual((running.state, pending.state), (CANCELLED, CANCELLED))
+        self.assertEqual(sorted(outcomes), ["pending cancelled", "running cancelled"])
+
+    def test_errors_go_to_on_error(self) -> None:
+        errors = []
+
+        def failing(context):
+            raise ValueError("bad workbook")
+
+        submitted = self.scheduler.submit(failing, on_error=errors.append)
+
+        self.assertTrue(wait_until(self.scheduler, lambda: submitted.done))
+        self.assertEqual(submitted.state, FAILED)
+        self.assertEqual([str(error) for error in errors], ["bad workbook"])
+
+    def test_process_jobs_return_results(self) -> None:
+        results = []
+
+        submitted = self.scheduler.submit_process(operator.mul, 6, 7, on_result=results.append)
+
+        self.assertTrue(wait_until(self.scheduler, lambda: submitted.done, timeout=30))
+        self.assertEqual(results, [42])
+
+    def test_workbooks_are_analyzed_in_process_jobs(self) -> None:
+        from openpyxl import Workbook
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "offer.xlsx"
+            workbook = Workbook()
+            workbook.active.title = "BOQ"
+            workbook.active.append(["Code", "Description", "Unit", "Quantity", "Unit Price", "Total Price"])
+            workbook.active.append(["1.1", "Concrete C30/37", "m3", 10, 100.0, 1000.0])
+            workbook.create_sheet("Notes").append(["Not part of the offer"])
+            workbook.save(path)
+            column_mapper = ColumnMapper()
+            results, errors = [], []
+
+            submitted = self.scheduler.submit_process(
+                process_workbook, path, SheetClassifier(), column_mapper, RowClassifier(),
+                DataValidator(), MappingGenerator(), sheet_filter=["BOQ"],
+                on_result=results.append, on_error=errors.append,
+            )
+
+            self.assertTrue(wait_until(self.scheduler, lambda: submitted.done, timeout=60))
+        self.assertEqual(errors, [])
+        file_mapping, processor_results = results[0]
+        self.assertEqual([sheet.sheet_name for sheet in file_mapping.sheets], ["BOQ"])
+        self.assertEqual(list(processor_results["sheet_data"]), ["BOQ"])
+        # The worker mapped with its own copy of the column mapper
+        self.assertIsNot(file_mapping.column_mapper, column_mapper)
+
+    def test_cancelling_a_merge_leaves_the_master_untouched(self) -> None:
+        count = 50
+        master = pd.DataFrame({
+            "code": [str(i) for i in range(count)],
+            "Description": [f"Item {i}" for i in range(count)],
+            "unit": ["m"] * count,
+            "quantity": [1.0] * count,
+            "unit_price": [2.0] * count,
+            "total_price": [2.0] * count,
+            "Source_Sheet": ["BOQ"] * count,
+            "Category": [""] * count,
+        })
+        processor = ComparisonProcessor()
+        processor.load_master_dataset(master)
+        processor.load_comparison_data(master.copy())
+        processor.process_comparison_rows()
+        halfway, resume = threading.Event(), threading.Event()
+        reported, outcomes = [], []
+
+        def merge(context):
+            def report(percentage, message):
+                reported.append(percentage)
+                if percentage >= 50 and not halfway.is_set():
+                    halfway.set()
+                    resume.wait(5)
+                context.progress(percentage, message)
+            return processor.process_valid_rows(offer_name="B", progress_callback=report)
+
+        job = self.scheduler.submit(merge, on_result=outcomes.append, on_cancelled=lambda: outcomes.append("cancelled"))
+        self.assertTrue(halfway.wait(5))
+        job.cancel()
+        resume.set()
+
+        self.assertTrue(wait_until(self.scheduler, lambda: job.done))
+        self.assertEqual(outcomes, ["cancelled"])
+        self.assertLess(len(reported), count)  # stopped at the first checkpoint after cancelling
+        self.assertNotIn("unit_price[B]", master.columns)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+import openpyxl
+
+from core.auto_categorizer import ManualReviewDescription, UnmatchedDescription
+from core.manual_categorizer import (generate_manual_categorization_excel, load_manual_categorization_results,
+                                     process_manual_categorizations, validate_excel_file_structure)
+
+
+class ManualCategorizationWorkbookTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tempdir.cleanup)
+        self.output_dir = Path(self._tempdir.name)
+
+        self.review = [
+            ManualReviewDescription("Excavation", "S1", 2, 1, frequency=3, auto_category="Earth Movement"),
+            ManualReviewDescription("Cable tray", "S2", 5, 4, frequency=1),
+            UnmatchedDescription("Fence", "S1", 9, 8),
+        ]
+        self.path = generate_manual_categorization_excel(self.review, [], output_dir=self.output_dir)
+
+    def test_workbook_layout_and_range_validation(self) -> None:
+        self.assertTrue(validate_excel_file_structure(self.path)["is_valid"])
+
+        wb = openpyxl.load_workbook(self.path)
+        ws = wb["Categorization"]
+        self.assertEqual(wb.sheetnames, ["Categorization", "Instructions"])
+        self.assertEqual([cell.value for cell in ws[2]][:3], ["Excavation", "S1", 3])
+        self.assertEqual(ws["G2"].value, "Earth Movement")
+        self.assertEqual(ws.freeze_panes, "A2")
+        validations = ws.data_validations.dataValidation
+        self.assertEqual([str(dv.sqref) for dv in validations], ["G2:G4"])
+
+    def test_categories_round_trip_from_the_category_column(self) -> None:
+        wb = openpyxl.load_workbook(self.path)
+        ws = wb["Categorization"]
+        ws["G4"] = "Other"
+        ws["H4"] = "checked on site"
+        wb.save(self.path)
+
+        results = load_manual_categorization_results(self.path)
+        self.assertEqual([(r["description"], r["category"], r["frequency"], r["notes"]) for r in results],
+                         [("Excavation", "Earth Movement", 3, ""), ("Fence", "Other", 1, "checked on site")])
+        self.assertEqual(process_manual_categorizations(self.path),
+                         {"excavation": "Earth Movement", "fence": "Other"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import openpyxl
+
+from core.comparison_pipeline import ComparisonPipeline
+from utils import profiler as profiler_module
+from utils.profiler import PipelineProfiler, get_profiler, enable_profiling, disable_profiling
+
+
+class PipelineProfilerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tempdir.cleanup)
+        self.root = Path(self._tempdir.name)
+
+    def test_nested_spans_record_rows_and_memory(self) -> None:
+        profiler = PipelineProfiler(enabled=True, memory_mode="tracemalloc")
+        self.addCleanup(profiler.disable)
+
+        with profiler.span("validation", rows=3):
+            with profiler.span("row_classification") as span:
+                data = [list(range(100)) for _ in range(1000)]
+                span.rows = len(data)
+            del data
+
+        spans = {span.name: span for span in profiler.spans}
+        self.assertEqual(spans["row_classification"].rows, 1000)
+        self.assertEqual(spans["row_classification"].depth, 1)
+        self.assertEqual(spans["validation"].depth, 0)
+        self.assertGreater(spans["row_classification"].memory_peak_mb, 0)
+        # The child's allocation peak is reflected in the enclosing span
+        self.assertGreaterEqual(spans["validation"].memory_peak_mb, spans["row_classification"].memory_peak_mb)
+        self.assertGreaterEqual(spans["validation"].wall_seconds, spans["row_classification"].wall_seconds)
+
+    @unittest.skipUnless(profiler_module.RESOURCE_AVAILABLE, "getrusage is not available")
+    def test_rss_mode_reports_a_delta_without_psutil(self) -> None:
+        profiler = PipelineProfiler(enabled=True, memory_mode="rss")
+
+        with mock.patch.object(profiler_module, "PSUTIL_AVAILABLE", False):
+            with profiler.span("load"):
+                data = bytearray(64 * 1024 * 1024)
+            del data
+
+        span = profiler.spans[0]
+        self.assertIsNotNone(span.memory_delta_mb)
+        self.assertGreaterEqual(span.memory_delta_mb, 0.0)
+        self.assertIsNotNone(span.memory_peak_mb)
+
+    def test_disabled_profiler_records_nothing(self) -> None:
+        profiler = PipelineProfiler()
+        with profiler.span("load") as span:
+            span.rows = 10
+
+        self.assertEqual(profiler.spans, [])
+
+    def test_exports_json_and_chrome_trace(self) -> None:
+        profiler = PipelineProfiler(enabled=True, memory_mode="none")
+        with profiler.span("load", file="offer.xlsx"):
+            pass
+        with profiler.span("load"):
+            pass
+
+        json_path = profiler.save(self.root / "profile.json")
+        trace_path = profiler.save(self.root / "trace.json", "chrome")
+
+        with open(json_path, encoding="utf-8") as handle:
+            report = json.load(handle)
+        self.assertEqual(report["summary"]["load"]["calls"], 2)
+        with open(trace_path, encoding="utf-8") as handle:
+            trace = json.load(handle)
+        event = trace["traceEvents"][0]
+        self.assertEqual((event["name"], event["ph"]), ("load", "X"))
+        self.assertEqual(event["args"]["file"], "offer.xlsx")
+        with self.assertRaises(ValueError):
+            profiler.save(self.root / "profile.txt", "text")
+
+    def test_comparison_pipeline_stages_are_profiled(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        for name, price in (("master", 10), ("offer", 12)):
+            workbook = openpyxl.Workbook()
+            sheet = workbook.active
+            sheet.append(["Code", "Description", "Unit", "Quantity", "Unit Price", "Total Price"])
+            sheet.append(["1.1", "Excavation works", "m3", 10, price, 10 * price])
+            sheet.append(["1.2", "Concrete C25/30", "m3", 5, price, 5 * price])
+            workbook.save(self.root / f"{name}.xlsx")
+
+        profiler = get_profiler()
+        profiler.reset()
+        enable_profiling("none")
+        self.addCleanup(profiler.reset)
+        self.addCleanup(disable_profiling)
+
+        ComparisonPipeline(max_workers=1).run(self.root / "master.xlsx", [self.root / "offer.xlsx"], offer_names=["A"])
+
+        summary = profiler.summary()
+        self.assertIn("offer_parsing", summary)
+        self.assertEqual(summary["merge"]["rows"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import logging
+import unittest
+
+import pandas as pd
+
+from core.comparison_engine import ComparisonProcessor
+from core.row_classifier import ROW_VALIDITY_STATIC, RowClassifier
+from core.row_facts import RowFactsCache, parse_numeric
+from tests.test_sheet_recompute import MAPPING, SHEET
+from utils.config import ColumnType
+
+
+class RowFactsCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self.classifier = RowClassifier()
+        self.facts = RowFactsCache(self.classifier)
+
+    def test_facts_match_the_classifier_and_are_computed_once(self) -> None:
+        for idx, row in enumerate(SHEET):
+            facts = self.facts.get("BOQ", idx, row, MAPPING)
+            self.assertEqual(facts.is_valid, self.classifier.ROW_VALIDITY(row, MAPPING))
+            self.assertEqual(facts.is_valid, ROW_VALIDITY_STATIC(row, MAPPING))
+        self.assertEqual(self.facts.computed, len(SHEET))
+
+        # Remapping scope or unit keeps the facts; a changed row or a remapped quantity column does not
+        self.facts.get("BOQ", 3, SHEET[3], {**MAPPING, 6: ColumnType.IGNORE})
+        self.facts.get("BOQ", 3, SHEET[3], {**MAPPING, 2: ColumnType.IGNORE})
+        self.assertEqual(self.facts.computed, len(SHEET))
+        self.assertFalse(self.facts.is_valid("BOQ", 3, ["1.1", "Excavation works", "m3", "", "20", "200"], MAPPING))
+        self.assertEqual(self.facts.computed, len(SHEET) + 1)
+        self.assertFalse(self.facts.is_valid("BOQ", 6, SHEET[6], {**MAPPING, 3: ColumnType.IGNORE}))
+        self.assertEqual(self.facts.computed, len(SHEET) + 2)
+
+    def test_comparison_rows_reuse_facts_until_new_data_is_loaded(self) -> None:
+        df = pd.DataFrame({
+            "Description": ["Excavation", "Concrete", "Note", "Rebar"],
+            "quantity": ["10", "5", "", "100"],
+            "unit_price": ["22", "1.234,50", "", "abc"],
+            "total_price": ["220", "6172,5", "", "250"],
+        })
+        processor = ComparisonProcessor()
+        processor.manual_invalidations = {"Concrete|C1|m3"}
+        processor.load_comparison_data(df)
+        results = processor.process_comparison_rows()
+
+        self.assertEqual([(r["key"], r["is_valid"], r["reason"]) for r in results], [
+            ("Excavation", True, "VALID"),
+            ("Concrete", False, "MANUAL_OVERRIDE"),
+            ("Note", False, "INVALID"),
+            ("Rebar", False, "INVALID"),
+        ])
+        computed = processor.row_facts.computed
+        self.assertEqual(processor.process_comparison_rows(), results)
+        self.assertEqual(processor.row_facts.computed, computed)
+
+        processor.load_comparison_data(df.iloc[:1])
+        self.assertEqual(len(processor.process_comparison_rows()), 1)
+        self.assertEqual(processor.row_facts.computed, 1)
+
+    def test_parse_numeric(self) -> None:
+        self.assertEqual(parse_numeric("€ 1 234"), 1234.0)
+        self.assertEqual(parse_numeric("1.234.5"), 1234.5)
+        self.assertIsNone(parse_numeric(" "))
+        self.assertIsNone(parse_numeric("n/a"))
+        self.assertIsNone(parse_numeric(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
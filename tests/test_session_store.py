@@ -0,0 +1,136 @@
+import logging
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from core.comparison_pipeline import dataframe_from_file_mapping, process_master_file
+from core.session_store import SessionStore, estimate_size
+from tests.test_comparison_pipeline import _write_boq
+
+
+class SessionStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tempdir.cleanup)
+        self.root = Path(self._tempdir.name)
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+        self.mappings = {}
+        for name in ("a", "b", "c"):
+            path = self.root / f"{name}.xlsx"
+            _write_boq(path, [20, 100, 2])
+            mapping = process_master_file(path)
+            mapping.dataframe = dataframe_from_file_mapping(mapping)
+            self.mappings[name] = mapping
+
+        self.store = SessionStore(budget_mb=0, spill_dir=self.root / "spill")
+        self.addCleanup(self.store.close)
+        for name, mapping in self.mappings.items():
+            self.store[name] = {"file_mapping": mapping, "processor_results": {"rows": list(range(100))},
+                                "processing_time": 1.5}
+
+    def _squeeze_budget(self) -> None:
+        self.store.budget_mb = 1e-6
+        self.store.enforce_budget()
+
+    def test_least_recently_used_files_are_spilled_within_the_budget(self) -> None:
+        self.store.touch("a")
+        self._squeeze_budget()
+
+        self.assertTrue(self.store.is_spilled("b"))
+        self.assertTrue(self.store.is_spilled("c"))
+        self.assertFalse(self.store.is_spilled("a"))
+        self.assertEqual(len(list((self.root / "spill").glob("*.pkl"))), 2)
+        self.assertLess(self.store.resident_bytes(), estimate_size(self.mappings["a"]) * 2)
+
+    def test_spilled_file_reloads_transparently(self) -> None:
+        expected = self.mappings["a"].dataframe.copy()
+        sheet_names = [sheet.sheet_name for sheet in self.mappings["a"].sheets]
+        self._squeeze_budget()
+        self.assertTrue(self.store.is_spilled("a"))
+
+        mapping = self.store["a"]["file_mapping"]
+        self.assertEqual(self.store["a"]["processing_time"], 1.5)
+        self.assertIn("processor_results", self.store["a"])
+        self.assertTrue(self.store.is_spilled("a"))
+
+        pd.testing.assert_frame_equal(mapping.dataframe, expected)
+        self.assertFalse(self.store.is_spilled("a"))
+        self.assertEqual([sheet.sheet_name for sheet in mapping.sheets], sheet_names)
+        self.assertEqual(self.store["a"]["processor_results"], {"rows": list(range(100))})
+
+        # The reloaded file is now the most recent one and stays resident
+        self.assertTrue(self.store.is_spilled("c") or self.store.is_spilled("b"))
+        self.assertEqual(list(self.store)[-1], "a")
+
+    def test_looking_up_a_mapping_does_not_reload_spilled_files(self) -> None:
+        self._squeeze_budget()
+        spilled = [key for key in ("a", "b", "c") if self.store.is_spilled(key)]
+        self.assertGreaterEqual(len(spilled), 2)
+        target = self.mappings[spilled[-1]]
+
+        # The lookup the main window does to find a tab's file
+        with mock.patch.object(self.store, "reload", wraps=self.store.reload) as reload:
+            matches = [key for key, file_data in self.store.items() if file_data.get("file_mapping") == target]
+
+        self.assertEqual(matches, [spilled[-1]])
+        reload.assert_not_called()
+        self.assertTrue(all(self.store.is_spilled(key) for key in spilled))
+
+    def test_shared_references_keep_their_identity(self) -> None:
+        # Locks cannot be pickled, so a copy on disk would fail the eviction
+        shared = threading.Lock()
+        self.store.share(shared)
+        self.mappings["a"].processing_lock = shared
+        self.store["a"]["offers"] = {"Offer 1": {"lock": shared}}
+        self.store.touch("c")
+
+        self._squeeze_budget()
+        self.assertTrue(self.store.is_spilled("a"))
+        self.assertIs(self.mappings["a"].processing_lock, shared)
+        self.assertIs(self.store["a"]["offers"]["Offer 1"]["lock"], shared)
+
+    def test_pinned_and_active_files_keep_their_data_objects(self) -> None:
+        held = self.mappings["a"].dataframe
+        self.store.set_active(self.mappings["a"])
+        self.store.pin(self.mappings["b"])
+
+        self._squeeze_budget()
+        self.assertEqual([key for key in ("a", "b", "c") if self.store.is_spilled(key)], [])
+        self.assertIs(self.mappings["a"].dataframe, held)
+
+        self.store.unpin(self.mappings["b"])
+        self.store.set_active(self.mappings["c"])
+        self.store.enforce_budget()
+        self.assertTrue(self.store.is_spilled("a"))
+        self.assertTrue(self.store.is_spilled("b"))
+
+    def test_budget_checks_from_worker_threads_wait_for_the_owner_thread(self) -> None:
+        self.store.budget_mb = 1e-6
+        worker = threading.Thread(target=self.store.enforce_budget)
+        worker.start()
+        worker.join()
+        self.assertFalse(any(self.store.is_spilled(key) for key in ("a", "b", "c")))
+
+        with self.store.pinned(self.mappings["a"]):
+            pass  # releasing a pin on the owner thread runs the deferred check
+        self.assertTrue(self.store.is_spilled("a"))
+        self.assertTrue(self.store.is_spilled("b"))
+
+    def test_clear_removes_spill_files_without_reloading(self) -> None:
+        self._squeeze_budget()
+        self.assertTrue(any((self.root / "spill").glob("*.pkl")))
+
+        self.store.clear()
+        self.assertEqual(len(self.store), 0)
+        self.assertFalse(any((self.root / "spill").glob("*.pkl")))
+        self.assertNotIn("_spilled", vars(self.mappings["a"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
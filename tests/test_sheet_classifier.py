@@ -0,0 +1,53 @@
+import logging
+import re
+import unittest
+from unittest import mock
+
+from core.sheet_classifier import KeywordMatcher, SheetClassifier, sample_rows
+
+
+def _boq_rows(count):
+    return [[f"1.{i}", f"Excavation item {i}", "m3", str(i), "12.50", f"{i * 12.5:.2f}"] for i in range(count)]
+
+
+class SheetClassifierTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def test_keyword_matcher_finds_the_same_patterns_as_separate_searches(self) -> None:
+        patterns = [r"sum", r"summary", r"summary of", r"total summary", r"^total$", r"sub.?total", r"total"]
+        matcher = KeywordMatcher(patterns)
+        for text in ["total summary of works", "total", "subtotal", "nothing here", "grand total", "sum"]:
+            expected = [p for p in patterns if re.search(p, text, re.IGNORECASE)]
+            self.assertEqual(matcher.matches(text), expected, text)
+            self.assertEqual(matcher.search(text), bool(expected))
+
+    def test_sample_keeps_head_middle_and_tail(self) -> None:
+        rows = [[str(i)] for i in range(1000)]
+
+        sample = sample_rows(rows, 30)
+
+        self.assertEqual(len(sample), 30)
+        self.assertEqual(sample[0], ["0"])
+        self.assertIn(["500"], sample)
+        self.assertEqual(sample[-1], ["999"])
+        self.assertIs(sample_rows(rows, None), rows)
+        self.assertIs(sample_rows(rows, 5000), rows)
+
+    def test_small_sheets_are_classified_as_before_and_large_ones_are_bounded(self) -> None:
+        headers = ["Item", "Description", "Unit", "Qty", "Rate", "Amount"]
+        small = [headers] + _boq_rows(50) + [["", "Subtotal", "", "", "", "1000.00"]]
+        sampled = SheetClassifier().classify_sheet(small, "BOQ")
+        full = SheetClassifier(sample_size=None).classify_sheet(small, "BOQ")
+        self.assertEqual((sampled.scores, sampled.patterns_detected), (full.scores, full.patterns_detected))
+
+        classifier = SheetClassifier(sample_size=90)
+        with mock.patch.object(classifier, "_is_numeric", wraps=classifier._is_numeric) as is_numeric:
+            result = classifier.classify_sheet([headers] + _boq_rows(20000), "Bill of Quantities")
+        self.assertEqual(result.sheet_type.value, "line_items")
+        self.assertLessEqual(is_numeric.call_count, 90 * len(headers))
+
+
+if __name__ == "__main__":
+    unittest.main()
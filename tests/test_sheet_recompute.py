@@ -0,0 +1,84 @@
+import logging
+import pickle
+import unittest
+
+from core.row_classifier import RowClassifier
+from core.sheet_recompute import SheetRecomputeCache
+from utils.config import ColumnType
+
+
+SHEET = [
+    ["Project BoQ", "", "", "", "", "", ""],
+    ["Code", "Description", "Unit", "Quantity", "Unit Price", "Total Price", "Scope"],
+    ["1", "EARTHWORKS", "", "", "", "", ""],
+    ["1.1", "Excavation works", "m3", "10", "20", "200", "A"],
+    ["1.2", "Backfill", "m3", "4", "", "", "A"],
+    ["", "Subtotal earthworks", "", "", "", "200", ""],
+    ["2.1", "Concrete C25/30", "m3", "5", "100", "500", "B"],
+]
+
+MAPPING = {
+    0: ColumnType.CODE, 1: ColumnType.DESCRIPTION, 2: ColumnType.UNIT, 3: ColumnType.QUANTITY,
+    4: ColumnType.UNIT_PRICE, 5: ColumnType.TOTAL_PRICE, 6: ColumnType.SCOPE,
+}
+
+
+def _summary(result):
+    return [(rc.row_index, rc.row_type, rc.completeness_score, rc.section_title) for rc in result.classifications]
+
+
+class SheetRecomputeCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self.classifier = RowClassifier()
+        self.cache = SheetRecomputeCache(self.classifier)
+
+    def test_cached_classification_matches_a_full_run(self) -> None:
+        for header_row_index in (1, 0):
+            data_rows = SHEET[:header_row_index] + SHEET[header_row_index + 1:]
+            expected = self.classifier.classify_rows(data_rows, MAPPING, "BOQ")
+            result = self.cache.classify("BOQ", SHEET, header_row_index, MAPPING)
+            self.assertEqual(_summary(result), _summary(expected))
+
+        # Moving the header row reclassifies, but the text patterns are reused
+        self.assertEqual(self.cache.recomputed["patterns"], 1)
+        self.assertEqual(self.cache.recomputed["classification"], 2)
+
+    def test_only_dependent_results_are_recomputed_after_a_mapping_edit(self) -> None:
+        first = self.cache.classify("BOQ", SHEET, 1, MAPPING)
+        other = self.cache.classify("Other", SHEET, 1, MAPPING)
+
+        # scope -> ignore does not affect classification
+        edited = {**MAPPING, 6: ColumnType.IGNORE}
+        self.assertIs(self.cache.classify("BOQ", SHEET, 1, edited), first)
+
+        # quantity -> ignore does, for the edited sheet only
+        edited[3] = ColumnType.IGNORE
+        data_rows = SHEET[:1] + SHEET[2:]
+        result = self.cache.classify("BOQ", SHEET, 1, edited)
+        self.assertEqual(_summary(result), _summary(self.classifier.classify_rows(data_rows, edited, "BOQ")))
+        self.assertIs(self.cache.classify("Other", SHEET, 1, MAPPING), other)
+        self.assertEqual(self.cache.recomputed["patterns"], 2)  # one per sheet
+
+    def test_sheet_rows_rebuild_on_key_change_and_cache_pickles(self) -> None:
+        builds = []
+
+        def build():
+            builds.append(1)
+            return [{"description": "x"}]
+
+        self.cache.sheet_rows("BOQ", ("a",), build)
+        self.cache.sheet_rows("BOQ", ("a",), build)
+        self.cache.sheet_rows("BOQ", ("b",), build)
+        self.assertEqual(len(builds), 2)
+
+        self.cache.classify("BOQ", SHEET, 1, MAPPING)
+        restored = pickle.loads(pickle.dumps(self.cache))
+        self.assertEqual(_summary(restored.classify("BOQ", restored._sheets["BOQ"].sheet_data, 1, MAPPING)),
+                         _summary(self.cache.classify("BOQ", SHEET, 1, MAPPING)))
+        self.assertEqual(restored.recomputed["classification"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
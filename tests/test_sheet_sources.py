@@ -0,0 +1,104 @@
+import logging
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from core.file_processor import ExcelProcessor
+from core.sheet_sources import CsvSheetSource, cell_to_str
+from utils.lazy_import import module_available
+
+
+class SheetSourceTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tempdir.cleanup)
+        self.root = Path(self._tempdir.name)
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def test_csv_streams_rows_in_chunks_with_detected_dialect(self) -> None:
+        path = self.root / "erp export.csv"
+        lines = ["Code;Description;Qty"] + [f"1.{i};Béton {i};{i}" for i in range(2500)] + ["", '9.9;"A; B";1;extra']
+        path.write_text("\n".join(lines) + "\n", encoding="cp1252")
+
+        source = CsvSheetSource(path)
+        chunks = list(source.iter_chunks("erp export", chunk_rows=1000))
+
+        self.assertEqual((source.encoding, source.delimiter), ("cp1252", ";"))
+        self.assertEqual([len(chunk) for chunk in chunks], [1000, 1000, 502])
+        self.assertEqual(chunks[0][1], ["1.0", "Béton 0", "0"])
+        self.assertEqual(chunks[-1][-1], ["9.9", "A; B", "1", "extra"])
+
+    def test_processor_reads_csv_without_row_cap(self) -> None:
+        path = self.root / "boq.csv"
+        path.write_text("Code,Description\n" + "".join(f"{i},Item {i}\n" for i in range(1500)), encoding="utf-8")
+
+        with ExcelProcessor() as processor:
+            processor.load_file(path)
+            self.assertEqual(processor.get_visible_sheets(), ["boq"])
+            self.assertEqual(len(processor.get_sheet_data("boq")), 1501)
+            self.assertEqual(len(processor.get_all_sheets_data()["boq"]), 1501)
+            self.assertEqual(processor.get_sheet_metadata("boq").last_data_row, 1501)
+            self.assertEqual(processor.sample_sheet_content("boq", 3).rows, [["0", "Item 0"], ["1", "Item 1"]])
+
+    def test_row_cap_truncation_is_logged(self) -> None:
+        path = self.root / "boq.csv"
+        path.write_text("".join(f"{i},Item {i}\n" for i in range(20)), encoding="utf-8")
+
+        logging.disable(logging.NOTSET)
+        with ExcelProcessor() as processor:
+            processor.load_file(path)
+            with self.assertLogs("core.file_processor", level="WARNING") as logs:
+                self.assertEqual(len(processor.get_sheet_data("boq", max_rows=10)), 10)
+            self.assertEqual(len(processor.get_sheet_data("boq", max_rows=20)), 20)
+        self.assertIn("more than 10 rows", logs.output[0])
+
+    @unittest.skipUnless(module_available("xlwt"), "xlwt is not installed")
+    def test_xls_is_read_directly_with_hidden_sheets_and_no_row_cap(self) -> None:
+        import xlwt
+
+        workbook = xlwt.Workbook()
+        sheet = workbook.add_sheet("BOQ")
+        hidden = workbook.add_sheet("Notes")
+        hidden.visibility = 1
+        for row in range(1200):
+            for col, value in enumerate([f"1.{row}", f"Item {row}", row, 12.5]):
+                sheet.write(row, col + 1, value)
+        path = self.root / "legacy.xls"
+        workbook.save(str(path))
+
+        with ExcelProcessor() as processor:
+            processor.load_file(path)
+            rows = processor.get_sheet_data("BOQ", max_rows=None)
+            self.assertEqual(processor.get_visible_sheets(), ["BOQ"])
+            self.assertEqual(len(rows), 1200)
+            self.assertEqual(rows[-1], ["", "1.1199", "Item 1199", "1199", "12.5"])
+            self.assertEqual(processor.get_sheet_metadata("BOQ").first_data_column, 2)
+
+    def test_xlsx_numbers_match_the_xls_and_csv_format(self) -> None:
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        workbook.active.title = "BOQ"
+        workbook.active.append(["Item", 5.0, 12.5, None, 3])
+        path = self.root / "offer.xlsx"
+        workbook.save(path)
+        # Excel stores computed values such as 5.0 with the decimal, which openpyxl reads back as a float
+        with zipfile.ZipFile(path) as archive:
+            parts = {name: archive.read(name) for name in archive.namelist()}
+        parts["xl/worksheets/sheet1.xml"] = parts["xl/worksheets/sheet1.xml"].replace(b"<v>5</v>", b"<v>5.0</v>")
+        with zipfile.ZipFile(path, "w") as archive:
+            for name, data in parts.items():
+                archive.writestr(name, data)
+
+        with ExcelProcessor() as processor:
+            processor.load_file(path)
+            self.assertEqual(processor.get_sheet_data("BOQ"), [["Item", "5", "12.5", "", "3"]])
+
+    def test_cell_to_str_drops_integral_float_suffix(self) -> None:
+        self.assertEqual([cell_to_str(v) for v in (None, 10.0, 12.5, "x", 3)], ["", "10", "12.5", "x", "3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import logging
+import tempfile
+import unittest
+from dataclasses import asdict, replace
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+
+import pandas as pd
+
+from core.comparison_pipeline import build_row_validity, dataframe_from_file_mapping, process_master_file
+from core.mapping_generator import CACHE_FIELDS, MappingGenerator
+from core.sheet_store import SheetDataRef, SheetDataStore
+from tests.test_comparison_pipeline import _write_boq
+
+
+def _to_json_value(value):
+    if isinstance(value, dict):
+        return {key: _to_json_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json_value(item) for item in value]
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class SheetStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tempdir.cleanup)
+        self.root = Path(self._tempdir.name)
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+        master = self.root / "master.xlsx"
+        _write_boq(master, [20, 100, 2])
+        self.mapping = process_master_file(master)
+
+    def test_streamed_json_matches_the_dictionary_export(self) -> None:
+        mapping_dict = asdict(replace(self.mapping, column_mapper=None))
+        for name in ("column_mapper", *CACHE_FIELDS):
+            mapping_dict.pop(name)
+        expected = json.dumps(_to_json_value(mapping_dict), indent=2, default=str)
+
+        output = self.root / "mapping.json"
+        MappingGenerator().write_mapping_json(self.mapping, output)
+
+        self.assertEqual(output.read_text(encoding="utf-8"), expected)
+        self.assertEqual(MappingGenerator().export_mapping_to_json(self.mapping), expected)
+
+    def test_spilled_sheets_reload_on_demand(self) -> None:
+        store = SheetDataStore(max_cached_sheets=1)
+        self.addCleanup(store.clear)
+        grids = {"A": [["1", "x"], ["2", "y", "z"]], "B": [["3"]]}
+        refs = store.spill("file.xlsx", grids)
+
+        self.assertEqual(list(refs), ["A", "B"])
+        self.assertIsInstance(refs["A"], SheetDataRef)
+        self.assertEqual((len(refs["A"]), refs["A"].column_count), (2, 3))
+        self.assertEqual(refs["A"][1], ["2", "y", "z"])
+        self.assertEqual(list(refs["B"]), [["3"]])
+        self.assertEqual(refs["A"][:1], [["1", "x"]])
+
+        cache_dir = store.cache_dir
+        store.clear()
+        self.assertFalse(cache_dir.exists())
+
+    def test_mapping_without_row_data_builds_the_same_dataframe(self) -> None:
+        self.mapping.row_validity = build_row_validity(self.mapping)
+        expected = dataframe_from_file_mapping(self.mapping)
+
+        store = SheetDataStore(self.root / "cache")
+        self.addCleanup(store.clear)
+        refs = store.spill("master", {sheet.sheet_name: sheet.sheet_data for sheet in self.mapping.sheets})
+        for sheet in self.mapping.sheets:
+            sheet.sheet_data = refs[sheet.sheet_name]
+            for rc in sheet.row_classifications:
+                rc.row_data = None
+
+        self.assertEqual(build_row_validity(self.mapping), self.mapping.row_validity)
+        pd.testing.assert_frame_equal(dataframe_from_file_mapping(self.mapping), expected)
+        self.assertIn('"sheet_data": [', MappingGenerator().export_mapping_to_json(self.mapping))
+
+
+if __name__ == "__main__":
+    unittest.main()
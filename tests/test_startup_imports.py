@@ -0,0 +1,75 @@
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from utils.lazy_import import lazy_available, lazy_callable, lazy_module
+from utils.startup_profile import parse_importtime, profile_imports
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Generous ceiling for importing main + the main window; pandas alone exceeds it
+IMPORT_BUDGET_MS = 400.0
+
+HEAVY_MODULES = ("pandas", "openpyxl", "matplotlib", "ttkthemes", "numpy", "ui.settings_dialog")
+
+
+class StartupImportsTest(unittest.TestCase):
+    def test_startup_path_does_not_import_heavy_modules(self) -> None:
+        probe = (
+            "import sys, main, ui.main_window; "
+            f"print('loaded=' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", probe], cwd=str(PROJECT_ROOT), capture_output=True, text=True
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "loaded=")
+
+    def test_startup_import_time_within_budget(self) -> None:
+        timings = profile_imports(["main", "ui.main_window"], PROJECT_ROOT)
+        total_ms = sum(t.cumulative_ms for t in timings if t.depth == 0)
+
+        self.assertIn("main", [t.module for t in timings])
+        self.assertLess(total_ms, IMPORT_BUDGET_MS)
+
+    def test_parse_importtime_reads_nesting(self) -> None:
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   re\n"
+            "import time:       300 |        420 | main\n"
+        )
+        timings = parse_importtime(output)
+
+        self.assertEqual([(t.module, t.depth) for t in timings], [("re", 1), ("main", 0)])
+        self.assertAlmostEqual(timings[1].cumulative_ms, 0.42)
+
+    def test_lazy_proxies_import_on_first_use(self) -> None:
+        json_module = lazy_module("json")
+        dumps = lazy_callable("json", "dumps")
+
+        self.assertFalse(json_module.is_loaded)
+        self.assertEqual(json_module.loads("[1]"), [1])
+        self.assertTrue(json_module.is_loaded)
+        self.assertEqual(dumps({"a": 1}), '{"a": 1}')
+
+    def test_availability_flags_catch_failing_imports(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            Path(directory, "broken_dialog.py").write_text("import no_such_dependency\n")
+            sys.path.insert(0, directory)
+            self.addCleanup(sys.path.remove, directory)
+            self.addCleanup(sys.modules.pop, "broken_dialog", None)
+
+            broken = lazy_available("broken_dialog")  # found by find_spec, fails on import
+            self.assertFalse(broken)
+            self.assertFalse(lazy_available("json", "no_such_module"))
+            self.assertTrue(lazy_available("json"))
+            with self.assertRaises(ImportError):
+                lazy_callable("broken_dialog", "show")()
+
+
+if __name__ == "__main__":
+    unittest.main()
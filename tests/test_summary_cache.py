@@ -0,0 +1,105 @@
+import logging
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from core.comparison_engine import ComparisonEngine, ComparisonProcessor
+from core.summary_cache import SummaryCache
+from utils.export import StreamingExcelWriter, offer_total_columns
+
+
+def _dataset() -> pd.DataFrame:
+    return pd.DataFrame({
+        "Source_Sheet": ["Civil", "Civil", "Electrical", "Electrical", "Civil"],
+        "Category": ["Civil Works", "Roads", "Electrical Works", None, ""],
+        "Description": ["Excavation", "Asphalt", "Cabling", "Lighting", "Fencing"],
+        "total_price": ["200", 150.0, "1.000", "x", np.nan],
+        "total_price[Offer A]": [210.0, 140.0, 900.0, 50.0, 10.0],
+    })
+
+
+def _scan(dataframe: pd.DataFrame, column: str) -> dict:
+    """Per-category totals the way the summary views used to compute them"""
+    return {category: float(pd.to_numeric(dataframe[dataframe["Category"] == category][column], errors="coerce").sum())
+            for category in dataframe["Category"].dropna().unique()}
+
+
+class SummaryCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def assertMatchesScan(self, summary: SummaryCache, dataframe: pd.DataFrame) -> None:
+        for column in ("total_price", "total_price[Offer A]"):
+            self.assertEqual(summary.category_totals(column), _scan(dataframe, column))
+            self.assertAlmostEqual(summary.total(column), pd.to_numeric(dataframe[column], errors="coerce").sum())
+        self.assertEqual(summary.category_counts(), dataframe["Category"].value_counts().to_dict())
+
+    def test_updates_touch_only_changed_rows(self) -> None:
+        df = _dataset()
+        summary = SummaryCache().sync(df)
+        self.assertEqual(summary.updated_rows, len(df))
+
+        # Manual category edit and a new row, reported by the writer
+        df.at[3, "Category"] = "Electrical Works"
+        df.loc[5] = ["Civil", "Roads", "Kerbs", 30.0, 25.0]
+        summary.update_rows(df, [3, 5])
+        self.assertEqual(summary.updated_rows, 5 + 2)
+        self.assertMatchesScan(summary, df)
+        self.assertEqual(summary.sheet_coverage(), {"Civil": (4, 3), "Electrical": (2, 2)})
+
+        # A copy with one edit is diffed, not rebuilt
+        copy = df.copy()
+        copy.at[0, "total_price[Offer A]"] = 999.0
+        before = summary.updated_rows
+        summary.sync(copy)
+        self.assertEqual(summary.updated_rows - before, 1)
+        self.assertMatchesScan(summary, copy)
+
+        restored = pickle.loads(pickle.dumps(summary))
+        self.assertMatchesScan(restored.sync(copy), copy)
+
+    def test_merge_and_add_update_the_master_summary(self) -> None:
+        master = _dataset().drop(columns=["total_price[Offer A]"])
+        master["unit"] = "m"
+        comparison = pd.DataFrame({
+            "Description": ["Asphalt", "Drainage"], "unit": ["m", "m"], "quantity": ["1", "2"], "unit_price": ["10", "5"],
+            "total_price": ["10", "10"], "Source_Sheet": ["Civil", "Civil"], "Category": ["", ""],
+        })
+        summary = SummaryCache()
+        processor = ComparisonProcessor()
+        processor.load_master_dataset(master, summary=summary)
+        processor.load_comparison_data(comparison)
+        processor.row_results = [{"row_index": i, "is_valid": True} for i in comparison.index]
+        processor.process_valid_rows(comparison_engine=ComparisonEngine(), offer_name="Offer B")
+
+        result = processor.master_dataset
+        self.assertEqual(len(result), len(master) + 1)
+        for column in ("total_price", "total_price[Offer B]"):
+            self.assertEqual(summary.category_totals(column), _scan(result, column))
+        self.assertEqual(summary.total("total_price[Offer B]"), 20.0)
+
+    def test_export_summary_caches_formula_results(self) -> None:
+        df = _dataset()
+        df["total_price"] = pd.to_numeric(df["total_price"], errors="coerce")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "summary.xlsx"
+            with StreamingExcelWriter(path) as writer:
+                writer.write_dataframe("BOQ Data", df)
+                writer.write_category_summary("Summary", "BOQ Data", df,
+                                              offer_total_columns(df, ["Offer A"]), summary=SummaryCache().sync(df))
+            sheet = openpyxl.load_workbook(path, data_only=True)["Summary"]
+            headers = [cell.value for cell in sheet[1]]
+            values = dict(zip(headers, [cell.value for cell in sheet[2]]))
+        self.assertEqual(values["Civil Works"], 210)
+        self.assertEqual(values["Electrical Works"], 900)
+        self.assertEqual(values["Solar Cables"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import logging
+import unittest
+
+from core.validator import DataValidator, ValidationIssue, ValidationLevel, ValidationRule, ValidationType
+from utils.config import ColumnType
+
+
+SHEET = [
+    ["1.1", "Excavation", "m3", "10", "20", "200"],
+    ["1.2", "Backfill", "m3", "4", "abc", "80"],
+    ["1.3", "Excavation", "m3", "-2", "€5", "7"],
+    ["1.4", "Concrete", "", "x", "100", ""],
+]
+
+MAPPING = {
+    0: ColumnType.CODE, 1: ColumnType.DESCRIPTION, 2: ColumnType.UNIT,
+    3: ColumnType.QUANTITY, 4: ColumnType.UNIT_PRICE, 5: ColumnType.TOTAL_PRICE,
+}
+
+CLASSIFICATIONS = {0: "primary_line_item", 3: "primary_line_item"}
+
+
+class _CountingValidator(DataValidator):
+    def __init__(self) -> None:
+        super().__init__()
+        self.parsed = 0
+
+    def _parse_number(self, value):
+        self.parsed += 1
+        return super()._parse_number(value)
+
+
+class _LongDescriptionRule(ValidationRule):
+    def __init__(self, validator, column_mapping, row_classifications):
+        super().__init__(validator, column_mapping, row_classifications)
+        self.issues = []
+
+    def check_row(self, row):
+        if row.has(1) and len(row.cells[1]) > 9:
+            self.issues.append(ValidationIssue(row.index, 1, ValidationType.CONSISTENCY, ValidationLevel.INFO,
+                                               "Long description", None, row.cells[1], None))
+
+    def finish(self):
+        return self.issues
+
+
+class DataValidatorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def test_issues_keep_the_order_of_the_individual_checks(self) -> None:
+        validator = DataValidator()
+        result = validator.validate_sheet(SHEET, MAPPING, CLASSIFICATIONS)
+
+        self.assertEqual(
+            [(issue.validation_type, issue.row_index, issue.column_index) for issue in result.issues],
+            [(ValidationType.MATHEMATICAL, 2, None),
+             (ValidationType.DATA_TYPE, 3, 3),
+             (ValidationType.DATA_TYPE, 1, 4),
+             (ValidationType.BUSINESS_RULE, 3, None),
+             (ValidationType.BUSINESS_RULE, 2, 3),
+             (ValidationType.CONSISTENCY, 2, 1)],
+        )
+        self.assertEqual(result.issues[3].actual_value, "Missing: total_price, unit")
+        self.assertEqual(result.summary[ValidationLevel.ERROR], 4)
+        self.assertEqual(result.overall_score, 100.0 - 4 * 10 - 2 * 2)
+
+        expected = [check.row_index for check in validator.validate_mathematical_consistency(SHEET, MAPPING)]
+        self.assertEqual(expected, [0, 2])
+        self.assertEqual(validator.validate_business_rules(SHEET, MAPPING, CLASSIFICATIONS),
+                         result.issues[3:5])
+
+    def test_each_numeric_cell_is_parsed_once(self) -> None:
+        validator = _CountingValidator()
+        validator.validate_sheet(SHEET, MAPPING, CLASSIFICATIONS)
+        numeric_cells = sum(1 for row in SHEET for col in (3, 4, 5) if col < len(row))
+        self.assertLessEqual(validator.parsed, numeric_cells)
+
+    def test_added_rules_report_after_the_built_in_ones(self) -> None:
+        validator = DataValidator()
+        validator.add_rule(_LongDescriptionRule)
+        issues = validator.validate_sheet(SHEET, MAPPING, CLASSIFICATIONS).issues
+        self.assertEqual([(issue.message, issue.row_index) for issue in issues[-2:]],
+                         [("Long description", 0), ("Long description", 2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
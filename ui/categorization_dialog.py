@@ -5,18 +5,19 @@ Provides UI for the complete categorization workflow
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import threading
 import os
 from pathlib import Path
 from typing import Dict, Any, Optional, Callable
 import logging
 import pandas as pd
 
+from utils.job_scheduler import JobScheduler
+
 logger = logging.getLogger(__name__)
 
 
 class CategorizationDialog:
-    def __init__(self, parent, controller, file_mapping, on_complete=None):
+    def __init__(self, parent, controller, file_mapping, on_complete=None, jobs=None):
         """
         Initialize the categorization dialog
         
@@ -25,11 +26,15 @@ class CategorizationDialog:
             controller: Main application controller
             file_mapping: File mapping object with processed data
             on_complete: Callback function when categorization is complete
+            jobs: JobScheduler to run auto-categorization on (default: one owned by the dialog)
         """
         self.parent = parent
         self.controller = controller
         self.file_mapping = file_mapping
         self.on_complete = on_complete
+        self.jobs = jobs
+        self._owns_jobs = jobs is None
+        self._job = None
         
         # Dialog state
         self.dialog = None
@@ -134,41 +139,54 @@ class CategorizationDialog:
         button_frame.grid_columnconfigure(0, weight=1)
     
     def _start_categorization(self):
-        """Start the categorization process in a background thread"""
-        def categorization_thread():
-            try:
-                from core.manual_categorizer import execute_row_categorization
-                
-                # Get the DataFrame from file mapping
-                # This assumes the file mapping contains the processed DataFrame
-                # You may need to adjust this based on your actual data structure
-                mapped_df = self._get_dataframe_from_mapping()
-                
-                if mapped_df is None:
-                    self._show_error("No data available for categorization")
-                    return
-                
-                # Execute categorization with progress callback
-                result = execute_row_categorization(
-                    mapped_df=mapped_df,
-                    progress_callback=self._update_progress
-                )
-                
-                # Handle result
-                if result['error']:
-                    self._show_error(f"Categorization failed: {result['error']}")
-                else:
-                    self.categorization_result = result
-                    self.final_dataframe = result['final_dataframe']
-                    self._show_success()
-                    
-            except Exception as e:
-                logger.error(f"Categorization error: {e}")
-                self._show_error(f"Unexpected error: {str(e)}")
+        """Run auto-categorization as a job; its progress and result arrive on the Tk thread"""
+        mapped_df = self._get_dataframe_from_mapping()
+        if mapped_df is None:
+            self._show_error("No data available for categorization")
+            return
         
-        # Start thread
-        thread = threading.Thread(target=categorization_thread, daemon=True)
-        thread.start()
+        if self.jobs is None:
+            self.jobs = JobScheduler(max_threads=1)
+            self.jobs.attach(self.dialog)
+        self.dialog.bind('<Destroy>', self._on_destroy, add='+')
+        
+        def categorize(context):
+            from core.manual_categorizer import execute_row_categorization
+            # context.progress also stops the job once the dialog is closed
+            return execute_row_categorization(mapped_df=mapped_df, progress_callback=context.progress)
+        
+        self._job = self.jobs.submit(
+            categorize,
+            name="Auto-categorize",
+            on_progress=self._update_progress,
+            on_result=self._on_categorized,
+            on_error=self._on_categorization_error,
+        )
+    
+    def _on_categorized(self, result):
+        """Apply the auto-categorization result (Tk thread)"""
+        if not self.dialog.winfo_exists():
+            return
+        if result['error']:
+            self._show_error(f"Categorization failed: {result['error']}")
+        else:
+            self.categorization_result = result
+            self.final_dataframe = result['final_dataframe']
+            self._show_success()
+    
+    def _on_categorization_error(self, error):
+        logger.error(f"Categorization error: {error}")
+        if self.dialog.winfo_exists():
+            self._show_error(f"Unexpected error: {str(error)}")
+    
+    def _on_destroy(self, event):
+        """Stop the categorization job when the dialog closes"""
+        if event.widget is not self.dialog:
+            return
+        if self._job is not None and not self._job.done:
+            self._job.cancel()
+        if self._owns_jobs and self.jobs is not None:
+            self.jobs.shutdown()
     
     def _get_dataframe_from_mapping(self):
         """Extract DataFrame from file mapping"""
@@ -630,7 +648,7 @@ class CategorizationDialog:
 
 
 
-def show_categorization_dialog(parent, controller, file_mapping, on_complete=None):
+def show_categorization_dialog(parent, controller, file_mapping, on_complete=None, jobs=None):
     """
     Show the categorization dialog
     
@@ -639,9 +657,10 @@ def show_categorization_dialog(parent, controller, file_mapping, on_complete=Non
         controller: Main application controller
         file_mapping: File mapping object
         on_complete: Callback function when categorization is complete
+        jobs: JobScheduler to run auto-categorization on (default: one owned by the dialog)
     
     Returns:
         CategorizationDialog instance
     """
-    dialog = CategorizationDialog(parent, controller, file_mapping, on_complete)
+    dialog = CategorizationDialog(parent, controller, file_mapping, on_complete, jobs)
     return dialog 
\ No newline at end of file
@@ -10,19 +10,18 @@ from typing import Dict, List, Any, Optional
 import logging
 import numpy as np
 
-# Optional matplotlib import
-try:
-    import matplotlib.pyplot as plt
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-    MATPLOTLIB_AVAILABLE = True
-except ImportError:
-    MATPLOTLIB_AVAILABLE = False
+from utils.lazy_import import lazy_available, lazy_callable, lazy_module
+
+# Optional matplotlib import, deferred until a chart is drawn
+MATPLOTLIB_AVAILABLE = lazy_available('matplotlib.pyplot', 'matplotlib.backends.backend_tkagg')
+plt = lazy_module('matplotlib.pyplot')
+FigureCanvasTkAgg = lazy_callable('matplotlib.backends.backend_tkagg', 'FigureCanvasTkAgg')
 
 logger = logging.getLogger(__name__)
 
 
 class CategorizationStatsDialog:
-    def __init__(self, parent, dataframe, categorization_result=None):
+    def __init__(self, parent, dataframe, categorization_result=None, summary=None):
         """
         Initialize the categorization statistics dialog
         
@@ -30,10 +29,16 @@ class CategorizationStatsDialog:
             parent: Parent window
             dataframe: DataFrame with categorization data
             categorization_result: Result from categorization process
+            summary: SummaryCache of the dataset (optional); category and sheet
+                counts are read from its running totals instead of rescanning
         """
         self.parent = parent
         self.dataframe = dataframe
         self.categorization_result = categorization_result
+        if summary is None and 'Category' in dataframe.columns:
+            from core.summary_cache import SummaryCache
+            summary = SummaryCache()
+        self.summary = summary.sync(dataframe) if summary is not None else None
         
         # Dialog state
         self.dialog = None
@@ -350,11 +355,11 @@ class CategorizationStatsDialog:
         
         # Get top categories
         if 'Category' in self.dataframe.columns:
-            category_counts = self.dataframe['Category'].value_counts().head(10)
+            category_counts = list(self.summary.category_counts().items())[:10]
             
             # Create bar chart
-            categories = category_counts.index.tolist()
-            counts = category_counts.values.tolist()
+            categories = [category for category, _ in category_counts]
+            counts = [count for _, count in category_counts]
             
             y_pos = np.arange(len(categories))
             ax.barh(y_pos, counts)
@@ -376,15 +381,14 @@ class CategorizationStatsDialog:
         total_rows = len(self.dataframe)
         
         if 'Category' in self.dataframe.columns:
-            categorized_mask = self.dataframe['Category'].notna() & (self.dataframe['Category'] != '')
-            categorized_rows = categorized_mask.sum()
+            categorized_rows = self.summary.categorized_count
             coverage_rate = categorized_rows / total_rows if total_rows > 0 else 0
             
             # Category statistics
-            category_counts = self.dataframe['Category'].value_counts()
+            category_counts = self.summary.category_counts()
             unique_categories = len(category_counts)
-            most_common_category = category_counts.index[0] if len(category_counts) > 0 else 'None'
-            avg_category_size = category_counts.mean() if len(category_counts) > 0 else 0
+            most_common_category = next(iter(category_counts)) if category_counts else 'None'
+            avg_category_size = sum(category_counts.values()) / len(category_counts) if category_counts else 0
             
             # Average description length
             if 'Description' in self.dataframe.columns:
@@ -416,19 +420,9 @@ class CategorizationStatsDialog:
         
         # Group by source sheet
         sheet_stats = []
-        for sheet in self.dataframe['Source_Sheet'].unique():
-            sheet_data = self.dataframe[self.dataframe['Source_Sheet'] == sheet]
-            total_rows = len(sheet_data)
-            
-            if 'Category' in sheet_data.columns:
-                categorized_mask = sheet_data['Category'].notna() & (sheet_data['Category'] != '')
-                categorized = categorized_mask.sum()
-                uncategorized = total_rows - categorized
-                coverage_rate = categorized / total_rows if total_rows > 0 else 0
-            else:
-                categorized = 0
-                uncategorized = total_rows
-                coverage_rate = 0
+        for sheet, (total_rows, categorized) in self._sheet_coverage().items():
+            uncategorized = total_rows - categorized
+            coverage_rate = categorized / total_rows if total_rows > 0 else 0
             
             sheet_stats.append({
                 'sheet': sheet,
@@ -457,15 +451,11 @@ class CategorizationStatsDialog:
             return
         
         # Get category statistics
-        category_counts = self.dataframe['Category'].value_counts()
+        category_counts = pd.Series(self.summary.category_counts(), dtype=int)
         total_rows = len(self.dataframe)
         
         # Calculate average description length per category
-        avg_lengths = {}
-        if 'Description' in self.dataframe.columns:
-            for category in category_counts.index:
-                category_data = self.dataframe[self.dataframe['Category'] == category]
-                avg_lengths[category] = category_data['Description'].astype(str).str.len().mean()
+        avg_lengths = self._average_description_lengths()
         
         # Insert into treeview
         for category, count in category_counts.items():
@@ -479,6 +469,23 @@ class CategorizationStatsDialog:
                 f"{avg_length:.1f}"
             ))
     
+    def _sheet_coverage(self) -> Dict[str, tuple]:
+        """(rows, categorized rows) per source sheet, in order of first appearance"""
+        if self.summary is not None:
+            coverage = self.summary.sheet_coverage()
+        else:
+            coverage = {sheet: (int(count), 0)
+                        for sheet, count in self.dataframe['Source_Sheet'].value_counts(sort=False).items()}
+        order = self.dataframe['Source_Sheet'].dropna().unique()
+        return {sheet: coverage[sheet] for sheet in order if sheet in coverage}
+    
+    def _average_description_lengths(self) -> Dict[str, float]:
+        """Average description length per category, in one grouped pass"""
+        if 'Description' not in self.dataframe.columns:
+            return {}
+        lengths = self.dataframe['Description'].astype(str).str.len()
+        return lengths.groupby(self.dataframe['Category']).mean().to_dict()
+    
     def _export_report(self):
         """Export the statistics report"""
         from tkinter import filedialog
@@ -548,19 +555,9 @@ class CategorizationStatsDialog:
             return pd.DataFrame()
         
         sheet_stats = []
-        for sheet in self.dataframe['Source_Sheet'].unique():
-            sheet_data = self.dataframe[self.dataframe['Source_Sheet'] == sheet]
-            total_rows = len(sheet_data)
-            
-            if 'Category' in sheet_data.columns:
-                categorized_mask = sheet_data['Category'].notna() & (sheet_data['Category'] != '')
-                categorized = categorized_mask.sum()
-                uncategorized = total_rows - categorized
-                coverage_rate = categorized / total_rows if total_rows > 0 else 0
-            else:
-                categorized = 0
-                uncategorized = total_rows
-                coverage_rate = 0
+        for sheet, (total_rows, categorized) in self._sheet_coverage().items():
+            uncategorized = total_rows - categorized
+            coverage_rate = categorized / total_rows if total_rows > 0 else 0
             
             sheet_stats.append({
                 'Source_Sheet': sheet,
@@ -577,15 +574,11 @@ class CategorizationStatsDialog:
         if 'Category' not in self.dataframe.columns:
             return pd.DataFrame()
         
-        category_counts = self.dataframe['Category'].value_counts()
+        category_counts = pd.Series(self.summary.category_counts(), dtype=int)
         total_rows = len(self.dataframe)
         
         # Calculate average description length per category
-        avg_lengths = {}
-        if 'Description' in self.dataframe.columns:
-            for category in category_counts.index:
-                category_data = self.dataframe[self.dataframe['Category'] == category]
-                avg_lengths[category] = category_data['Description'].astype(str).str.len().mean()
+        avg_lengths = self._average_description_lengths()
         
         data = {
             'Category': category_counts.index.tolist(),
@@ -597,7 +590,7 @@ class CategorizationStatsDialog:
         return pd.DataFrame(data)
 
 
-def show_categorization_stats_dialog(parent, dataframe, categorization_result=None):
+def show_categorization_stats_dialog(parent, dataframe, categorization_result=None, summary=None):
     """
     Show the categorization statistics dialog
     
@@ -605,9 +598,10 @@ def show_categorization_stats_dialog(parent, dataframe, categorization_result=No
         parent: Parent window
         dataframe: DataFrame with categorization data
         categorization_result: Result from categorization process
+        summary: SummaryCache of the dataset (optional)
     
     Returns:
         CategorizationStatsDialog instance
     """
-    dialog = CategorizationStatsDialog(parent, dataframe, categorization_result)
+    dialog = CategorizationStatsDialog(parent, dataframe, categorization_result, summary)
     return dialog 
\ No newline at end of file
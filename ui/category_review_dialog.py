@@ -9,11 +9,13 @@ import pandas as pd
 from typing import Dict, List, Any, Optional, Callable
 import logging
 
+from core.boq_schema import make_writable
+
 logger = logging.getLogger(__name__)
 
 
 class CategoryReviewDialog:
-    def __init__(self, parent, dataframe, on_save=None):
+    def __init__(self, parent, dataframe, on_save=None, summary=None):
         """
         Initialize the category review dialog
         
@@ -21,11 +23,14 @@ class CategoryReviewDialog:
             parent: Parent window
             dataframe: DataFrame with categorization data
             on_save: Callback function when categories are saved
+            summary: SummaryCache of the dataset, told which rows changed on save (optional)
         """
         self.parent = parent
         self.dataframe = dataframe.copy()  # Work with a copy
         self.original_dataframe = dataframe
         self.on_save = on_save
+        self.summary = summary
+        self.changed_labels = set()
         
         # Dialog state
         self.dialog = None
@@ -266,7 +271,9 @@ class CategoryReviewDialog:
             # Update the DataFrame
             index = self.tree.set(item, 'index')
             if index is not None:
+                make_writable(self.dataframe, 'Category', [new_category])
                 self.dataframe.at[int(index), 'Category'] = new_category
+                self.changed_labels.add(int(index))
             
             # Update statistics
             self._update_statistics()
@@ -375,6 +382,8 @@ class CategoryReviewDialog:
         # Confirm save
         if messagebox.askyesno("Save Changes", 
                               "Are you sure you want to save the category changes?"):
+            if self.summary is not None:
+                self.summary.update_rows(self.dataframe, self.changed_labels)
             if self.on_save:
                 self.on_save(self.dataframe)
             messagebox.showinfo("Success", "Category changes saved successfully!")
@@ -395,7 +404,7 @@ class CategoryReviewDialog:
         self._on_cancel()
 
 
-def show_category_review_dialog(parent, dataframe, on_save=None):
+def show_category_review_dialog(parent, dataframe, on_save=None, summary=None):
     """
     Show the category review dialog
     
@@ -403,9 +412,10 @@ def show_category_review_dialog(parent, dataframe, on_save=None):
         parent: Parent window
         dataframe: DataFrame with categorization data
         on_save: Callback function when categories are saved
+        summary: SummaryCache of the dataset, told which rows changed on save (optional)
     
     Returns:
         CategoryReviewDialog instance
     """
-    dialog = CategoryReviewDialog(parent, dataframe, on_save)
+    dialog = CategoryReviewDialog(parent, dataframe, on_save, summary)
     return dialog 
\ No newline at end of file
@@ -292,15 +292,11 @@ class ComparisonRowReviewDialog:
                     row_index_mapping[len(all_rows) - 1] = (sheet.sheet_name, rc.row_index)
         
         # Add rows to treeview
+        results_by_index = self._row_results_by_index()
         for unified_idx, row_dict in enumerate(all_rows):
             # Find corresponding row result
             sheet_name, original_idx = row_index_mapping[unified_idx]
-            row_result = None
-            
-            for result in self.row_results:
-                if result['row_index'] == original_idx:
-                    row_result = result
-                    break
+            row_result = results_by_index.get(original_idx)
             
             if row_result is None:
                 # Create default result if not found
@@ -329,6 +325,13 @@ class ComparisonRowReviewDialog:
             else:
                 self.tree.item(item, tags=('invalidrow',))
     
+    def _row_results_by_index(self):
+        """First row result for each row index, instead of scanning row_results for every row"""
+        results_by_index = {}
+        for result in self.row_results:
+            results_by_index.setdefault(result['row_index'], result)
+        return results_by_index
+    
     def _populate_from_dataframe(self):
         """Populate treeview using DataFrame directly"""
         dataframe = getattr(self.file_mapping, 'dataframe', None)
@@ -347,13 +350,10 @@ class ComparisonRowReviewDialog:
         logger.info(f"Column name mapping: {column_name_mapping}")
         
         # Add rows to treeview
+        results_by_index = self._row_results_by_index()
         for idx, row in dataframe.iterrows():
             # Find corresponding row result
-            row_result = None
-            for result in self.row_results:
-                if result['row_index'] == idx:
-                    row_result = result
-                    break
+            row_result = results_by_index.get(idx)
             
             if row_result is None:
                 # Create default result if not found
@@ -10,10 +10,9 @@ import platform
 from pathlib import Path
 from typing import List, Dict, Any, Tuple
 import logging
-import threading
+from utils.job_scheduler import JobScheduler
+import copy
 import dataclasses
-import pandas as pd
-import openpyxl
 from core.row_classifier import RowType
 from core.category_dictionary import CategoryDictionary
 from core.validator import ValidationType
@@ -21,6 +20,11 @@ from datetime import datetime
 import pickle
 import re
 import time
+from utils.lazy_import import lazy_available, lazy_callable, lazy_module
+
+# Heavy modules are imported on first use to keep window startup fast
+pd = lazy_module('pandas')
+openpyxl = lazy_module('openpyxl')
 
 # Get a logger for this module
 logger = logging.getLogger(__name__)
@@ -36,6 +40,32 @@ class PositionValidationError(ValidationError):
     """Specific exception for position-description validation failures"""
     pass
 
+class ComparisonError(Exception):
+    """A comparison stage failed; the message is shown to the user under title"""
+    def __init__(self, message, title="Error"):
+        super().__init__(message)
+        self.title = title
+
+@dataclasses.dataclass
+class ComparisonRun:
+    """State of one comparison, handed from stage to stage of the background comparison jobs"""
+    tab_id: str
+    master_file_mapping: Any
+    master_df: Any
+    offer_info: Dict[str, Any]
+    comparison_file: str
+    # Master file mapping attributes before the comparison, restored when it is cancelled or fails
+    snapshot: Dict[str, Any]
+    summary: Any = None
+    existing_offer_cols: List[str] = dataclasses.field(default_factory=list)
+    processor: Any = None
+    comparison_file_mapping: Any = None
+    comparison_df: Any = None
+    row_results: Any = None
+    warnings: List[Any] = dataclasses.field(default_factory=list)
+    updated_df: Any = None
+    grid: Any = None
+
 def _format_validation_error_message(validation_result, context=""):
     """
     Standardized error message formatting for position-description validation failures
@@ -175,80 +205,40 @@ def _handle_validation_failure(validation_result, context="", operation="validat
     # Raise exception to terminate processing
     raise PositionValidationError(error_message, validation_result)
 
-# Optional imports
-try:
-    from ttkthemes import ThemedTk
-    THEME_AVAILABLE = True
-except ImportError:
-    THEME_AVAILABLE = False
-
-try:
-    import tkinterdnd2 as TkinterDnD
-    DND_AVAILABLE = True
-    DND_FILES = TkinterDnD.DND_FILES
-except ImportError:
-    DND_AVAILABLE = False
-
-# Import settings dialog
-try:
-    from ui.settings_dialog import show_settings_dialog
-    SETTINGS_AVAILABLE = True
-except ImportError:
-    SETTINGS_AVAILABLE = False
-
-# Import sheet categorization dialog
-try:
-    from ui.sheet_categorization_dialog import show_sheet_categorization_dialog
-    SHEET_CATEGORIZATION_AVAILABLE = True
-except ImportError:
-    SHEET_CATEGORIZATION_AVAILABLE = False
-
-print('SHEET_CATEGORIZATION_AVAILABLE forced to True')
-
-# Import comparison row review dialog
-try:
-    from ui.comparison_row_review_dialog import show_comparison_row_review
-    COMPARISON_ROW_REVIEW_AVAILABLE = True
-except ImportError:
-    COMPARISON_ROW_REVIEW_AVAILABLE = False
-
-# Import offer info dialog
-try:
-    from ui.offer_info_dialog import show_offer_info_dialog
-    OFFER_INFO_AVAILABLE = True
-except ImportError:
-    OFFER_INFO_AVAILABLE = False
-
-# Import row review dialog
-try:
-    from ui.row_review_dialog import show_row_review_dialog
-    ROW_REVIEW_AVAILABLE = True
-except ImportError:
-    ROW_REVIEW_AVAILABLE = False
-
-# Import preview dialog
-try:
-    from ui.preview_dialog import show_preview_dialog
-    PREVIEW_AVAILABLE = True
-except ImportError:
-    PREVIEW_AVAILABLE = False
-
-# Import categorization dialogs
-try:
-    from ui.categorization_dialog import show_categorization_dialog
-    from ui.category_review_dialog import show_category_review_dialog
-    from ui.categorization_stats_dialog import show_categorization_stats_dialog
-    CATEGORIZATION_AVAILABLE = True
-except ImportError:
-    CATEGORIZATION_AVAILABLE = False
-
-# Import category dictionary manager dialog
-try:
-    from ui.category_dictionary_manager import CategoryDictionaryManager
-    CATEGORY_DICTIONARY_MANAGER_AVAILABLE = True
-except ImportError:
-    CATEGORY_DICTIONARY_MANAGER_AVAILABLE = False
-    CategoryDictionaryManager = None
+# Optional imports (resolved on first use; a flag imports its modules the first time it is tested)
+THEME_AVAILABLE = lazy_available('ttkthemes')
+ThemedTk = lazy_callable('ttkthemes', 'ThemedTk')
+
+DND_AVAILABLE = lazy_available('tkinterdnd2')
+TkinterDnD = lazy_module('tkinterdnd2')
+
+# Dialogs
+SETTINGS_AVAILABLE = lazy_available('ui.settings_dialog')
+show_settings_dialog = lazy_callable('ui.settings_dialog', 'show_settings_dialog')
+
+SHEET_CATEGORIZATION_AVAILABLE = lazy_available('ui.sheet_categorization_dialog')
+show_sheet_categorization_dialog = lazy_callable('ui.sheet_categorization_dialog', 'show_sheet_categorization_dialog')
+
+COMPARISON_ROW_REVIEW_AVAILABLE = lazy_available('ui.comparison_row_review_dialog')
+show_comparison_row_review = lazy_callable('ui.comparison_row_review_dialog', 'show_comparison_row_review')
+
+OFFER_INFO_AVAILABLE = lazy_available('ui.offer_info_dialog')
+show_offer_info_dialog = lazy_callable('ui.offer_info_dialog', 'show_offer_info_dialog')
+
+ROW_REVIEW_AVAILABLE = lazy_available('ui.row_review_dialog')
+show_row_review_dialog = lazy_callable('ui.row_review_dialog', 'show_row_review_dialog')
+
+PREVIEW_AVAILABLE = lazy_available('ui.preview_dialog')
+show_preview_dialog = lazy_callable('ui.preview_dialog', 'show_preview_dialog')
+
+CATEGORIZATION_AVAILABLE = lazy_available(
+    'ui.categorization_dialog', 'ui.category_review_dialog', 'ui.categorization_stats_dialog')
+show_categorization_dialog = lazy_callable('ui.categorization_dialog', 'show_categorization_dialog')
+show_category_review_dialog = lazy_callable('ui.category_review_dialog', 'show_category_review_dialog')
+show_categorization_stats_dialog = lazy_callable('ui.categorization_stats_dialog', 'show_categorization_stats_dialog')
+
+CATEGORY_DICTIONARY_MANAGER_AVAILABLE = lazy_available('ui.category_dictionary_manager')
+CategoryDictionaryManager = lazy_callable('ui.category_dictionary_manager', 'CategoryDictionaryManager')
 
 # Color coding for confidence
 def confidence_color(score):
@@ -287,6 +277,9 @@ class MainWindow:
         self.root.title("BOQ Tools - Excel Processor")
         self.root.geometry("1200x700")
         self.root.minsize(900, 600)
+        # Background work runs on the job scheduler; its results are delivered from the Tk loop
+        self.jobs = JobScheduler()
+        self.jobs.attach(self.root)
         self._setup_style()
         self._create_menu()
         # Initialize variables before creating widgets
@@ -302,6 +295,8 @@ class MainWindow:
         self.row_review_frame = None  # Initialize row review frame
         # ComparisonProcessor will handle comparison logic
         self.comparison_processor = None
+        self.comparison_run = None  # ComparisonRun of the comparison in progress
+        self.comparison_job = None  # Job of its current background stage
         # Track comparison state
         self.is_comparison_workflow = False
         self.master_file_mapping = None
@@ -412,6 +407,7 @@ class MainWindow:
         # Center: Tabbed interface for files
         self.notebook = ttk.Notebook(main_frame)
         self.notebook.grid(row=1, column=0, sticky=tk.NSEW, padx=10, pady=5)
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_notebook_tab_changed)
         
         # Bottom: Status bar and progress
         self.status_frame = ttk.Frame(main_frame)
@@ -426,13 +422,18 @@ class MainWindow:
         
         self.progress = ttk.Progressbar(self.status_frame, variable=self.progress_var, maximum=100, length=180)
         self.progress.grid(row=0, column=1, padx=8)
+        
+        # Shown while a comparison runs in the background
+        self.cancel_button = ttk.Button(self.status_frame, text="Cancel", command=self._cancel_comparison)
+        self.cancel_button.grid(row=0, column=2, padx=(0, 8))
+        self.cancel_button.grid_remove()
 
     def _setup_drag_and_drop(self):
         if DND_AVAILABLE:
             try:
                 # Enable drag and drop if available
                 if hasattr(self.root, 'drop_target_register'):
-                    self.root.drop_target_register(DND_FILES)
+                    self.root.drop_target_register(TkinterDnD.DND_FILES)
                 if hasattr(self.root, 'dnd_bind'):
                     self.root.dnd_bind('<<Drop>>', self._on_drop)
             except AttributeError:
@@ -447,6 +448,7 @@ class MainWindow:
         self.root.bind('<Control-o>', lambda e: self.open_file())
         self.root.bind('<Control-e>', lambda e: self.export_file())
         self.root.bind('<Control-q>', lambda e: self.root.quit())
+        self.root.bind('<Escape>', lambda e: self._cancel_comparison())
         self.root.bind('<Control-z>', lambda e: self._update_status('Undo is not implemented.'))
         self.root.bind('<Control-y>', lambda e: self._update_status('Redo is not implemented.'))
 
@@ -536,6 +538,146 @@ class MainWindow:
             import traceback
             traceback.print_exc()
 
+    def _session_store(self):
+        """The controller's SessionStore, or None when files are kept in a plain dict"""
+        current_files = getattr(self.controller, 'current_files', None)
+        return current_files if hasattr(current_files, 'pin') else None
+
+    def _pin_while_open(self, file_mapping, window):
+        """Keep file_mapping resident in the session store until window is destroyed"""
+        store = self._session_store()
+        if store is None or file_mapping is None or window is None:
+            return
+        store.pin(file_mapping)
+        
+        def release(event):
+            if event.widget is window:
+                store.unpin(file_mapping)
+        window.bind('<Destroy>', release, add='+')
+
+    def _submit_file_processing(self, filepath, name, on_result, on_error, on_cancelled=None,
+                                sheet_filter=None, sheet_types=None):
+        """
+        Analyze a workbook as a process job and register the result on the Tk thread
+
+        Each job gets its own copies of the controller's pipeline components, so
+        several files are classified and mapped in parallel. Falls back to a
+        thread job when worker processes cannot be started.
+        """
+        from concurrent.futures.process import BrokenProcessPool
+        from core.file_pipeline import process_workbook
+
+        path = Path(filepath)
+
+        def run_in_thread():
+            self.jobs.submit(
+                lambda context: self.controller.process_file(
+                    path, progress_callback=context.progress,
+                    sheet_filter=sheet_filter, sheet_types=sheet_types,
+                ),
+                name=name,
+                on_progress=self.update_progress,
+                on_result=on_result,
+                on_error=on_error,
+                on_cancelled=on_cancelled,
+            )
+
+        def on_processed(result):
+            try:
+                file_mapping = self.controller.register_processed_file(path, *result)
+            except Exception as e:
+                on_error(e)
+                return
+            self.update_progress(100, "Processing complete")
+            on_result(file_mapping)
+
+        def on_process_error(error):
+            if isinstance(error, BrokenProcessPool):
+                logger.warning(f"Worker process failed for {path.name}, processing in a thread: {error}")
+                run_in_thread()
+            else:
+                on_error(error)
+
+        if not hasattr(self.controller, 'pipeline_components'):
+            run_in_thread()
+            return
+        try:
+            self.jobs.submit_process(
+                process_workbook, path, *self.controller.pipeline_components(),
+                sheet_filter=sheet_filter, sheet_types=sheet_types,
+                name=name,
+                on_result=on_processed,
+                on_error=on_process_error,
+                on_cancelled=on_cancelled,
+            )
+        except (OSError, PermissionError, NotImplementedError) as e:
+            logger.warning(f"Worker processes unavailable, processing {path.name} in a thread: {e}")
+            run_in_thread()
+            return
+        # Process jobs report no progress
+        self.update_progress(10, f"Analyzing {path.name}...")
+
+    def _on_notebook_tab_changed(self, event=None):
+        """Reload the selected file if the session store spilled it, pin it and mark it most recently used"""
+        current_files = self._session_store()
+        if current_files is None:
+            return
+        try:
+            current_tab_id = self._get_current_tab_id()
+            if not current_tab_id:
+                return
+            for file_key, file_data in current_files.items():
+                file_mapping = file_data.get('file_mapping')
+                if file_mapping is not None and str(getattr(file_mapping, 'tab', '')) == current_tab_id:
+                    if current_files.is_spilled(file_key):
+                        self._update_status(f"Reloading {os.path.basename(file_key)}...")
+                        current_files.reload(file_key)
+                        self._update_status(f"Reloaded {os.path.basename(file_key)}")
+                    else:
+                        current_files.touch(file_key)
+                    current_files.set_active(file_mapping)
+                    return
+            current_files.set_active(None)
+        except Exception as e:
+            logger.error(f"Error restoring file for selected tab: {e}")
+
+    def _get_recompute_cache(self, file_mapping):
+        """
+        Per-file cache of row classification, validity and DataFrame slices, created on first use.
+        Stored on the file mapping so it follows the file (and is spilled with it).
+        """
+        from core.mapping_generator import file_mapping_cache
+        from core.row_facts import get_row_facts
+        from core.sheet_recompute import SheetRecomputeCache
+        
+        return file_mapping_cache(file_mapping, 'recompute_cache',
+                                  lambda: SheetRecomputeCache(row_facts=get_row_facts(file_mapping)))
+
+    def _get_summary_cache(self, dataframe, file_mapping=None):
+        """
+        Category/offer totals of a file, from its running SummaryCache.
+        The cache tracks the file's dataset (_file_dataset), not the display or export
+        view passed in, so repeated refreshes cost nothing; code that edits the dataset
+        in place reports the rows through update_rows(). dataframe is summarized
+        directly only when the file has no dataset yet.
+        """
+        from core.summary_cache import SummaryCache, get_summary_cache
+        
+        file_mapping = file_mapping or self._get_file_mapping_for_current_tab()
+        if file_mapping is None:
+            return SummaryCache().rebuild(dataframe)
+        dataset = self._file_dataset(file_mapping)
+        return get_summary_cache(file_mapping).sync(dataset if dataset is not None else dataframe)
+
+    @staticmethod
+    def _file_dataset(file_mapping):
+        """The file's current dataset (final_dataframe, else dataframe); views and exports derive from it"""
+        for attr in ('final_dataframe', 'dataframe'):
+            dataset = getattr(file_mapping, attr, None)
+            if dataset is not None:
+                return dataset
+        return None
+
     def _get_file_mapping_for_current_tab(self):
         """
         Get file_mapping for the current tab using standardized lookup algorithm.
@@ -581,7 +723,7 @@ class MainWindow:
 
     def open_settings(self):
         if SETTINGS_AVAILABLE:
-            show_settings_dialog(self.root)
+            show_settings_dialog(self.root, self.controller.settings, on_save=self.controller.update_settings)
         else:
             self._not_implemented()
 
@@ -718,104 +860,84 @@ class MainWindow:
         loading_label.grid(row=0, column=0, pady=40, padx=100)
         self.root.update_idletasks()
 
-        def process_in_thread():
-            """Runs the file processing in a background thread."""
-            try:
-                # Step 1: Load the file and get visible sheets
-                from core.file_processor import ExcelProcessor
-                processor = ExcelProcessor()
-                processor.load_file(Path(filepath))
-                visible_sheets = processor.get_visible_sheets()
-                if not visible_sheets:
-                    self.root.after(0, self._on_processing_error, tab, filename, loading_label)
-                    return
-                
-                print(f"Loaded {len(visible_sheets)} visible sheets: {visible_sheets}")
-                
-                # Step 2: Ask user to categorize sheets - schedule this on main thread
-                def ask_categorization():
-                    print('About to show sheet categorization dialog')
-                    if SHEET_CATEGORIZATION_AVAILABLE:
-                        categories = show_sheet_categorization_dialog(self.root, visible_sheets)
-                        print('Returned from sheet categorization dialog')
-                        if not categories:
-                            # User cancelled
-                            self._update_status("Sheet categorization cancelled.")
-                            loading_label.destroy()
-                            return
-                        boq_sheets = [sheet for sheet, cat in categories.items() if cat == "BOQ"]
-                        if not boq_sheets:
-                            self._update_status("No sheets marked as BOQ. Processing aborted.")
-                            loading_label.destroy()
-                            return
-                    else:
-                        # Fallback: treat all sheets as BOQ
-                        boq_sheets = visible_sheets
-                        categories = {sheet: "BOQ" for sheet in visible_sheets}
-                    
-                    # Store the categories for later use in processing
-                    self.current_sheet_categories = categories
-                    
-                    print(f"Processing {len(boq_sheets)} BOQ sheets: {boq_sheets}")
-                    
-                    # Step 3: Process only BOQ sheets in a separate thread
-                    def process_boq_sheets(offer_info_param):
-                        try:
-                            file_mapping = self.controller.process_file(
-                                Path(filepath),
-                                progress_callback=lambda p, m: self.root.after(0, self.update_progress, p, m),
-                                sheet_filter=boq_sheets,
-                                sheet_types=categories
-                            )
-                            # After processing, show the main window with BOQ sheets for column mapping
-                            self.file_mapping = file_mapping
-                            self.column_mapper = file_mapping.column_mapper if hasattr(file_mapping, 'column_mapper') else None
-                            
-                            # Apply sheet categories to the file mapping
-                            if hasattr(self, 'current_sheet_categories'):
-                                for sheet in file_mapping.sheets:
-                                    if sheet.sheet_name in self.current_sheet_categories:
-                                        sheet.sheet_type = self.current_sheet_categories[sheet.sheet_name]
-                                        logger.debug(f"Applied sheet type '{sheet.sheet_type}' to sheet '{sheet.sheet_name}'")
-                            
-                            # Schedule the completion callback on the main thread
-                            try:
-                                self.root.after(0, self._on_processing_complete, tab, filepath, self.file_mapping, loading_label, offer_info_param)
-                            except RuntimeError:
-                                # If the main loop is not running, just log the completion
-                                logger.info(f"Processing completed for {filepath} but main loop not available")
-                        except Exception as e:
-                            logger.error(f"Failed to process BOQ sheets: {e}", exc_info=True)
-                            self.root.after(0, self._on_processing_error, tab, filename, loading_label)
-                    
-                    # Start the BOQ processing in a separate thread
-                    threading.Thread(target=lambda: process_boq_sheets(offer_info), daemon=True).start()
-                
-                # Schedule the categorization question on the main thread immediately
-                try:
-                    print("Scheduling ask_categorization on main thread")
-                    self.root.after(0, ask_categorization)
-                except RuntimeError:
-                    logger.error("Could not schedule categorization dialog - main loop not available")
-                    self._on_processing_error(tab, filename, loading_label)
-                    
-            except Exception as e:
-                logger.error(f"Failed to process file {filepath}: {e}", exc_info=True)
-                # Schedule the error callback on the main thread
-                try:
-                    self.root.after(0, self._on_processing_error, tab, filename, loading_label)
-                except RuntimeError:
-                    logger.error(f"Could not schedule error callback - main loop not available")
+        def load_visible_sheets(context):
+            """Step 1: Load the file and get visible sheets (background job)"""
+            from core.file_processor import ExcelProcessor
+            processor = ExcelProcessor()
+            processor.load_file(Path(filepath))
+            return processor.get_visible_sheets()
 
-        # Start the processing thread
-        try:
-            threading.Thread(target=process_in_thread, daemon=True).start()
-        except Exception as e:
-            logger.error(f"Failed to start processing thread: {e}")
+        def on_processing_error(error):
+            logger.error(f"Failed to process file {filepath}: {error}",
+                         exc_info=(type(error), error, error.__traceback__))
             self._on_processing_error(tab, filename, loading_label)
 
+        def ask_categorization(visible_sheets):
+            """Step 2: Ask user to categorize sheets (main thread)"""
+            if not visible_sheets:
+                self._on_processing_error(tab, filename, loading_label)
+                return
+
+            print(f"Loaded {len(visible_sheets)} visible sheets: {visible_sheets}")
+            print('About to show sheet categorization dialog')
+            if SHEET_CATEGORIZATION_AVAILABLE:
+                categories = show_sheet_categorization_dialog(self.root, visible_sheets)
+                print('Returned from sheet categorization dialog')
+                if not categories:
+                    # User cancelled
+                    self._update_status("Sheet categorization cancelled.")
+                    loading_label.destroy()
+                    return
+                boq_sheets = [sheet for sheet, cat in categories.items() if cat == "BOQ"]
+                if not boq_sheets:
+                    self._update_status("No sheets marked as BOQ. Processing aborted.")
+                    loading_label.destroy()
+                    return
+            else:
+                # Fallback: treat all sheets as BOQ
+                boq_sheets = visible_sheets
+                categories = {sheet: "BOQ" for sheet in visible_sheets}
+
+            # Store the categories for later use in processing
+            self.current_sheet_categories = categories
+
+            print(f"Processing {len(boq_sheets)} BOQ sheets: {boq_sheets}")
+
+            # Step 3: Process only BOQ sheets in a worker process
+            self._submit_file_processing(
+                filepath,
+                name=f"Process {filename}",
+                on_result=lambda file_mapping: on_boq_sheets_processed(file_mapping, categories),
+                on_error=on_processing_error,
+                on_cancelled=loading_label.destroy,
+                sheet_filter=boq_sheets,
+                sheet_types=categories,
+            )
+
+        def on_boq_sheets_processed(file_mapping, categories):
+            """Step 4: Show the BOQ sheets for column mapping (main thread)"""
+            # Budget checks triggered while a thread job stored the file run here, on the Tk thread
+            store = self._session_store()
+            if store is not None:
+                store.enforce_budget()
+            self.file_mapping = file_mapping
+            self.column_mapper = file_mapping.column_mapper if hasattr(file_mapping, 'column_mapper') else None
+
+            # Apply this file's sheet categories; self.current_sheet_categories may
+            # already belong to another file opened while this one was processing
+            for sheet in file_mapping.sheets:
+                if sheet.sheet_name in categories:
+                    sheet.sheet_type = categories[sheet.sheet_name]
+                    logger.debug(f"Applied sheet type '{sheet.sheet_type}' to sheet '{sheet.sheet_name}'")
+
+            self._on_processing_complete(tab, filepath, file_mapping, loading_label, offer_info)
+
+        self.jobs.submit(load_visible_sheets, name=f"Load {filename}",
+                         on_result=ask_categorization, on_error=on_processing_error,
+                         on_cancelled=loading_label.destroy)
+
     def update_progress(self, percentage, message):
-        """Thread-safe method to update the progress bar and status label."""
+        """Update the progress bar and status label (main thread; jobs report through on_progress)"""
         self.progress_var.set(percentage)
         self._update_status(message)
 
@@ -1185,14 +1307,16 @@ class MainWindow:
                 messagebox.showerror("Error", f"Original file not found: {file_path}")
                 return False
             
-            # Reload the file temporarily to get sheet data
+            # Use the sheet data kept from processing; reload the file only if it is not available
             try:
-                from core.file_processor import ExcelProcessor
-                temp_processor = ExcelProcessor()
-                temp_processor.load_file(file_path)
-                
-                # Get sheet data for the specific sheet
-                sheet_data = temp_processor.get_sheet_data(sheet.sheet_name)
+                sheet_data = self._get_cached_sheet_data(sheet.sheet_name)
+                if not sheet_data:
+                    from core.file_processor import ExcelProcessor
+                    temp_processor = ExcelProcessor()
+                    temp_processor.load_file(file_path)
+                    
+                    # Get sheet data for the specific sheet
+                    sheet_data = temp_processor.get_sheet_data(sheet.sheet_name)
                 
                 if not sheet_data:
                     messagebox.showerror("Error", "No sheet data available for reprocessing")
@@ -1289,6 +1413,16 @@ class MainWindow:
             messagebox.showerror("Error", f"Failed to reprocess sheet: {str(e)}")
             return False
     
+    def _get_cached_sheet_data(self, sheet_name):
+        """Raw rows of a sheet of the current file from the controller's processor results, or None"""
+        if not getattr(self, 'controller', None) or not self.file_mapping:
+            return None
+        for key, file_data in self.controller.current_files.items():
+            if file_data.get('file_mapping') is self.file_mapping:
+                processor_results = file_data.get('processor_results') or {}
+                return (processor_results.get('sheet_data') or {}).get(sheet_name)
+        return None
+    
     def _refresh_single_sheet_tab(self, sheet):
         """Refresh the UI for a single sheet tab"""
         try:
@@ -1355,6 +1489,8 @@ class MainWindow:
             # Don't show error dialog as this is a background refresh
 
     def _edit_column_mapping(self, tree, sheet):
+        if self._master_locked():
+            return
         selection = tree.selection()
         if not selection:
             return
@@ -1510,6 +1646,8 @@ class MainWindow:
         if not self.file_mapping or not hasattr(self.file_mapping, 'sheets'):
             self._update_status("No file loaded to propagate mappings.")
             return
+        if self._master_locked(self.file_mapping):
+            return
         user_edited = [cm for cm in getattr(source_sheet, 'column_mappings', []) if getattr(cm, 'confidence', 0) == 1.0]
         if not user_edited:
             self._update_status("No user-edited columns to propagate.")
@@ -1626,11 +1764,9 @@ class MainWindow:
             return
         
         try:
-            # Import row classifier here to avoid circular imports
-            from core.row_classifier import RowClassifier
             from utils.config import ColumnType
             
-            row_classifier = RowClassifier()
+            recompute_cache = self._get_recompute_cache(self.file_mapping)
             
             # Get the original sheet data from the controller
             if hasattr(self, 'controller') and self.controller:
@@ -1736,8 +1872,11 @@ class MainWindow:
                                 # print(f"[DEBUG] Row {i}: {sheet_data[i]}")
                                 pass
                 
-                # Perform row classification using the data rows (without header row)
-                row_classification_result = row_classifier.classify_rows(data_rows, column_mapping_dict, sheet.sheet_name)
+                # Perform row classification using the data rows (without header row); sheets whose
+                # header row and classification columns are unchanged reuse their previous result
+                row_classification_result = recompute_cache.classify(
+                    sheet.sheet_name, sheet_data, header_row_index, column_mapping_dict
+                )
                 
                 # Update the sheet's row classifications
                 sheet.row_classifications = []
@@ -1750,8 +1889,6 @@ class MainWindow:
                     if row_class.row_index >= header_row_index:
                         adjusted_row_index = row_class.row_index + 1
                     
-                    print(f"[DEBUG] Row classification: original_index={row_class.row_index}, header_row={header_row_index}, adjusted_index={adjusted_row_index}")
-                    
                     row_info = RowClassificationInfo(
                         row_index=adjusted_row_index,
                         row_type=row_class.row_type.value,
@@ -2007,6 +2144,8 @@ class MainWindow:
         row_id = tree.identify_row(event.y)
         if not row_id:
             return
+        if self._master_locked():
+            return
         idx = int(row_id)
         # Toggle validity
         is_valid = self.row_validity[sheet_name].get(idx, True)
@@ -2138,6 +2277,15 @@ class MainWindow:
             style.layout('Treeview.Item', [('Treeitem.padding', {'sticky': 'nswe', 'children': [('Treeitem.indicator', {'side': 'left', 'sticky': ''}), ('Treeitem.image', {'side': 'left', 'sticky': ''}), ('Treeitem.text', {'side': 'left', 'sticky': ''})]})])
             # Populate rows
             self.row_validity[sheet.sheet_name] = {}
+            recompute_cache = self._get_recompute_cache(file_mapping)
+            # Convert column mappings to format expected by row classifier
+            from utils.config import ColumnType
+            column_mapping = {}
+            for cm in getattr(sheet, 'column_mappings', []):
+                try:
+                    column_mapping[cm.column_index] = ColumnType(cm.mapped_type)
+                except ValueError:
+                    continue
             if hasattr(sheet, 'row_classifications'):
                 for rc in sheet.row_classifications:
                     row_data = getattr(rc, 'row_data', None)
@@ -2160,22 +2308,8 @@ class MainWindow:
                             val = format_number_eu(val)
                         
                         row_values.append(val)
-                    # New: Use new row validity logic based on master vs comparison mode
-                    from core.row_classifier import RowClassifier
-                    from utils.config import ColumnType
-                    row_classifier = RowClassifier()
-                    
-                    # Convert column mappings to format expected by row classifier
-                    column_mapping = {}
-                    for cm in sheet.column_mappings:
-                        try:
-                            col_type = ColumnType(cm.mapped_type)
-                            column_mapping[cm.column_index] = col_type
-                        except ValueError:
-                            continue
-                    
-                    # Use master validation criteria for all rows
-                        is_valid = row_classifier.validate_master_row_validity(row_data, column_mapping)
+                    # Use master validation criteria for all rows (cached until the row's validity columns change)
+                    is_valid = recompute_cache.row_validity(sheet.sheet_name, rc.row_index, row_data, column_mapping)
                     
                     self.row_validity[sheet.sheet_name][rc.row_index] = is_valid
                     status = "Valid" if is_valid else "Invalid"
@@ -2244,6 +2378,7 @@ class MainWindow:
             import pandas as pd
             rows = []
             sheet_count = 0
+            recompute_cache = self._get_recompute_cache(file_mapping)
             
             # FILTER: Only process valid rows from each sheet
             for sheet in getattr(file_mapping, 'sheets', []):
@@ -2261,27 +2396,39 @@ class MainWindow:
                     if validity_dict.get(rc.row_index, True):  # Only include valid rows
                         valid_row_classifications.append(rc)
                 
-                # Process only valid rows
-                for rc in valid_row_classifications:
-                    row_data = getattr(rc, 'row_data', None)
-                    if row_data is None and hasattr(sheet, 'sheet_data'):
-                        try:
-                            row_data = sheet.sheet_data[rc.row_index]
-                        except Exception:
-                            row_data = None
-                    if row_data is None:
-                        row_data = []
-                    row_dict = {}
-                    for cm in sheet.column_mappings:
-                        mapped_type = getattr(cm, 'mapped_type', None)
-                        if not mapped_type:
-                            continue
-                        idx = cm.column_index
-                        row_dict[mapped_type] = row_data[idx] if idx < len(row_data) else ''
-                    for mt in col_headers:
-                        if mt not in row_dict:
-                            row_dict[mt] = ''
-                    rows.append(row_dict)
+                def build_sheet_rows(sheet=sheet, col_headers=col_headers,
+                                     valid_row_classifications=valid_row_classifications):
+                    sheet_rows = []
+                    for rc in valid_row_classifications:
+                        row_data = getattr(rc, 'row_data', None)
+                        if row_data is None and hasattr(sheet, 'sheet_data'):
+                            try:
+                                row_data = sheet.sheet_data[rc.row_index]
+                            except Exception:
+                                row_data = None
+                        if row_data is None:
+                            row_data = []
+                        row_dict = {}
+                        for cm in sheet.column_mappings:
+                            mapped_type = getattr(cm, 'mapped_type', None)
+                            if not mapped_type:
+                                continue
+                            idx = cm.column_index
+                            row_dict[mapped_type] = row_data[idx] if idx < len(row_data) else ''
+                        for mt in col_headers:
+                            if mt not in row_dict:
+                                row_dict[mt] = ''
+                        sheet_rows.append(row_dict)
+                    return sheet_rows
+                
+                # Process only valid rows; a sheet's slice is rebuilt only when its mappings,
+                # data or valid rows changed since the last confirmation
+                slice_key = (
+                    tuple((cm.column_index, getattr(cm, 'mapped_type', None)) for cm in sheet.column_mappings),
+                    id(getattr(sheet, 'sheet_data', None)),
+                    tuple(rc.row_index for rc in valid_row_classifications),
+                )
+                rows.extend(recompute_cache.sheet_rows(sheet_name, slice_key, build_sheet_rows))
             
             if not rows:
                 messagebox.showerror("Error", "No valid rows found for categorization.")
@@ -2304,6 +2451,8 @@ class MainWindow:
         if not CATEGORIZATION_AVAILABLE:
             messagebox.showerror("Error", "Categorization components not available")
             return
+        if self._master_locked(file_mapping):
+            return
         
         try:
             # Show categorization dialog
@@ -2311,8 +2460,10 @@ class MainWindow:
                 parent=self.root,
                 controller=self.controller,
                 file_mapping=file_mapping,
-                on_complete=self._on_categorization_complete
+                on_complete=self._on_categorization_complete,
+                jobs=self.jobs
             )
+            self._pin_while_open(file_mapping, getattr(dialog, 'dialog', None))
             
         except Exception as e:
             logger.error(f"Failed to start categorization: {e}")
@@ -2340,6 +2491,7 @@ class MainWindow:
                     
                     # Ensure file_mapping is stored in tab_id_to_file_mapping using helper
                     file_mapping = file_data['file_mapping']
+                    file_mapping.final_dataframe = final_dataframe
                     self._store_file_mapping_for_tab(current_tab_path, file_mapping, file_key)
                     
                     # Update the tab with the final categorized data
@@ -2505,12 +2657,21 @@ class MainWindow:
         """
         Optimized comparison workflow using master BOQ structure
         
+        Dialogs run here, on the UI thread; the heavy stages run as background
+        jobs so the window stays responsive: parse → validate, the row review,
+        then match → merge → recategorize → refresh. The master dataset is only
+        replaced when the last stage finishes, and only changed rows of the grid
+        are rewritten. Cancelling (Escape or the status bar's Cancel button)
+        leaves the master dataset as it was before the comparison.
+        
         Args:
             tab: The tab containing the master BoQ data
         """
+        if self.comparison_run is not None:
+            self._update_status("A comparison is already running (press Escape to cancel it)")
+            return
         try:
-            from core.comparison_engine import ComparisonProcessor
-            import pandas as pd
+            import copy
             
             # Get the current tab ID and file mapping using helper method
             current_tab_id = self._get_current_tab_id()
@@ -2572,109 +2733,202 @@ class MainWindow:
                 self._update_status("Comparison cancelled")
                 return
             
-            # Process comparison file using optimized method
-            self._update_status("Processing comparison file...")
-            
-            # Process comparison file using the same logic as "Use Mapping"
-            self._update_status("Processing comparison file...")
-            
-            # Use the same file processing logic as "Use Mapping" workflow but adapted for comparison
-            comparison_file_mapping = self._process_comparison_file_with_master_mappings(
-                comparison_file, 
-                master_file_mapping,  # Use master BOQ mappings
-                comparison_offer_info
+            # The jobs merge into a copy of the master and a copy of its running totals;
+            # the file mapping keeps its current data until the comparison completes
+            run = ComparisonRun(
+                tab_id=self.notebook.select(),
+                master_file_mapping=master_file_mapping,
+                master_df=master_df,
+                offer_info=comparison_offer_info,
+                comparison_file=comparison_file,
+                snapshot={attr: getattr(master_file_mapping, attr)
+                          for attr in ('dataframe', 'final_dataframe', 'summary_cache')
+                          if hasattr(master_file_mapping, attr)},
+                summary=copy.deepcopy(self._get_summary_cache(master_df, master_file_mapping)),
+                existing_offer_cols=existing_offer_cols,
             )
             
-            if not comparison_file_mapping:
-                messagebox.showerror("Error", "Failed to process comparison file")
-                return
-            
             # Set comparison workflow state
             self.is_comparison_workflow = True
             self.master_file_mapping = master_file_mapping
-            self.comparison_processor = ComparisonProcessor()
-            
-            # Load master dataset
-            self.comparison_processor.load_master_dataset(master_df)
-            
-            # CRITICAL: Verify that all existing offer columns are preserved in processor
-            processor_offer_cols = [col for col in self.comparison_processor.master_dataset.columns if '[' in col and ']' in col]
-            logger.info(f"Processor master_dataset has {len(self.comparison_processor.master_dataset.columns)} columns")
-            logger.info(f"Offer columns in processor.master_dataset: {processor_offer_cols}")
-            
-            # Verify all existing offer columns are present
-            missing_cols = set(existing_offer_cols) - set(processor_offer_cols)
-            if missing_cols:
-                logger.error(f"CRITICAL: Missing offer columns in processor: {missing_cols}")
-                logger.error(f"Master df columns: {list(master_df.columns)}")
-                logger.error(f"Processor columns: {list(self.comparison_processor.master_dataset.columns)}")
-            else:
-                logger.info("All existing offer columns preserved in processor")
+            self.comparison_run = run
+            # The jobs read the master's data until the comparison ends
+            store = self._session_store()
+            if store is not None:
+                store.pin(master_file_mapping)
+            self._run_comparison_stage(run, self._compare_parse_and_validate, self._on_comparison_rows_validated,
+                                       "parse and validate")
             
-            # Create unified comparison dataset with consistent structure
-            comparison_df = self._create_unified_dataframe(comparison_file_mapping, is_master=False)
-            if comparison_df is None or comparison_df.empty:
-                messagebox.showerror("Error", "No comparison data available")
-                return
-            
-            # Debug: Log both datasets for verification
-            logger.info(f"Master DataFrame shape: {master_df.shape}, columns: {list(master_df.columns)}")
-            logger.info(f"Comparison DataFrame shape: {comparison_df.shape}, columns: {list(comparison_df.columns)}")
-            
-            # Verify both datasets have the same required columns
-            master_cols = set(master_df.columns)
-            comparison_cols = set(comparison_df.columns)
-            missing_in_comparison = master_cols - comparison_cols
-            missing_in_master = comparison_cols - master_cols
-            
-            if missing_in_comparison:
-                logger.warning(f"Comparison dataset missing columns: {missing_in_comparison}")
-                # Add missing columns to comparison dataset
-                for col in missing_in_comparison:
-                    comparison_df[col] = ''
-            
-            if missing_in_master:
-                logger.warning(f"Master dataset missing columns: {missing_in_master}")
-                # Add missing columns to master dataset
-                for col in missing_in_master:
-                    master_df[col] = ''
-            
-            # Ensure both datasets have the same column order
-            all_columns = list(set(master_df.columns) | set(comparison_df.columns))
-            master_df = master_df.reindex(columns=all_columns, fill_value='')
-            comparison_df = comparison_df.reindex(columns=all_columns, fill_value='')
-            
-            self.comparison_processor.load_comparison_data(comparison_df)
-            
-            # Validate comparison data with enhanced error handling
-            is_valid, message = self.comparison_processor.validate_comparison_data()
-            if not is_valid:
-                # Try to fix common validation issues
-                logger.warning(f"Initial validation failed: {message}")
-                
-                # Check if it's a column mismatch issue
-                if "missing columns" in message.lower():
-                    # We've already handled column alignment above, so this shouldn't happen
-                    logger.error(f"Column alignment failed despite our attempts: {message}")
-                    messagebox.showerror("Validation Error", 
-                                       f"Comparison data validation failed: {message}\n\n"
-                                       f"Master columns: {list(master_df.columns)}\n"
-                                       f"Comparison columns: {list(comparison_df.columns)}")
-                    return
-                else:
-                    messagebox.showerror("Validation Error", f"Comparison data validation failed: {message}")
-                    return
+        except Exception as e:
+            logger.error(f"Error in _compare_full: {e}")
+            import traceback
+            traceback.print_exc()
+            messagebox.showerror("Error", f"Comparison failed: {str(e)}")
             
-            # Process rows for validity
-            self._update_status("Processing row validity...")
-            # CRITICAL FIX: Build column mapping from file mapping structure to match DataFrame columns
-            # This ensures column mappings match the actual DataFrame structure
-            column_mapping_for_validation = self._build_column_mapping_from_file_mapping(
-                comparison_file_mapping, comparison_df
-            )
-            row_results = self.comparison_processor.process_comparison_rows(
-                column_mapping=column_mapping_for_validation
-            )
+            # Reset comparison workflow flags even on error (and release the master's pin)
+            if self.comparison_run is not None:
+                self._end_comparison(self.comparison_run)
+            self.comparison_run = None
+            self.is_comparison_workflow = False
+            self._pending_comparison_export = False
+            self._pending_comparison_offer_info = None
+
+    def _master_locked(self, file_mapping=None):
+        """
+        True (after telling the user) if file_mapping is the master of the comparison in progress
+        
+        The comparison merges into a copy of the master and replaces the master's data
+        when it completes, so edits made meanwhile would be lost.
+        
+        Args:
+            file_mapping: File about to be edited (default: the current tab's)
+        """
+        run = self.comparison_run
+        if run is None:
+            return False
+        file_mapping = file_mapping or self._get_file_mapping_for_current_tab() or self.file_mapping
+        if file_mapping is not None and file_mapping is not run.master_file_mapping:
+            return False
+        self._update_status("The master dataset is read-only while the comparison runs; "
+                            "wait for it to finish or cancel it (Esc)")
+        return True
+
+    def _run_comparison_stage(self, run, stage, on_done, label):
+        """Run one background stage of a comparison; on_done(run) continues on the UI thread"""
+        self._update_status(f"Comparison: {label}...")
+        self.progress_var.set(0)
+        self.cancel_button.grid()
+        self.comparison_job = self.jobs.submit(
+            stage, run,
+            name=f"Comparison: {label}",
+            on_progress=self.update_progress,
+            on_update=lambda value, message: self._update_status(message),
+            on_result=on_done,
+            on_error=lambda error: self._on_comparison_failed(run, error),
+            on_cancelled=lambda: self._on_comparison_cancelled(run),
+        )
+
+    def _cancel_comparison(self):
+        """Cancel the running comparison (Escape / status bar Cancel button)"""
+        if self.comparison_job is None:
+            return
+        self._update_status("Cancelling comparison...")
+        self.comparison_job.cancel()
+
+    def _compare_parse_and_validate(self, context, run):
+        """
+        Comparison stages parse and validate (background job)
+        
+        Reads the comparison file with the master mappings, loads both datasets
+        into a new ComparisonProcessor and classifies the comparison rows.
+        """
+        from core.comparison_engine import ComparisonProcessor
+        
+        # Process comparison file using the same logic as "Use Mapping"
+        context.progress(5, "Processing comparison file...")
+        comparison_file_mapping = self._process_comparison_file_with_master_mappings(
+            run.comparison_file,
+            run.master_file_mapping,  # Use master BOQ mappings
+            run.offer_info
+        )
+        if not comparison_file_mapping:
+            raise ComparisonError("Failed to process comparison file")
+        context.publish(comparison_file_mapping, f"Comparison file parsed: {os.path.basename(run.comparison_file)}")
+        
+        context.progress(40, "Loading datasets...")
+        processor = ComparisonProcessor()
+        master_df = run.master_df
+        
+        # Load master dataset
+        processor.load_master_dataset(master_df, summary=run.summary)
+        
+        # CRITICAL: Verify that all existing offer columns are preserved in processor
+        processor_offer_cols = [col for col in processor.master_dataset.columns if '[' in col and ']' in col]
+        logger.info(f"Processor master_dataset has {len(processor.master_dataset.columns)} columns")
+        logger.info(f"Offer columns in processor.master_dataset: {processor_offer_cols}")
+        
+        # Verify all existing offer columns are present
+        missing_cols = set(run.existing_offer_cols) - set(processor_offer_cols)
+        if missing_cols:
+            logger.error(f"CRITICAL: Missing offer columns in processor: {missing_cols}")
+            logger.error(f"Master df columns: {list(master_df.columns)}")
+            logger.error(f"Processor columns: {list(processor.master_dataset.columns)}")
+        else:
+            logger.info("All existing offer columns preserved in processor")
+        
+        # Create unified comparison dataset with consistent structure
+        comparison_df = self._create_unified_dataframe(comparison_file_mapping, is_master=False)
+        if comparison_df is None or comparison_df.empty:
+            raise ComparisonError("No comparison data available")
+        
+        # Debug: Log both datasets for verification
+        logger.info(f"Master DataFrame shape: {master_df.shape}, columns: {list(master_df.columns)}")
+        logger.info(f"Comparison DataFrame shape: {comparison_df.shape}, columns: {list(comparison_df.columns)}")
+        
+        # Verify both datasets have the same required columns
+        master_cols = set(master_df.columns)
+        comparison_cols = set(comparison_df.columns)
+        missing_in_comparison = master_cols - comparison_cols
+        missing_in_master = comparison_cols - master_cols
+        
+        if missing_in_comparison:
+            logger.warning(f"Comparison dataset missing columns: {missing_in_comparison}")
+            # Add missing columns to comparison dataset
+            for col in missing_in_comparison:
+                comparison_df[col] = ''
+        
+        if missing_in_master:
+            logger.warning(f"Master dataset missing columns: {missing_in_master}")
+        
+        # Ensure both datasets have the same column order
+        all_columns = list(set(master_df.columns) | set(comparison_df.columns))
+        master_df = master_df.reindex(columns=all_columns, fill_value='')
+        comparison_df = comparison_df.reindex(columns=all_columns, fill_value='')
+        
+        processor.load_comparison_data(comparison_df)
+        
+        # Validate comparison data with enhanced error handling
+        context.progress(55, "Validating comparison data...")
+        is_valid, message = processor.validate_comparison_data()
+        if not is_valid:
+            logger.warning(f"Initial validation failed: {message}")
+            
+            # Check if it's a column mismatch issue
+            if "missing columns" in message.lower():
+                # We've already handled column alignment above, so this shouldn't happen
+                logger.error(f"Column alignment failed despite our attempts: {message}")
+                raise ComparisonError(f"Comparison data validation failed: {message}\n\n"
+                                      f"Master columns: {list(master_df.columns)}\n"
+                                      f"Comparison columns: {list(comparison_df.columns)}",
+                                      title="Validation Error")
+            raise ComparisonError(f"Comparison data validation failed: {message}", title="Validation Error")
+        
+        # Process rows for validity
+        context.progress(65, "Processing row validity...")
+        # CRITICAL FIX: Build column mapping from file mapping structure to match DataFrame columns
+        # This ensures column mappings match the actual DataFrame structure
+        column_mapping_for_validation = self._build_column_mapping_from_file_mapping(
+            comparison_file_mapping, comparison_df
+        )
+        row_results = processor.process_comparison_rows(
+            column_mapping=column_mapping_for_validation
+        )
+        valid_count = sum(1 for r in row_results if r['is_valid'])
+        context.progress(100, f"{valid_count} of {len(row_results)} comparison rows are valid")
+        
+        run.processor = processor
+        run.comparison_file_mapping = comparison_file_mapping
+        run.comparison_df = comparison_df
+        run.row_results = row_results
+        return run
+
+    def _on_comparison_rows_validated(self, run):
+        """Show the comparison row review, then start the merge stages (UI thread)"""
+        self.comparison_job = None
+        self.cancel_button.grid_remove()
+        try:
+            comparison_offer_info = run.offer_info
+            comparison_file_mapping = run.comparison_file_mapping
             
             # Show comparison row review dialog
             if COMPARISON_ROW_REVIEW_AVAILABLE:
@@ -2688,7 +2942,7 @@ class MainWindow:
                 confirmed, updated_results = show_comparison_row_review(
                     self.root, 
                     comparison_file_mapping,  # Pass file mapping instead of DataFrame
-                    row_results, 
+                    run.row_results, 
                     comparison_offer_info.get('offer_name', 'Comparison')
                 )
                 
@@ -2696,132 +2950,196 @@ class MainWindow:
                 logger.info(f"Updated results count: {len(updated_results) if updated_results else 0}")
                 
                 if not confirmed:
+                    self._end_comparison(run, roll_back=True)
                     self._update_status("Comparison cancelled by user")
                     return
                 
-                # DEBUG: Export both datasets when user confirms row review
                 # Create filtered comparison dataset with only valid rows
                 valid_comparison_rows = [r for r in updated_results if r['is_valid']]
                 valid_comparison_indices = [r['row_index'] for r in valid_comparison_rows]
-                filtered_comparison_df = comparison_df.iloc[valid_comparison_indices].copy()
+                filtered_comparison_df = run.comparison_df.iloc[valid_comparison_indices].copy()
                 
                 # Store the filtered comparison dataset for later use
                 comparison_file_mapping.filtered_dataframe = filtered_comparison_df
                 
                 # Reload comparison processor with filtered dataset (only valid rows)
-                self.comparison_processor.load_comparison_data(filtered_comparison_df)
+                run.processor.load_comparison_data(filtered_comparison_df)
                 
                 # DEBUG EXPORT (COMMENTED OUT)
-                # self._debug_export_datasets_before_merge(master_df, filtered_comparison_df, comparison_offer_info)
+                # self._debug_export_datasets_before_merge(run.master_df, filtered_comparison_df, comparison_offer_info)
                 
                 # Update processor with user modifications
-                self.comparison_processor.row_results = updated_results
-            else:
-                # Fallback: use original results
-                updated_results = row_results
-            
-            # Process valid rows with MERGE/ADD logic
-            self._update_status("Processing valid rows...")
-            offer_name = comparison_offer_info.get('offer_name', 'Comparison')
-            instance_results = self.comparison_processor.process_valid_rows(offer_name=offer_name)
-            
-            # Collect and display warnings
-            all_warnings = []
-            if self.comparison_processor.comparison_warnings:
-                all_warnings.extend(self.comparison_processor.comparison_warnings)
-                # Clear warnings after collecting
-                self.comparison_processor.comparison_warnings.clear()
-            
-            if all_warnings:
-                # Filter out less important warnings - only show actionable ones
-                # Filter out BUSINESS_RULE warnings about invalid rows (user already reviewed these)
-                important_warnings = [
-                    w for w in all_warnings 
-                    if w.validation_type != ValidationType.BUSINESS_RULE or 
-                       "does not meet master BOQ validity criteria" not in w.message
-                ]
-                
-                if important_warnings:
-                    warning_messages = []
-                    for warning in important_warnings:
-                        # Extract sheet name and row index from the warning object
-                        # The row_index in ValidationIssue is 0-based, convert to 1-based for display
-                        # The suggestion field might contain the sheet name for unit mismatches
-                        sheet_name = "Unknown Sheet"
-                        row_display_index = warning.row_index + 2 # Convert to Excel row number
-                        
-                        # Try to get Source_Sheet from comparison data if available
-                        if hasattr(self.comparison_processor, 'comparison_data') and self.comparison_processor.comparison_data is not None:
-                            try:
-                                if warning.row_index < len(self.comparison_processor.comparison_data):
-                                    source_sheet = self.comparison_processor.comparison_data.iloc[warning.row_index].get('Source_Sheet', None)
-                                    if source_sheet:
-                                        sheet_name = str(source_sheet)
-                            except Exception:
-                                pass
-                        
-                        # Also try to extract from suggestion field
-                        if sheet_name == "Unknown Sheet" and warning.suggestion and "sheet" in warning.suggestion.lower():
-                            try:
-                                # Extract sheet name from suggestion string
-                                match = re.search(r"sheet '([^']+)'", warning.suggestion, re.IGNORECASE)
-                                if match:
-                                    sheet_name = match.group(1)
-                            except Exception:
-                                pass # Fallback to "Unknown Sheet"
-                        
-                        # Format message based on warning type
-                        if warning.validation_type == ValidationType.CONSISTENCY: # Unit mismatch
-                            message = f"Unit Mismatch: Sheet '{sheet_name}', Row {row_display_index}. Master unit '{warning.expected_value}' vs. Comparison unit '{warning.actual_value}'."
-                        elif warning.validation_type == ValidationType.DATA_TYPE: # Invalid data type
-                            message = f"Invalid Data: Sheet '{sheet_name}', Row {row_display_index}, Column '{warning.column_index}'. Value '{warning.actual_value}' is not valid. Suggestion: {warning.suggestion}"
-                        else:
-                            message = f"Warning: Sheet '{sheet_name}', Row {row_display_index}. {warning.message}"
-                        
-                        warning_messages.append(message)
-                    
-                    # Show summary if there are many warnings
-                    if len(warning_messages) > 20:
-                        summary = f"The comparison completed with {len(warning_messages)} warnings.\n\n"
-                        summary += "Most common issues:\n"
-                        # Count warning types
-                        unit_mismatches = sum(1 for w in important_warnings if w.validation_type == ValidationType.CONSISTENCY)
-                        data_type_errors = sum(1 for w in important_warnings if w.validation_type == ValidationType.DATA_TYPE)
-                        if unit_mismatches > 0:
-                            summary += f"- {unit_mismatches} unit mismatches\n"
-                        if data_type_errors > 0:
-                            summary += f"- {data_type_errors} data type errors\n"
-                        summary += f"\nFirst 10 warnings:\n" + "\n".join(warning_messages[:10])
-                        summary += f"\n\n... and {len(warning_messages) - 10} more warnings (see logs for details)"
-                        messagebox.showwarning("Comparison Warnings", summary)
-                    else:
-                        full_warning_message = "The comparison completed with the following warnings:\n\n" + "\n".join(warning_messages)
-                        messagebox.showwarning("Comparison Warnings", full_warning_message)
+                run.processor.row_results = updated_results
             
-            # Clean up data
-            self._update_status("Cleaning up data...")
-            cleanup_results = self.comparison_processor.cleanup_comparison_data()
+            self._run_comparison_stage(run, self._compare_merge, self._on_comparison_merged,
+                                       "match, merge and recategorize")
+        except Exception as e:
+            self._on_comparison_failed(run, e)
+
+    def _compare_merge(self, context, run):
+        """
+        Comparison stages match, merge, recategorize and the refresh preparation (background job)
+        
+        Everything here works on the processor's copy of the master; the grid rows
+        are formatted too, so the UI thread only applies the differences.
+        """
+        processor = run.processor
+        
+        # Process valid rows with MERGE/ADD logic
+        offer_name = run.offer_info.get('offer_name', 'Comparison')
+        processor.process_valid_rows(
+            offer_name=offer_name,
+            progress_callback=lambda percentage, message: context.progress(0.8 * percentage, message)
+        )
+        context.publish(processor.master_dataset,
+                        f"Matched rows: {len(processor.merge_results)} merges, {len(processor.add_results)} adds")
+        
+        # Collect warnings (shown once the comparison completes)
+        run.warnings = list(processor.comparison_warnings)
+        processor.comparison_warnings.clear()
+        
+        # Clean up data
+        context.progress(80, "Cleaning up data...")
+        processor.cleanup_comparison_data()
+        
+        context.progress(90, "Preparing the updated dataset...")
+        run.updated_df = self._comparison_dataframe(processor, run.master_file_mapping)
+        if processor.summary is not None:
+            # Track the dataset the master will hold, diffing it here rather than on the UI thread
+            processor.summary.sync(run.updated_df)
+        run.grid = self._comparison_grid(run.updated_df.copy(deep=False))
+        context.progress(100, "Updating view...")
+        return run
+
+    def _on_comparison_merged(self, run):
+        """Show the warnings and apply the comparison to the master dataset and its tab (UI thread)"""
+        self.comparison_job = None
+        try:
+            self._show_comparison_warnings(run.processor, run.warnings)
             
             # Update the main dataset in place instead of showing results
-            self._update_main_dataset_with_comparison_results(self.comparison_processor, comparison_offer_info)
-            
-            # Reset comparison workflow flags
-            self.is_comparison_workflow = False
-            self._pending_comparison_export = False
-            self._pending_comparison_offer_info = None
+            self.comparison_processor = run.processor
+            self._update_main_dataset_with_comparison_results(
+                run.processor, run.offer_info, tab_id=run.tab_id, updated_df=run.updated_df, grid=run.grid
+            )
             
+            self._end_comparison(run)
             self._update_status("Comparison completed successfully")
-            
         except Exception as e:
-            logger.error(f"Error in _compare_full: {e}")
-            import traceback
-            traceback.print_exc()
-            messagebox.showerror("Error", f"Comparison failed: {str(e)}")
-            
-            # Reset comparison workflow flags even on error
-            self.is_comparison_workflow = False
-            self._pending_comparison_export = False
-            self._pending_comparison_offer_info = None
+            self._on_comparison_failed(run, e)
+
+    def _on_comparison_failed(self, run, error):
+        """Report a failed comparison stage and roll back (UI thread)"""
+        logger.error(f"Error in _compare_full: {error}", exc_info=(type(error), error, error.__traceback__))
+        self._end_comparison(run, roll_back=True)
+        if isinstance(error, ComparisonError):
+            messagebox.showerror(error.title, str(error))
+        else:
+            messagebox.showerror("Error", f"Comparison failed: {str(error)}")
+        self._update_status("Comparison failed")
+
+    def _on_comparison_cancelled(self, run):
+        """Roll back a cancelled comparison (UI thread)"""
+        self._end_comparison(run, roll_back=True)
+        self._update_status("Comparison cancelled; the master dataset is unchanged")
+
+    def _end_comparison(self, run, roll_back=False):
+        """
+        Reset the comparison workflow state
+        
+        Args:
+            run: The ComparisonRun that ended
+            roll_back: Restore the master file mapping's dataframe, final_dataframe and
+                running totals to what they were before the comparison started
+        """
+        if roll_back:
+            for attr, value in run.snapshot.items():
+                setattr(run.master_file_mapping, attr, value)
+            logger.info("Comparison rolled back to the pre-comparison master dataset")
+        if self.comparison_run is run:
+            self.comparison_run = None
+            self.comparison_job = None
+            store = self._session_store()
+            if store is not None:
+                store.unpin(run.master_file_mapping)
+        self.cancel_button.grid_remove()
+        self.progress_var.set(0)
+        
+        # Reset comparison workflow flags
+        self.is_comparison_workflow = False
+        self.comparison_processor = None
+        self._pending_comparison_export = False
+        self._pending_comparison_offer_info = None
+
+    def _show_comparison_warnings(self, processor, all_warnings):
+        """Show the actionable warnings of a comparison"""
+        if not all_warnings:
+            return
+        
+        # Filter out less important warnings - only show actionable ones
+        # Filter out BUSINESS_RULE warnings about invalid rows (user already reviewed these)
+        important_warnings = [
+            w for w in all_warnings 
+            if w.validation_type != ValidationType.BUSINESS_RULE or 
+               "does not meet master BOQ validity criteria" not in w.message
+        ]
+        
+        if important_warnings:
+            warning_messages = []
+            for warning in important_warnings:
+                # Extract sheet name and row index from the warning object
+                # The row_index in ValidationIssue is 0-based, convert to 1-based for display
+                # The suggestion field might contain the sheet name for unit mismatches
+                sheet_name = "Unknown Sheet"
+                row_display_index = warning.row_index + 2 # Convert to Excel row number
+
+                # Try to get Source_Sheet from comparison data if available
+                if processor.comparison_data is not None:
+                    try:
+                        if warning.row_index < len(processor.comparison_data):
+                            source_sheet = processor.comparison_data.iloc[warning.row_index].get('Source_Sheet', None)
+                            if source_sheet:
+                                sheet_name = str(source_sheet)
+                    except Exception:
+                        pass
+
+                # Also try to extract from suggestion field
+                if sheet_name == "Unknown Sheet" and warning.suggestion and "sheet" in warning.suggestion.lower():
+                    try:
+                        # Extract sheet name from suggestion string
+                        match = re.search(r"sheet '([^']+)'", warning.suggestion, re.IGNORECASE)
+                        if match:
+                            sheet_name = match.group(1)
+                    except Exception:
+                        pass # Fallback to "Unknown Sheet"
+
+                # Format message based on warning type
+                if warning.validation_type == ValidationType.CONSISTENCY: # Unit mismatch
+                    message = f"Unit Mismatch: Sheet '{sheet_name}', Row {row_display_index}. Master unit '{warning.expected_value}' vs. Comparison unit '{warning.actual_value}'."
+                elif warning.validation_type == ValidationType.DATA_TYPE: # Invalid data type
+                    message = f"Invalid Data: Sheet '{sheet_name}', Row {row_display_index}, Column '{warning.column_index}'. Value '{warning.actual_value}' is not valid. Suggestion: {warning.suggestion}"
+                else:
+                    message = f"Warning: Sheet '{sheet_name}', Row {row_display_index}. {warning.message}"
+
+                warning_messages.append(message)
+
+            # Show summary if there are many warnings
+            if len(warning_messages) > 20:
+                summary = f"The comparison completed with {len(warning_messages)} warnings.\n\n"
+                summary += "Most common issues:\n"
+                # Count warning types
+                unit_mismatches = sum(1 for w in important_warnings if w.validation_type == ValidationType.CONSISTENCY)
+                data_type_errors = sum(1 for w in important_warnings if w.validation_type == ValidationType.DATA_TYPE)
+                if unit_mismatches > 0:
+                    summary += f"- {unit_mismatches} unit mismatches\n"
+                if data_type_errors > 0:
+                    summary += f"- {data_type_errors} data type errors\n"
+                summary += f"\nFirst 10 warnings:\n" + "\n".join(warning_messages[:10])
+                summary += f"\n\n... and {len(warning_messages) - 10} more warnings (see logs for details)"
+                messagebox.showwarning("Comparison Warnings", summary)
+            else:
+                full_warning_message = "The comparison completed with the following warnings:\n\n" + "\n".join(warning_messages)
+                messagebox.showwarning("Comparison Warnings", full_warning_message)
 
     def _process_comparison_file(self, filepath, offer_info):
         """
@@ -2964,19 +3282,98 @@ class MainWindow:
                 'errors': [str(e)]
             }
 
-    def _update_main_dataset_with_comparison_results(self, processor, offer_info):
+    def _comparison_dataframe(self, processor, file_mapping):
+        """
+        Merged master dataset of a comparison, ready to replace file_mapping.dataframe
+        
+        Master value columns get the master offer name and the column dtypes are
+        restored. Touches no widgets, so the comparison jobs build it in the background.
+        
+        Args:
+            processor: ComparisonProcessor that ran the comparison
+            file_mapping: Master file mapping
+        
+        Returns:
+            DataFrame
+        """
+        # Get the updated dataframe from the processor's master_dataset
+        updated_df = processor.master_dataset.copy()
+        
+        if updated_df is None or updated_df.empty:
+            logger.warning("No updated dataframe available from processor")
+            return updated_df
+        
+        # CRITICAL: Log all columns before updating to verify existing offer columns are preserved
+        all_columns = list(updated_df.columns)
+        offer_columns = [col for col in all_columns if '[' in col and ']' in col]
+        logger.info(f"Updating master dataset with {len(updated_df)} rows and {len(updated_df.columns)} columns")
+        logger.info(f"All columns in updated_df: {all_columns}")
+        logger.info(f"Offer columns in updated_df: {offer_columns}")
+        
+        # Also log what columns were in file_mapping.dataframe before update
+        if hasattr(file_mapping, 'dataframe') and file_mapping.dataframe is not None:
+            old_offer_cols = [col for col in file_mapping.dataframe.columns if '[' in col and ']' in col]
+            logger.info(f"Offer columns in file_mapping.dataframe BEFORE update: {old_offer_cols}")
+            
+            # Check if any offer columns are being lost
+            lost_cols = set(old_offer_cols) - set(offer_columns)
+            if lost_cols:
+                logger.error(f"CRITICAL: Offer columns being lost during update: {lost_cols}")
+            else:
+                logger.info("All existing offer columns preserved in updated_df")
+        
+        # CRITICAL FIX: Rename master columns to include master offer name for consistency
+        # This ensures both master and comparison offers have offer-specific column names
+        master_offer_info = getattr(file_mapping, 'offer_info', None)
+        if master_offer_info:
+            master_offer_name = master_offer_info.get('offer_name', 'Master')
+            logger.info(f"Master offer name: {master_offer_name}")
+            
+            # Define columns that should have offer names
+            offer_specific_columns = ['quantity', 'unit_price', 'total_price', 'manhours', 'wage']
+            
+            # Only rename base columns (those without brackets) to include master offer name
+            columns_to_rename = {}
+            for base_col in offer_specific_columns:
+                if base_col in updated_df.columns:
+                    # Check if this column already has an offer name (contains brackets)
+                    if '[' not in base_col and ']' not in base_col:
+                        # Base column exists without offer name, rename it
+                        offer_col = f'{base_col}[{master_offer_name}]'
+                        # Only rename if the offer column doesn't already exist
+                        if offer_col not in updated_df.columns:
+                            columns_to_rename[base_col] = offer_col
+            
+            if columns_to_rename:
+                logger.info(f"Renaming master columns to include offer name: {columns_to_rename}")
+                updated_df = updated_df.rename(columns=columns_to_rename)
+            else:
+                logger.info("Master columns already have offer names or don't need renaming")
+        else:
+            logger.warning("No master offer info found, skipping master column renaming")
+        
+        # Rows ADD appended hold raw cell values: restore the column dtypes
+        from core.boq_schema import apply_schema
+        updated_df = apply_schema(updated_df, processor.descriptions)
+        return updated_df
+
+    def _update_main_dataset_with_comparison_results(self, processor, offer_info, tab_id=None, updated_df=None,
+                                                     grid=None):
         """
         Update the main dataset in place with comparison results
         
         Args:
             processor: ComparisonProcessor instance
             offer_info: Offer information dictionary
+            tab_id: Tab of the master dataset (default: the selected tab)
+            updated_df: Merged dataset from _comparison_dataframe (computed here if not given)
+            grid: Grid rows from _comparison_grid (computed here if not given)
         """
         try:
             logger.info("=== STARTING _update_main_dataset_with_comparison_results ===")
             
             # Get the current tab (master dataset)
-            current_tab_id = self.notebook.select()
+            current_tab_id = tab_id or self.notebook.select()
             if not current_tab_id:
                 logger.warning("No current tab found for updating main dataset")
                 return
@@ -2990,75 +3387,30 @@ class MainWindow:
                 logger.warning("No file mapping found for current tab")
                 return
             
-            # Get the updated dataframe from the processor's master_dataset
-            updated_df = processor.master_dataset.copy()
-            
+            if updated_df is None:
+                updated_df = self._comparison_dataframe(processor, file_mapping)
             if updated_df is None or updated_df.empty:
                 logger.warning("No updated dataframe available from processor")
                 return
             
-            # CRITICAL: Log all columns before updating to verify existing offer columns are preserved
-            all_columns = list(updated_df.columns)
-            offer_columns = [col for col in all_columns if '[' in col and ']' in col]
-            logger.info(f"Updating master dataset with {len(updated_df)} rows and {len(updated_df.columns)} columns")
-            logger.info(f"All columns in updated_df: {all_columns}")
-            logger.info(f"Offer columns in updated_df: {offer_columns}")
-            
-            # Also log what columns were in file_mapping.dataframe before update
-            if hasattr(file_mapping, 'dataframe') and file_mapping.dataframe is not None:
-                old_offer_cols = [col for col in file_mapping.dataframe.columns if '[' in col and ']' in col]
-                logger.info(f"Offer columns in file_mapping.dataframe BEFORE update: {old_offer_cols}")
-                
-                # Check if any offer columns are being lost
-                lost_cols = set(old_offer_cols) - set(offer_columns)
-                if lost_cols:
-                    logger.error(f"CRITICAL: Offer columns being lost during update: {lost_cols}")
-                else:
-                    logger.info("All existing offer columns preserved in updated_df")
-            
-            # CRITICAL FIX: Rename master columns to include master offer name for consistency
-            # This ensures both master and comparison offers have offer-specific column names
-            master_offer_info = getattr(file_mapping, 'offer_info', None)
-            if master_offer_info:
-                master_offer_name = master_offer_info.get('offer_name', 'Master')
-                logger.info(f"Master offer name: {master_offer_name}")
-                
-                # Define columns that should have offer names
-                offer_specific_columns = ['quantity', 'unit_price', 'total_price', 'manhours', 'wage']
-                
-                # Only rename base columns (those without brackets) to include master offer name
-                columns_to_rename = {}
-                for base_col in offer_specific_columns:
-                    if base_col in updated_df.columns:
-                        # Check if this column already has an offer name (contains brackets)
-                        if '[' not in base_col and ']' not in base_col:
-                            # Base column exists without offer name, rename it
-                            offer_col = f'{base_col}[{master_offer_name}]'
-                            # Only rename if the offer column doesn't already exist
-                            if offer_col not in updated_df.columns:
-                                columns_to_rename[base_col] = offer_col
-                
-                if columns_to_rename:
-                    logger.info(f"Renaming master columns to include offer name: {columns_to_rename}")
-                    updated_df = updated_df.rename(columns=columns_to_rename)
-                else:
-                    logger.info("Master columns already have offer names or don't need renaming")
-            else:
-                logger.warning("No master offer info found, skipping master column renaming")
+            # The comparison merged into a copy of the running totals: keep it
+            if processor.summary is not None:
+                file_mapping.summary_cache = processor.summary
             
             # Update the file mapping's dataframe with the merged data
             # CRITICAL: This must preserve ALL existing offer columns from previous comparisons
-            file_mapping.dataframe = updated_df.copy()
+            # One object everywhere: the running totals already track updated_df
+            file_mapping.dataframe = updated_df
             
             # CRITICAL: Also update final_dataframe if it exists (used by some workflows)
             if hasattr(file_mapping, 'final_dataframe'):
-                file_mapping.final_dataframe = updated_df.copy()
+                file_mapping.final_dataframe = updated_df
             
             # CRITICAL: Ensure the updated dataframe is also stored in controller.current_files
             # This ensures consistency across all storage locations
             for file_key, file_data in self.controller.current_files.items():
                 if 'file_mapping' in file_data and file_data['file_mapping'] == file_mapping:
-                    file_data['final_dataframe'] = updated_df.copy()
+                    file_data['final_dataframe'] = updated_df
                     logger.info(f"Updated final_dataframe in current_files for file_key: {file_key}")
                     break
             
@@ -3124,7 +3476,7 @@ class MainWindow:
             logger.info(f"DEBUG: About to call _update_tab_with_comparison_data method")
             logger.info(f"DEBUG: Method exists: {hasattr(self, '_update_tab_with_comparison_data')}")
             try:
-                self._update_tab_with_comparison_data(current_tab, updated_df)
+                self._update_tab_with_comparison_data(current_tab, updated_df, grid=grid)
                 logger.info("_update_tab_with_comparison_data completed successfully")
             except Exception as e:
                 logger.error(f"Exception in _update_tab_with_comparison_data: {e}")
@@ -3484,119 +3836,35 @@ Offer Information:
             )
             
             if filename:
-                # Export the updated master dataset with proper formatting
-                with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-                    processor.master_dataset.to_excel(writer, index=False, sheet_name='Comparison Results')
-                    
-                    # Get the workbook and worksheet
-                    workbook = writer.book
-                    worksheet = writer.sheets['Comparison Results']
-                    
-                    # Apply European number formatting to numeric columns
-                    from openpyxl.styles import NamedStyle
-                    from openpyxl.utils import get_column_letter
-                    
-                    # Identify numeric columns (those containing price, quantity, manhours, wage)
-                    numeric_columns = []
-                    for col_idx, col_name in enumerate(processor.master_dataset.columns, 1):
-                        col_lower = col_name.lower()
-                        if any(keyword in col_lower for keyword in ['price', 'quantity', 'manhours', 'wage']):
-                            numeric_columns.append((col_idx, col_name))
-                    
-                    # Apply formatting to numeric columns
-                    for col_idx, col_name in numeric_columns:
-                        # Create European number style
-                        euro_style = NamedStyle(name=f"euro_number_{col_name}")
-                        euro_style.number_format = '#,##0.00'
-                        
-                        # Apply to the column
-                        col_letter = get_column_letter(col_idx)
-                        for row in range(2, len(processor.master_dataset) + 2):  # Skip header row
-                            cell = worksheet[f'{col_letter}{row}']
-                            cell.style = euro_style
-                    
-                    # Add data validation for Category column if it exists
-                    if 'Category' in processor.master_dataset.columns:
-                        category_col_idx = list(processor.master_dataset.columns).index('Category') + 1
-                        category_col_letter = get_column_letter(category_col_idx)
-                        
-                        # Get available categories in the correct order (from category_order)
-                        try:
-                            category_order = ['General Costs', 'Site Costs', 'Civil Works', 'Earth Movement', 'Roads', 'OEM Building', 'Electrical Works', 'Solar Cables', 'LV Cables', 'MV Cables', 'Trenching', 'PV Mod. Installation', 'Cleaning and Cabling of PV Mod.', 'Tracker Inst.', 'Other']
-                            available_categories = category_order
-                            
-                            # Create data validation for Category column
-                            from openpyxl.worksheet.datavalidation import DataValidation
-                            
-                            # Create validation rule
-                            dv = DataValidation(
-                                type="list",
-                                formula1=f'"{",".join(available_categories)}"',
-                                allow_blank=True,
-                                showErrorMessage=True,
-                                errorTitle="Invalid Category",
-                                error="Please select a category from the dropdown list.",
-                                showInputMessage=True,
-                                promptTitle="Category Selection",
-                                prompt="Select a category from the dropdown list."
-                            )
-                            
-                            # Add validation to worksheet
-                            worksheet.add_data_validation(dv)
-                            
-                            # Apply validation to Category column (skip header row)
-                            for row in range(2, len(processor.master_dataset) + 2):
-                                dv.add(f'{category_col_letter}{row}')
-                            
-                        except Exception as e:
-                            logger.warning(f"Could not add category validation: {e}")
-                    
-                    # Auto-adjust column widths
-                    for column in worksheet.columns:
-                        max_length = 0
-                        column_letter = column[0].column_letter
-                        for cell in column:
-                            try:
-                                if len(str(cell.value)) > max_length:
-                                    max_length = len(str(cell.value))
-                            except:
-                                pass
-                        adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-                        worksheet.column_dimensions[column_letter].width = adjusted_width
-                    
-                    # Format header row
-                    from openpyxl.styles import Font, PatternFill, Alignment
-                    header_font = Font(bold=True)
-                    header_fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
-                    header_alignment = Alignment(horizontal="center", vertical="center")
-                    
-                    for cell in worksheet[1]:
-                        cell.font = header_font
-                        cell.fill = header_fill
-                        cell.alignment = header_alignment
-                    
-                    # Collect all offers from the dataset
-                    all_offers_info = {}
-                    # Get comparison offer info
-                    all_offers_info[offer_info.get('offer_name', 'Comparison')] = offer_info
-                    
-                    # Get master offer info
-                    file_mapping = self._get_file_mapping_for_current_tab()
-                    if file_mapping and hasattr(file_mapping, 'offer_info'):
-                        master_offer_info = file_mapping.offer_info
-                        master_offer_name = master_offer_info.get('offer_name', 'Master')
-                        if master_offer_name not in all_offers_info:
-                            all_offers_info[master_offer_name] = master_offer_info
-                    
-                    # Also check for other offers in controller's current_files
-                    for file_key, file_data in self.controller.current_files.items():
-                        if 'offers' in file_data:
-                            for offer_name, offer_info_dict in file_data['offers'].items():
-                                if offer_name not in all_offers_info:
-                                    all_offers_info[offer_name] = offer_info_dict
-                    
-                    # Add summary sheet with formulas
-                    self._add_summary_sheet_with_formulas_comparison(workbook, processor.master_dataset, all_offers_info)
+                # Collect all offers from the dataset
+                all_offers_info = {}
+                # Get comparison offer info
+                all_offers_info[offer_info.get('offer_name', 'Comparison')] = offer_info
+                
+                # Get master offer info
+                file_mapping = self._get_file_mapping_for_current_tab()
+                if file_mapping and hasattr(file_mapping, 'offer_info'):
+                    master_offer_info = file_mapping.offer_info
+                    master_offer_name = master_offer_info.get('offer_name', 'Master')
+                    if master_offer_name not in all_offers_info:
+                        all_offers_info[master_offer_name] = master_offer_info
+                
+                # Also check for other offers in controller's current_files
+                for file_key, file_data in self.controller.current_files.items():
+                    if 'offers' in file_data:
+                        for offer_name, offer_info_dict in file_data['offers'].items():
+                            if offer_name not in all_offers_info:
+                                all_offers_info[offer_name] = offer_info_dict
+                
+                # Stream the updated master dataset with formatting and a formula summary sheet
+                from utils.export import StreamingExcelWriter, offer_total_columns
+                with StreamingExcelWriter(filename) as writer:
+                    writer.write_dataframe('Comparison Results', processor.master_dataset)
+                    writer.write_category_summary(
+                        'Summary', 'Comparison Results', processor.master_dataset,
+                        offer_total_columns(processor.master_dataset, list(all_offers_info)),
+                        summary=processor.summary
+                    )
                 
                 messagebox.showinfo("Export Complete", f"Comparison results exported to {filename}")
                 
@@ -3870,31 +4138,30 @@ Offer Information:
             loading_label.grid(row=0, column=0, pady=40, padx=100)
             self.root.update_idletasks()
 
-            def process_in_thread():
-                try:
-                    # Process file with mapping
-                    file_mapping = self.controller.process_file(
-                        Path(filepath),
-                        progress_callback=lambda p, m: self.root.after(0, self.update_progress, p, m)
-                    )
-                    
-                    # Apply the saved mapping to the file_mapping
-                    self._apply_saved_mapping(file_mapping, mapping_data)
-                    
-                    # Store the file mapping
-                    self.file_mapping = file_mapping
-                    self.column_mapper = file_mapping.column_mapper if hasattr(file_mapping, 'column_mapper') else None
-                    
-                    # Schedule completion on main thread
-                    self.root.after(0, self._on_mapping_processing_complete, tab, filepath, file_mapping, loading_label, offer_info)
-                    
-                except Exception as e:
-                    logger.error(f"Failed to process file with mapping: {e}", exc_info=True)
-                    self.root.after(0, self._on_processing_error, tab, filename, loading_label)
+            def on_processed(file_mapping):
+                # Apply the saved mapping to the file_mapping
+                self._apply_saved_mapping(file_mapping, mapping_data)
+
+                # Store the file mapping
+                self.file_mapping = file_mapping
+                self.column_mapper = file_mapping.column_mapper if hasattr(file_mapping, 'column_mapper') else None
+
+                self._on_mapping_processing_complete(tab, filepath, file_mapping, loading_label, offer_info)
+
+            def on_error(error):
+                logger.error(f"Failed to process file with mapping: {error}",
+                             exc_info=(type(error), error, error.__traceback__))
+                self._on_processing_error(tab, filename, loading_label)
+
+            # Process file with mapping in a background job
+            self._submit_file_processing(
+                filepath,
+                name=f"Process {filename} with saved mapping",
+                on_result=on_processed,
+                on_error=on_error,
+                on_cancelled=loading_label.destroy,
+            )
 
-            # Start processing thread
-            threading.Thread(target=process_in_thread, daemon=True).start()
-            
         except Exception as e:
             logger.error(f"Error in _process_file_with_mapping: {e}")
             messagebox.showerror("Error", f"Failed to process file with mapping: {str(e)}")
@@ -4236,12 +4503,12 @@ Offer Information:
             summary_vsb.grid(row=0, column=1, sticky=(tk.N, tk.S))
             summary_hsb.grid(row=1, column=0, sticky=(tk.W, tk.E))
             
-            # Calculate summary data
+            # Calculate summary data from the running totals
+            summary_cache = self._get_summary_cache(display_df)
             total_cost = 0.0
             if 'total_price' in display_df.columns:
                 try:
-                    numeric_prices = pd.to_numeric(display_df['total_price'], errors='coerce')
-                    total_cost = numeric_prices.sum()
+                    total_cost = summary_cache.total('total_price')
                 except Exception as e:
                     logger.warning(f"Error calculating total cost: {e}")
                     total_cost = 0.0
@@ -4350,8 +4617,7 @@ Offer Information:
                         # Calculate total cost for this offer
                         offer_total_cost = 0.0
                         if col in display_df.columns:
-                            numeric_prices = pd.to_numeric(display_df[col], errors='coerce')
-                            offer_total_cost = numeric_prices.sum()
+                            offer_total_cost = summary_cache.total(col)
                         
                         # Format total cost
                         if offer_total_cost > 0:
@@ -4501,6 +4767,12 @@ Offer Information:
                 """Determine whether each comparison row would be MERGE or ADD"""
                 decisions = []
                 
+                from core.description_intern import MISSING, DescriptionTable
+                
+                # Master rows grouped by description ID (same text up to case and whitespace)
+                descriptions = DescriptionTable()
+                master_groups = descriptions.group_positions(descriptions.codes(master_df['Description']))
+                
                 # Create a mapping of description to instance counts for correct ordering
                 description_instance_counts = {}
                 
@@ -4511,22 +4783,8 @@ Offer Information:
                         decisions.append('INVALID - No Description')
                         continue
                     
-                    # Get master instances using normalized whitespace matching first
-                    # This handles cases where descriptions have different whitespace/newline characters
-                    normalized_desc = ' '.join(description.split())  # Normalize whitespace
-                    master_instances = master_df[
-                        master_df['Description'].str.lower().apply(lambda x: ' '.join(str(x).split())) == normalized_desc.lower()
-                    ]
-                    
-                    # If no matches found with normalized matching, try exact matching as fallback
-                    if len(master_instances) == 0:
-                        master_instances = master_df[master_df['Description'] == description]
-                        
-                        # If still no matches, try case-insensitive matching
-                        if len(master_instances) == 0:
-                            master_instances = master_df[
-                                master_df['Description'].str.lower() == description.lower()
-                            ]
+                    description_id = descriptions.lookup(description)
+                    master_positions = master_groups.get(description_id, []) if description_id != MISSING else []
                     
                     # Initialize instance count for this description if not seen before
                     if description not in description_instance_counts:
@@ -4537,8 +4795,8 @@ Offer Information:
                     description_instance_counts[description] += 1
                     
                     # Decision logic: if instance number < master instances, MERGE; else ADD
-                    if comp_instance_number < len(master_instances):
-                        master_idx = master_instances.index[comp_instance_number]
+                    if comp_instance_number < len(master_positions):
+                        master_idx = master_df.index[master_positions[comp_instance_number]]
                         decisions.append(f'MERGE Instance {comp_instance_number + 1} (Master Row {master_idx + 2})')
                     else:
                         decisions.append(f'ADD Instance {comp_instance_number + 1} (New Row)')
@@ -4736,404 +4994,156 @@ Offer Information:
                 # Use dataframe with comparison columns if available
                 if hasattr(self, '_current_dataframe_with_comparison') and self._current_dataframe_with_comparison is not None:
                     logger.info("Using dataframe with comparison columns for export")
-                    export_df = self._current_dataframe_with_comparison.copy()
+                    source_df = self._current_dataframe_with_comparison
                 else:
                     logger.info("Using original dataframe (no comparison columns found)")
-                    export_df = final_dataframe.copy()
-                
-                # Remove unwanted columns
-                columns_to_remove = ['ignore', 'Position']
-                for col in columns_to_remove:
-                    if col in export_df.columns:
-                        export_df = export_df.drop(columns=[col])
-                
-                # Define desired column order
-                desired_order = ['code', 'Category', 'Description', 'unit', 
-                               'quantity', 'unit_price', 'total_price', 'manhours', 'wage']
+                    source_df = final_dataframe
                 
-                # Get offer-specific columns (those with brackets)
-                offer_columns = [col for col in export_df.columns if '[' in col and ']' in col]
-                
-                # Reorder columns (only include columns that exist)
-                existing_columns = [col for col in desired_order if col in export_df.columns]
-                # Add offer-specific columns after base columns
-                other_columns = [col for col in export_df.columns if col not in desired_order and col not in offer_columns]
-                final_columns = existing_columns + offer_columns + other_columns
+                # Get offer name for summary sheet
+                offer_name = "Current Offer"
+                current_tab_path = self.notebook.select()
+                for file_key, file_data in self.controller.current_files.items():
+                    if hasattr(file_data['file_mapping'], 'tab') and str(file_data['file_mapping'].tab) == str(current_tab_path):
+                        if hasattr(file_data['file_mapping'], 'offer_info') and file_data['file_mapping'].offer_info:
+                            offer_info = file_data['file_mapping'].offer_info
+                            offer_name = offer_info.get('offer_name', offer_name)
+                        elif 'offer_info' in file_data:
+                            offer_info = file_data['offer_info']
+                            offer_name = offer_info.get('offer_name', offer_name)
+                        break
                 
-                export_df = export_df[final_columns]
+                # Check if there are comparison offers in the dataframe
+                comparison_columns = [col for col in source_df.columns if '[' in col and ']' in col and 'total_price' in col]
                 
-                # Convert numeric columns to proper numeric values for Excel
-                # Include both base columns and offer-specific columns
-                numeric_columns = ['quantity', 'unit_price', 'total_price', 'manhours', 'wage']
-                # Also include all offer-specific numeric columns
-                numeric_columns.extend([col for col in offer_columns if any(base_col in col for base_col in ['quantity', 'unit_price', 'total_price', 'manhours', 'wage'])])
-                for col in numeric_columns:
-                    if col in export_df.columns:
-                        # Convert to numeric, handling any formatting
-                        export_df[col] = pd.to_numeric(export_df[col], errors='coerce')
-                
-                # Export with proper Excel formatting and data validation
-                with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-                    export_df.to_excel(writer, index=False, sheet_name='BOQ Data')
-                    
-                    # Get the workbook and worksheet
-                    workbook = writer.book
-                    worksheet = writer.sheets['BOQ Data']
-                    
-                    # Apply European number formatting to numeric columns
-                    for col_idx, col_name in enumerate(export_df.columns, 1):
-                        # Check if this is a numeric column (base or offer-specific)
-                        is_numeric = col_name in numeric_columns or any(base_col in col_name for base_col in ['quantity', 'unit_price', 'total_price', 'manhours', 'wage'])
-                        if is_numeric:
-                            # Apply European number format (dot for thousands, comma for decimals)
-                            from openpyxl.styles import NamedStyle
-                            from openpyxl.utils import get_column_letter
-                            
-                            # Create European number style
-                            euro_style = NamedStyle(name=f"euro_number_{col_name}")
-                            euro_style.number_format = '#,##0.00'
-                            
-                            # Apply to the column
-                            col_letter = get_column_letter(col_idx)
-                            for row in range(2, len(export_df) + 2):  # Skip header row
-                                cell = worksheet[f'{col_letter}{row}']
-                                cell.style = euro_style
-                    
-                    # Add data validation for Category column
-                    if 'Category' in export_df.columns:
-                        category_col_idx = list(export_df.columns).index('Category') + 1
-                        category_col_letter = get_column_letter(category_col_idx)
-                        
-                        # Get available categories in the correct order (from category_order)
-                        try:
-                            category_order = ['General Costs', 'Site Costs', 'Civil Works', 'Earth Movement', 'Roads', 'OEM Building', 'Electrical Works', 'Solar Cables', 'LV Cables', 'MV Cables', 'Trenching', 'PV Mod. Installation', 'Cleaning and Cabling of PV Mod.', 'Tracker Inst.', 'Other']
-                            available_categories = category_order
-                            
-                            # Create data validation for Category column
-                            from openpyxl.worksheet.datavalidation import DataValidation
-                            
-                            # Create validation rule
-                            dv = DataValidation(
-                                type="list",
-                                formula1=f'"{",".join(available_categories)}"',
-                                allow_blank=True,
-                                showErrorMessage=True,
-                                errorTitle="Invalid Category",
-                                error="Please select a category from the dropdown list.",
-                                showInputMessage=True,
-                                promptTitle="Category Selection",
-                                prompt="Select a category from the dropdown list."
-                            )
-                            
-                            # Add validation to worksheet
-                            worksheet.add_data_validation(dv)
-                            
-                            # Apply validation to Category column (skip header row)
-                            for row in range(2, len(export_df) + 2):
-                                dv.add(f'{category_col_letter}{row}')
+                if comparison_columns:
+                    # Collect all offer info
+                    all_offers_info = {}
+                    # Get master offer info
+                    all_offers_info[offer_name] = {
+                        'offer_name': offer_name,
+                        'project_name': 'Unknown',
+                        'project_size': 'N/A',
+                        'date': datetime.now().strftime('%Y-%m-%d')
+                    }
+                    # Get comparison offer info
+                    for col in comparison_columns:
+                        offer_name_from_col = col.split('[')[1].split(']')[0]
+                        if offer_name_from_col not in all_offers_info:
+                            # Try to get offer info from controller
+                            offer_info_for_col = None
+                            for file_key, file_data in self.controller.current_files.items():
+                                if 'offers' in file_data and offer_name_from_col in file_data['offers']:
+                                    offer_info_for_col = file_data['offers'][offer_name_from_col]
+                                    break
                             
-                        except Exception as e:
-                            logger.warning(f"Could not add category validation: {e}")
-                    
-                    # Auto-adjust column widths
-                    for column in worksheet.columns:
-                        max_length = 0
-                        column_letter = column[0].column_letter
-                        for cell in column:
-                            try:
-                                if len(str(cell.value)) > max_length:
-                                    max_length = len(str(cell.value))
-                            except:
-                                pass
-                        adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-                        worksheet.column_dimensions[column_letter].width = adjusted_width
-                    
-                    # Format header row
-                    from openpyxl.styles import Font, PatternFill, Alignment
-                    header_font = Font(bold=True)
-                    header_fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
-                    header_alignment = Alignment(horizontal="center", vertical="center")
-                    
-                    for cell in worksheet[1]:
-                        cell.font = header_font
-                        cell.fill = header_fill
-                        cell.alignment = header_alignment
-                    
-                    # Get offer name for summary sheet
-                    offer_name = "Current Offer"
-                    current_tab_path = self.notebook.select()
-                    for file_key, file_data in self.controller.current_files.items():
-                        if hasattr(file_data['file_mapping'], 'tab') and str(file_data['file_mapping'].tab) == str(current_tab_path):
-                            if hasattr(file_data['file_mapping'], 'offer_info') and file_data['file_mapping'].offer_info:
-                                offer_info = file_data['file_mapping'].offer_info
-                                offer_name = offer_info.get('offer_name', offer_name)
-                            elif 'offer_info' in file_data:
-                                offer_info = file_data['offer_info']
-                                offer_name = offer_info.get('offer_name', offer_name)
-                            break
-                    
-                    # Check if there are comparison offers in the dataframe
-                    comparison_columns = [col for col in export_df.columns if '[' in col and ']' in col and 'total_price' in col]
+                            if offer_info_for_col:
+                                all_offers_info[offer_name_from_col] = offer_info_for_col
+                            else:
+                                all_offers_info[offer_name_from_col] = {
+                                    'offer_name': offer_name_from_col,
+                                    'project_name': f'Project {offer_name_from_col}',
+                                    'project_size': 'N/A',
+                                    'date': datetime.now().strftime('%Y-%m-%d')
+                                }
                     
-                    if comparison_columns:
-                        # Multiple offers - use comparison summary function
-                        # Collect all offer info
-                        all_offers_info = {}
-                        # Get master offer info
-                        all_offers_info[offer_name] = {
-                            'offer_name': offer_name,
-                            'project_name': 'Unknown',
-                            'project_size': 'N/A',
-                            'date': datetime.now().strftime('%Y-%m-%d')
-                        }
-                        # Get comparison offer info
-                        for col in comparison_columns:
-                            offer_name_from_col = col.split('[')[1].split(']')[0]
-                            if offer_name_from_col not in all_offers_info:
-                                # Try to get offer info from controller
-                                offer_info_for_col = None
-                                for file_key, file_data in self.controller.current_files.items():
-                                    if 'offers' in file_data and offer_name_from_col in file_data['offers']:
-                                        offer_info_for_col = file_data['offers'][offer_name_from_col]
-                                        break
-                                
-                                if offer_info_for_col:
-                                    all_offers_info[offer_name_from_col] = offer_info_for_col
-                                else:
-                                    all_offers_info[offer_name_from_col] = {
-                                        'offer_name': offer_name_from_col,
-                                        'project_name': f'Project {offer_name_from_col}',
-                                        'project_size': 'N/A',
-                                        'date': datetime.now().strftime('%Y-%m-%d')
-                                    }
-                        
-                        # Use comparison summary function
-                        self._add_summary_sheet_with_formulas_comparison(workbook, export_df, all_offers_info)
-                    else:
-                        # Single offer - use regular summary function
-                        self._add_summary_sheet_with_formulas(workbook, export_df, offer_name)
+                else:
+                    all_offers_info = {offer_name: {'offer_name': offer_name}}
                 
-                messagebox.showinfo("Export Complete", f"Categorized data exported to {filename}")
+                # Snapshot what the job reads: edits made while it writes must not
+                # reach the file half-way. The cache replaces its aggregates rather
+                # than mutating them, so a shallow copy freezes its totals.
+                file_mapping = self._get_file_mapping_for_current_tab()
+                export_df = source_df.copy()
+                summary = copy.copy(self._get_summary_cache(export_df, file_mapping))
+                store = self._session_store()
+                if store is not None and file_mapping is not None:
+                    store.pin(file_mapping)
+                
+                def release():
+                    if store is not None and file_mapping is not None:
+                        store.unpin(file_mapping)
+                
+                def on_exported(_):
+                    release()
+                    self.update_progress(100, f"Exported {os.path.basename(filename)}")
+                    messagebox.showinfo("Export Complete", f"Categorized data exported to {filename}")
+                
+                def on_export_error(error):
+                    release()
+                    logger.error(f"Error exporting categorized data: {error}",
+                                 exc_info=(type(error), error, error.__traceback__))
+                    self._update_status("Export failed.")
+                    messagebox.showerror("Export Error", f"Failed to export data: {str(error)}")
+                
+                def on_export_cancelled():
+                    release()
+                    self._update_status("Export cancelled.")
+                
+                self._update_status(f"Exporting {os.path.basename(filename)}...")
+                self.jobs.submit(
+                    self._write_categorized_export, filename, export_df, list(all_offers_info), summary,
+                    name=f"Export {os.path.basename(filename)}",
+                    on_progress=self.update_progress,
+                    on_result=on_exported,
+                    on_error=on_export_error,
+                    on_cancelled=on_export_cancelled,
+                )
                 
         except Exception as e:
             logger.error(f"Error exporting categorized data: {e}")
             messagebox.showerror("Export Error", f"Failed to export data: {str(e)}")
 
-    def _add_summary_sheet_with_formulas(self, workbook, dataframe, offer_name):
-        """Add a summary sheet with formulas that calculate totals for each category"""
-        try:
-            logger.info(f"Creating summary sheet for offer: {offer_name}")
-            # Create summary sheet
-            summary_sheet = workbook.create_sheet("Summary")
-            
-            # Define category order (same as in _summarize_categorized_data)
-            category_order = [
-                "General Costs",
-                "Site Costs", 
-                "Civil Works",
-                "Earth Movement",
-                "Roads",
-                "OEM Building",
-                "Electrical Works",
-                "Solar Cables",
-                "LV Cables", 
-                "MV Cables",
-                "Trenching",
-                "PV Mod. Installation",
-                "Cleaning and Cabling of PV Mod.",
-                "Tracker Inst.",
-                "Other"
-            ]
-            
-            # Create headers
-            headers = ['Offer Name'] + category_order
-            for col_idx, header in enumerate(headers, 1):
-                cell = summary_sheet.cell(row=1, column=col_idx, value=header)
-                cell.font = openpyxl.styles.Font(bold=True)
-                cell.fill = openpyxl.styles.PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
-                cell.alignment = openpyxl.styles.Alignment(horizontal="center", vertical="center")
-            
-            # Add offer name
-            summary_sheet.cell(row=2, column=1, value=offer_name)
-            
-            # Add formulas for each category
-            for col_idx, category in enumerate(category_order, 2):  # Start from column 2 (after Offer Name)
-                # Find the Category column in the main data sheet
-                category_col_idx = None
-                for idx, col_name in enumerate(dataframe.columns, 1):
-                    if col_name == 'Category':
-                        category_col_idx = idx
-                        break
-                
-                # Find the total_price column in the main data sheet
-                total_price_col_idx = None
-                for idx, col_name in enumerate(dataframe.columns, 1):
-                    if col_name == 'total_price':
-                        total_price_col_idx = idx
-                        break
-                
-                if category_col_idx and total_price_col_idx:
-                    # Create SUMIFS formula: =SUMIFS('BOQ Data'!F:F,'BOQ Data'!C:C,"General Costs")
-                    # Where F is total_price column and C is Category column
-                    category_col_letter = openpyxl.utils.get_column_letter(category_col_idx)
-                    total_price_col_letter = openpyxl.utils.get_column_letter(total_price_col_idx)
-                    
-                    formula = f'=SUMIFS(\'BOQ Data\'!{total_price_col_letter}:{total_price_col_letter},\'BOQ Data\'!{category_col_letter}:{category_col_letter},"{category}")'
-                    
-                    cell = summary_sheet.cell(row=2, column=col_idx)
-                    cell.value = formula
-                    
-                    # Apply European number formatting
-                    cell.number_format = '#,##0.00'
-                else:
-                    # If columns not found, set to 0
-                    summary_sheet.cell(row=2, column=col_idx, value=0)
-                    summary_sheet.cell(row=2, column=col_idx).number_format = '#,##0.00'
-            
-            # Auto-adjust column widths
-            for column in summary_sheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-                summary_sheet.column_dimensions[column_letter].width = adjusted_width
-                
-        except Exception as e:
-            logger.error(f"Error adding summary sheet with formulas: {e}")
-            import traceback
-            logger.error(f"Full traceback: {traceback.format_exc()}")
-            # Don't raise the exception, just log it so the main export can continue
-
-    def _add_summary_sheet_with_formulas_comparison(self, workbook, dataframe, all_offers_info):
-        """Add a summary sheet with formulas for comparison results with multiple offers"""
-        try:
-            # Handle backward compatibility: if all_offers_info is a single dict, convert to dict format
-            if isinstance(all_offers_info, dict) and 'offer_name' in all_offers_info:
-                # Old format: single offer_info dict
-                offer_name = all_offers_info.get('offer_name', 'Comparison Results')
-                all_offers_info = {offer_name: all_offers_info}
-            
-            logger.info(f"Creating summary sheet for comparison with {len(all_offers_info)} offers")
-            # Create summary sheet
-            summary_sheet = workbook.create_sheet("Summary")
-            
-            # Define category order (same as in _summarize_categorized_data)
-            category_order = [
-                "General Costs",
-                "Site Costs", 
-                "Civil Works",
-                "Earth Movement",
-                "Roads",
-                "OEM Building",
-                "Electrical Works",
-                "Solar Cables",
-                "LV Cables", 
-                "MV Cables",
-                "Trenching",
-                "PV Mod. Installation",
-                "Cleaning and Cabling of PV Mod.",
-                "Tracker Inst.",
-                "Other"
-            ]
-            
-            # Create headers
-            headers = ['Offer Name'] + category_order
-            for col_idx, header in enumerate(headers, 1):
-                cell = summary_sheet.cell(row=1, column=col_idx, value=header)
-                cell.font = openpyxl.styles.Font(bold=True)
-                cell.fill = openpyxl.styles.PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
-                cell.alignment = openpyxl.styles.Alignment(horizontal="center", vertical="center")
-            
-            # Find the Category column in the main data sheet
-            category_col_idx = None
-            for idx, col_name in enumerate(dataframe.columns, 1):
-                if col_name == 'Category':
-                    category_col_idx = idx
-                    break
-            
-            category_col_letter = openpyxl.utils.get_column_letter(category_col_idx) if category_col_idx else None
-            
-            # Get all offer-specific total_price columns
-            offer_total_price_columns = {}
-            for col in dataframe.columns:
-                if '[' in col and ']' in col and 'total_price' in col:
-                    offer_name_from_col = col.split('[')[1].split(']')[0]
-                    offer_total_price_columns[offer_name_from_col] = col
-            
-            # Also check for base total_price column (master offer)
-            base_total_price_col = None
-            if 'total_price' in dataframe.columns:
-                # Check if it doesn't have brackets (is base column)
-                if '[' not in 'total_price' and ']' not in 'total_price':
-                    base_total_price_col = 'total_price'
-            
-            # Add a row for each offer
-            row_num = 2
-            for offer_name, offer_info in all_offers_info.items():
-                # Add offer name
-                summary_sheet.cell(row=row_num, column=1, value=offer_name)
-                
-                # Determine which total_price column to use for this offer
-                total_price_col = None
-                total_price_col_idx = None
-                
-                if offer_name in offer_total_price_columns:
-                    # Use offer-specific column
-                    total_price_col = offer_total_price_columns[offer_name]
-                    for idx, col_name in enumerate(dataframe.columns, 1):
-                        if col_name == total_price_col:
-                            total_price_col_idx = idx
-                            break
-                elif base_total_price_col:
-                    # Use base total_price column
-                    for idx, col_name in enumerate(dataframe.columns, 1):
-                        if col_name == base_total_price_col:
-                            total_price_col_idx = idx
-                            break
-                
-                # Add formulas for each category
-                for col_idx, category in enumerate(category_order, 2):  # Start from column 2 (after Offer Name)
-                    if category_col_letter and total_price_col_idx:
-                        total_price_col_letter = openpyxl.utils.get_column_letter(total_price_col_idx)
-                        
-                        # Create SUMIFS formula: =SUMIFS('BOQ Data'!F:F,'BOQ Data'!C:C,"General Costs")
-                        formula = f'=SUMIFS(\'BOQ Data\'!{total_price_col_letter}:{total_price_col_letter},\'BOQ Data\'!{category_col_letter}:{category_col_letter},"{category}")'
-                        
-                        cell = summary_sheet.cell(row=row_num, column=col_idx)
-                        cell.value = formula
-                        
-                        # Apply European number formatting
-                        cell.number_format = '#,##0.00'
-                    else:
-                        # If columns not found, set to 0
-                        summary_sheet.cell(row=row_num, column=col_idx, value=0)
-                        summary_sheet.cell(row=row_num, column=col_idx).number_format = '#,##0.00'
-                
-                row_num += 1
-            
-            # Auto-adjust column widths
-            for column in summary_sheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-                summary_sheet.column_dimensions[column_letter].width = adjusted_width
-                
-        except Exception as e:
-            logger.error(f"Error adding summary sheet with formulas for comparison: {e}")
-            import traceback
-            logger.error(f"Full traceback: {traceback.format_exc()}")
-            # Don't raise the exception, just log it so the main export can continue
+    @staticmethod
+    def _write_categorized_export(context, filename, export_df, offer_names, summary):
+        """Format export_df and stream it with its summary sheet to filename (background job)"""
+        context.progress(10, "Preparing export...")
+        
+        # Remove unwanted columns
+        columns_to_remove = ['ignore', 'Position']
+        for col in columns_to_remove:
+            if col in export_df.columns:
+                export_df = export_df.drop(columns=[col])
+        
+        # Define desired column order
+        desired_order = ['code', 'Category', 'Description', 'unit', 
+                       'quantity', 'unit_price', 'total_price', 'manhours', 'wage']
+        
+        # Get offer-specific columns (those with brackets)
+        offer_columns = [col for col in export_df.columns if '[' in col and ']' in col]
+        
+        # Reorder columns (only include columns that exist)
+        existing_columns = [col for col in desired_order if col in export_df.columns]
+        # Add offer-specific columns after base columns
+        other_columns = [col for col in export_df.columns if col not in desired_order and col not in offer_columns]
+        final_columns = existing_columns + offer_columns + other_columns
+        
+        export_df = export_df[final_columns]
+        
+        # Convert numeric columns to proper numeric values for Excel
+        # Include both base columns and offer-specific columns
+        numeric_columns = ['quantity', 'unit_price', 'total_price', 'manhours', 'wage']
+        # Also include all offer-specific numeric columns
+        numeric_columns.extend([col for col in offer_columns if any(base_col in col for base_col in ['quantity', 'unit_price', 'total_price', 'manhours', 'wage'])])
+        for col in numeric_columns:
+            if col in export_df.columns:
+                # Convert to numeric, handling any formatting
+                export_df[col] = pd.to_numeric(export_df[col], errors='coerce')
+        
+        context.progress(30, "Writing export...")
+        # Stream with column-level number formats, one Category validation range
+        # and a formula summary sheet
+        from utils.export import StreamingExcelWriter, offer_total_columns
+        with StreamingExcelWriter(filename) as writer:
+            writer.write_dataframe('BOQ Data', export_df, numeric_columns=[
+                col for col in export_df.columns
+                if col in numeric_columns or any(base_col in col for base_col in ['quantity', 'unit_price', 'total_price', 'manhours', 'wage'])
+            ])
+            context.progress(80, "Writing summary...")
+            writer.write_category_summary(
+                'Summary', 'BOQ Data', export_df, offer_total_columns(export_df, offer_names),
+                summary=summary
+            )
+        return filename
 
     def _summarize_categorized_data(self, dataframe):
         # Use the dataframe with comparison columns if available
@@ -5242,6 +5252,8 @@ Offer Information:
             logger.info(f"DEBUG: comparison_columns found: {comparison_columns}")
             
             if comparison_columns:
+                # Per-category totals come from the running summary, not a scan per category
+                summary_cache = self._get_summary_cache(display_dataframe)
                 # Look for comparison offers in the current dataframe
                 
                 for col in comparison_columns:
@@ -5257,14 +5269,13 @@ Offer Information:
                         
                         # Calculate category costs for this offer
                         offer_data = [offer_name_from_col]
+                        category_costs = summary_cache.category_totals(col)
                         
                         for category in category_order:
                             try:
-                                category_data = display_dataframe[display_dataframe['Category'] == category]
-                                if len(category_data) > 0:
+                                if category in category_costs:
                                     # Use the comparison column for this offer
-                                    category_prices = pd.to_numeric(category_data[col], errors='coerce')
-                                    category_cost = category_prices.sum()
+                                    category_cost = category_costs[category]
                                     if category_cost > 0:
                                         formatted_cost = format_number_eu(category_cost)
                                     else:
@@ -5296,12 +5307,11 @@ Offer Information:
                 if current_offer_name.lower() not in added_offer_names_lower:
                     # Calculate category costs for current offer
                     current_offer_data = [current_offer_name]
+                    category_costs = self._get_summary_cache(dataframe).category_totals('total_price')
                     for category in category_order:
                         try:
-                            category_data = dataframe[dataframe['Category'] == category]
-                            if len(category_data) > 0:
-                                category_prices = pd.to_numeric(category_data['total_price'], errors='coerce')
-                                category_cost = category_prices.sum()
+                            if category in category_costs:
+                                category_cost = category_costs[category]
                                 if category_cost > 0:
                                     formatted_cost = format_number_eu(category_cost)
                                 else:
@@ -5447,10 +5457,13 @@ Offer Information:
         try:
             import pandas as pd
             
+            from core.boq_schema import apply_schema
+            from core.description_intern import get_description_table
+            
             # First, try to use the dataframe attribute if it exists
             if hasattr(file_mapping, 'dataframe') and file_mapping.dataframe is not None:
                 logger.debug(f"Using existing dataframe from file mapping with {len(file_mapping.dataframe)} rows")
-                return file_mapping.dataframe.copy()
+                return apply_schema(file_mapping.dataframe.copy(), get_description_table(file_mapping))
             
             # Fallback: create DataFrame from sheet data
             rows = []
@@ -5475,7 +5488,7 @@ Offer Information:
             if rows:
                 df = pd.DataFrame(rows)
                 logger.debug(f"Created DataFrame with {len(df)} rows from file mapping sheet data")
-                return df
+                return apply_schema(df, get_description_table(file_mapping))
             else:
                 logger.warning("No data found in file mapping")
                 return None
@@ -5628,7 +5641,7 @@ Offer Information:
             for sheet_name in sheets_to_process:
                 try:
                     # Get sheet data with proper header detection
-                    sheet_data = excel_processor.get_sheet_data(sheet_name, max_rows=10000)
+                    sheet_data = excel_processor.get_sheet_data(sheet_name)
                     if not sheet_data or len(sheet_data) < 2:  # Need at least header + 1 row
                         continue
                     
@@ -5808,7 +5821,7 @@ Offer Information:
                     continue
                 
                 # Get sheet data
-                sheet_data = excel_processor.get_sheet_data(sheet_name, max_rows=10000)
+                sheet_data = excel_processor.get_sheet_data(sheet_name)
                 if not sheet_data or len(sheet_data) <= header_row_idx:
                     continue
                 
@@ -6118,7 +6131,7 @@ Offer Information:
                 
                 try:
                     # Get sheet data
-                    sheet_data = excel_processor.get_sheet_data(sheet_name, max_rows=10000)
+                    sheet_data = excel_processor.get_sheet_data(sheet_name)
                     if not sheet_data or len(sheet_data) < 2:
                         continue
                     
@@ -6382,10 +6395,17 @@ Offer Information:
         """
         try:
             import pandas as pd
+            from core.boq_schema import apply_schema
+            from core.description_intern import get_description_table
             
             dataset_type = "master" if is_master else "comparison"
             logger.info(f"Creating unified DataFrame for {dataset_type} dataset")
             
+            def typed(df):
+                # The master gets the typed schema; comparison rows keep their cell text,
+                # which row validation and MERGE's data type warnings read
+                return apply_schema(df, get_description_table(file_mapping)) if is_master else df
+            
             # First, try to use the dataframe attribute if it exists
             if hasattr(file_mapping, 'dataframe') and file_mapping.dataframe is not None:
                 # CRITICAL: Make a deep copy to avoid any reference issues
@@ -6541,7 +6561,7 @@ Offer Information:
                 else:
                     logger.error(f"No Description column found in {dataset_type} dataset!")
                 
-                return df
+                return typed(df)
             
             # Fallback: create DataFrame from sheet data
             logger.warning(f"No dataframe attribute found for {dataset_type}, falling back to sheet data")
@@ -6565,7 +6585,7 @@ Offer Information:
             if rows:
                 df = pd.DataFrame(rows)
                 logger.info(f"Created DataFrame from sheet data for {dataset_type}: {len(df)} rows")
-                return df
+                return typed(df)
             else:
                 logger.error(f"No data found in {dataset_type} file mapping")
                 return None
@@ -6728,6 +6748,8 @@ Offer Information:
         except Exception as e:
             logger.error(f"Error in main window event loop: {e}")
             raise
+        finally:
+            self.jobs.shutdown()
     
     def _process_comparison_file_with_sheet_structure(self, filepath, offer_info):
         """Process comparison file with sheet structure, like master BOQ workflow."""
@@ -6748,37 +6770,19 @@ Offer Information:
         self._pending_comparison_export = True
         self._pending_comparison_offer_info = offer_info
 
-    def _update_tab_with_comparison_data(self, tab, updated_df):
-        print("=== ENTERED _update_tab_with_comparison_data ===")
-        logger.info("Updating tab with comparison data")
-        logger.info(f"Tab children count: {len(tab.winfo_children())}")
-        
-        # Find the existing treeview in the tab
-        treeview = None
-        for widget in tab.winfo_children():
-            logger.info(f"Widget type: {type(widget)}")
-            if isinstance(widget, ttk.Frame):
-                logger.info(f"Frame children count: {len(widget.winfo_children())}")
-                for child in widget.winfo_children():
-                    logger.info(f"Child type: {type(child)}")
-                    if isinstance(child, ttk.Treeview):
-                        treeview = child
-                        logger.info("Found treeview!")
-                        break
-                if treeview:
-                    break
-        
-        if not treeview:
-            logger.warning("No treeview found in tab")
-            return
+    def _comparison_grid(self, updated_df):
+        """
+        Display columns and formatted rows of a comparison result
         
-        # Clear existing data
-        for item in treeview.get_children():
-            treeview.delete(item)
+        Touches no widgets, so the comparison jobs format the grid in the background
+        and the UI thread only applies it (see _update_tab_with_comparison_data).
         
-        # Get the current columns from the treeview
-        current_columns = treeview['columns']
+        Args:
+            updated_df: Merged master dataset
         
+        Returns:
+            (updated_df with standard column names, display columns, list of row value tuples)
+        """
         # Filter out ignore columns from the updated dataframe
         meaningful_columns = [col for col in updated_df.columns if not (col.startswith('ignore') or col == 'ignore')]
         
@@ -6848,10 +6852,6 @@ Offer Information:
             if col not in final_columns:
                 final_columns.append(col)
         
-        # Store the updated dataframe with comparison columns for summary methods
-        # This ensures the comparison columns are available when summary methods are called
-        self._current_dataframe_with_comparison = updated_df.copy()
-        
         # Add any remaining meaningful columns
         for col in meaningful_columns:
             if col not in final_columns:
@@ -6859,6 +6859,70 @@ Offer Information:
         
         logger.info(f"Final column order: {final_columns}")
         
+        # Format the rows using exact same formatting as row review
+        rows = []
+        for idx, row in updated_df.iterrows():
+            values = []
+            for col in final_columns:
+                val = row.get(col, '')
+                
+                # Apply exact same formatting as row review
+                if pd.notna(val) and val != '':
+                    # Check if this is a comparison column (has [offer_name] pattern)
+                    is_comparison_col = '[' in col and ']' in col
+                    
+                    # Extract base column name for comparison columns
+                    base_col = col.split('[')[0] if is_comparison_col else col
+                    
+                    if base_col in ['unit_price', 'total_price', 'wage']:
+                        # Currency formatting (same as row review) - applies to both master and comparison
+                        val = format_number_eu(val)
+                    elif base_col in ['quantity', 'manhours']:
+                        # Use standard European number formatting for both quantity and manhours
+                        val = format_number_eu(val)
+                    else:
+                        val = str(val)
+                else:
+                    val = ''
+                
+                values.append(val)
+            
+            rows.append(tuple(values))
+        
+        return updated_df, final_columns, rows
+
+    def _update_tab_with_comparison_data(self, tab, updated_df, grid=None):
+        print("=== ENTERED _update_tab_with_comparison_data ===")
+        logger.info("Updating tab with comparison data")
+        logger.info(f"Tab children count: {len(tab.winfo_children())}")
+        
+        # Find the existing treeview in the tab
+        treeview = None
+        for widget in tab.winfo_children():
+            logger.info(f"Widget type: {type(widget)}")
+            if isinstance(widget, ttk.Frame):
+                logger.info(f"Frame children count: {len(widget.winfo_children())}")
+                for child in widget.winfo_children():
+                    logger.info(f"Child type: {type(child)}")
+                    if isinstance(child, ttk.Treeview):
+                        treeview = child
+                        logger.info("Found treeview!")
+                        break
+                if treeview:
+                    break
+        
+        if not treeview:
+            logger.warning("No treeview found in tab")
+            return
+        
+        if grid is None:
+            grid = self._comparison_grid(updated_df)
+        updated_df, final_columns, rows = grid
+        
+        # Store the updated dataframe with comparison columns for summary methods
+        # This ensures the comparison columns are available when summary methods are called
+        self._current_dataframe_with_comparison = updated_df.copy()
+        
         # Update treeview columns if needed
         if list(treeview['columns']) != final_columns:
             treeview['columns'] = final_columns
@@ -6900,34 +6964,8 @@ Offer Information:
                     width = 100
                 treeview.column(col, width=width, minwidth=80, stretch=False)
         
-        # Populate with data using exact same formatting as row review
-        for idx, row in updated_df.iterrows():
-            values = []
-            for col in final_columns:
-                val = row.get(col, '')
-                
-                # Apply exact same formatting as row review
-                if pd.notna(val) and val != '':
-                    # Check if this is a comparison column (has [offer_name] pattern)
-                    is_comparison_col = '[' in col and ']' in col
-                    
-                    # Extract base column name for comparison columns
-                    base_col = col.split('[')[0] if is_comparison_col else col
-                    
-                    if base_col in ['unit_price', 'total_price', 'wage']:
-                        # Currency formatting (same as row review) - applies to both master and comparison
-                        val = format_number_eu(val)
-                    elif base_col in ['quantity', 'manhours']:
-                        # Use standard European number formatting for both quantity and manhours
-                        val = format_number_eu(val)
-                    else:
-                        val = str(val)
-                else:
-                    val = ''
-                
-                values.append(val)
-            
-            treeview.insert('', 'end', values=values)
+        # Apply only the rows that changed
+        self._apply_grid_rows(treeview, rows)
         
         logger.info("Tab updated successfully with comparison data")
         
@@ -6938,6 +6976,30 @@ Offer Information:
         except Exception as e:
             logger.error(f"Error refreshing summary after comparison: {e}")
         
+    def _apply_grid_rows(self, treeview, rows):
+        """
+        Make the treeview show rows, touching only items whose values differ
+        
+        Existing items are updated in place (keeping selection and scroll position),
+        surplus items are deleted and missing ones appended.
+        
+        Args:
+            treeview: Data grid
+            rows: List of row value tuples (strings), in display order
+        """
+        items = treeview.get_children()
+        changed = 0
+        for item, values in zip(items, rows):
+            if tuple(str(value) for value in treeview.item(item, 'values')) != values:
+                treeview.item(item, values=values)
+                changed += 1
+        if len(items) > len(rows):
+            treeview.delete(*items[len(rows):])
+        for values in rows[len(items):]:
+            treeview.insert('', 'end', values=values)
+        logger.info(f"Grid updated: {changed} rows changed, {max(len(rows) - len(items), 0)} added, "
+                    f"{max(len(items) - len(rows), 0)} removed")
+
     def _refresh_summary_after_comparison(self, tab, updated_df):
         """Refresh the summary frame to show all offers after comparison data is loaded"""
         try:
@@ -7009,12 +7071,12 @@ Offer Information:
                 project_size = offer_info.get('project_size', project_size)
                 date = offer_info.get('date', date)
             
-            # Calculate total cost for current offer
+            # Calculate total cost for current offer from the running totals
+            summary_cache = self._get_summary_cache(updated_df)
             total_cost = 0.0
             if 'total_price' in updated_df.columns:
                 try:
-                    numeric_prices = pd.to_numeric(updated_df['total_price'], errors='coerce')
-                    total_cost = numeric_prices.sum()
+                    total_cost = summary_cache.total('total_price')
                 except Exception as e:
                     logger.warning(f"Error calculating total cost: {e}")
                     total_cost = 0.0
@@ -7046,8 +7108,7 @@ Offer Information:
                         # Calculate total cost for this offer
                         offer_total_cost = 0.0
                         if col in updated_df.columns:
-                            numeric_prices = pd.to_numeric(updated_df[col], errors='coerce')
-                            offer_total_cost = numeric_prices.sum()
+                            offer_total_cost = summary_cache.total(col)
                         
                         # Format total cost
                         if offer_total_cost > 0:
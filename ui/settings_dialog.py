@@ -71,6 +71,17 @@ DEFAULT_SETTINGS = {
             "auto_save_config": True,
             "config_file_location": str(Path.home() / "Documents" / "BOQ_Config"),
             "last_import_location": str(Path.home() / "Documents")
+        },
+        "profiling": {
+            "enabled": False,
+            "format": "json",
+            "memory_mode": "rss",
+            "output_file": ""
+        },
+        "memory": {
+            "compact_sheet_data": False,
+            "cache_dir": "",
+            "session_budget_mb": 1024
         }
     }
 }
@@ -404,6 +415,46 @@ class SettingsDialog:
         console_check.grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=2)
         tooltip(console_check, "Display log messages in the application console")
         
+        # Pipeline profiler
+        profiling_frame = ttk.LabelFrame(adv_frame, text="Pipeline Profiler", padding=10)
+        profiling_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        self.profiling_var = tk.BooleanVar()
+        profiling_check = ttk.Checkbutton(profiling_frame, text="Enable Pipeline Profiler", variable=self.profiling_var)
+        profiling_check.grid(row=0, column=0, columnspan=2, sticky=tk.W, pady=2)
+        tooltip(profiling_check, "Record time, rows and memory for each processing stage; the profile is written on exit")
+        
+        ttk.Label(profiling_frame, text="Profile Format:").grid(row=1, column=0, sticky=tk.W, pady=2)
+        self.profiling_format_var = tk.StringVar()
+        profiling_format_combo = ttk.Combobox(profiling_frame, textvariable=self.profiling_format_var,
+                                             values=["json", "chrome"], state="readonly", width=15)
+        profiling_format_combo.grid(row=1, column=1, sticky=tk.W, padx=5, pady=2)
+        tooltip(profiling_format_combo, "JSON summary, or Chrome trace for chrome://tracing / Perfetto")
+        
+        ttk.Label(profiling_frame, text="Memory Measurement:").grid(row=2, column=0, sticky=tk.W, pady=2)
+        self.profiling_memory_var = tk.StringVar()
+        profiling_memory_combo = ttk.Combobox(profiling_frame, textvariable=self.profiling_memory_var,
+                                             values=["rss", "tracemalloc", "none"], state="readonly", width=15)
+        profiling_memory_combo.grid(row=2, column=1, sticky=tk.W, padx=5, pady=2)
+        tooltip(profiling_memory_combo, "rss is cheap and process-wide; tracemalloc is per-stage but slows processing")
+        
+        # Memory
+        memory_frame = ttk.LabelFrame(adv_frame, text="Memory", padding=10)
+        memory_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        self.compact_sheet_data_var = tk.BooleanVar()
+        compact_check = ttk.Checkbutton(memory_frame, text="Keep Raw Sheet Data on Disk",
+                                        variable=self.compact_sheet_data_var)
+        compact_check.grid(row=0, column=0, columnspan=2, sticky=tk.W, pady=2)
+        tooltip(compact_check, "Spill each processed file's raw sheet rows to a disk cache and reload them on demand")
+        
+        ttk.Label(memory_frame, text="Open Files Budget (MB):").grid(row=1, column=0, sticky=tk.W, pady=2)
+        self.session_budget_var = tk.IntVar()
+        session_budget_spin = ttk.Spinbox(memory_frame, from_=0, to=65536, increment=256,
+                                          textvariable=self.session_budget_var, width=10)
+        session_budget_spin.grid(row=1, column=1, sticky=tk.W, padx=5, pady=2)
+        tooltip(session_budget_spin, "Memory for open files; the least recently viewed are moved to disk beyond it (0 = no limit)")
+        
         # Backup settings
         backup_frame = ttk.LabelFrame(adv_frame, text="Backup & Recovery", padding=10)
         backup_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -474,6 +525,15 @@ class SettingsDialog:
         self.log_location_var.set(logging_settings.get("file_location", ""))
         self.console_output_var.set(logging_settings.get("console_output", True))
         
+        profiling_settings = advanced.get("profiling", {})
+        self.profiling_var.set(profiling_settings.get("enabled", False))
+        self.profiling_format_var.set(profiling_settings.get("format", "json"))
+        self.profiling_memory_var.set(profiling_settings.get("memory_mode", "rss"))
+        
+        memory_settings = advanced.get("memory", {})
+        self.compact_sheet_data_var.set(memory_settings.get("compact_sheet_data", False))
+        self.session_budget_var.set(memory_settings.get("session_budget_mb", 1024))
+        
         backup_settings = advanced.get("backup", {})
         self.auto_backup_var.set(backup_settings.get("auto_backup", True))
         self.backup_interval_var.set(backup_settings.get("backup_interval_hours", 24))
@@ -637,7 +697,18 @@ class SettingsDialog:
                     "backup_location": self.backup_location_var.get(),
                     "max_backups": 10
                 },
-                "import_export": DEFAULT_SETTINGS["advanced"]["import_export"]
+                "import_export": DEFAULT_SETTINGS["advanced"]["import_export"],
+                "profiling": {
+                    "enabled": self.profiling_var.get(),
+                    "format": self.profiling_format_var.get(),
+                    "memory_mode": self.profiling_memory_var.get(),
+                    "output_file": self.current_settings.get("advanced", {}).get("profiling", {}).get("output_file", "")
+                },
+                "memory": {
+                    "compact_sheet_data": self.compact_sheet_data_var.get(),
+                    "session_budget_mb": self.session_budget_var.get(),
+                    "cache_dir": self.current_settings.get("advanced", {}).get("memory", {}).get("cache_dir", "")
+                }
             }
         }
         
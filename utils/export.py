@@ -5,16 +5,281 @@ Handles export of processed BOQ data to various formats like Excel, CSV, and JSO
 
 import logging
 import json
+import math
+from dataclasses import is_dataclass
+from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Union
+import numpy as np
 import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl.utils import get_column_letter
+import xlsxwriter
+from xlsxwriter.utility import xl_col_to_name
 
 logger = logging.getLogger(__name__)
 
+# Category order used for the Category dropdown and the summary sheet
+CATEGORY_ORDER = [
+    "General Costs",
+    "Site Costs",
+    "Civil Works",
+    "Earth Movement",
+    "Roads",
+    "OEM Building",
+    "Electrical Works",
+    "Solar Cables",
+    "LV Cables",
+    "MV Cables",
+    "Trenching",
+    "PV Mod. Installation",
+    "Cleaning and Cabling of PV Mod.",
+    "Tracker Inst.",
+    "Other"
+]
+
+# Columns whose name contains one of these get the European number format
+NUMERIC_COLUMN_KEYWORDS = ['price', 'quantity', 'manhours', 'wage']
+
+EURO_NUMBER_FORMAT = '#,##0.00'
+DATE_FORMAT = 'yyyy-mm-dd hh:mm:ss'
+HEADER_FILL_COLOR = '#D9E1F2'
+MAX_COLUMN_WIDTH = 50
+
+
+def is_numeric_export_column(column_name: Any) -> bool:
+    """True if the column should be written with the European number format"""
+    col_lower = str(column_name).lower()
+    return any(keyword in col_lower for keyword in NUMERIC_COLUMN_KEYWORDS)
+
+
+def compute_column_widths(dataframe: pd.DataFrame, numeric_columns: Optional[List[str]] = None,
+                          cap: int = MAX_COLUMN_WIDTH) -> List[int]:
+    """
+    Column widths from header and value string lengths, without touching any cells
+
+    Args:
+        dataframe: Data being exported
+        numeric_columns: Columns written with EURO_NUMBER_FORMAT (width of the formatted maximum)
+        cap: Maximum width
+
+    Returns:
+        Width per column, in DataFrame column order
+    """
+    numeric_columns = set(numeric_columns or [])
+    widths = []
+    for column in dataframe.columns:
+        series = dataframe[column]
+        if isinstance(series, pd.DataFrame):  # duplicate column names
+            series = series.iloc[:, 0]
+        length = len(str(column))
+        values = series.dropna()
+        if not values.empty:
+            if column in numeric_columns and pd.api.types.is_numeric_dtype(values):
+                finite = values[np.isfinite(values.astype(float))]
+                if not finite.empty:
+                    largest = float(finite.abs().max())
+                    length = max(length, len(f"{largest:,.2f}") + (1 if (finite < 0).any() else 0))
+            else:
+                length = max(length, int(values.astype(str).str.len().max()))
+        widths.append(min(length + 2, cap))
+    return widths
+
+
+def offer_total_columns(dataframe: pd.DataFrame, offer_names: List[str],
+                        base_column: str = 'total_price') -> Dict[str, Optional[str]]:
+    """
+    Pick the total price column summed for each offer on the summary sheet
+
+    Uses `total_price[<offer>]` when present, otherwise the base column.
+
+    Returns:
+        Dictionary mapping offer name to column name (None when neither exists)
+    """
+    totals = {}
+    for offer_name in offer_names:
+        offer_column = f'{base_column}[{offer_name}]'
+        if offer_column in dataframe.columns:
+            totals[offer_name] = offer_column
+        elif base_column in dataframe.columns:
+            totals[offer_name] = base_column
+        else:
+            totals[offer_name] = None
+    return totals
+
+
+class StreamingExcelWriter:
+    """
+    Write DataFrames to .xlsx with xlsxwriter in constant_memory mode
+
+    Rows are streamed to disk as they are written, so memory stays flat as the
+    row count grows. Formats are set per column, the Category dropdown is one
+    range-level validation and widths come from DataFrame string lengths.
+
+    Usage:
+        with StreamingExcelWriter(path) as writer:
+            writer.write_dataframe('BOQ Data', df)
+            writer.write_category_summary('Summary', 'BOQ Data', df, {'Offer A': 'total_price'})
+    """
+
+    def __init__(self, path: Union[str, Path], chunk_rows: int = 5000):
+        self.path = Path(path)
+        self.chunk_rows = chunk_rows
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.workbook = xlsxwriter.Workbook(str(self.path), {
+            'constant_memory': True,
+            'strings_to_formulas': False,
+            'strings_to_urls': False,
+            'nan_inf_to_errors': True,
+        })
+        self.header_format = self.workbook.add_format({
+            'bold': True, 'bg_color': HEADER_FILL_COLOR, 'align': 'center', 'valign': 'vcenter'
+        })
+        self.number_format = self.workbook.add_format({'num_format': EURO_NUMBER_FORMAT})
+        self.date_format = self.workbook.add_format({'num_format': DATE_FORMAT})
+
+    def __enter__(self) -> 'StreamingExcelWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Finish the workbook and write it to disk"""
+        self.workbook.close()
+
+    def write_dataframe(self, sheet_name: str, dataframe: pd.DataFrame,
+                        numeric_columns: Optional[List[str]] = None,
+                        category_column: Optional[str] = 'Category',
+                        categories: Optional[List[str]] = None) -> None:
+        """
+        Stream a DataFrame into a new worksheet
+
+        Args:
+            sheet_name: Worksheet name
+            dataframe: Data to write (index is not written)
+            numeric_columns: Columns given the European number format
+                (default: columns matching NUMERIC_COLUMN_KEYWORDS)
+            category_column: Column that gets the category dropdown, if present
+            categories: Dropdown values (default: CATEGORY_ORDER)
+        """
+        worksheet = self.workbook.add_worksheet(sheet_name)
+        columns = list(dataframe.columns)
+        if numeric_columns is None:
+            numeric_columns = [col for col in columns if is_numeric_export_column(col)]
+        numeric_set = set(numeric_columns)
+        row_count = len(dataframe)
+
+        # Column-level formats and widths are set before any cells are streamed
+        for col_idx, width in enumerate(compute_column_widths(dataframe, numeric_columns)):
+            column_format = self.number_format if columns[col_idx] in numeric_set else None
+            worksheet.set_column(col_idx, col_idx, width, column_format)
+
+        if category_column in columns and row_count > 0:
+            col_idx = columns.index(category_column)
+            try:
+                worksheet.data_validation(1, col_idx, row_count, col_idx, {
+                    'validate': 'list',
+                    'source': categories or CATEGORY_ORDER,
+                    'ignore_blank': True,
+                    'input_title': 'Category Selection',
+                    'input_message': 'Select a category from the dropdown list.',
+                    'error_title': 'Invalid Category',
+                    'error_message': 'Please select a category from the dropdown list.',
+                })
+            except Exception as e:
+                logger.warning(f"Could not add category validation: {e}")
+
+        worksheet.write_row(0, 0, [str(col) for col in columns], self.header_format)
+
+        # Values are converted a chunk of rows at a time so memory does not grow with the
+        # row count; numeric columns are cleaned per chunk, object columns typed per value
+        float_columns = [
+            pd.api.types.is_numeric_dtype(dataframe.iloc[:, col_idx]) and not pd.api.types.is_bool_dtype(dataframe.iloc[:, col_idx])
+            for col_idx in range(len(columns))
+        ]
+        write_number = worksheet.write_number
+        write_value = self._write_value
+        for chunk_start in range(0, row_count, self.chunk_rows):
+            chunk = dataframe.iloc[chunk_start:chunk_start + self.chunk_rows]
+            column_values = []
+            for col_idx, is_float in enumerate(float_columns):
+                series = chunk.iloc[:, col_idx]
+                if is_float:
+                    values = series.to_numpy(dtype=float, na_value=np.nan).tolist()
+                    column_values.append([None if v != v else v for v in values])
+                else:
+                    column_values.append(series.tolist())
+
+            for offset, row_values in enumerate(zip(*column_values)):
+                excel_row = chunk_start + offset + 1
+                for col_idx, value in enumerate(row_values):
+                    if value is None:
+                        continue
+                    if float_columns[col_idx]:
+                        write_number(excel_row, col_idx, value)
+                    else:
+                        write_value(worksheet, excel_row, col_idx, value)
+
+        logger.debug(f"Streamed {row_count} rows x {len(columns)} columns to sheet '{sheet_name}'")
+
+    def _write_value(self, worksheet, row: int, col: int, value: Any) -> None:
+        """Write one cell from an object column, choosing the cell type from the value"""
+        if isinstance(value, str):
+            if value:
+                worksheet.write_string(row, col, value)
+        elif isinstance(value, (bool, np.bool_)):
+            worksheet.write_boolean(row, col, bool(value))
+        elif isinstance(value, (int, float, np.integer, np.floating)):
+            if not math.isnan(value):
+                worksheet.write_number(row, col, float(value))
+        elif isinstance(value, (datetime, date)):
+            if not pd.isna(value):
+                worksheet.write_datetime(row, col, value, self.date_format)
+        elif value is not None and not (np.isscalar(value) and pd.isna(value)):
+            worksheet.write_string(row, col, str(value))
+
+    def write_category_summary(self, sheet_name: str, data_sheet_name: str, dataframe: pd.DataFrame,
+                               offer_totals: Dict[str, Optional[str]],
+                               category_column: str = 'Category',
+                               categories: Optional[List[str]] = None,
+                               summary=None) -> None:
+        """
+        Add a summary sheet with one SUMIFS row per offer and one column per category
+
+        Args:
+            sheet_name: Summary worksheet name
+            data_sheet_name: Worksheet the formulas reference
+            dataframe: DataFrame written to data_sheet_name (for column positions)
+            offer_totals: Offer name -> total price column to sum (None writes zeros)
+            category_column: Column holding categories
+            categories: Category order (default: CATEGORY_ORDER)
+            summary: SummaryCache of dataframe; its totals are stored as the formulas' cached
+                results, so viewers that do not recalculate show the right values
+        """
+        categories = categories or CATEGORY_ORDER
+        worksheet = self.workbook.add_worksheet(sheet_name)
+        columns = list(dataframe.columns)
+        category_letter = xl_col_to_name(columns.index(category_column)) if category_column in columns else None
+
+        headers = ['Offer Name'] + categories
+        worksheet.write_row(0, 0, headers, self.header_format)
+        offer_width = max([len('Offer Name')] + [len(str(name)) for name in offer_totals])
+        worksheet.set_column(0, 0, min(offer_width + 2, MAX_COLUMN_WIDTH))
+        for col_idx, category in enumerate(categories, 1):
+            worksheet.set_column(col_idx, col_idx, max(len(category), 14) + 2, self.number_format)
+
+        quoted_sheet = data_sheet_name.replace("'", "''")
+        for row_idx, (offer_name, total_column) in enumerate(offer_totals.items(), 1):
+            worksheet.write_string(row_idx, 0, str(offer_name))
+            total_letter = xl_col_to_name(columns.index(total_column)) if total_column in columns else None
+            cached = summary.category_totals(total_column) if summary is not None and total_letter else {}
+            for col_idx, category in enumerate(categories, 1):
+                if category_letter and total_letter:
+                    formula = (f"=SUMIFS('{quoted_sheet}'!{total_letter}:{total_letter},"
+                               f"'{quoted_sheet}'!{category_letter}:{category_letter},\"{category}\")")
+                    worksheet.write_formula(row_idx, col_idx, formula, self.number_format, cached.get(category, 0))
+                else:
+                    worksheet.write_number(row_idx, col_idx, 0, self.number_format)
+
 
 class ExcelExporter:
     """
@@ -57,6 +322,11 @@ class ExcelExporter:
 
     def export_to_json(self, file_mapping: Dict[str, Any], export_path: Path) -> bool:
         """Export mapping data to a JSON file."""
+        if is_dataclass(file_mapping):
+            # A FileMapping is streamed field by field instead of being converted to a dict first
+            from core.mapping_generator import MappingGenerator
+            MappingGenerator().write_mapping_json(file_mapping, export_path)
+            return True
         export_path.parent.mkdir(parents=True, exist_ok=True)
         with open(export_path, 'w', encoding='utf-8') as f:
             json.dump(file_mapping, f, indent=2, ensure_ascii=False)
@@ -74,15 +344,9 @@ class ExcelExporter:
     def export_normalized_boq(self, file_mapping: Dict[str, Any], export_path: Path) -> bool:
         """Export normalized BOQ data to an Excel file."""
         df = self._create_dataframe(file_mapping)
-        export_path.parent.mkdir(parents=True, exist_ok=True)
-        with pd.ExcelWriter(export_path, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Normalized BOQ', index=False)
-            # Formatting
-            ws = writer.sheets['Normalized BOQ']
-            self._format_excel_sheet(ws)
-            
-            # Add summary sheet with formulas
-            self._add_summary_sheet_with_formulas(writer.book, df, "Normalized BOQ")
+        with StreamingExcelWriter(export_path) as writer:
+            writer.write_dataframe('Normalized BOQ', df)
+            writer.write_category_summary('Summary', 'Normalized BOQ', df, {'Normalized BOQ': 'Total Price'})
             
         logger.info(f"Successfully exported normalized BOQ to Excel: {export_path}")
         return True
@@ -103,11 +367,8 @@ class ExcelExporter:
                 "Total Value": total_value,
             })
         df = pd.DataFrame(summary_data)
-        export_path.parent.mkdir(parents=True, exist_ok=True)
-        with pd.ExcelWriter(export_path, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Summary Report', index=False)
-            ws = writer.sheets['Summary Report']
-            self._format_excel_sheet(ws)
+        with StreamingExcelWriter(export_path) as writer:
+            writer.write_dataframe('Summary Report', df, numeric_columns=['Total Value'])
         logger.info(f"Successfully exported summary report to Excel: {export_path}")
         return True
         
@@ -128,175 +389,3 @@ class ExcelExporter:
                 }
                 records.append(record)
         return pd.DataFrame(records)
-
-    def _format_excel_sheet(self, ws):
-        """Apply standard formatting to an Excel worksheet with European number formatting and data validation."""
-        from openpyxl.styles import NamedStyle
-        from openpyxl.utils import get_column_letter
-        from openpyxl.worksheet.datavalidation import DataValidation
-        
-        # Format header row
-        header_font = Font(bold=True)
-        header_fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
-        header_alignment = Alignment(horizontal="center", vertical="center")
-        
-        for cell in ws[1]:
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-
-        # Apply European number formatting to numeric columns
-        numeric_columns = []
-        for col_idx, col_name in enumerate(ws[1], 1):
-            col_lower = str(col_name.value).lower()
-            if any(keyword in col_lower for keyword in ['price', 'quantity', 'manhours', 'wage']):
-                numeric_columns.append((col_idx, col_name.value))
-        
-        # Apply formatting to numeric columns
-        for col_idx, col_name in numeric_columns:
-            # Create European number style
-            euro_style = NamedStyle(name=f"euro_number_{col_name}")
-            euro_style.number_format = '#,##0.00'
-            
-            # Apply to the column
-            col_letter = get_column_letter(col_idx)
-            for row in range(2, ws.max_row + 1):  # Skip header row
-                cell = ws[f'{col_letter}{row}']
-                cell.style = euro_style
-        
-        # Add data validation for Category column if it exists
-        category_col_idx = None
-        for col_idx, col_name in enumerate(ws[1], 1):
-            if str(col_name.value).lower() == 'category':
-                category_col_idx = col_idx
-                break
-        
-        if category_col_idx:
-            category_col_letter = get_column_letter(category_col_idx)
-            
-            # Get available categories in the correct order (from category_order)
-            try:
-                category_order = ['General Costs', 'Site Costs', 'Civil Works', 'Earth Movement', 'Roads', 'OEM Building', 'Electrical Works', 'Solar Cables', 'LV Cables', 'MV Cables', 'Trenching', 'PV Mod. Installation', 'Cleaning and Cabling of PV Mod.', 'Tracker Inst.', 'Other']
-                available_categories = category_order
-                
-                # Create data validation for Category column
-                dv = DataValidation(
-                    type="list",
-                    formula1=f'"{",".join(available_categories)}"',
-                    allow_blank=True,
-                    showErrorMessage=True,
-                    errorTitle="Invalid Category",
-                    error="Please select a category from the dropdown list.",
-                    showInputMessage=True,
-                    promptTitle="Category Selection",
-                    prompt="Select a category from the dropdown list."
-                )
-                
-                # Add validation to worksheet
-                ws.add_data_validation(dv)
-                
-                # Apply validation to Category column (skip header row)
-                for row in range(2, ws.max_row + 1):
-                    dv.add(f'{category_col_letter}{row}')
-                
-            except Exception as e:
-                logger.warning(f"Could not add category validation: {e}")
-
-        # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-    def _add_summary_sheet_with_formulas(self, workbook, dataframe, sheet_name):
-        """Add a summary sheet with formulas that calculate totals for each category"""
-        try:
-            # Create summary sheet
-            summary_sheet = workbook.create_sheet("Summary")
-            
-            # Define category order (same as in main_window.py)
-            category_order = [
-                "General Costs",
-                "Site Costs", 
-                "Civil Works",
-                "Earth Movement",
-                "Roads",
-                "OEM Building",
-                "Electrical Works",
-                "Solar Cables",
-                "LV Cables", 
-                "MV Cables",
-                "Trenching",
-                "PV Mod. Installation",
-                "Cleaning and Cabling of PV Mod.",
-                "Tracker Inst.",
-                "Other"
-            ]
-            
-            # Create headers
-            headers = ['Offer Name'] + category_order
-            for col_idx, header in enumerate(headers, 1):
-                cell = summary_sheet.cell(row=1, column=col_idx, value=header)
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-            
-            # Add offer name
-            summary_sheet.cell(row=2, column=1, value=sheet_name)
-            
-            # Add formulas for each category
-            for col_idx, category in enumerate(category_order, 2):  # Start from column 2 (after Offer Name)
-                # Find the Category column in the main data sheet
-                category_col_idx = None
-                for idx, col_name in enumerate(dataframe.columns, 1):
-                    if col_name == 'Category':
-                        category_col_idx = idx
-                        break
-                
-                # Find the total_price column in the main data sheet
-                total_price_col_idx = None
-                for idx, col_name in enumerate(dataframe.columns, 1):
-                    if col_name == 'Total Price':
-                        total_price_col_idx = idx
-                        break
-                
-                if category_col_idx and total_price_col_idx:
-                    # Create SUMIFS formula
-                    category_col_letter = get_column_letter(category_col_idx)
-                    total_price_col_letter = get_column_letter(total_price_col_idx)
-                    
-                    formula = f'=SUMIFS(\'{sheet_name}\'!{total_price_col_letter}:{total_price_col_letter},\'{sheet_name}\'!{category_col_letter}:{category_col_letter},"{category}")'
-                    
-                    cell = summary_sheet.cell(row=2, column=col_idx)
-                    cell.value = formula
-                    
-                    # Apply European number formatting
-                    cell.number_format = '#,##0.00'
-                else:
-                    # If columns not found, set to 0
-                    summary_sheet.cell(row=2, column=col_idx, value=0)
-                    summary_sheet.cell(row=2, column=col_idx).number_format = '#,##0.00'
-            
-            # Auto-adjust column widths
-            for column in summary_sheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-                summary_sheet.column_dimensions[column_letter].width = adjusted_width
-                
-        except Exception as e:
-            logger.error(f"Error adding summary sheet with formulas: {e}")
-            # Don't raise the exception, just log it so the main export can continue 
\ No newline at end of file
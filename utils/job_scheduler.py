@@ -0,0 +1,340 @@
+"""
+Job Scheduler for BOQ Tools
+Runs background jobs on bounded worker pools and hands their progress and results to the Tk event loop
+"""
+
+import itertools
+import logging
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Thread workers: file loading, parsing and exports mostly wait on I/O or release the GIL
+DEFAULT_THREAD_WORKERS = 4
+
+# How often the Tk loop drains the event queue
+POLL_INTERVAL_MS = 50
+
+# Job states
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+class JobCancelled(Exception):
+    """Raised inside a job that was cancelled, to stop it at the next checkpoint"""
+
+
+@dataclass
+class JobEvent:
+    """Something a job reported, delivered to the callbacks by JobScheduler.poll()"""
+    job_id: int
+    kind: str  # 'progress', 'update', 'result', 'error' or 'cancelled'
+    value: Any = None
+    message: str = ''
+
+
+class JobContext:
+    """
+    Handle a thread job receives as its first argument
+
+    progress() and publish() are safe to call from the worker; the events are
+    queued and delivered on the thread that polls the scheduler. Both are also
+    cancellation checkpoints: once the job is cancelled they raise JobCancelled,
+    so a job passing context.progress as a progress callback stops at its next
+    progress report without further changes.
+    """
+
+    def __init__(self, job_id: int, events: 'queue.Queue[JobEvent]', cancel_event: threading.Event):
+        self.job_id = job_id
+        self._events = events
+        self._cancel_event = cancel_event
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self) -> None:
+        """Raise JobCancelled if the job was cancelled"""
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def progress(self, percentage: float, message: str = '') -> None:
+        """Report progress (0-100) to the job's on_progress callback"""
+        self.check_cancelled()
+        self._events.put(JobEvent(self.job_id, 'progress', percentage, message))
+
+    def publish(self, value: Any, message: str = '') -> None:
+        """Stream an intermediate result to the job's on_update callback"""
+        self.check_cancelled()
+        self._events.put(JobEvent(self.job_id, 'update', value, message))
+
+
+class Job:
+    """A submitted job: its future, state and callbacks"""
+
+    def __init__(self, job_id: int, name: str, kind: str, callbacks: Dict[str, Optional[Callable]]):
+        self.id = job_id
+        self.name = name
+        self.kind = kind  # 'thread' or 'process'
+        self.state = PENDING
+        self.future: Optional[Future] = None
+        self.callbacks = callbacks
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self.state in (DONE, FAILED, CANCELLED)
+
+    def cancel(self) -> None:
+        """
+        Ask the job to stop
+
+        A job that has not started yet never runs. A running thread job stops at
+        its next checkpoint (JobContext.progress/publish/check_cancelled); a
+        running process job finishes, but its result is discarded.
+        """
+        self._cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def __repr__(self) -> str:
+        return f"Job({self.id}, {self.name!r}, {self.state})"
+
+
+class JobScheduler:
+    """
+    Bounded worker pools plus a results queue polled by the UI thread
+
+    Thread jobs run on a fixed-size thread pool and get a JobContext for
+    progress reports, intermediate results and cancellation checks. Process
+    jobs (CPU-heavy, picklable functions and arguments) run on a process pool
+    created on first use. Workers never touch widgets: everything a job reports
+    goes through a queue, and poll() delivers it to the job's callbacks on the
+    calling thread. attach() makes the Tk loop call poll() periodically.
+
+    Usage:
+        jobs = JobScheduler()
+        jobs.attach(root)
+        job = jobs.submit(load, path, name='Load file',
+                          on_progress=update_progress, on_result=show, on_error=report)
+        job.cancel()
+    """
+
+    def __init__(self, max_threads: int = DEFAULT_THREAD_WORKERS, max_processes: Optional[int] = None):
+        """
+        Initialize the scheduler
+
+        Args:
+            max_threads: Size of the thread pool
+            max_processes: Size of the process pool (default: CPU count)
+        """
+        self.max_threads = max_threads
+        self.max_processes = max_processes
+        self._threads = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix='boq-job')
+        self._processes = None
+        self._events: 'queue.Queue[JobEvent]' = queue.Queue()
+        self._jobs: Dict[int, Job] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._root = None
+        self._after_id = None
+        self._interval_ms = POLL_INTERVAL_MS
+
+    # ------------------------------------------------------------------ submitting
+
+    def submit(self, fn: Callable, *args, name: Optional[str] = None,
+               on_result: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[BaseException], None]] = None,
+               on_progress: Optional[Callable[[float, str], None]] = None,
+               on_update: Optional[Callable[[Any, str], None]] = None,
+               on_cancelled: Optional[Callable[[], None]] = None, **kwargs) -> Job:
+        """
+        Run fn(context, *args, **kwargs) on the thread pool
+
+        Args:
+            fn: Job function; its first argument is the JobContext
+            name: Label for logs
+            on_result: Called with fn's return value
+            on_error: Called with the exception fn raised (logged when not given)
+            on_progress: Called with (percentage, message) for context.progress()
+            on_update: Called with (value, message) for context.publish()
+            on_cancelled: Called when the job ends because it was cancelled
+
+        Returns:
+            Job
+        """
+        job = self._register(fn, name, 'thread', on_result, on_error, on_progress, on_update, on_cancelled)
+        context = JobContext(job.id, self._events, job._cancel_event)
+        job.future = self._threads.submit(self._run_thread_job, job, context, fn, args, kwargs)
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+
+    def submit_process(self, fn: Callable, *args, name: Optional[str] = None,
+                       on_result: Optional[Callable[[Any], None]] = None,
+                       on_error: Optional[Callable[[BaseException], None]] = None,
+                       on_cancelled: Optional[Callable[[], None]] = None, **kwargs) -> Job:
+        """
+        Run fn(*args, **kwargs) on the process pool (fn and arguments must be picklable)
+
+        Process jobs report no progress; cancelling one that already started
+        discards its result.
+        """
+        job = self._register(fn, name, 'process', on_result, on_error, None, None, on_cancelled)
+        job.future = self._process_pool().submit(fn, *args, **kwargs)
+        job.state = RUNNING
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+
+    def _register(self, fn, name, kind, on_result, on_error, on_progress, on_update, on_cancelled) -> Job:
+        callbacks = {'result': on_result, 'error': on_error, 'progress': on_progress,
+                     'update': on_update, 'cancelled': on_cancelled}
+        job = Job(next(self._ids), name or getattr(fn, '__name__', 'job'), kind, callbacks)
+        with self._lock:
+            self._jobs[job.id] = job
+        logger.debug(f"Job {job.id} ({job.name}) submitted to the {kind} pool")
+        return job
+
+    def _process_pool(self):
+        if self._processes is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self._processes = ProcessPoolExecutor(max_workers=self.max_processes)
+        return self._processes
+
+    @staticmethod
+    def _run_thread_job(job: Job, context: JobContext, fn: Callable, args, kwargs) -> Any:
+        context.check_cancelled()
+        job.state = RUNNING
+        return fn(context, *args, **kwargs)
+
+    def _finish(self, job: Job, future: Future) -> None:
+        """Queue the outcome of a finished future (runs on the worker or the cancelling thread)"""
+        if future.cancelled() or job.cancelled:
+            self._events.put(JobEvent(job.id, 'cancelled'))
+            return
+        error = future.exception()
+        if isinstance(error, JobCancelled):
+            self._events.put(JobEvent(job.id, 'cancelled'))
+        elif error is not None:
+            self._events.put(JobEvent(job.id, 'error', error))
+        else:
+            self._events.put(JobEvent(job.id, 'result', future.result()))
+
+    # ------------------------------------------------------------------ delivering
+
+    def poll(self, limit: Optional[int] = None) -> int:
+        """
+        Deliver queued events to their callbacks on the calling thread
+
+        Args:
+            limit: Maximum number of events to deliver (default: all queued)
+
+        Returns:
+            Number of events delivered
+        """
+        delivered = 0
+        while limit is None or delivered < limit:
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                break
+            delivered += 1
+            with self._lock:
+                job = self._jobs.get(event.job_id)
+            if job is None:
+                continue
+            if event.kind in ('progress', 'update'):
+                if not job.cancelled:
+                    self._call(job, event.kind, event.value, event.message)
+                continue
+
+            job.state = {'result': DONE, 'error': FAILED, 'cancelled': CANCELLED}[event.kind]
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            if event.kind == 'result':
+                self._call(job, 'result', event.value)
+            elif event.kind == 'error':
+                if job.callbacks['error'] is None:
+                    logger.error(f"Job {job.id} ({job.name}) failed: {event.value}",
+                                 exc_info=(type(event.value), event.value, event.value.__traceback__))
+                self._call(job, 'error', event.value)
+            else:
+                logger.info(f"Job {job.id} ({job.name}) cancelled")
+                self._call(job, 'cancelled')
+        return delivered
+
+    def _call(self, job: Job, kind: str, *args) -> None:
+        callback = job.callbacks.get(kind)
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.name}) {kind} callback failed: {e}", exc_info=True)
+
+    def attach(self, root, interval_ms: int = POLL_INTERVAL_MS) -> None:
+        """Poll from the Tk event loop of root every interval_ms"""
+        self._root = root
+        self._interval_ms = interval_ms
+        if self._after_id is None:
+            self._after_id = root.after(interval_ms, self._tick)
+
+    def detach(self) -> None:
+        """Stop polling from the Tk event loop"""
+        if self._root is not None and self._after_id is not None:
+            try:
+                self._root.after_cancel(self._after_id)
+            except Exception:
+                pass
+        self._after_id = None
+
+    def _tick(self) -> None:
+        self._after_id = None
+        try:
+            self.poll()
+        finally:
+            if self._root is not None:
+                try:
+                    self._after_id = self._root.after(self._interval_ms, self._tick)
+                except Exception:
+                    self._after_id = None  # the window was destroyed
+
+    # ------------------------------------------------------------------ control
+
+    def jobs(self) -> List[Job]:
+        """Jobs that have not been delivered as finished yet"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel one job; False if it is unknown or already finished"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        job.cancel()
+        return True
+
+    def cancel_all(self) -> None:
+        """Cancel every pending or running job"""
+        for job in self.jobs():
+            job.cancel()
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Cancel all jobs, stop polling and release the pools"""
+        self.cancel_all()
+        self.detach()
+        self._threads.shutdown(wait=wait, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=wait, cancel_futures=True)
+            self._processes = None
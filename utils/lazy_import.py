@@ -0,0 +1,145 @@
+"""
+Lazy Import Helpers for BOQ Tools
+Defers heavy modules (pandas, openpyxl, matplotlib, dialogs) until first use
+"""
+
+import importlib
+import importlib.util
+import logging
+import threading
+import types
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class LazyModule(types.ModuleType):
+    """
+    Module proxy that imports the real module on first attribute access
+
+    Usage:
+        pd = LazyModule('pandas')
+        pd.DataFrame(...)  # pandas is imported here
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_name'] = name
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with self.__dict__['_lazy_lock']:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    module = importlib.import_module(self.__dict__['_lazy_name'])
+                    self.__dict__['_lazy_module'] = module
+                    logger.debug(f"Lazily imported {self.__dict__['_lazy_name']}")
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        """True once the underlying module has been imported"""
+        return self.__dict__['_lazy_module'] is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.is_loaded else 'not loaded'
+        return f"<lazy module '{self.__dict__['_lazy_name']}' ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    """Return a proxy for module `name` that is imported on first use"""
+    return LazyModule(name)
+
+
+def lazy_callable(module_name: str, attr: str) -> Callable[..., Any]:
+    """
+    Return a callable that imports `module_name.attr` on first call
+
+    Works for functions and classes (calling the proxy instantiates the class).
+    """
+    resolved = []
+
+    def _call(*args, **kwargs):
+        if not resolved:
+            try:
+                resolved.append(getattr(importlib.import_module(module_name), attr))
+            except ImportError as e:
+                logger.error(f"Could not import {module_name}.{attr}: {e}")
+                raise
+        return resolved[0](*args, **kwargs)
+
+    _call.__name__ = attr
+    _call.__qualname__ = attr
+    _call.__doc__ = f"Lazy proxy for {module_name}.{attr}"
+    return _call
+
+
+class LazyAvailability:
+    """
+    Availability flag that imports its modules the first time it is tested
+
+    find_spec only proves a module exists; importing it can still fail (for
+    example when one of its own dependencies is missing). The flag imports the
+    modules on its first truth test, right before the matching lazy proxy is
+    used, and is False if any import raises ImportError.
+
+    Usage:
+        SETTINGS_AVAILABLE = lazy_available('ui.settings_dialog')
+        if SETTINGS_AVAILABLE:  # ui.settings_dialog is imported here
+            ...
+    """
+
+    def __init__(self, *names: str):
+        self.names = names
+        self._available = None
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        if self._available is None:
+            with self._lock:
+                if self._available is None:
+                    self._available = self._import_all()
+        return self._available
+
+    def _import_all(self) -> bool:
+        for name in self.names:
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                logger.warning(f"{name} is unavailable: {e}")
+                return False
+        return True
+
+    def __repr__(self) -> str:
+        state = 'not checked' if self._available is None else str(self._available)
+        return f"<lazy availability of {', '.join(self.names)} ({state})>"
+
+
+def lazy_available(*names: str) -> LazyAvailability:
+    """Return a flag that is True once all of `names` import successfully"""
+    return LazyAvailability(*names)
+
+
+def module_available(name: str) -> bool:
+    """
+    Check whether a module can be imported without importing it
+
+    Args:
+        name: Dotted module name
+
+    Returns:
+        True if an import spec for the module exists
+    """
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
@@ -0,0 +1,329 @@
+"""
+Pipeline Profiler for BOQ Tools
+Named spans recording wall/CPU time, rows processed and memory per processing stage
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from utils.lazy_import import lazy_module, module_available
+
+logger = logging.getLogger(__name__)
+
+PSUTIL_AVAILABLE = module_available('psutil')
+psutil = lazy_module('psutil')
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+
+# Memory measurement modes
+MEMORY_MODES = ['rss', 'tracemalloc', 'none']
+
+# Export formats
+PROFILE_FORMATS = ['json', 'chrome']
+
+_MB = 1024.0 * 1024.0
+
+
+@dataclass
+class ProfileSpan:
+    """A single timed stage"""
+    name: str
+    start_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    rows: Optional[int] = None
+    memory_delta_mb: Optional[float] = None
+    memory_peak_mb: Optional[float] = None
+    thread_id: int = 0
+    depth: int = 0
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        if self.rows is None or self.wall_seconds <= 0:
+            return None
+        return self.rows / self.wall_seconds
+
+
+class _DisabledSpan:
+    """Stand-in yielded when profiling is off; attribute writes are discarded"""
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        pass
+
+
+_DISABLED_SPAN = _DisabledSpan()
+
+
+class PipelineProfiler:
+    """
+    Collects named spans around pipeline stages
+
+    Usage:
+        profiler = PipelineProfiler(enabled=True)
+        with profiler.span('validation', rows=len(rows)) as span:
+            ...
+            span.rows = processed  # rows can also be set once known
+
+    Memory modes:
+        rss:         process RSS delta and the process high-water mark; cheap
+                     but process-wide. Without psutil the delta is the growth
+                     of the getrusage high-water mark, so a span that stays
+                     below an earlier peak reports 0 and freed memory is not
+                     subtracted
+        tracemalloc: Python allocation delta and peak within the span; precise
+                     but slows allocation-heavy code noticeably
+        none:        timings only
+    """
+
+    def __init__(self, enabled: bool = False, memory_mode: str = 'rss'):
+        if memory_mode not in MEMORY_MODES:
+            raise ValueError(f"Unknown memory mode '{memory_mode}', expected one of {MEMORY_MODES}")
+        self.enabled = False
+        self.memory_mode = memory_mode
+        self.spans: List[ProfileSpan] = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_tracemalloc = False
+        if enabled:
+            self.enable(memory_mode)
+
+    def enable(self, memory_mode: Optional[str] = None) -> None:
+        """Start (or restart) collecting spans"""
+        if memory_mode is not None:
+            if memory_mode not in MEMORY_MODES:
+                raise ValueError(f"Unknown memory mode '{memory_mode}', expected one of {MEMORY_MODES}")
+            self.memory_mode = memory_mode
+        if self.memory_mode == 'tracemalloc' and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.enabled = True
+        logger.info(f"Pipeline profiling enabled (memory: {self.memory_mode})")
+
+    def disable(self) -> None:
+        """Stop collecting spans; recorded spans are kept"""
+        self.enabled = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def reset(self) -> None:
+        """Drop recorded spans and restart the clock"""
+        with self._lock:
+            self.spans = []
+            self._origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, rows: Optional[int] = None, **metadata: Any) -> Iterator[Any]:
+        """
+        Time a stage
+
+        Args:
+            name: Stage name (e.g. 'column_mapping')
+            rows: Rows processed, if known up front
+            **metadata: Extra values stored with the span (e.g. sheet name)
+
+        Yields:
+            The ProfileSpan being recorded, so `rows` can be set inside the block
+        """
+        if not self.enabled:
+            yield _DISABLED_SPAN
+            return
+
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+
+        record = ProfileSpan(name=name, rows=rows, thread_id=threading.get_ident(),
+                             depth=len(stack), metadata=dict(metadata))
+        memory_start = self._memory_start(stack)
+        stack.append(record)
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield record
+        finally:
+            record.cpu_seconds = time.thread_time() - cpu_start
+            record.wall_seconds = time.perf_counter() - wall_start
+            record.start_seconds = wall_start - self._origin
+            stack.pop()
+            self._memory_end(record, memory_start, stack)
+            with self._lock:
+                self.spans.append(record)
+
+    def _memory_start(self, stack: List[ProfileSpan]) -> Optional[float]:
+        if self.memory_mode == 'tracemalloc' and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # Resetting the peak would hide it from enclosing spans, so hand it up first
+            for parent in stack:
+                parent.memory_peak_mb = max(parent.memory_peak_mb or 0.0, peak / _MB)
+            tracemalloc.reset_peak()
+            return current / _MB
+        if self.memory_mode == 'rss':
+            return _rss_baseline_mb()
+        return None
+
+    def _memory_end(self, record: ProfileSpan, memory_start: Optional[float], stack: List[ProfileSpan]) -> None:
+        if self.memory_mode == 'tracemalloc' and memory_start is not None and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            record.memory_delta_mb = current / _MB - memory_start
+            record.memory_peak_mb = max(record.memory_peak_mb or 0.0, peak / _MB)
+            for parent in stack:
+                parent.memory_peak_mb = max(parent.memory_peak_mb or 0.0, record.memory_peak_mb)
+        elif self.memory_mode == 'rss':
+            current = _rss_baseline_mb()
+            if current is not None and memory_start is not None:
+                record.memory_delta_mb = current - memory_start
+            record.memory_peak_mb = _peak_rss_mb()
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Aggregate spans by name
+
+        Returns:
+            Dictionary of stage name -> calls, wall/CPU seconds, rows and peak memory
+        """
+        stages: Dict[str, Dict[str, Any]] = {}
+        for span in sorted(self.spans, key=lambda s: s.start_seconds):
+            stage = stages.setdefault(span.name, {
+                'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'rows': None, 'memory_peak_mb': None
+            })
+            stage['calls'] += 1
+            stage['wall_seconds'] += span.wall_seconds
+            stage['cpu_seconds'] += span.cpu_seconds
+            if span.rows is not None:
+                stage['rows'] = (stage['rows'] or 0) + span.rows
+            if span.memory_peak_mb is not None:
+                stage['memory_peak_mb'] = max(stage['memory_peak_mb'] or 0.0, span.memory_peak_mb)
+        return stages
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Profile as a JSON-serialisable dictionary"""
+        return {
+            'memory_mode': self.memory_mode,
+            'pid': os.getpid(),
+            'summary': self.summary(),
+            'spans': [asdict(span) for span in sorted(self.spans, key=lambda s: s.start_seconds)],
+        }
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Profile in Chrome trace event format (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        events = []
+        for span in sorted(self.spans, key=lambda s: s.start_seconds):
+            args: Dict[str, Any] = {'cpu_ms': round(span.cpu_seconds * 1000.0, 3)}
+            if span.rows is not None:
+                args['rows'] = span.rows
+            if span.memory_delta_mb is not None:
+                args['memory_delta_mb'] = round(span.memory_delta_mb, 3)
+            if span.memory_peak_mb is not None:
+                args['memory_peak_mb'] = round(span.memory_peak_mb, 3)
+            args.update({key: str(value) for key, value in span.metadata.items()})
+            events.append({
+                'name': span.name,
+                'cat': 'pipeline',
+                'ph': 'X',
+                'ts': round(span.start_seconds * 1e6, 1),
+                'dur': round(span.wall_seconds * 1e6, 1),
+                'pid': pid,
+                'tid': span.thread_id,
+                'args': args,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def save(self, path: Union[str, Path], format_type: str = 'json') -> Path:
+        """
+        Write the profile to disk
+
+        Args:
+            path: Output file path
+            format_type: 'json' or 'chrome'
+
+        Returns:
+            Path written
+        """
+        if format_type not in PROFILE_FORMATS:
+            raise ValueError(f"Unknown profile format '{format_type}', expected one of {PROFILE_FORMATS}")
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = self.to_chrome_trace() if format_type == 'chrome' else self.to_dict()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, default=str)
+        logger.info(f"Pipeline profile written to {path}")
+        return path
+
+    def format_report(self) -> str:
+        """Format the per-stage summary as a text table"""
+        lines = [f"{'stage':<24} {'calls':>5} {'wall s':>9} {'cpu s':>9} {'rows':>9} {'peak MB':>9}"]
+        for name, stage in self.summary().items():
+            rows = '' if stage['rows'] is None else str(stage['rows'])
+            peak = '' if stage['memory_peak_mb'] is None else f"{stage['memory_peak_mb']:.1f}"
+            lines.append(f"{name:<24} {stage['calls']:>5} {stage['wall_seconds']:>9.3f} "
+                         f"{stage['cpu_seconds']:>9.3f} {rows:>9} {peak:>9}")
+        return '\n'.join(lines)
+
+
+def _current_rss_mb() -> Optional[float]:
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss / _MB
+    return None
+
+
+def _rss_baseline_mb() -> Optional[float]:
+    """Current RSS, or the getrusage high-water mark when psutil is missing"""
+    current = _current_rss_mb()
+    return current if current is not None else _peak_rss_mb()
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if RESOURCE_AVAILABLE:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak / _MB if sys.platform == 'darwin' else peak / 1024.0
+    if PSUTIL_AVAILABLE:
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / _MB
+    return None
+
+
+# Global profiler instance
+_profiler_instance = None
+
+
+def get_profiler() -> PipelineProfiler:
+    """Get the global pipeline profiler (disabled until enable_profiling is called)"""
+    global _profiler_instance
+    if _profiler_instance is None:
+        _profiler_instance = PipelineProfiler()
+    return _profiler_instance
+
+
+def enable_profiling(memory_mode: str = 'rss') -> PipelineProfiler:
+    """Enable the global profiler and return it"""
+    profiler = get_profiler()
+    profiler.enable(memory_mode)
+    return profiler
+
+
+def disable_profiling() -> None:
+    """Disable the global profiler"""
+    get_profiler().disable()
+
+
+def profile_span(name: str, rows: Optional[int] = None, **metadata: Any):
+    """Span on the global profiler; a no-op while profiling is disabled"""
+    return get_profiler().span(name, rows, **metadata)
@@ -0,0 +1,111 @@
+"""
+Startup Profiler for BOQ Tools
+Reports per-module import cost of the application startup path
+"""
+
+import importlib
+import logging
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Modules imported on the way to showing the main window
+STARTUP_MODULES = ['main', 'ui.main_window']
+
+
+@dataclass
+class ImportTiming:
+    """Import cost of a single module"""
+    module: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int = 0
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """
+    Parse the stderr output of `python -X importtime`
+
+    Args:
+        output: Raw stderr text
+
+    Returns:
+        List of ImportTiming in import order
+    """
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        parts = line.split(':', 1)[1].split('|')
+        if len(parts) != 3:
+            continue
+        self_us, cumulative_us, name = parts
+        timings.append(ImportTiming(
+            module=name.strip(),
+            self_ms=int(self_us) / 1000.0,
+            cumulative_ms=int(cumulative_us) / 1000.0,
+            depth=(len(name) - len(name.lstrip()) - 1) // 2,
+        ))
+    return timings
+
+
+def profile_imports(modules: Optional[List[str]] = None, project_root: Optional[Path] = None) -> List[ImportTiming]:
+    """
+    Measure the import cost of `modules` in a fresh interpreter
+
+    Uses `python -X importtime` so nested imports are attributed correctly. When
+    running as a frozen executable no interpreter is available, so each module
+    is timed in-process instead (cumulative cost only).
+
+    Args:
+        modules: Modules to import (defaults to STARTUP_MODULES)
+        project_root: Directory to run the interpreter in (defaults to the repo root)
+
+    Returns:
+        List of ImportTiming
+    """
+    modules = modules or STARTUP_MODULES
+    project_root = project_root or Path(__file__).resolve().parent.parent
+
+    if getattr(sys, 'frozen', False):
+        timings = []
+        for module in modules:
+            start = time.perf_counter()
+            importlib.import_module(module)
+            elapsed = (time.perf_counter() - start) * 1000.0
+            timings.append(ImportTiming(module, elapsed, elapsed))
+        return timings
+
+    statement = '; '.join(f'import {module}' for module in modules)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=str(project_root), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        logger.error(f"Startup profile failed: {result.stderr.strip().splitlines()[-1:]}")
+    return parse_importtime(result.stderr)
+
+
+def format_import_report(timings: List[ImportTiming], top: int = 25) -> str:
+    """
+    Format a startup profile as a text report
+
+    Args:
+        timings: Output of profile_imports
+        top: Number of most expensive modules to list
+
+    Returns:
+        Multi-line report
+    """
+    roots = [t for t in timings if t.depth == 0]
+    total_ms = sum(t.cumulative_ms for t in roots)
+    lines = [f"Startup import time: {total_ms:.1f} ms across {len(timings)} modules", ""]
+    lines.append(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for timing in sorted(timings, key=lambda t: t.cumulative_ms, reverse=True)[:top]:
+        lines.append(f"{timing.cumulative_ms:>14.1f} {timing.self_ms:>9.1f}  {'  ' * timing.depth}{timing.module}")
+    return '\n'.join(lines)